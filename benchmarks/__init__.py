@@ -0,0 +1,6 @@
+"""
+Benchmarks of the orchestration overhead of statue.
+
+Run them with ``python -m benchmarks run`` and compare results of different
+versions with ``python -m benchmarks compare``.
+"""
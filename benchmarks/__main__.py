@@ -0,0 +1,171 @@
+"""Command line of the benchmarks."""
+import json
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+import click
+
+import statue
+from benchmarks.execution import (
+    DISTRIBUTIONS,
+    IN_PROCESS,
+    MODES,
+    Workload,
+    run_workload,
+)
+from benchmarks.fake_tool import PROFILES
+from benchmarks.suite import (
+    BENCHMARKS,
+    DEFAULT_REPEAT,
+    compare_results,
+    run_benchmarks,
+)
+
+RESULTS_DIR = Path(".benchmarks")
+DEFAULT_THRESHOLD = 0.1
+
+
+@click.group()
+def benchmarks_cli() -> None:
+    """Benchmarks of statue's orchestration overhead."""
+
+
+@benchmarks_cli.command("list")
+def list_benchmarks():
+    """List available benchmarks."""
+    for benchmark in BENCHMARKS:
+        click.echo(f"{benchmark.name} - {benchmark.setup.__doc__}")
+
+
+@benchmarks_cli.command("run")
+@click.argument("names", nargs=-1)
+@click.option("--scale", type=click.IntRange(min=1), default=1)
+@click.option("--repeat", type=click.IntRange(min=1), default=DEFAULT_REPEAT)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False),
+    help=f"Results output path. {RESULTS_DIR}/statue-<version>.json by default",
+)
+def run_benchmarks_cli(names, scale, repeat, output):
+    """Run benchmarks whose names start with NAMES, or all of them."""
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"statue-{statue.__version__}.json"
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_benchmarks(
+            Path(work_dir),
+            scale=scale,
+            repeat=repeat,
+            names=list(names) if len(names) != 0 else None,
+            on_result=__print_result,
+        )
+    with open(output, mode="w") as output_file:
+        json.dump(results, output_file, indent=2)
+    click.echo(f"Results were saved to {output}")
+
+
+@benchmarks_cli.command("compare")
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("results", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_THRESHOLD,
+    help=(
+        "Relative slowdown which is considered a regression. "
+        f"{DEFAULT_THRESHOLD} by default"
+    ),
+)
+def compare_benchmarks_cli(baseline, results, threshold):
+    """Compare RESULTS to BASELINE. Fails if any benchmark regressed."""
+    with open(baseline, mode="r") as baseline_file:
+        baseline_results = json.load(baseline_file)
+    with open(results, mode="r") as results_file:
+        new_results = json.load(results_file)
+    click.echo(
+        f"statue {baseline_results['statue_version']} -> "
+        f"{new_results['statue_version']}"
+    )
+    regressed = False
+    for name, ratio in compare_results(baseline_results, new_results).items():
+        message = f"{name}: {ratio - 1:+.1%}"
+        if ratio - 1 > threshold:
+            regressed = True
+            message = click.style(message, fg="red")
+        click.echo(message)
+    if regressed:
+        sys.exit(1)
+
+
+@benchmarks_cli.command("execution")
+@click.option("--tasks", type=click.IntRange(min=1), default=1000)
+@click.option("--commands-per-source", type=click.IntRange(min=1), default=5)
+@click.option(
+    "--mean-duration",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    help="Mean duration of a task in seconds",
+)
+@click.option("--distribution", type=click.Choice(DISTRIBUTIONS), default="constant")
+@click.option("--profile", type=click.Choice(PROFILES), default="sleep")
+@click.option("--failure-rate", type=click.FloatRange(0, 1), default=0.0)
+@click.option("--output-lines", type=click.IntRange(min=0), default=0)
+@click.option(
+    "--reports-files",
+    is_flag=True,
+    help="Capture and parse the output of tasks, as of linters reporting files",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(MODES),
+    default=IN_PROCESS,
+    help="Run tasks in process, or as fake tool processes",
+)
+@click.option("--seed", type=int, default=0)
+@click.option("-o", "--output", type=click.Path(dir_okay=False))
+def execution_benchmark_cli(  # pylint: disable=too-many-arguments
+    tasks,
+    commands_per_source,
+    mean_duration,
+    distribution,
+    profile,
+    failure_rate,
+    output_lines,
+    reports_files,
+    mode,
+    seed,
+    output,
+):
+    """Measure the execution engine over a workload of fake tasks."""
+    workload = Workload(
+        tasks=tasks,
+        commands_per_source=commands_per_source,
+        mean_duration=mean_duration,
+        distribution=distribution,
+        profile=profile,
+        failure_rate=failure_rate,
+        output_lines=output_lines,
+        reports_files=reports_files,
+        seed=seed,
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        metrics = run_workload(workload, Path(work_dir), mode=mode)
+    for name, value in metrics.items():
+        click.echo(f"{name}: {value}")
+    if output is not None:
+        with open(output, mode="w") as output_file:
+            json.dump(dict(workload=asdict(workload), metrics=metrics), output_file)
+
+
+def __print_result(name, result):
+    if "skipped" in result:
+        click.echo(f"{name}: skipped ({result['skipped']})")
+        return
+    click.echo(f"{name}: min {result['min']:.4f}s, median {result['median']:.4f}s")
+
+
+if __name__ == "__main__":
+    benchmarks_cli()  # pylint: disable=E1120
@@ -0,0 +1,232 @@
+"""Benchmark harness of the execution engine, using fake tools of controlled cost."""
+import math
+import os
+import random
+import stat
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks import fake_tool
+from statue.command import Command, ProcessesUsage
+from statue.evaluation import evaluate_commands_map
+from statue.verbosity import SILENT
+
+DISTRIBUTIONS = ["constant", "uniform", "exponential", "lognormal"]
+IN_PROCESS = "in-process"
+PROCESS = "process"
+MODES = [IN_PROCESS, PROCESS]
+FAKE_TOOL_NAME = "fake-tool"
+
+try:
+    import resource
+except ImportError:
+    resource = None  # type: ignore
+
+
+@dataclass
+class Workload:  # pylint: disable=too-many-instance-attributes
+    """
+    Reproducible set of fake tasks.
+
+    :param tasks: Number of tasks, split between sources.
+    :param commands_per_source: Number of tasks of each source.
+    :param mean_duration: Mean duration of a task in seconds.
+    :param distribution: Distribution of tasks durations, one of
+     :data:`DISTRIBUTIONS`.
+    :param profile: What tasks spend their time on, one of
+     :data:`fake_tool.PROFILES`.
+    :param failure_rate: Probability of a task to fail.
+    :param output_lines: Number of lines each task outputs.
+    :param reports_files: Do tasks report the files they fail on, so their output
+     is captured and parsed.
+    :param seed: Seed of the tasks randomness.
+    """
+
+    tasks: int
+    commands_per_source: int = 5
+    mean_duration: float = 0.0
+    distribution: str = "constant"
+    profile: str = "sleep"
+    failure_rate: float = 0.0
+    output_lines: int = 0
+    reports_files: bool = False
+    seed: int = 0
+
+    def durations(self) -> List[float]:
+        """Sample durations of the tasks."""
+        randomness = random.Random(self.seed)
+        if self.distribution == "uniform":
+            return [
+                randomness.uniform(0, 2 * self.mean_duration) for _ in range(self.tasks)
+            ]
+        if self.distribution == "exponential" and self.mean_duration > 0:
+            return [
+                randomness.expovariate(1 / self.mean_duration)
+                for _ in range(self.tasks)
+            ]
+        if self.distribution == "lognormal" and self.mean_duration > 0:
+            # Standard deviation of 1 in log space, keeping the requested mean
+            return [
+                randomness.lognormvariate(0, 1) * self.mean_duration / math.exp(0.5)
+                for _ in range(self.tasks)
+            ]
+        return [self.mean_duration] * self.tasks
+
+    def commands_map(
+        self, executable: Optional[Path] = None
+    ) -> Dict[str, List[Command]]:
+        """
+        Build commands map of the workload.
+
+        :param executable: Path of the fake tool executable. Tasks run in process
+         if None.
+        :return: Dictionary from source to its fake commands.
+        """
+        randomness = random.Random(self.seed + 1)
+        commands_map: Dict[str, List[Command]] = {}
+        for index, duration in enumerate(self.durations()):
+            task = FakeTask(
+                duration=duration,
+                profile=self.profile,
+                output_lines=self.output_lines,
+                success=randomness.random() >= self.failure_rate,
+            )
+            commands_map.setdefault(
+                f"source{index // self.commands_per_source}", []
+            ).append(
+                FakeCommand(
+                    name=FAKE_TOOL_NAME if executable is None else str(executable),
+                    help="Fake tool",
+                    args=task.args(),
+                    task=task,
+                    fake_reports_files=self.reports_files,
+                    in_process=executable is None,
+                )
+            )
+        return commands_map
+
+
+@dataclass
+class FakeTask:
+    """Cost and result of a fake task."""
+
+    duration: float
+    profile: str
+    output_lines: int
+    success: bool
+
+    def args(self) -> List[str]:
+        """Arguments of the fake tool executable, following the source."""
+        return [
+            str(self.duration),
+            self.profile,
+            str(self.output_lines),
+            "0" if self.success else "1",
+        ]
+
+
+@dataclass
+class FakeCommand(Command):
+    """Command running a fake task, either in process or as a fake tool executable."""
+
+    task: FakeTask = field(default=None, repr=False)  # type: ignore
+    fake_reports_files: bool = False
+    in_process: bool = True
+
+    @property
+    def reports_files(self) -> bool:
+        """Does the fake task report files, so its output would be captured."""
+        return self.fake_reports_files
+
+    def _run_subprocess(
+        self,
+        args: List[str],
+        verbosity: str,
+        output: Optional[List[str]] = None,
+        usage: Optional[ProcessesUsage] = None,
+    ) -> int:
+        if not self.in_process:
+            return super()._run_subprocess(args, verbosity, output, usage)
+        fake_tool.perform(self.task.duration, self.task.profile)
+        if output is not None:
+            output.extend(
+                fake_tool.output_line(args[1], index)
+                for index in range(self.task.output_lines)
+            )
+        return 0 if self.task.success else 1
+
+
+def write_fake_tool(bin_dir: Path) -> Path:
+    """
+    Write fake tool executable, running with the current interpreter.
+
+    :param bin_dir: Directory to write the executable into.
+    :return: Path of the executable.
+    """
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    executable = bin_dir / FAKE_TOOL_NAME
+    executable.write_text(
+        f"#!{sys.executable} -SE\n" + Path(fake_tool.__file__).read_text()
+    )
+    executable.chmod(executable.stat().st_mode | stat.S_IXUSR)
+    return executable
+
+
+def run_workload(
+    workload: Workload,
+    work_dir: Path,
+    mode: str = IN_PROCESS,
+    evaluate: Callable[..., Any] = evaluate_commands_map,
+) -> Dict[str, Any]:
+    """
+    Evaluate workload and measure the execution engine.
+
+    :param workload: Workload to evaluate.
+    :param work_dir: Directory for the fake tool executable.
+    :param mode: Run tasks in process, or as processes of the fake tool, one of
+     :data:`MODES`.
+    :param evaluate: Function evaluating a commands map.
+    :return: Makespan, overheads, cpu utilization and peak memory.
+    """
+    commands_map = workload.commands_map(
+        executable=write_fake_tool(work_dir / "bin") if mode == PROCESS else None
+    )
+    work = sum(workload.durations())
+    cpu_start = __cpu_time()
+    start = time.perf_counter()
+    evaluation = evaluate(commands_map, verbosity=SILENT)
+    makespan = time.perf_counter() - start
+    cpu_time = __cpu_time() - cpu_start
+    commands_time = sum(
+        command_evaluation.duration
+        for source_evaluation in evaluation.sources_evaluations.values()
+        for command_evaluation in source_evaluation.commands_evaluations
+    )
+    return dict(
+        tasks=workload.tasks,
+        mode=mode,
+        failures=evaluation.failed_commands_number,
+        work=work,
+        makespan=makespan,
+        overhead_per_task=(makespan - work) / workload.tasks,
+        statue_overhead_per_task=(makespan - commands_time) / workload.tasks,
+        cpu_utilization=cpu_time / makespan if makespan > 0 else None,
+        peak_memory=__peak_memory(),
+    )
+
+
+def __cpu_time() -> float:
+    """Cpu time of this process and of its finished children."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def __peak_memory() -> Optional[int]:
+    """Peak resident memory of this process in bytes, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,56 @@
+"""
+Fake static analysis tool with a controlled cost.
+
+Usage: fake_tool.py SOURCE DURATION PROFILE OUTPUT_LINES EXIT_CODE
+
+Only the standard library is used, so the tool starts as fast as the
+interpreter does.
+"""
+import os
+import sys
+import tempfile
+import time
+
+PROFILES = ["sleep", "cpu", "io"]
+IO_CHUNK = b"\0" * 65536
+
+
+def perform(duration: float, profile: str) -> None:
+    """
+    Spend time as a tool would.
+
+    :param duration: Time to spend in seconds.
+    :param profile: ``sleep`` in order to wait, ``cpu`` in order to keep the cpu
+     busy or ``io`` in order to write and sync a temporary file.
+    """
+    if profile == "sleep":
+        time.sleep(duration)
+        return
+    deadline = time.perf_counter() + duration
+    if profile == "cpu":
+        while time.perf_counter() < deadline:
+            pass
+        return
+    with tempfile.TemporaryFile() as io_file:
+        while time.perf_counter() < deadline:
+            io_file.write(IO_CHUNK)
+            io_file.flush()
+            os.fsync(io_file.fileno())
+
+
+def output_line(source: str, index: int) -> str:
+    """Output line in the format of linters reporting files."""
+    return f"{source}/module{index}.py:1:1: F401 synthetic issue\n"
+
+
+def main() -> int:
+    """Run the fake tool with command line arguments."""
+    source, duration, profile, output_lines, exit_code = sys.argv[1:6]
+    perform(float(duration), profile)
+    for index in range(int(output_lines)):
+        sys.stdout.write(output_line(source, index))
+    return int(exit_code)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
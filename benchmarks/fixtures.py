@@ -0,0 +1,123 @@
+"""Synthetic inputs of the benchmarks."""
+from pathlib import Path
+from typing import Dict, List
+
+import toml
+
+from statue.command import Command
+from statue.evaluation import CommandEvaluation, Evaluation, SourceEvaluation
+
+COMMANDS_NAMES = ["black", "flake8", "isort", "mypy", "pylint", "pydocstyle"]
+
+
+def contexts_names(contexts_number: int, chain_length: int) -> List[List[str]]:
+    """
+    Get names of contexts, split into inheritance chains.
+
+    :param contexts_number: Total number of contexts.
+    :param chain_length: Number of contexts in each chain.
+    :return: List of chains, from the root context to the leaf context.
+    """
+    return [
+        [
+            f"context{index}"
+            for index in range(start, min(start + chain_length, contexts_number))
+        ]
+        for start in range(0, contexts_number, chain_length)
+    ]
+
+
+def configuration_setup(
+    sources_number: int, contexts_number: int, chain_length: int
+) -> Dict[str, Dict]:
+    """
+    Build configuration with many sources and deep contexts inheritance chains.
+
+    Every context adds an argument to one of the commands, so resolving the
+    commands of a source goes through its whole chain.
+
+    :param sources_number: Number of sources in the configuration.
+    :param contexts_number: Number of contexts in the configuration.
+    :param chain_length: Number of contexts inheriting from one another.
+    :return: Configuration dictionary, as read from ``statue.toml``.
+    """
+    chains = contexts_names(contexts_number, chain_length)
+    contexts: Dict[str, Dict] = {}
+    commands: Dict[str, Dict] = {name: {} for name in COMMANDS_NAMES}
+    for chain in chains:
+        for index, name in enumerate(chain):
+            contexts[name] = {"help": f"Synthetic context {name}"}
+            if index != 0:
+                contexts[name]["parent"] = chain[index - 1]
+            commands[COMMANDS_NAMES[index % len(COMMANDS_NAMES)]][name] = {
+                "add_args": [f"--{name}"]
+            }
+    sources = {
+        f"package{index // 100}/module{index}.py": {
+            "contexts": [chains[index % len(chains)][-1]]
+        }
+        for index in range(sources_number)
+    }
+    return {"contexts": contexts, "commands": commands, "sources": sources}
+
+
+def write_configuration(
+    directory: Path, sources_number: int, contexts_number: int, chain_length: int
+) -> Path:
+    """
+    Write synthetic configuration file into a directory.
+
+    :return: Path of the written ``statue.toml``.
+    """
+    configuration_path = directory / "statue.toml"
+    with open(configuration_path, mode="w") as configuration_file:
+        toml.dump(
+            configuration_setup(sources_number, contexts_number, chain_length),
+            configuration_file,
+        )
+    return configuration_path
+
+
+def build_evaluation(sources_number: int, failure_every: int = 7) -> Evaluation:
+    """
+    Build evaluation of all commands over many sources.
+
+    :param sources_number: Number of evaluated sources.
+    :param failure_every: Every command evaluation with an index divisible by
+     this number fails.
+    :return: :class:`Evaluation`.
+    """
+    commands = [
+        Command(name=name, help=f"Synthetic {name}", args=[f"--{name}"])
+        for name in COMMANDS_NAMES
+    ]
+    evaluation = Evaluation()
+    for source_index in range(sources_number):
+        source = f"package{source_index // 100}/module{source_index}.py"
+        evaluation[source] = SourceEvaluation(
+            [
+                CommandEvaluation(
+                    command=command,
+                    success=(source_index + command_index) % failure_every != 0,
+                    duration=0.01 * (command_index + 1),
+                )
+                for command_index, command in enumerate(commands)
+            ]
+        )
+    return evaluation
+
+
+def write_legacy_evaluations(
+    evaluations_dir: Path, evaluations_number: int, sources_number: int
+) -> None:
+    """
+    Write evaluations directory, as kept by older versions of statue.
+
+    :param evaluations_dir: Directory to write the evaluations into.
+    :param evaluations_number: Number of evaluations files.
+    :param sources_number: Number of sources in each evaluation.
+    """
+    evaluations_dir.mkdir(parents=True, exist_ok=True)
+    evaluation = build_evaluation(sources_number)
+    for index in range(evaluations_number):
+        evaluation.save_as_json(evaluations_dir / f"evaluation-{1000 + index}.json")
@@ -0,0 +1,269 @@
+"""Benchmarks registry, measurement and results."""
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import statue
+from benchmarks.fixtures import (
+    build_evaluation,
+    write_configuration,
+    write_legacy_evaluations,
+)
+from statue.cache import Cache
+from statue.commands_map import read_commands_map
+from statue.configuration import Configuration
+from statue.evaluation import Evaluation
+from statue.history_stats import commands_stats
+from statue.retention import RetentionPolicy
+
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_REPEAT = 5
+
+# A benchmark gets a work directory and a scale, prepares its inputs and returns
+# the function to measure.
+BenchmarkSetup = Callable[[Path, int], Callable[[], Any]]
+
+
+@dataclass
+class Benchmark:
+    """
+    Benchmark of one operation of statue.
+
+    :param name: Unique name of the benchmark.
+    :param setup: Function preparing inputs and returning the measured function.
+    """
+
+    name: str
+    setup: BenchmarkSetup
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str) -> Callable[[BenchmarkSetup], BenchmarkSetup]:
+    """Register benchmark setup function under a name."""
+
+    def register(setup: BenchmarkSetup) -> BenchmarkSetup:
+        BENCHMARKS.append(Benchmark(name=name, setup=setup))
+        return setup
+
+    return register
+
+
+@benchmark("configuration.load")
+def load_configuration_benchmark(directory: Path, scale: int) -> Callable[[], Any]:
+    """Load configuration with thousands of sources and deep contexts chains."""
+    configuration_path = write_configuration(
+        directory,
+        sources_number=2000 * scale,
+        contexts_number=1000 * scale,
+        chain_length=50,
+    )
+    return lambda: Configuration.load_configuration(configuration_path)
+
+
+@benchmark("commands_map.read")
+def read_commands_map_benchmark(directory: Path, scale: int) -> Callable[[], Any]:
+    """Resolve the commands of every source of a large configuration."""
+    Configuration.load_configuration(
+        write_configuration(
+            directory,
+            sources_number=200 * scale,
+            contexts_number=100 * scale,
+            chain_length=50,
+        )
+    )
+    return lambda: read_commands_map([])
+
+
+@benchmark("evaluation.save")
+def save_evaluation_benchmark(directory: Path, scale: int) -> Callable[[], Any]:
+    """Save evaluation of thousands of sources as json."""
+    evaluation = build_evaluation(sources_number=2000 * scale)
+    output = directory / "evaluation.json"
+    return lambda: evaluation.save_as_json(output)
+
+
+@benchmark("evaluation.load")
+def load_evaluation_benchmark(directory: Path, scale: int) -> Callable[[], Any]:
+    """Load evaluation of thousands of sources from json."""
+    input_path = directory / "evaluation.json"
+    build_evaluation(sources_number=2000 * scale).save_as_json(input_path)
+    return lambda: Evaluation.load_from_file(input_path)
+
+
+@benchmark("history.import_legacy")
+def import_legacy_history_benchmark(directory: Path, scale: int) -> Callable[[], Any]:
+    """Import a large evaluations directory of older versions into history."""
+    write_legacy_evaluations(
+        directory / ".statue" / "evaluations",
+        evaluations_number=30 * scale,
+        sources_number=200,
+    )
+
+    def import_legacy_history():
+        __remove_history()
+        return Cache.runs_summaries()
+
+    return import_legacy_history
+
+
+@benchmark("history.list")
+def list_history_benchmark(directory: Path, scale: int) -> Callable[[], Any]:
+    """List summaries of a full history."""
+    __fill_history(scale)
+    return Cache.runs_summaries
+
+
+@benchmark("history.recent")
+def recent_evaluation_benchmark(directory: Path, scale: int) -> Callable[[], Any]:
+    """Load most recent evaluation of a full history."""
+    __fill_history(scale)
+    return Cache.recent_evaluation
+
+
+@benchmark("history.stats")
+def commands_stats_benchmark(directory: Path, scale: int) -> Callable[[], Any]:
+    """Compute statistics of all commands evaluations of a full history."""
+    __fill_history(scale)
+    return lambda: commands_stats(Cache.commands_histories())
+
+
+@benchmark("cli.cold_start")
+def cli_cold_start_benchmark(directory: Path, scale: int) -> Callable[[], Any]:
+    """Start the statue command line in a new interpreter."""
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(
+        [str(Path(statue.__file__).parent.parent), environment.get("PYTHONPATH", "")]
+    )
+    return lambda: subprocess.run(
+        [sys.executable, "-m", "statue", "--help"],
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Measure run time of a function.
+
+    :param function: Function to measure.
+    :param repeat: Number of times to run the function.
+    :return: Minimal and median times in seconds, and all measured times.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return dict(min=min(times), median=statistics.median(times), times=times)
+
+
+def run_benchmarks(
+    work_dir: Path,
+    scale: int = 1,
+    repeat: int = DEFAULT_REPEAT,
+    names: Optional[List[str]] = None,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run benchmarks, each in its own directory.
+
+    Benchmarks which are not supported by the installed version of statue are
+    skipped, so results of older versions stay comparable.
+
+    :param work_dir: Directory to create the benchmarks inputs in.
+    :param scale: Multiplier of the inputs sizes.
+    :param repeat: Number of times to run each benchmark.
+    :param names: Prefixes of names of benchmarks to run. All benchmarks if None.
+    :param on_result: Called with the name and result of each benchmark.
+    :return: Results json dictionary.
+    """
+    results: Dict[str, Any] = {}
+    for benchmark_obj in BENCHMARKS:
+        if names is not None and not any(
+            benchmark_obj.name.startswith(name) for name in names
+        ):
+            continue
+        directory = work_dir / benchmark_obj.name
+        directory.mkdir(parents=True)
+        with __working_directory(directory):
+            try:
+                result = measure(benchmark_obj.setup(directory, scale), repeat)
+            except (AttributeError, ImportError) as error:
+                result = dict(skipped=str(error))
+            finally:
+                Configuration.reset_configuration()
+        shutil.rmtree(directory)
+        results[benchmark_obj.name] = result
+        if on_result is not None:
+            on_result(benchmark_obj.name, result)
+    return dict(
+        version=RESULTS_FORMAT_VERSION,
+        statue_version=statue.__version__,
+        python_version=platform.python_version(),
+        platform=platform.platform(),
+        timestamp=time.time(),
+        scale=scale,
+        repeat=repeat,
+        benchmarks=results,
+    )
+
+
+def compare_results(
+    baseline: Dict[str, Any], results: Dict[str, Any]
+) -> Dict[str, float]:
+    """
+    Compare median times of benchmarks which ran in both results.
+
+    :param baseline: Results to compare to.
+    :param results: New results.
+    :return: Ratio of the new median time to the baseline one, by benchmark name.
+    """
+    ratios = {}
+    for name, result in results["benchmarks"].items():
+        baseline_result = baseline["benchmarks"].get(name, {})
+        if "median" not in result or "median" not in baseline_result:
+            continue
+        ratios[name] = result["median"] / baseline_result["median"]
+    return ratios
+
+
+@contextmanager
+def __working_directory(directory: Path) -> Iterator[None]:
+    previous_directory = Path.cwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(previous_directory)
+
+
+def __fill_history(scale: int) -> None:
+    evaluation = build_evaluation(sources_number=200)
+    for timestamp in range(30 * scale):
+        Cache.save_evaluation(
+            evaluation,
+            timestamp=timestamp,
+            retention_policy=RetentionPolicy(max_runs=None),
+        )
+
+
+def __remove_history() -> None:
+    history_path = Cache.history_path()
+    for path in [
+        history_path,
+        history_path.with_name(f"{history_path.name}-wal"),
+        history_path.with_name(f"{history_path.name}-shm"),
+    ]:
+        if path.exists():
+            path.unlink()
@@ -1,10 +1,166 @@
 """Module for cache related methods."""
+import hashlib
+import json
+import sqlite3
 import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from operator import itemgetter
 from pathlib import Path
-from typing import List
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from statue.constants import HISTORY_SIZE
-from statue.evaluation import Evaluation
+from git import Repo
+
+from statue.command import Command
+from statue.constants import HISTORY_TIMEOUT
+from statue.evaluation import CommandEvaluation, Evaluation, SourceEvaluation
+from statue.history_stats import (
+    DAILY,
+    WEEKLY,
+    CommandHistory,
+    CommandRollup,
+    period_start,
+)
+from statue.hotspots import FileTiming
+from statue.retention import SECONDS_IN_DAY, RetentionPolicy
+from statue.sources_index import SourcesIndex
+
+HISTORY_SCHEMA_VERSION = 1
+# Commands evaluations are the bulk of the history, so their rows are kept small:
+# source paths are stored once in the paths table, durations are stored as
+# integer microseconds and rows are clustered by their primary key, which is the
+# only index they need.
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    commands_number INTEGER NOT NULL,
+    successful_commands_number INTEGER NOT NULL,
+    pinned INTEGER NOT NULL DEFAULT 0,
+    last_used REAL,
+    complete INTEGER NOT NULL DEFAULT 1,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (timestamp, id);
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sources (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    path_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (run_id, path_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY,
+    digest BLOB NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    command BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS commands_by_name ON commands (name);
+CREATE TABLE IF NOT EXISTS commands_evaluations (
+    run_id INTEGER NOT NULL,
+    path_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    command_id INTEGER NOT NULL,
+    success INTEGER NOT NULL,
+    failed_files TEXT,
+    duration_us INTEGER,
+    PRIMARY KEY (run_id, path_id, position),
+    FOREIGN KEY (run_id, path_id) REFERENCES sources (run_id, path_id)
+        ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    id INTEGER PRIMARY KEY,
+    period_days INTEGER NOT NULL,
+    period_start REAL NOT NULL,
+    source TEXT NOT NULL,
+    command TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    durations TEXT NOT NULL,
+    UNIQUE (period_days, period_start, source, command)
+);
+CREATE TABLE IF NOT EXISTS file_timings (
+    command_digest BLOB NOT NULL,
+    file TEXT NOT NULL,
+    file_digest BLOB NOT NULL,
+    duration REAL NOT NULL,
+    success INTEGER NOT NULL,
+    PRIMARY KEY (command_digest, file)
+)
+"""
+RECENT_RUNS_QUERY = (
+    "SELECT id, timestamp, commands_number, successful_commands_number, pinned, "
+    "complete, fingerprint FROM runs ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+)
+NTH_RUN_ID_QUERY = (
+    "SELECT id FROM runs ORDER BY timestamp DESC, id DESC LIMIT 1 OFFSET ?"
+)
+# Joins commands evaluations with their source path and command, ordered by
+# sources positions, to be followed by a condition matching them with runs
+EVALUATIONS_JOIN = (
+    "JOIN commands_evaluations "
+    "JOIN sources ON sources.run_id = commands_evaluations.run_id "
+    "AND sources.path_id = commands_evaluations.path_id "
+    "JOIN paths ON paths.id = commands_evaluations.path_id "
+    "JOIN commands ON commands.id = commands_evaluations.command_id"
+)
+MICROSECONDS_IN_SECOND = 1_000_000
+# Unfinished runs started more recently than that are not removed from history
+RECORDING_TIMEOUT = SECONDS_IN_DAY
+
+
+@dataclass
+class RunSummary:
+    """Summary of an evaluation saved in history."""
+
+    run_id: int
+    timestamp: float
+    commands_number: int
+    successful_commands_number: int
+    pinned: bool = False
+    complete: bool = True
+    fingerprint: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        """All commands evaluations of the run are successful."""
+        return self.commands_number == self.successful_commands_number
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "RunSummary":
+        """Build summary from a row of the runs table."""
+        (
+            run_id,
+            timestamp,
+            commands_number,
+            successful_commands_number,
+            pinned,
+            complete,
+            fingerprint,
+        ) = row
+        return RunSummary(
+            run_id=run_id,
+            timestamp=timestamp,
+            commands_number=commands_number,
+            successful_commands_number=successful_commands_number,
+            pinned=bool(pinned),
+            complete=bool(complete),
+            fingerprint=fingerprint,
+        )
 
 
 class Cache:
@@ -17,39 +173,765 @@ class Cache:
 
     @classmethod
     def evaluations_dir(cls) -> Path:
-        """Directory of cache files. Created if missing."""
-        return cls.__ensure_dir_exists(cls.cache_dir() / "evaluations")
+        """Directory of evaluations json files, kept by older versions of statue."""
+        return cls.cache_dir() / "evaluations"
+
+    @classmethod
+    def history_path(cls) -> Path:
+        """Path of the history database."""
+        return cls.cache_dir() / "history.sqlite"
+
+    @classmethod
+    @contextmanager
+    def connect(cls) -> Iterator[sqlite3.Connection]:
+        """
+        Connect to the history database, creating it if missing.
+
+        Evaluations json files of older versions of statue are imported into the
+        database once it is created. A corrupted database is moved aside and
+        replaced by a new one. Several statue processes may use the database
+        concurrently, waiting for each other's writes to finish.
+        """
+        connection = cls.__open_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @classmethod
+    def runs_summaries(cls, head: Optional[int] = None) -> List[RunSummary]:
+        """Get summaries of saved evaluations, ordered from recent to last."""
+        with cls.connect() as connection:
+            rows = connection.execute(
+                RECENT_RUNS_QUERY, (-1 if head is None else head, 0)
+            ).fetchall()
+        return [RunSummary.from_row(row) for row in rows]
+
+    @classmethod
+    def run_summary(cls, n: int) -> Optional[RunSummary]:  # pylint: disable=C0103
+        """Get summary of the nth most recent evaluation."""
+        with cls.connect() as connection:
+            row = connection.execute(RECENT_RUNS_QUERY, (1, n)).fetchone()
+        if row is None:
+            return None
+        return RunSummary.from_row(row)
+
+    @classmethod
+    def load_evaluation(cls, n: int) -> Optional[Evaluation]:  # pylint: disable=C0103
+        """Load the nth most recent evaluation."""
+        with cls.connect() as connection, cls.__transaction(connection):
+            run_row = connection.execute(NTH_RUN_ID_QUERY, (n,)).fetchone()
+            if run_row is None:
+                return None
+            cls.__mark_used(connection, run_row[0])
+            return cls.__load_run_evaluation(connection, run_row[0])
+
+    @classmethod
+    def recent_evaluation(cls) -> Optional[Evaluation]:
+        """Load the most recent evaluation."""
+        return cls.load_evaluation(0)
+
+    @classmethod
+    def last_incomplete_run(cls) -> Optional[RunSummary]:
+        """Get summary of the most recent run which was not finished."""
+        with cls.connect() as connection:
+            row = connection.execute(
+                "SELECT id, timestamp, commands_number, successful_commands_number, "
+                "pinned, complete, fingerprint FROM runs WHERE complete = 0 "
+                "ORDER BY timestamp DESC, id DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        return RunSummary.from_row(row)
+
+    @classmethod
+    def commands_histories(cls, head: Optional[int] = None) -> List[CommandHistory]:
+        """
+        Get evaluations of each command over each source in the nth recent runs.
+
+        Evaluations are counted and grouped by sqlite, so only the durations of
+        each command are passed on, as a single string.
+
+        :param head: Number of most recent runs to include. All runs, including the
+         rolled up ones, if None.
+        :return: Histories of commands, in no particular order.
+        """
+        with cls.connect() as connection:
+            runs = connection.execute(
+                "SELECT id, timestamp FROM runs "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (-1 if head is None else head,),
+            ).fetchall()
+            rows = connection.execute(
+                "SELECT paths.path, commands.name, evaluations.runs, "
+                "evaluations.failures, evaluations.timed_runs, evaluations.durations "
+                "FROM (SELECT path_id, command_id, COUNT(*) AS runs, "
+                "SUM(success = 0) AS failures, "
+                "group_concat(CASE WHEN duration_us IS NOT NULL THEN run_id END) "
+                "AS timed_runs, group_concat(duration_us) AS durations "
+                "FROM commands_evaluations"
+                + (
+                    ""
+                    if head is None
+                    else " WHERE run_id IN (SELECT id FROM runs "
+                    "ORDER BY timestamp DESC, id DESC LIMIT ?)"
+                )
+                + " GROUP BY path_id, command_id) AS evaluations "
+                "JOIN paths ON paths.id = evaluations.path_id "
+                "JOIN commands ON commands.id = evaluations.command_id",
+                () if head is None else (head,),
+            ).fetchall()
+            rollups_rows = (
+                []
+                if head is not None
+                else connection.execute(
+                    "SELECT period_start, source, command, runs, failures, durations "
+                    "FROM rollups ORDER BY period_start, period_days DESC"
+                ).fetchall()
+            )
+        # Concatenated durations are in no particular order, so they are ordered by
+        # the positions of their runs, from the oldest run
+        runs_positions = {
+            str(run_id): position for position, (run_id, _) in enumerate(runs[::-1])
+        }
+        histories: Dict[Tuple[str, str], CommandHistory] = {}
+        durations_positions: Dict[Tuple[str, str], List[int]] = {}
+        for source, command, runs_number, failures, timed_runs, durations in rows:
+            history = histories.setdefault(
+                (source, command), CommandHistory(source=source, command=command)
+            )
+            history.runs += runs_number
+            history.failures += failures
+            if durations is None:
+                continue
+            history.durations.extend(
+                [
+                    (duration_us / MICROSECONDS_IN_SECOND, 1)
+                    for duration_us in map(int, durations.split(","))
+                ]
+            )
+            durations_positions.setdefault((source, command), []).extend(
+                map(runs_positions.__getitem__, timed_runs.split(","))
+            )
+        for key, positions in durations_positions.items():
+            if positions != sorted(positions):
+                history = histories[key]
+                history.durations = [
+                    duration
+                    for _, duration in sorted(
+                        zip(positions, history.durations), key=itemgetter(0)
+                    )
+                ]
+        cls.__add_rollups_histories(histories, rollups_rows, runs, durations_positions)
+        return list(histories.values())
+
+    @classmethod
+    def __add_rollups_histories(
+        cls,
+        histories: Dict[Tuple[str, str], CommandHistory],
+        rollups_rows: List[Tuple[float, str, str, int, int, str]],
+        runs: List[Tuple[int, float]],
+        durations_positions: Dict[Tuple[str, str], List[int]],
+    ) -> None:
+        """Add rolled up evaluations, ordering durations by time with the others."""
+        rollups_durations: Dict[
+            Tuple[str, str], List[Tuple[float, Tuple[float, int]]]
+        ] = {}
+        for (
+            timestamp,
+            source,
+            command,
+            runs_number,
+            failures,
+            durations,
+        ) in rollups_rows:
+            rollup = CommandRollup.from_row(runs_number, failures, durations)
+            history = histories.setdefault(
+                (source, command), CommandHistory(source=source, command=command)
+            )
+            history.runs += rollup.runs
+            history.failures += rollup.failures
+            rollups_durations.setdefault((source, command), []).extend(
+                (timestamp, duration) for duration in rollup.bucketed_durations()
+            )
+        runs_timestamps = [timestamp for _, timestamp in runs[::-1]]
+        for key, timed_durations in rollups_durations.items():
+            history = histories[key]
+            timed_durations.extend(
+                zip(
+                    [
+                        runs_timestamps[position]
+                        for position in sorted(durations_positions.get(key, []))
+                    ],
+                    history.durations,
+                )
+            )
+            # Sorting is stable, so rollups come before runs of the same time
+            timed_durations.sort(key=itemgetter(0))
+            history.durations = [duration for _, duration in timed_durations]
+
+    @classmethod
+    def run_evaluation(cls, run_id: int) -> Evaluation:
+        """
+        Load evaluation of a run, as recorded so far.
+
+        :param run_id: Id of the run.
+        :return: :class:`Evaluation`. Empty if the run does not exist.
+        """
+        with cls.connect() as connection:
+            return cls.__load_run_evaluation(connection, run_id)
+
+    @classmethod
+    def __load_run_evaluation(
+        cls, connection: sqlite3.Connection, run_id: int
+    ) -> Evaluation:
+        rows = connection.execute(
+            "SELECT paths.path, commands.command, "
+            "commands_evaluations.success, commands_evaluations.failed_files, "
+            "commands_evaluations.duration_us FROM sources "
+            "JOIN paths ON sources.path_id = paths.id "
+            "LEFT JOIN commands_evaluations "
+            "ON commands_evaluations.run_id = sources.run_id "
+            "AND commands_evaluations.path_id = sources.path_id "
+            "LEFT JOIN commands ON commands_evaluations.command_id = commands.id "
+            "WHERE sources.run_id = ? "
+            "ORDER BY sources.position, commands_evaluations.position",
+            (run_id,),
+        ).fetchall()
+        evaluation = Evaluation()
+        for source, command, success, failed_files, duration_us in rows:
+            if source not in evaluation.sources_evaluations:
+                evaluation[source] = SourceEvaluation()
+            command = cls.__load_command(command)
+            if command is not None:
+                evaluation[source].commands_evaluations.append(
+                    CommandEvaluation(
+                        command=command,
+                        success=bool(success),
+                        failed_files=cls.__load_failed_files(failed_files),
+                        duration=cls.__seconds(duration_us),
+                    )
+                )
+        return evaluation
+
+    @classmethod
+    def failure_map(
+        cls, n: int = 0  # pylint: disable=C0103
+    ) -> Dict[str, List[Command]]:
+        """
+        Get a map from sources to failed commands of the nth recent evaluation.
+
+        Failed commands check only the files they failed on, when these are known.
+        """
+        with cls.connect() as connection, cls.__transaction(connection):
+            run_row = connection.execute(NTH_RUN_ID_QUERY, (n,)).fetchone()
+            if run_row is None:
+                return {}
+            cls.__mark_used(connection, run_row[0])
+            rows = connection.execute(
+                "SELECT paths.path, commands.command, "
+                f"commands_evaluations.failed_files FROM runs {EVALUATIONS_JOIN} "
+                "WHERE commands_evaluations.run_id = runs.id AND runs.id = ? "
+                "AND commands_evaluations.success = 0 "
+                "ORDER BY sources.position, commands_evaluations.position",
+                run_row,
+            ).fetchall()
+        failure_map: Dict[str, List[Command]] = dict()
+        for source, command, failed_files in rows:
+            command = cls.__load_command(command)
+            if command is not None:
+                failure_map.setdefault(source, []).append(
+                    CommandEvaluation(
+                        command=command,
+                        success=False,
+                        failed_files=cls.__load_failed_files(failed_files),
+                    ).failed_command
+                )
+        return failure_map
+
+    @classmethod
+    def save_evaluation(
+        cls,
+        evaluation: Evaluation,
+        timestamp: Optional[float] = None,
+        retention_policy: Optional[RetentionPolicy] = None,
+    ) -> int:
+        """
+        Save evaluation to cache.
+
+        :param evaluation: Evaluation to save.
+        :param timestamp: Time of the evaluation. Current time by default.
+        :param retention_policy: Policy of which evaluations to keep. Default
+         :class:`RetentionPolicy` if not given.
+        :return: Id of the saved run.
+        """
+        now = time.time()
+        with cls.connect() as connection, cls.__transaction(connection):
+            run_id = cls.__insert_evaluation(
+                connection, evaluation, now if timestamp is None else timestamp
+            )
+            cls.__remove_old_evaluations(
+                connection,
+                RetentionPolicy() if retention_policy is None else retention_policy,
+                now,
+            )
+        return run_id
+
+    @classmethod
+    def import_evaluation(
+        cls,
+        input_path: Union[Path, str],
+        timestamp: Optional[float] = None,
+        retention_policy: Optional[RetentionPolicy] = None,
+    ) -> int:
+        """
+        Import evaluation json file into history.
+
+        :param input_path: Path of the evaluation json file.
+        :param timestamp: Time of the evaluation. Modification time of the file by
+         default.
+        :param retention_policy: Policy of which evaluations to keep.
+        :return: Id of the saved run.
+        """
+        evaluation_path = Path(input_path)
+        if timestamp is None:
+            timestamp = evaluation_path.stat().st_mtime
+        return cls.save_evaluation(
+            Evaluation.load_from_file(evaluation_path),
+            timestamp=timestamp,
+            retention_policy=retention_policy,
+        )
+
+    @classmethod
+    def start_run(
+        cls, timestamp: Optional[float] = None, fingerprint: Optional[str] = None
+    ) -> int:
+        """
+        Start recording a run into history.
+
+        The run is shown as incomplete until :meth:`finish_run` is called, so runs
+        that were killed or crashed keep the evaluations recorded until then.
+
+        :param timestamp: Time of the run. Current time by default.
+        :param fingerprint: Fingerprint of the commands and sources of the run,
+         used in order to verify nothing changed before resuming it.
+        :return: Id of the run.
+        """
+        with cls.connect() as connection, cls.__transaction(connection):
+            return cls.__inserted_id(
+                connection.execute(
+                    "INSERT INTO runs (timestamp, commands_number, "
+                    "successful_commands_number, complete, fingerprint) "
+                    "VALUES (?, 0, 0, 0, ?)",
+                    (time.time() if timestamp is None else timestamp, fingerprint),
+                )
+            )
+
+    @classmethod
+    def record_command_evaluation(
+        cls, run_id: int, source: str, command_evaluation: CommandEvaluation
+    ) -> None:
+        """
+        Record evaluation of a command as soon as it is completed.
+
+        :param run_id: Id of the run, as returned from :meth:`start_run`.
+        :param source: Source the command was evaluated on.
+        :param command_evaluation: Evaluation of the command.
+        """
+        with cls.connect() as connection, cls.__transaction(connection):
+            path_id = cls.__path_id(connection, source)
+            source_row = connection.execute(
+                "SELECT COUNT(*) FROM commands_evaluations "
+                "WHERE run_id = ? AND path_id = ?",
+                (run_id, path_id),
+            ).fetchone()
+            if source_row[0] == 0:
+                connection.execute(
+                    "INSERT OR IGNORE INTO sources (run_id, path_id, position) "
+                    "SELECT ?, ?, COUNT(*) FROM sources WHERE run_id = ?",
+                    (run_id, path_id, run_id),
+                )
+            cls.__insert_commands_evaluations(
+                connection,
+                run_id,
+                path_id,
+                [command_evaluation],
+                first_position=source_row[0],
+            )
+            connection.execute(
+                "UPDATE runs SET commands_number = commands_number + 1, "
+                "successful_commands_number = successful_commands_number + ? "
+                "WHERE id = ?",
+                (command_evaluation.success, run_id),
+            )
+
+    @classmethod
+    def finish_run(
+        cls, run_id: int, retention_policy: Optional[RetentionPolicy] = None
+    ) -> None:
+        """
+        Mark recorded run as complete and remove old evaluations.
+
+        :param run_id: Id of the run, as returned from :meth:`start_run`.
+        :param retention_policy: Policy of which evaluations to keep. Default
+         :class:`RetentionPolicy` if not given.
+        """
+        with cls.connect() as connection, cls.__transaction(connection):
+            connection.execute("UPDATE runs SET complete = 1 WHERE id = ?", (run_id,))
+            cls.__remove_old_evaluations(
+                connection,
+                RetentionPolicy() if retention_policy is None else retention_policy,
+                time.time(),
+            )
+
+    @classmethod
+    def pin_evaluation(
+        cls, n: int, pinned: bool = True  # pylint: disable=C0103
+    ) -> bool:
+        """
+        Pin the nth most recent evaluation, so it would never be removed.
+
+        :param n: Index of the evaluation, from the most recent one.
+        :param pinned: Pin evaluation if True, unpin it otherwise.
+        :return: Was the evaluation found.
+        """
+        with cls.connect() as connection, cls.__transaction(connection):
+            cursor = connection.execute(
+                f"UPDATE runs SET pinned = ? WHERE id = ({NTH_RUN_ID_QUERY})",
+                (pinned, n),
+            )
+        return cursor.rowcount != 0
 
     @classmethod
-    def all_evaluation_paths(cls) -> List[Path]:
-        """Get all evaluation paths, ordered from recent to last."""
-        evaluations_files = list(cls.evaluations_dir().iterdir())
-        evaluations_files.sort(key=cls.__extract_time_stamp, reverse=True)
-        return evaluations_files
+    def file_timings(
+        cls, command: Command, files_digests: Dict[str, bytes]
+    ) -> Dict[str, FileTiming]:
+        """
+        Get saved timings of a command on files which were not changed since.
+
+        :param command: Timed command.
+        :param files_digests: Digest of the current content of each file.
+        :return: Timings by file.
+        """
+        _, command_digest = cls.__command_digest(command)
+        with cls.connect() as connection:
+            rows = connection.execute(
+                "SELECT file, file_digest, duration, success FROM file_timings "
+                "WHERE command_digest = ?",
+                (command_digest,),
+            ).fetchall()
+        return {
+            file: FileTiming(file=file, duration=duration, success=bool(success))
+            for file, digest, duration, success in rows
+            if files_digests.get(file, None) == digest
+        }
+
+    @classmethod
+    def save_file_timings(
+        cls,
+        command: Command,
+        files_timings: Sequence[FileTiming],
+        files_digests: Dict[str, bytes],
+    ) -> None:
+        """
+        Save timings of a command on files, replacing older timings of the files.
+
+        :param command: Timed command.
+        :param files_timings: Timings of the files.
+        :param files_digests: Digest of the content of each timed file.
+        """
+        _, command_digest = cls.__command_digest(command)
+        with cls.connect() as connection, cls.__transaction(connection):
+            connection.executemany(
+                "INSERT OR REPLACE INTO file_timings "
+                "(command_digest, file, file_digest, duration, success) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        command_digest,
+                        file_timing.file,
+                        files_digests[file_timing.file],
+                        file_timing.duration,
+                        file_timing.success,
+                    )
+                    for file_timing in files_timings
+                ],
+            )
+
+    @classmethod
+    def sources_index_path(cls) -> Path:
+        """Path of the persistent sources index."""
+        return cls.cache_dir() / "sources_index.json"
+
+    @classmethod
+    def sources_index(cls, repo: Optional[Repo] = None) -> SourcesIndex:
+        """
+        Get sources index of the current directory.
+
+        The index is loaded from cache, refreshed incrementally and saved back.
+
+        :param repo: Git repository of the current directory. If given, files
+         ignored by git are not indexed.
+        """
+        index_path = cls.sources_index_path()
+        sources_index = None
+        if index_path.exists():
+            sources_index = SourcesIndex.load_from_file(index_path)
+        if sources_index is None or sources_index.root != Path.cwd():
+            sources_index = SourcesIndex(root=Path.cwd())
+        sources_index.refresh(repo=repo)
+        sources_index.save_as_json(index_path)
+        return sources_index
+
+    @classmethod
+    def __open_connection(cls) -> sqlite3.Connection:
+        history_path = cls.history_path()
+        connection = sqlite3.connect(
+            str(history_path), timeout=HISTORY_TIMEOUT, isolation_level=None
+        )
+        try:
+            cls.__initialize(connection)
+        except sqlite3.OperationalError:
+            connection.close()
+            raise
+        except sqlite3.DatabaseError:
+            connection.close()
+            history_path.replace(
+                history_path.with_name(f"{history_path.name}.corrupted")
+            )
+            connection = sqlite3.connect(
+                str(history_path), timeout=HISTORY_TIMEOUT, isolation_level=None
+            )
+            cls.__initialize(connection)
+        return connection
+
+    @classmethod
+    def __initialize(cls, connection: sqlite3.Connection) -> None:
+        connection.execute("PRAGMA foreign_keys = ON")
+        # Takes effect only if the database is still empty
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cls.__enable_write_ahead_log(connection)
+        if cls.__schema_version(connection) == HISTORY_SCHEMA_VERSION:
+            return
+        with cls.__transaction(connection):
+            # Checked again, since another process may have created the schema
+            schema_version = cls.__schema_version(connection)
+            if schema_version == HISTORY_SCHEMA_VERSION:
+                return
+            is_new = (
+                connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' "
+                    "AND name = 'runs'"
+                ).fetchone()
+                is None
+            )
+            if not is_new:
+                # Set aside as a corrupted history by the caller
+                raise sqlite3.DatabaseError(
+                    f"Unknown history schema version {schema_version}"
+                )
+            cls.__create_schema(connection)
+            cls.__import_legacy_evaluations(connection)
+            connection.execute(f"PRAGMA user_version = {HISTORY_SCHEMA_VERSION}")
+
+    @classmethod
+    def __create_schema(cls, connection: sqlite3.Connection) -> None:
+        for statement in HISTORY_SCHEMA.split(";"):
+            connection.execute(statement)
+
+    @classmethod
+    def __enable_write_ahead_log(cls, connection: sqlite3.Connection) -> None:
+        """
+        Switch database to write-ahead log, so readers would not block writers.
+
+        Switching requires an exclusive lock, which sqlite does not wait for, so it
+        is retried until the history timeout passes.
+        """
+        deadline = time.monotonic() + HISTORY_TIMEOUT
+        while connection.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            try:
+                connection.execute("PRAGMA journal_mode = WAL")
+            except sqlite3.OperationalError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    @classmethod
+    def __schema_version(cls, connection: sqlite3.Connection) -> int:
+        return connection.execute("PRAGMA user_version").fetchone()[0]
+
+    @classmethod
+    @contextmanager
+    def __transaction(
+        cls, connection: sqlite3.Connection, behavior: str = "IMMEDIATE"
+    ) -> Iterator[None]:
+        """
+        Run statements in a single transaction.
+
+        Immediate transactions take the database write lock when they begin, so
+        concurrent writers are serialized instead of failing in the middle.
+        """
+        connection.execute(f"BEGIN {behavior}")
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @classmethod
+    def __command_id(cls, connection: sqlite3.Connection, command: Command) -> int:
+        """
+        Get id of a stored command, storing it if missing.
+
+        Commands are stored once, compressed, no matter in how many runs they were
+        evaluated.
+        """
+        payload, digest = cls.__command_digest(command)
+        row = connection.execute(
+            "SELECT id FROM commands WHERE digest = ?", (digest,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        return cls.__inserted_id(
+            connection.execute(
+                "INSERT INTO commands (digest, name, command) VALUES (?, ?, ?)",
+                (digest, command.name, zlib.compress(payload, 9)),
+            )
+        )
+
+    @classmethod
+    def __inserted_id(cls, cursor: sqlite3.Cursor) -> int:
+        """Get id of the row inserted by a cursor."""
+        row_id = cursor.lastrowid
+        # Always set after a successful INSERT into a rowid table
+        assert row_id is not None  # nosec
+        return row_id
 
     @classmethod
-    def evaluation_path(cls, n: int):  # pylint: disable=invalid-name
-        """Get the nth most recent evaluation result path."""
-        evaluations_files = cls.all_evaluation_paths()
-        if n >= len(evaluations_files):
+    def __command_digest(cls, command: Command) -> Tuple[bytes, bytes]:
+        """Serialize command, along with a digest identifying it."""
+        payload = json.dumps(command.as_json(), sort_keys=True).encode("utf-8")
+        return payload, hashlib.sha256(payload).digest()
+
+    @classmethod
+    def __load_command(cls, command: Optional[bytes]) -> Optional[Command]:
+        if command is None:
+            return None
+        try:
+            return Command.from_json(json.loads(zlib.decompress(command)))
+        except (zlib.error, ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def __seconds(cls, duration_us: Optional[int]) -> Optional[float]:
+        if duration_us is None:
             return None
-        return evaluations_files[n]
+        return duration_us / MICROSECONDS_IN_SECOND
 
     @classmethod
-    def recent_evaluation_path(cls) -> Path:
-        """Get last evaluation result path."""
-        return cls.evaluation_path(0)
+    def __microseconds(cls, duration: Optional[float]) -> Optional[int]:
+        if duration is None:
+            return None
+        return round(duration * MICROSECONDS_IN_SECOND)
 
     @classmethod
-    def save_evaluation(cls, evaluation: Evaluation):
-        """Save evaluation to cache."""
-        file_name = f"evaluation-{int(time.time())}.json"
-        evaluation.save_as_json(cls.evaluations_dir() / file_name)
-        cls.__remove_old_evaluations()
+    def __load_failed_files(cls, failed_files: Optional[str]) -> Optional[List[str]]:
+        return json.loads(failed_files) if failed_files is not None else None
 
     @classmethod
-    def __extract_time_stamp(cls, path: Path):
-        return int(path.stem.split("-")[-1])
+    def __mark_used(cls, connection: sqlite3.Connection, run_id: int) -> None:
+        connection.execute(
+            "UPDATE runs SET last_used = ? WHERE id = ?", (time.time(), run_id)
+        )
+
+    @classmethod
+    def __insert_evaluation(
+        cls, connection: sqlite3.Connection, evaluation: Evaluation, timestamp: float
+    ) -> int:
+        run_id = cls.__inserted_id(
+            connection.execute(
+                "INSERT INTO runs "
+                "(timestamp, commands_number, successful_commands_number) "
+                "VALUES (?, ?, ?)",
+                (
+                    timestamp,
+                    evaluation.commands_number,
+                    evaluation.successful_commands_number,
+                ),
+            )
+        )
+        for source_position, (source, source_evaluation) in enumerate(
+            evaluation.items()
+        ):
+            path_id = cls.__path_id(connection, source)
+            connection.execute(
+                "INSERT INTO sources (run_id, path_id, position) VALUES (?, ?, ?)",
+                (run_id, path_id, source_position),
+            )
+            cls.__insert_commands_evaluations(
+                connection, run_id, path_id, source_evaluation.commands_evaluations
+            )
+        return run_id
+
+    @classmethod
+    def __path_id(cls, connection: sqlite3.Connection, path: str) -> int:
+        """Get id of a stored source path, storing it if missing."""
+        row = connection.execute(
+            "SELECT id FROM paths WHERE path = ?", (path,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        return cls.__inserted_id(
+            connection.execute("INSERT INTO paths (path) VALUES (?)", (path,))
+        )
+
+    @classmethod
+    def __insert_commands_evaluations(  # pylint: disable=too-many-arguments
+        cls,
+        connection: sqlite3.Connection,
+        run_id: int,
+        path_id: int,
+        commands_evaluations: List[CommandEvaluation],
+        first_position: int = 0,
+    ) -> None:
+        connection.executemany(
+            "INSERT INTO commands_evaluations "
+            "(run_id, path_id, position, command_id, success, failed_files, "
+            "duration_us) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run_id,
+                    path_id,
+                    position,
+                    cls.__command_id(connection, command_evaluation.command),
+                    command_evaluation.success,
+                    (
+                        json.dumps(command_evaluation.failed_files)
+                        if command_evaluation.failed_files is not None
+                        else None
+                    ),
+                    cls.__microseconds(command_evaluation.duration),
+                )
+                for position, command_evaluation in enumerate(
+                    commands_evaluations, start=first_position
+                )
+            ],
+        )
+
+    @classmethod
+    def __import_legacy_evaluations(cls, connection: sqlite3.Connection) -> None:
+        evaluations_dir = cls.evaluations_dir()
+        if not evaluations_dir.exists():
+            return
+        for evaluation_file in evaluations_dir.glob("evaluation-*.json"):
+            try:
+                evaluation = Evaluation.load_from_file(evaluation_file)
+                timestamp = float(evaluation_file.stem.split("-")[-1])
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            cls.__insert_evaluation(connection, evaluation, timestamp)
+        cls.__remove_old_evaluations(connection, RetentionPolicy(), time.time())
 
     @classmethod
     def __ensure_dir_exists(cls, dir_path: Path) -> Path:
@@ -57,9 +939,161 @@ class Cache:
         return dir_path
 
     @classmethod
-    def __remove_old_evaluations(cls):
-        evaluation_files = cls.all_evaluation_paths()
-        if len(evaluation_files) <= HISTORY_SIZE:
+    def __remove_old_evaluations(
+        cls,
+        connection: sqlite3.Connection,
+        retention_policy: RetentionPolicy,
+        now: float,
+    ) -> None:
+        """
+        Remove evaluations according to retention policy.
+
+        Unpinned runs exceeding the runs number or age limits are removed first.
+        Then, least recently used runs are removed as long as the history is larger
+        than its size limit. Removed runs are rolled up if the policy says so.
+
+        Unfinished runs may still be recorded by another process, so they are kept
+        until they are older than :data:`RECORDING_TIMEOUT`.
+        """
+        runs: List[Tuple[int, float]] = connection.execute(
+            "SELECT id, timestamp FROM runs WHERE pinned = 0 "
+            "AND (complete = 1 OR timestamp < ?) "
+            "ORDER BY COALESCE(last_used, timestamp) DESC, id DESC",
+            (now - RECORDING_TIMEOUT,),
+        ).fetchall()
+        expired_runs = set(retention_policy.expired_runs(runs, now))
+        cls.__remove_runs(connection, expired_runs, rollup=retention_policy.rollup)
+        if retention_policy.max_size is not None:
+            removable_runs = [
+                run_id
+                for run_id, _ in runs[retention_policy.min_runs :]
+                if run_id not in expired_runs
+            ]
+            while (
+                len(removable_runs) != 0
+                and cls.__history_size(connection) > retention_policy.max_size
+            ):
+                cls.__remove_runs(
+                    connection, [removable_runs.pop()], rollup=retention_policy.rollup
+                )
+        if retention_policy.rollup:
+            cls.__rollup_weeks(
+                connection,
+                before=now - retention_policy.weekly_rollup_after_days * SECONDS_IN_DAY,
+            )
+        connection.execute("PRAGMA incremental_vacuum").fetchall()
+
+    @classmethod
+    def __remove_runs(
+        cls,
+        connection: sqlite3.Connection,
+        runs_ids: Collection[int],
+        rollup: bool = False,
+    ) -> None:
+        if len(runs_ids) == 0:
+            return
+        if rollup:
+            cls.__rollup_runs(connection, runs_ids)
+        connection.executemany(
+            "DELETE FROM runs WHERE id = ?", [(run_id,) for run_id in runs_ids]
+        )
+        # Uncorrelated subqueries are scanned once, not once per deleted row
+        connection.execute(
+            "DELETE FROM commands WHERE id NOT IN "
+            "(SELECT command_id FROM commands_evaluations)"
+        )
+        connection.execute(
+            "DELETE FROM paths WHERE id NOT IN (SELECT path_id FROM sources)"
+        )
+
+    @classmethod
+    def __history_size(cls, connection: sqlite3.Connection) -> int:
+        """Size in bytes of the pages used by the history database."""
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist_count) * page_size
+
+    @classmethod
+    def __rollup_runs(
+        cls, connection: sqlite3.Connection, runs_ids: Collection[int]
+    ) -> None:
+        """Aggregate commands evaluations of runs into daily rollups."""
+        rollups: Dict[Tuple[float, str, str], CommandRollup] = {}
+        for run_id in runs_ids:
+            rows = connection.execute(
+                "SELECT runs.timestamp, paths.path, commands.name, "
+                "commands_evaluations.success, commands_evaluations.duration_us "
+                f"FROM runs {EVALUATIONS_JOIN} "
+                "WHERE commands_evaluations.run_id = runs.id AND runs.id = ?",
+                (run_id,),
+            )
+            for timestamp, source, command, success, duration_us in rows:
+                rollups.setdefault(
+                    (period_start(timestamp, DAILY), source, command), CommandRollup()
+                ).add(bool(success), cls.__seconds(duration_us))
+        for (start, source, command), rollup in rollups.items():
+            cls.__add_rollup(connection, DAILY, start, source, command, rollup)
+
+    @classmethod
+    def __rollup_weeks(cls, connection: sqlite3.Connection, before: float) -> None:
+        """Aggregate daily rollups of days which ended before a time into weeks."""
+        rows = connection.execute(
+            "SELECT id, period_start, source, command, runs, failures, durations "
+            "FROM rollups WHERE period_days = ? AND period_start + ? <= ?",
+            (DAILY, SECONDS_IN_DAY, before),
+        ).fetchall()
+        rollups: Dict[Tuple[float, str, str], CommandRollup] = {}
+        for _, start, source, command, runs, failures, durations in rows:
+            rollups.setdefault(
+                (period_start(start, WEEKLY), source, command), CommandRollup()
+            ).merge(CommandRollup.from_row(runs, failures, durations))
+        connection.executemany(
+            "DELETE FROM rollups WHERE id = ?", [(row[0],) for row in rows]
+        )
+        for (start, source, command), rollup in rollups.items():
+            cls.__add_rollup(connection, WEEKLY, start, source, command, rollup)
+
+    @classmethod
+    def __add_rollup(  # pylint: disable=too-many-arguments
+        cls,
+        connection: sqlite3.Connection,
+        period_days: int,
+        start: float,
+        source: str,
+        command: str,
+        rollup: CommandRollup,
+    ) -> None:
+        """Add rollup to the stored rollup of its period, storing it if missing."""
+        row = connection.execute(
+            "SELECT id, runs, failures, durations FROM rollups WHERE period_days = ? "
+            "AND period_start = ? AND source = ? AND command = ?",
+            (period_days, start, source, command),
+        ).fetchone()
+        if row is None:
+            connection.execute(
+                "INSERT INTO rollups (period_days, period_start, source, command, "
+                "runs, failures, durations) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    period_days,
+                    start,
+                    source,
+                    command,
+                    rollup.runs,
+                    rollup.failures,
+                    rollup.durations_as_json(),
+                ),
+            )
             return
-        for evaluation_file in evaluation_files[HISTORY_SIZE:]:
-            evaluation_file.unlink()
+        rollup_id, runs, failures, durations = row
+        stored_rollup = CommandRollup.from_row(runs, failures, durations)
+        stored_rollup.merge(rollup)
+        connection.execute(
+            "UPDATE rollups SET runs = ?, failures = ?, durations = ? WHERE id = ?",
+            (
+                stored_rollup.runs,
+                stored_rollup.failures,
+                stored_rollup.durations_as_json(),
+                rollup_id,
+            ),
+        )
@@ -4,6 +4,7 @@ from statue.cli.commands import commands_cli
 from statue.cli.config import config_cli
 from statue.cli.contexts import context_cli
 from statue.cli.history import history_cli
+from statue.cli.profile import profile_cli
 from statue.cli.run import run_cli
 
 __all__ = [
@@ -13,4 +14,5 @@ __all__ = [
     "context_cli",
     "run_cli",
     "history_cli",
+    "profile_cli",
 ]
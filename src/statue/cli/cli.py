@@ -5,6 +5,8 @@ import click
 
 from statue import __version__
 from statue.configuration import Configuration
+from statue.hooks import CONFIGURATION_LOADED, Hooks
+from statue.profiler import CONFIGURATION_LOAD, Profiler
 
 
 @click.group(no_args_is_help=True)
@@ -17,4 +19,8 @@ from statue.configuration import Configuration
 )
 def statue(config: Optional[str]) -> None:
     """Statue is a static code analysis tools orchestrator."""
-    Configuration.load_configuration(config)
+    Profiler.finish_start_up()
+    Hooks.load_plugins()
+    with Profiler.phase(CONFIGURATION_LOAD):
+        Configuration.load_configuration(config)
+    Hooks.emit(CONFIGURATION_LOADED, config=config)
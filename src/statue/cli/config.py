@@ -7,6 +7,7 @@ import click
 import git
 import toml
 
+from statue.cache import Cache
 from statue.cli.cli import statue as statue_cli
 from statue.configuration import Configuration
 from statue.constants import CONTEXTS, SOURCES
@@ -59,8 +60,12 @@ def init_config(directory, interactive):
         repo = git.Repo(directory)
     except git.InvalidGitRepositoryError:
         pass
+    sources_index = None
+    if directory.resolve() == Path.cwd().resolve():
+        sources_index = Cache.sources_index(repo=repo)
     sources = [
-        source.relative_to(directory) for source in find_sources(directory, repo=repo)
+        source.relative_to(directory)
+        for source in find_sources(directory, repo=repo, sources_index=sources_index)
     ]
     sources_map = OrderedDict()
     __update_sources_map(
@@ -1,34 +1,55 @@
 """History CLI."""
+import json
 import time
-from pathlib import Path
-from typing import Union
+from typing import Iterator, Tuple, Union
 
 import click
 
-from statue.cache import Cache
+from statue.cache import Cache, RunSummary
 from statue.cli.cli import statue as statue_cli
+from statue.cli.util import compact_option
+from statue.configuration import Configuration
 from statue.constants import DATETIME_FORMAT
-from statue.evaluation import CommandEvaluation, Evaluation
+from statue.evaluation import CommandEvaluation, Evaluation, merge_evaluations
+from statue.evaluation_diff import EvaluationDiff
+from statue.exceptions import EvaluationsConflict
+from statue.history_stats import (
+    DEFAULT_BASELINE_WINDOW,
+    DEFAULT_SIGNIFICANCE,
+    DEFAULT_WINDOW,
+    commands_stats,
+)
 
 
-def evaluation_status(evaluation: Union[Evaluation, CommandEvaluation]) -> str:
+def evaluation_status(
+    evaluation: Union[Evaluation, CommandEvaluation, RunSummary]
+) -> str:
     """Get styled evaluation string."""
+    if isinstance(evaluation, RunSummary) and not evaluation.complete:
+        return click.style("Incomplete", fg="yellow")
     if evaluation.success:
         return click.style("Success", fg="green")
     return click.style("Failure", fg="red")
 
 
-def evaluation_datetime(evaluation_path: Path) -> str:
-    """Get styled time string for evaluation path."""
-    parsed_time = time.localtime(int(evaluation_path.stem.split("-")[-1]))
+def evaluation_datetime(run_summary: RunSummary) -> str:
+    """Get styled time string for evaluation run."""
+    parsed_time = time.localtime(int(run_summary.timestamp))
     return click.style(time.strftime(DATETIME_FORMAT, parsed_time), fg="yellow")
 
 
-def evaluation_success_ratio(evaluation: Evaluation) -> str:
+def evaluation_success_ratio(evaluation: Union[Evaluation, RunSummary]) -> str:
     """Get evaluation ratio string."""
     return f"{evaluation.successful_commands_number}/{evaluation.commands_number}"
 
 
+def evaluation_duration(command_evaluation: CommandEvaluation) -> str:
+    """Get duration string of command evaluation, if it is known."""
+    if command_evaluation.duration is None:
+        return ""
+    return f" ({command_evaluation.duration:.2f}s)"
+
+
 def positive_validation(  # pylint: disable=unused-argument
     ctx: click.Context, param: click.Parameter, value: int
 ) -> int:
@@ -38,6 +59,25 @@ def positive_validation(  # pylint: disable=unused-argument
     return value
 
 
+def positive_numbers_validation(  # pylint: disable=unused-argument
+    ctx: click.Context, param: click.Parameter, value: Tuple[int, ...]
+) -> Tuple[int, ...]:
+    """Validate all numbers are 1 or greater."""
+    for number in value:
+        positive_validation(ctx, param, number)
+    return value
+
+
+number_option = click.option(
+    "-n",
+    "number",
+    type=int,
+    default=1,
+    callback=positive_validation,
+    help="Show nth recent evaluation. 1 by default",
+)
+
+
 @statue_cli.group("history")
 def history_cli() -> None:
     """History related actions such as list, show, etc."""
@@ -47,37 +87,32 @@ def history_cli() -> None:
 @click.option("--head", type=int, help="Show only the nth recent evaluations")
 def list_evaluations(head):
     """List all recent evaluations."""
-    evaluation_paths = Cache.all_evaluation_paths()
-    if len(evaluation_paths) == 0:
+    runs_summaries = Cache.runs_summaries(head=head)
+    if len(runs_summaries) == 0:
         click.echo("No previous evaluations.")
         return
-    if head is not None:
-        evaluation_paths = evaluation_paths[:head]
-    for i, evaluation_path in enumerate(evaluation_paths, start=1):
-        evaluation = Evaluation.load_from_file(evaluation_path)
+    for i, run_summary in enumerate(runs_summaries, start=1):
         click.echo(
             f"{i}) "
-            f"{evaluation_datetime(evaluation_path)} - {evaluation_status(evaluation)} "
-            f"({evaluation_success_ratio(evaluation)} successful)"
+            f"{evaluation_datetime(run_summary)} - {evaluation_status(run_summary)} "
+            f"({evaluation_success_ratio(run_summary)} successful)"
+            f"{' [pinned]' if run_summary.pinned else ''}"
         )
 
 
 @history_cli.command("show")
-@click.option(
-    "-n",
-    "number",
-    type=int,
-    default=1,
-    callback=positive_validation,
-    help="Show nth recent evaluation. 1 by default",
-)
-def show_evaluation(number):
+@click.pass_context
+@number_option
+def show_evaluation(ctx, number):
     """Show past evaluation."""
-    evaluation_path = Cache.evaluation_path(number - 1)
-    evaluation = Evaluation.load_from_file(evaluation_path)
+    run_summary = Cache.run_summary(number - 1)
+    evaluation = Cache.load_evaluation(number - 1)
+    if run_summary is None or evaluation is None:
+        click.echo(f"Could not find evaluation number {number}.")
+        ctx.exit(1)
     click.echo(
-        f"{evaluation_datetime(evaluation_path)} - {evaluation_status(evaluation)} "
-        f"({evaluation_success_ratio(evaluation)} successful)"
+        f"{evaluation_datetime(run_summary)} - {evaluation_status(run_summary)} "
+        f"({evaluation_success_ratio(run_summary)} successful)"
     )
     for source, source_evaluation in evaluation.items():
         click.echo(f"{source}:")
@@ -85,4 +120,256 @@ def show_evaluation(number):
             click.echo(
                 f"\t{command_evaluation.command.name} - "
                 f"{evaluation_status(command_evaluation)}"
+                f"{evaluation_duration(command_evaluation)}"
+            )
+
+
+@history_cli.command("export")
+@click.pass_context
+@click.argument("output", type=click.Path(dir_okay=False))
+@number_option
+@compact_option
+def export_evaluation(ctx, output, number, compact):
+    """Export past evaluation as json file, compressed if it ends with ".gz"."""
+    evaluation = Cache.load_evaluation(number - 1)
+    if evaluation is None:
+        click.echo(f"Could not find evaluation number {number}.")
+        ctx.exit(1)
+    evaluation.save_as_json(output, compact=compact)
+
+
+@history_cli.command("import")
+@click.pass_context
+@click.argument(
+    "inputs", nargs=-1, type=click.Path(dir_okay=False, exists=True), required=True
+)
+def import_evaluations(ctx, inputs):
+    """Import evaluations json files into history."""
+    for input_path in inputs:
+        try:
+            Cache.import_evaluation(
+                input_path, retention_policy=Configuration.history_retention()
+            )
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            click.echo(f'Could not import "{input_path}" since it is not valid.')
+            ctx.exit(1)
+
+
+@history_cli.command("pin")
+@click.pass_context
+@number_option
+def pin_evaluation(ctx, number):
+    """Pin past evaluation, so it would never be removed from history."""
+    if not Cache.pin_evaluation(number - 1):
+        click.echo(f"Could not find evaluation number {number}.")
+        ctx.exit(1)
+
+
+@history_cli.command("unpin")
+@click.pass_context
+@number_option
+def unpin_evaluation(ctx, number):
+    """Unpin past evaluation, so it would be removed by the retention policy."""
+    if not Cache.pin_evaluation(number - 1, pinned=False):
+        click.echo(f"Could not find evaluation number {number}.")
+        ctx.exit(1)
+
+
+@history_cli.command("merge")
+@click.pass_context
+@click.argument("inputs", nargs=-1, type=click.Path(dir_okay=False, exists=True))
+@click.option(
+    "-n",
+    "numbers",
+    type=int,
+    multiple=True,
+    callback=positive_numbers_validation,
+    help="Merge nth recent evaluation. Can be given multiple times",
+)
+@click.option(
+    "--strict",
+    is_flag=True,
+    help="Fail if evaluations disagree on a command, instead of taking the last one",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False),
+    help="Output path to save merged evaluation",
+)
+@compact_option
+def merge_evaluations_cli(  # pylint: disable=too-many-arguments
+    ctx, inputs, numbers, strict, output, compact
+):
+    """
+    Merge evaluations into a new evaluation in history.
+
+    Past evaluations given with "-n" are merged first, in the given order, followed by
+    evaluations json files. Later evaluations take precedence.
+    """
+    if len(inputs) == 0 and len(numbers) == 0:
+        click.echo("No evaluations to merge.")
+        ctx.exit(1)
+    try:
+        evaluation = merge_evaluations(
+            __read_evaluations(ctx, inputs, numbers), strict=strict
+        )
+    except EvaluationsConflict as error:
+        click.echo(str(error))
+        ctx.exit(1)
+    Cache.save_evaluation(
+        evaluation, retention_policy=Configuration.history_retention()
+    )
+    if output is not None:
+        evaluation.save_as_json(output, compact=compact)
+    click.echo(
+        f"Merged {len(inputs) + len(numbers)} evaluations - "
+        f"{evaluation_status(evaluation)} "
+        f"({evaluation_success_ratio(evaluation)} successful)"
+    )
+
+
+def __read_evaluations(ctx, inputs, numbers) -> Iterator[Evaluation]:
+    for number in numbers:
+        evaluation = Cache.load_evaluation(number - 1)
+        if evaluation is None:
+            click.echo(f"Could not find evaluation number {number}.")
+            ctx.exit(1)
+        else:
+            yield evaluation
+    for input_path in inputs:
+        try:
+            input_evaluation = Evaluation.load_from_file(input_path)
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            click.echo(f'Could not merge "{input_path}" since it is not valid.')
+            ctx.exit(1)
+        yield input_evaluation
+
+
+@history_cli.command("diff")
+@click.pass_context
+@click.option(
+    "-n",
+    "number",
+    type=int,
+    default=1,
+    callback=positive_validation,
+    help="Nth recent evaluation to compare. 1 by default",
+)
+@click.option(
+    "-m",
+    "other_number",
+    type=int,
+    default=2,
+    callback=positive_validation,
+    help="Nth recent evaluation to compare to. 2 by default",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print differences as json")
+def diff_evaluations(ctx, number, other_number, as_json):
+    """Show differences between two past evaluations."""
+    evaluation = Cache.load_evaluation(number - 1)
+    other_evaluation = Cache.load_evaluation(other_number - 1)
+    for evaluation_number, loaded_evaluation in [
+        (number, evaluation),
+        (other_number, other_evaluation),
+    ]:
+        if loaded_evaluation is None:
+            click.echo(f"Could not find evaluation number {evaluation_number}.")
+            ctx.exit(1)
+    evaluation_diff = EvaluationDiff.from_evaluations(other_evaluation, evaluation)
+    if as_json:
+        click.echo(json.dumps(evaluation_diff.as_json(), indent=2))
+        return
+    for title, commands, color in [
+        ("Newly failing", evaluation_diff.newly_failing, "red"),
+        ("Newly passing", evaluation_diff.newly_passing, "green"),
+        ("Added", evaluation_diff.added, None),
+        ("Removed", evaluation_diff.removed, None),
+    ]:
+        if len(commands) == 0:
+            continue
+        click.echo(f"{title}:")
+        for source, command in commands:
+            click.echo(f"\t{source}: {click.style(command, fg=color)}")
+    if not evaluation_diff.changed:
+        click.echo("No changes in commands results.")
+    if len(evaluation_diff.durations) != 0:
+        click.echo("Durations:")
+    for duration_change in evaluation_diff.durations:
+        click.echo(
+            f"\t{duration_change.source}: {duration_change.command} "
+            f"{duration_change.old_duration:.2f}s -> "
+            f"{duration_change.new_duration:.2f}s ({duration_change.delta:+.2f}s)"
+        )
+
+
+@history_cli.command("stats")
+@click.option("--head", type=int, help="Use only the nth recent evaluations")
+@click.option(
+    "--window",
+    type=int,
+    default=DEFAULT_WINDOW,
+    callback=positive_validation,
+    help=(
+        "Number of recent evaluations of each command to compare to the older ones. "
+        f"{DEFAULT_WINDOW} by default"
+    ),
+)
+@click.option(
+    "--baseline",
+    type=int,
+    default=DEFAULT_BASELINE_WINDOW,
+    callback=positive_validation,
+    help=(
+        "Number of evaluations of each command before the recent ones to compare "
+        f"them to. {DEFAULT_BASELINE_WINDOW} by default"
+    ),
+)
+@click.option(
+    "--significance",
+    type=click.FloatRange(0, 1),
+    default=DEFAULT_SIGNIFICANCE,
+    help=(
+        "Maximal p-value of a slowdown in order to report it. "
+        f"{DEFAULT_SIGNIFICANCE} by default"
+    ),
+)
+@click.option("--json", "as_json", is_flag=True, help="Print statistics as json")
+def history_stats(head, window, baseline, significance, as_json):
+    """Show durations and failure rates statistics of commands over history."""
+    stats = commands_stats(
+        Cache.commands_histories(head=head),
+        window=window,
+        significance=significance,
+        baseline_window=baseline,
+    )
+    if as_json:
+        click.echo(
+            json.dumps([command_stats.as_json() for command_stats in stats], indent=2)
+        )
+        return
+    if len(stats) == 0:
+        click.echo("No previous evaluations.")
+        return
+    source = None
+    for command_stats in stats:
+        if command_stats.source != source:
+            source = command_stats.source
+            click.echo(f"{source}:")
+        message = (
+            f"\t{command_stats.command} - {command_stats.runs} runs, "
+            f"{command_stats.failure_rate:.1%} failed"
+        )
+        if command_stats.median_duration is not None:
+            message += (
+                f", median {command_stats.median_duration:.2f}s, "
+                f"p95 {command_stats.p95_duration:.2f}s, "
+                f"trend {command_stats.trend:.2f}s"
+            )
+        if command_stats.slowdown is not None:
+            message += click.style(
+                f" - {command_stats.slowdown:.0%} slower "
+                f"(p-value {command_stats.p_value:.2g})",
+                fg="red",
             )
+        click.echo(message)
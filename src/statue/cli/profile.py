@@ -0,0 +1,114 @@
+"""Profile CLI."""
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import click
+
+from statue.cache import Cache
+from statue.cli.cli import statue as statue_cli
+from statue.cli.util import allow_option, contexts_option, deny_option
+from statue.commands_map import read_commands_map
+from statue.exceptions import (
+    CommandExecutionError,
+    MissingConfiguration,
+    UnknownContext,
+)
+from statue.hotspots import (
+    FileTiming,
+    command_files,
+    file_digest,
+    rank_hotspots,
+    time_files,
+)
+
+DEFAULT_TOP = 10
+
+
+@statue_cli.command("profile")
+@click.pass_context
+@click.argument("sources", nargs=-1)
+@contexts_option
+@allow_option
+@deny_option
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    help="Number of commands to run at the same time. Number of cpus by default",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    default=DEFAULT_TOP,
+    show_default=True,
+    help="Number of slowest files to show for each command",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse timings of files which were not changed since they were timed",
+)
+def profile_cli(  # pylint: disable=too-many-arguments
+    ctx: click.Context,
+    sources: List[Union[Path, str]],
+    context: Optional[List[str]],
+    allow: Optional[List[str]],
+    deny: Optional[List[str]],
+    jobs: int,
+    top: int,
+    cache: bool,
+) -> None:
+    """
+    Find the files which make each command slow.
+
+    Each command is run on each file of the sources, and the slowest files of each
+    command are shown, along with their share of the command's time on their source.
+    """
+    try:
+        commands_map = read_commands_map(
+            sources, contexts=context, allow_list=allow, deny_list=deny
+        )
+    except (UnknownContext, MissingConfiguration) as error:
+        click.echo(error)
+        ctx.exit(1)
+    if commands_map is None or len(commands_map) == 0:
+        click.echo(ctx.get_help())
+        return
+    timings: Dict[str, Dict[str, List[FileTiming]]] = {}
+    try:
+        for source, commands in commands_map.items():
+            for command in commands:
+                timings.setdefault(command.name, {})[source] = __time_command(
+                    source, command, jobs=jobs, cache=cache
+                )
+    except CommandExecutionError as error:
+        click.echo(str(error))
+        click.echo('Try to install the missing command with "statue run -i"')
+        ctx.exit(1)
+    for command_hotspots in rank_hotspots(timings, top=top):
+        click.echo(
+            f"{click.style(command_hotspots.command, fg='cyan')} "
+            f"({command_hotspots.total:.3f}s on "
+            f"{command_hotspots.files_number} files):"
+        )
+        for hotspot in command_hotspots.hotspots:
+            click.echo(
+                f"\t{hotspot.duration:8.3f}s {hotspot.share:6.1%} "
+                f"{hotspot.file} ({hotspot.source})"
+            )
+
+
+def __time_command(source, command, jobs, cache):
+    files = command_files(source, command)
+    files_digests = {file: file_digest(file) for file in files}
+    cached_timings = Cache.file_timings(command, files_digests) if cache else {}
+    new_timings = time_files(
+        command, [file for file in files if file not in cached_timings], jobs=jobs
+    )
+    if cache:
+        Cache.save_file_timings(command, new_timings, files_digests)
+    timings = {file_timing.file: file_timing for file_timing in new_timings}
+    timings.update(cached_timings)
+    return [timings[file] for file in files]
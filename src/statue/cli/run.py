@@ -1,7 +1,10 @@
 """Run CLI."""
+import cProfile
+import sys
+from functools import partial
 from itertools import chain
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Callable, Dict, List, Optional, TextIO, Tuple, Union
 
 import click
 
@@ -9,21 +12,53 @@ from statue.cache import Cache
 from statue.cli.cli import statue as statue_cli
 from statue.cli.util import (
     allow_option,
+    compact_option,
     contexts_option,
     deny_option,
     silent_option,
     verbose_option,
     verbosity_option,
 )
-from statue.commands_map import read_commands_map
-from statue.evaluation import Evaluation, evaluate_commands_map, get_failure_map
+from statue.command import Command
+from statue.commands_map import (
+    commands_map_fingerprint,
+    find_overlapping_sources,
+    read_commands_map,
+    sources_contexts,
+)
+from statue.configuration import Configuration
+from statue.evaluation import (
+    CommandEvaluation,
+    Evaluation,
+    SourceEvaluation,
+    evaluate_commands_map,
+    get_failure_map,
+)
+from statue.event_stream import FORMATS, JSONL_FORMAT, TEXT_FORMAT, EventStreamWriter
 from statue.exceptions import (
     CommandExecutionError,
     MissingConfiguration,
     UnknownContext,
 )
+from statue.hooks import CACHE_HIT, COMMANDS_MAP_BUILT, RUN_FINISHED, Hooks
+from statue.metrics import save_metrics
 from statue.print_util import print_boxed
-from statue.verbosity import is_silent
+from statue.profiler import (
+    COMMANDS_MAP_BUILD,
+    HISTORY_SAVE,
+    INSTALL_CHECKS,
+    SOURCES_FINGERPRINT,
+    TOOLS_PHASES,
+    Profiler,
+)
+from statue.resource_sampler import (
+    MIN_SAMPLE_INTERVAL,
+    ResourceSample,
+    ResourceSampler,
+    is_supported,
+)
+from statue.trace import TraceWriter
+from statue.verbosity import SILENT, is_silent
 
 
 @statue_cli.command("run")
@@ -39,6 +74,14 @@ from statue.verbosity import is_silent
 @click.option(
     "--cache/--no-cache", default=True, help="Save evaluation to cache or not"
 )
+@click.option(
+    "--resume",
+    is_flag=True,
+    help=(
+        "Resume the last interrupted run, "
+        "if its commands and sources were not changed since"
+    ),
+)
 @silent_option
 @verbose_option
 @verbosity_option
@@ -46,7 +89,53 @@ from statue.verbosity import is_silent
     "-o",
     "--output",
     type=click.Path(dir_okay=False),
-    help="Output path to save evaluation result",
+    help=(
+        "Output path to save evaluation result. "
+        "Results are streamed as json lines if the path ends with .jsonl"
+    ),
+)
+@compact_option
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(FORMATS),
+    default=TEXT_FORMAT,
+    show_default=True,
+    help=(
+        f'Output format. "{JSONL_FORMAT}" streams a json object per event, '
+        "embedding the output of the tools"
+    ),
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Show the time spent in each phase of the run, by statue and by the tools",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    help="Save cProfile statistics of statue's own process, readable with pstats",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False),
+    help="Save timeline of the run in Chrome Trace Event Format, viewable in Perfetto",
+)
+@click.option(
+    "--sample-interval",
+    type=click.FloatRange(min=MIN_SAMPLE_INTERVAL),
+    help=(
+        "Sample cpu, memory and threads of the running tools every given seconds, "
+        'into the trace of "--trace"'
+    ),
+)
+@click.option(
+    "--metrics-output",
+    type=click.Path(dir_okay=False),
+    help=(
+        "Save metrics of the run in Prometheus text format, "
+        "for node-exporter's textfile collector"
+    ),
 )
 def run_cli(  # pylint: disable=too-many-arguments
     ctx: click.Context,
@@ -57,8 +146,16 @@ def run_cli(  # pylint: disable=too-many-arguments
     failed: bool,
     install: bool,
     cache: bool,
+    resume: bool,
     verbosity: str,
     output: Optional[str],
+    compact: bool,
+    output_format: str,
+    profile: bool,
+    profile_output: Optional[str],
+    trace: Optional[str],
+    sample_interval: Optional[float],
+    metrics_output: Optional[str],
 ) -> None:
     """
     Run static code analysis commands on sources.
@@ -67,46 +164,137 @@ def run_cli(  # pylint: disable=too-many-arguments
     When no source files are presented, will use configuration file to determine on
     which files to run
     """
+    # Only events are written to stdout in jsonl format, messages go to stderr
+    is_jsonl = output_format == JSONL_FORMAT
+    if resume and not cache:
+        click.echo('Cannot resume evaluation with "--no-cache".', err=is_jsonl)
+        ctx.exit(1)
+    if sample_interval is not None and trace is None:
+        click.echo('Cannot sample resources without "--trace".', err=is_jsonl)
+        ctx.exit(1)
+    if is_jsonl:
+        verbosity = SILENT
+        event_stream_writer = EventStreamWriter(sys.stdout)
+        Hooks.register(event_stream_writer)
+        ctx.call_on_close(lambda: Hooks.unregister(event_stream_writer))
+    if profile:
+        ctx.call_on_close(partial(__print_profile, err=is_jsonl))
+    if profile_output is not None:
+        __start_cprofile(ctx, profile_output)
     commands_map = None
     try:
-        commands_map = __get_commands_map(
-            sources=sources, context=context, allow=allow, deny=deny, failed=failed
-        )
+        with Profiler.phase(COMMANDS_MAP_BUILD):
+            commands_map = __get_commands_map(
+                sources=sources, context=context, allow=allow, deny=deny, failed=failed
+            )
     except UnknownContext as error:
-        click.echo(error)
+        click.echo(error, err=is_jsonl)
         ctx.exit(1)
     except MissingConfiguration:
         click.echo(
             '"Run" command cannot be run without a specified source '
-            "or a sources section in Statue's configuration."
+            "or a sources section in Statue's configuration.",
+            err=is_jsonl,
         )
         click.echo(
             'Please consider running "statue config init" in order to initialize '
-            "default configuration."
+            "default configuration.",
+            err=is_jsonl,
         )
         ctx.exit(1)
     if commands_map is None or len(commands_map) == 0:
-        click.echo(ctx.get_help())
+        click.echo(ctx.get_help(), err=is_jsonl)
         return
+    Hooks.emit(COMMANDS_MAP_BUILT, commands_map=commands_map)
+    overlapping_sources = find_overlapping_sources(list(commands_map.keys()))
+    if len(overlapping_sources) != 0 and not is_silent(verbosity):
+        __print_overlapping_sources(overlapping_sources)
 
     if install:
-        for command in chain.from_iterable(commands_map.values()):
-            command.install(verbosity=verbosity)
+        with Profiler.phase(INSTALL_CHECKS):
+            for command in chain.from_iterable(commands_map.values()):
+                command.install(verbosity=verbosity)
     if not is_silent(verbosity):
         print_boxed("Evaluation", print_method=click.echo)
-    evaluation = None
+    fingerprint = None
+    if cache:
+        with Profiler.phase(SOURCES_FINGERPRINT):
+            fingerprint = commands_map_fingerprint(commands_map)
+    run_id, previous_evaluation = (
+        __resumed_run(fingerprint, verbosity) if resume else (None, Evaluation())
+    )
+    if run_id is None and cache:
+        with Profiler.phase(HISTORY_SAVE):
+            run_id = Cache.start_run(fingerprint=fingerprint)
+    stream = (
+        open(output, mode="w")  # pylint: disable=consider-using-with
+        if output is not None and Path(output).suffix == ".jsonl"
+        else None
+    )
+    trace_writer = (
+        TraceWriter(open(trace, mode="w"))  # pylint: disable=consider-using-with
+        if trace is not None
+        else None
+    )
+    if trace_writer is not None:
+        Hooks.register(trace_writer)
+    resource_sampler = __start_resource_sampler(
+        sample_interval, trace_writer, err=is_jsonl
+    )
     try:
+        for source, source_evaluation in previous_evaluation.items():
+            for command_evaluation in source_evaluation.commands_evaluations:
+                if stream is not None:
+                    stream.write(command_evaluation.as_json_line(source))
+                Hooks.emit(
+                    CACHE_HIT, source=source, command_evaluation=command_evaluation
+                )
         evaluation = evaluate_commands_map(
-            commands_map=commands_map, verbosity=verbosity, print_method=click.echo
+            commands_map=__remaining_commands_map(commands_map, previous_evaluation),
+            verbosity=verbosity,
+            print_method=click.echo,
+            on_command_evaluation=__record_command_evaluation(run_id, stream),
+            capture_output=is_jsonl or metrics_output is not None,
+            attribute_failures=failed or output is not None,
         )
     except CommandExecutionError as error:
-        click.echo(str(error))
-        click.echo('Try to rerun with the "-i" flag')
+        click.echo(str(error), err=is_jsonl)
+        click.echo('Try to rerun with the "-i" flag', err=is_jsonl)
         ctx.exit(1)
-    if cache:
-        Cache.save_evaluation(evaluation)
-    if output is not None:
-        evaluation.save_as_json(output)
+    except KeyboardInterrupt:
+        if trace_writer is not None:
+            trace_writer.instant("interrupted")
+        click.echo(err=is_jsonl)
+        click.echo("Evaluation was interrupted.", err=is_jsonl)
+        if cache:
+            click.echo('Run "statue run --resume" in order to resume it.', err=is_jsonl)
+        ctx.exit(130)
+    finally:
+        if stream is not None:
+            stream.close()
+        if resource_sampler is not None:
+            resource_sampler.stop()
+        if trace_writer is not None:
+            Hooks.unregister(trace_writer)
+            trace_writer.close()
+    evaluation = __combine_evaluations(commands_map, previous_evaluation, evaluation)
+    Hooks.emit(RUN_FINISHED, evaluation=evaluation)
+    if run_id is not None:
+        with Profiler.phase(HISTORY_SAVE):
+            Cache.finish_run(run_id, retention_policy=Configuration.history_retention())
+    if output is not None and stream is None:
+        evaluation.save_as_json(output, compact=compact)
+    if metrics_output is not None:
+        save_metrics(
+            metrics_output,
+            evaluation,
+            sources_contexts=sources_contexts(
+                list(evaluation.keys()), contexts=context
+            ),
+            cached_evaluation=previous_evaluation,
+        )
+    if is_jsonl:
+        ctx.exit(0 if evaluation.success else 1)
     click.echo()
     if not is_silent(verbosity):
         print_boxed("Summary", print_method=click.echo)
@@ -115,6 +303,170 @@ def run_cli(  # pylint: disable=too-many-arguments
     ctx.exit(__evaluate_failure_map(failure_map))
 
 
+def __resumed_run(
+    fingerprint: Optional[str], verbosity: str
+) -> Tuple[Optional[int], Evaluation]:
+    run_summary = Cache.last_incomplete_run()
+    if run_summary is None:
+        if not is_silent(verbosity):
+            click.echo("No interrupted run to resume. Running all commands.")
+        return None, Evaluation()
+    if run_summary.fingerprint != fingerprint:
+        if not is_silent(verbosity):
+            click.echo(
+                "Commands or sources were changed since the interrupted run. "
+                "Running all commands."
+            )
+        return None, Evaluation()
+    previous_evaluation = Cache.run_evaluation(run_summary.run_id)
+    if not is_silent(verbosity):
+        click.echo(
+            "Resuming interrupted run. "
+            f"Skipping {previous_evaluation.commands_number} evaluated commands."
+        )
+    return run_summary.run_id, previous_evaluation
+
+
+def __remaining_commands_map(
+    commands_map: Dict[str, List[Command]], previous_evaluation: Evaluation
+) -> Dict[str, List[Command]]:
+    remaining_commands_map = {}
+    for source, commands in commands_map.items():
+        evaluated_commands = (
+            [
+                command_evaluation.command
+                for command_evaluation in previous_evaluation[
+                    source
+                ].commands_evaluations
+            ]
+            if source in previous_evaluation
+            else []
+        )
+        remaining_commands = [
+            command for command in commands if command not in evaluated_commands
+        ]
+        if len(remaining_commands) != 0:
+            remaining_commands_map[source] = remaining_commands
+    return remaining_commands_map
+
+
+def __combine_evaluations(
+    commands_map: Dict[str, List[Command]],
+    previous_evaluation: Evaluation,
+    evaluation: Evaluation,
+) -> Evaluation:
+    """Combine evaluations of resumed run, ordered as in the commands map."""
+    if len(previous_evaluation.keys()) == 0:
+        return evaluation
+    combined_evaluation = Evaluation()
+    for source, commands in commands_map.items():
+        commands_evaluations = [
+            command_evaluation
+            for partial_evaluation in [previous_evaluation, evaluation]
+            if source in partial_evaluation
+            for command_evaluation in partial_evaluation[source].commands_evaluations
+        ]
+        combined_evaluation[source] = SourceEvaluation(
+            sorted(commands_evaluations, key=partial(__command_position, commands))
+        )
+    return combined_evaluation
+
+
+def __command_position(
+    commands: List[Command], command_evaluation: CommandEvaluation
+) -> int:
+    return commands.index(command_evaluation.command)
+
+
+def __record_command_evaluation(
+    run_id: Optional[int],
+    stream: Optional[TextIO],
+) -> Callable[[str, CommandEvaluation], None]:
+    def record(source: str, command_evaluation: CommandEvaluation) -> None:
+        if run_id is not None:
+            with Profiler.phase(HISTORY_SAVE):
+                Cache.record_command_evaluation(run_id, source, command_evaluation)
+        if stream is not None:
+            stream.write(command_evaluation.as_json_line(source))
+            stream.flush()
+
+    return record
+
+
+def __start_resource_sampler(
+    sample_interval: Optional[float], trace_writer: Optional[TraceWriter], err: bool
+) -> Optional[ResourceSampler]:
+    if sample_interval is None or trace_writer is None:
+        return None
+    if not is_supported():
+        click.echo(
+            "Resources sampling is supported only on platforms with procfs.", err=err
+        )
+        return None
+
+    def record(resource_sample: ResourceSample) -> None:
+        trace_writer.counter(
+            "tools cpu", dict(percent=round(resource_sample.cpu_percent, 1))
+        )
+        trace_writer.counter("tools memory", dict(rss=resource_sample.rss_bytes))
+        trace_writer.counter(
+            "tools threads",
+            dict(
+                threads=resource_sample.threads,
+                processes=resource_sample.processes,
+            ),
+        )
+
+    resource_sampler = ResourceSampler(interval=sample_interval, on_sample=record)
+    resource_sampler.start()
+    return resource_sampler
+
+
+def __start_cprofile(ctx: click.Context, profile_output: str) -> None:
+    profile = cProfile.Profile()
+
+    def dump_profile() -> None:
+        profile.disable()
+        profile.dump_stats(profile_output)
+
+    ctx.call_on_close(dump_profile)
+    profile.enable()
+
+
+def __print_profile(err: bool) -> None:
+    wall_time = Profiler.elapsed()
+    phases = Profiler.phases()
+    click.echo(err=err)
+    click.echo("Profile:", err=err)
+    for name, phase_time in phases.items():
+        message = f"\t{name}: {phase_time.total:.3f}s"
+        if phase_time.count > 1:
+            message += (
+                f" ({phase_time.count} times, "
+                f"{phase_time.total / phase_time.count * 1000:.1f}ms each)"
+            )
+        click.echo(message, err=err)
+    other_time = wall_time - sum(phase_time.total for phase_time in phases.values())
+    click.echo(f"\tother: {other_time:.3f}s", err=err)
+    tools_time = sum(phases[name].total for name in TOOLS_PHASES if name in phases)
+    overhead = wall_time - tools_time
+    click.echo(
+        f"Tools took {tools_time:.3f}s of {wall_time:.3f}s wall time. "
+        f"Statue overhead is {overhead:.3f}s ({overhead / wall_time:.1%}).",
+        err=err,
+    )
+
+
+def __print_overlapping_sources(overlapping_sources):
+    click.echo(
+        "Warning: the following sources overlap. "
+        "Nested sources are excluded from the sources containing them:"
+    )
+    for source, nested_sources in overlapping_sources.items():
+        click.echo(f"\t{source}: {', '.join(nested_sources)}")
+    click.echo()
+
+
 def __evaluate_failure_map(failure_map):
     """Returns exit code."""
     if len(failure_map) == 0:
@@ -132,15 +484,8 @@ def __get_commands_map(  # pylint: disable=too-many-arguments
     sources, context, allow, deny, failed
 ):
     commands_map = None
-    recent_evaluation_path = Cache.recent_evaluation_path()
-    if (
-        failed
-        and recent_evaluation_path is not None  # noqa: W503
-        and recent_evaluation_path.exists()  # noqa: W503
-    ):
-        commands_map = get_failure_map(
-            Evaluation.load_from_file(recent_evaluation_path)
-        )
+    if failed:
+        commands_map = Cache.failure_map()
     if commands_map is None or len(commands_map) == 0:
         commands_map = read_commands_map(
             sources,
@@ -31,3 +31,9 @@ silent_option = click.option(
 verbose_option = click.option(
     "--verbose", "verbosity", flag_value=VERBOSE, help=f'Set verbosity to "{VERBOSE}".'
 )
+
+compact_option = click.option(
+    "--compact",
+    is_flag=True,
+    help="Save evaluation in the minified compact json format.",
+)
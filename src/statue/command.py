@@ -1,17 +1,61 @@
 # noqa: D100
 # pylint: disable=missing-module-docstring
+import errno
 import importlib
 import os
+import re
+import signal
+import struct
 import subprocess  # nosec
 import sys
-from dataclasses import dataclass, field
-from typing import List
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
 
 import pkg_resources
 
+from statue.constants import (
+    ARGS,
+    FILES_FILTER,
+    FILES_REPORTING_COMMANDS,
+    HELP,
+    PYTHON_SUFFIX,
+)
 from statue.exceptions import CommandExecutionError
+from statue.files_filter import FilesFilter
+from statue.profiler import OUTPUT_CAPTURE, SPAWN, TOOLS_RUNTIME, Profiler
 from statue.verbosity import DEFAULT_VERBOSITY, is_silent, is_verbose
 
+PYTHON_FILE_REGEX = re.compile(
+    rf"(?:[A-Za-z]:)?[^\s:\"'()\[\],]+{re.escape(PYTHON_SUFFIX)}(?![\w.])"
+)
+# Command line length limit of Windows, which has no ARG_MAX
+WINDOWS_COMMAND_LINE_LIMIT = 32767
+# Headroom left out of ARG_MAX, as POSIX requires from xargs
+ARGS_HEADROOM = 2048
+POINTER_SIZE = struct.calcsize("P")
+# Peak resident memory is reported in kilobytes, while macOS reports bytes
+MAX_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+@dataclass
+class ProcessesUsage:
+    """
+    Resources used by the processes of a command.
+
+    :param peak_rss: Peak resident memory of the largest process, in bytes. None
+     if unknown.
+    """
+
+    peak_rss: Optional[int] = None
+
+    def add_peak_rss(self, peak_rss: int) -> None:
+        """Count peak resident memory of another process of the command."""
+        self.peak_rss = (
+            peak_rss if self.peak_rss is None else max(self.peak_rss, peak_rss)
+        )
+
 
 @dataclass
 class Command:
@@ -21,11 +65,13 @@ class Command:
     :param name: The name of the command to run.
     :param args: A list of arguments for the command.
     :param help: Help string
+    :param files_filter: Optional filter of the source files to check.
     """
 
     name: str
     help: str
     args: List[str] = field(default_factory=list)
+    files_filter: Optional[FilesFilter] = field(default=None)
 
     def installed(self) -> bool:
         """
@@ -60,30 +106,241 @@ class Command:
             capture_output=is_silent(verbosity),
         )
 
+    @property
+    def reports_files(self) -> bool:
+        """Does the command report the paths of the files it fails on."""
+        return self.name in FILES_REPORTING_COMMANDS
+
     def execute(  # pylint: disable=too-many-arguments
         self,
         source: str,
         verbosity: str = DEFAULT_VERBOSITY,
+        output: Optional[List[str]] = None,
+        usage: Optional[ProcessesUsage] = None,
     ) -> int:
         """
         Execute the command.
 
         :param source: source files to check.
         :param verbosity: String. Indicates the verbosity of the prints to console.
+        :param output: If given, the command output lines are appended to it while
+         being printed.
+        :param usage: If given, resources used by the command processes are counted
+         in it, where the platform reports them.
         :return: Int. Returns the return code of the command
         """
-        args = [self.name, source, *self.args]
+        if self.files_filter is None:
+            return self.__execute_on_files([source], verbosity, output, usage)
+        files = self.files_filter.filter_source(source)
+        if len(files) == 0 and self.files_filter.files is not None:
+            # None of the failed files is left, so the whole source is checked again
+            whole_source_filter = replace(self.files_filter, files=None)
+            return replace(
+                self,
+                files_filter=(
+                    None
+                    if whole_source_filter == FilesFilter()
+                    else whole_source_filter
+                ),
+            ).execute(source, verbosity, output, usage)
+        if len(files) == 0:
+            if is_verbose(verbosity):
+                print(f'No files of "{source}" were left to check.')
+            return 0
+        # Filtered files may not fit in a single command line, so the command is
+        # run once for each chunk of files which does
+        return_code = 0
+        for files_chunk in split_to_chunks(
+            files, max_args_length() - args_length([self.name, *self.args])
+        ):
+            chunk_return_code = self.__execute_on_files(
+                files_chunk, verbosity, output, usage
+            )
+            if return_code == 0:
+                return_code = chunk_return_code
+        return return_code
+
+    def failed_files(
+        self, source: Union[Path, str], output: Sequence[str]
+    ) -> Optional[List[str]]:
+        """
+        Get files of a directory source which the command reported in its output.
+
+        :param source: Source the command was executed on.
+        :param output: Output lines of the command.
+        :return: Sorted posix paths relative to the source, or None if failures
+         cannot be attributed to files.
+        """
+        if not self.reports_files or not Path(source).is_dir():
+            return None
+        source_path = os.path.abspath(source)
+        failed_files = set()
+        for line in output:
+            for match in PYTHON_FILE_REGEX.finditer(line):
+                file_path = os.path.abspath(match.group(0))
+                if file_path.startswith(source_path + os.sep):
+                    failed_files.add(
+                        Path(os.path.relpath(file_path, source_path)).as_posix()
+                    )
+        if len(failed_files) == 0:
+            return None
+        return sorted(failed_files)
+
+    def as_json(self) -> Dict[str, Any]:
+        """Return command as json dictionary."""
+        command_json: Dict[str, Any] = dict(
+            name=self.name, help=self.help, args=self.args
+        )
+        if self.files_filter is not None:
+            command_json[FILES_FILTER] = self.files_filter.as_json()
+        return command_json
+
+    @classmethod
+    def from_json(cls, command):
+        # type: (Dict[str, Any]) -> Command
+        """Read command from json dictionary."""
+        files_filter = command.get(FILES_FILTER, None)
+        return Command(
+            name=command["name"],
+            help=command[HELP],
+            args=command.get(ARGS, []),
+            files_filter=(
+                FilesFilter.from_json(files_filter)
+                if files_filter is not None
+                else None
+            ),
+        )
+
+    def __execute_on_files(
+        self,
+        files: List[str],
+        verbosity: str,
+        output: Optional[List[str]],
+        usage: Optional[ProcessesUsage],
+    ) -> int:
+        args = [self.name, *files, *self.args]
         if is_verbose(verbosity):
             print(f"Running the following command: \"{' '.join(args)}\"")
-        return self._run_subprocess(args, verbosity)
+        try:
+            return self._run_subprocess(args, verbosity, output, usage)
+        except OSError as error:
+            # Arguments limit was underestimated, so files are split further
+            if error.errno != errno.E2BIG or len(files) == 1:
+                raise
+        middle = len(files) // 2
+        first_return_code = self.__execute_on_files(
+            files[:middle], verbosity, output, usage
+        )
+        second_return_code = self.__execute_on_files(
+            files[middle:], verbosity, output, usage
+        )
+        return first_return_code or second_return_code
 
-    def _run_subprocess(self, args: List[str], verbosity: str) -> int:
+    def _run_subprocess(
+        self,
+        args: List[str],
+        verbosity: str,
+        output: Optional[List[str]] = None,
+        usage: Optional[ProcessesUsage] = None,
+    ) -> int:
+        """
+        Run command in a process group of its own.
+
+        If waiting for the command is interrupted, its whole process group is
+        killed, so no process spawned by the command is left running.
+        """
+        if output is not None:
+            stdout, stderr = subprocess.PIPE, subprocess.STDOUT
+        elif is_silent(verbosity):
+            stdout, stderr = subprocess.DEVNULL, subprocess.DEVNULL
+        else:
+            stdout, stderr = None, None
         try:
-            return subprocess.run(  # nosec
-                args,
-                env=os.environ,
-                check=False,
-                capture_output=is_silent(verbosity),
-            ).returncode
+            with Profiler.phase(SPAWN):
+                process = subprocess.Popen(  # nosec # pylint: disable=R1732
+                    args,
+                    env=os.environ,
+                    stdout=stdout,
+                    stderr=stderr,
+                    start_new_session=True,
+                    text=output is not None,
+                    errors="replace" if output is not None else None,
+                )
         except FileNotFoundError as error:
             raise CommandExecutionError(self.name) from error
+        start = time.perf_counter()
+        # Waiting for the next line is tool time, only handling lines is statue's
+        capture_time = 0.0
+        try:
+            if output is not None and process.stdout is not None:
+                for line in process.stdout:
+                    line_start = time.perf_counter()
+                    output.append(line)
+                    if not is_silent(verbosity):
+                        sys.stdout.write(line)
+                        sys.stdout.flush()
+                    capture_time += time.perf_counter() - line_start
+            return_code = _wait(process, usage)
+        except BaseException:
+            _kill_process_group(process)
+            raise
+        if output is not None:
+            Profiler.add(OUTPUT_CAPTURE, capture_time)
+        Profiler.add(TOOLS_RUNTIME, time.perf_counter() - start - capture_time)
+        return return_code
+
+
+def max_args_length() -> int:
+    """Get number of bytes available for arguments of a spawned command."""
+    try:
+        arg_max = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        return WINDOWS_COMMAND_LINE_LIMIT
+    environment_length = args_length(
+        [f"{key}={value}" for key, value in os.environ.items()]
+    )
+    return arg_max - environment_length - ARGS_HEADROOM
+
+
+def args_length(args: List[str]) -> int:
+    """Get number of bytes arguments take, including their pointers."""
+    return sum(len(os.fsencode(arg)) + 1 + POINTER_SIZE for arg in args)
+
+
+def split_to_chunks(files: List[str], max_length: int) -> List[List[str]]:
+    """Split files into chunks whose arguments fit in max_length bytes."""
+    chunks: List[List[str]] = [[]]
+    chunk_length = 0
+    for file in files:
+        file_length = args_length([file])
+        if len(chunks[-1]) != 0 and chunk_length + file_length > max_length:
+            chunks.append([])
+            chunk_length = 0
+        chunks[-1].append(file)
+        chunk_length += file_length
+    return chunks
+
+
+def _wait(process: subprocess.Popen, usage: Optional[ProcessesUsage]) -> int:
+    """Wait for process, counting its peak resident memory in usage if given."""
+    if usage is None or not hasattr(os, "wait4"):
+        return process.wait()
+    _, status, rusage = os.wait4(process.pid, 0)
+    # The process is reaped here, so its return code is set on it as wait would
+    process.returncode = (
+        -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    )
+    usage.add_peak_rss(rusage.ru_maxrss * MAX_RSS_UNIT)
+    return process.returncode
+
+
+def _kill_process_group(process: subprocess.Popen) -> None:
+    killpg = getattr(os, "killpg", None)
+    if killpg is None:
+        process.kill()
+    else:
+        try:
+            killpg(process.pid, signal.SIGKILL)  # pylint: disable=no-member
+        except ProcessLookupError:
+            pass
+    process.wait()
@@ -1,11 +1,30 @@
 """Commands map allow us to know which commands to run on each source."""
+import hashlib
+import json
+import os
+from dataclasses import replace
+from glob import escape
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Set, Union
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from statue.command import Command
 from statue.configuration import Configuration
 from statue.constants import ALLOW_LIST, CONTEXTS, DENY_LIST
 from statue.exceptions import MissingConfiguration
+from statue.files_filter import FilesFilter
+
+CommandsSignature = Tuple[Tuple[str, ...], Optional[FrozenSet[str]], FrozenSet[str]]
 
 
 def read_commands_map(
@@ -29,31 +48,217 @@ def read_commands_map(
     """
     if len(sources) == 0:
         sources = Configuration.sources_list()
-    commands_map = dict()
-    for source in sources:
-        instructions = None
-        try:
-            instructions = Configuration.get_source_configuration(source)
-        except MissingConfiguration:
-            pass
-        if instructions is None:
-            instructions = dict()
-        commands = Configuration.read_commands(
-            contexts=__combine_if_possible(contexts, instructions.get(CONTEXTS, None)),
-            allow_list=__intersect_if_possible(
-                allow_list, instructions.get(ALLOW_LIST, None)
-            ),
-            deny_list=__combine_if_possible(
-                deny_list, instructions.get(DENY_LIST, None)
-            ),
+    source_paths: List[str] = list(
+        dict.fromkeys(str(Path(source)) for source in sources)
+    )
+    sources_configuration = __read_sources_configuration()
+    overlapping_sources = find_overlapping_sources(source_paths)
+    commands_map: Dict[str, List[Command]] = dict()
+    resolved_commands: Dict[CommandsSignature, List[Command]] = dict()
+    for source in source_paths:
+        instructions = __source_instructions(source, sources_configuration)
+        contexts_list = __combine_if_possible(
+            contexts, instructions.get(CONTEXTS, None)
+        )
+        source_allow_list = __intersect_if_possible(
+            allow_list, instructions.get(ALLOW_LIST, None)
+        )
+        source_deny_list = __combine_if_possible(
+            deny_list, instructions.get(DENY_LIST, None)
         )
+        signature = __commands_signature(
+            contexts_list, source_allow_list, source_deny_list
+        )
+        if signature not in resolved_commands:
+            resolved_commands[signature] = Configuration.read_commands(
+                contexts=contexts_list,
+                allow_list=source_allow_list,
+                deny_list=source_deny_list,
+            )
+        commands = resolved_commands[signature]
         if commands is not None and len(commands) != 0:
-            commands_map[str(source)] = commands
+            commands_map[source] = __filter_commands(
+                commands,
+                __source_filter(
+                    source, instructions, overlapping_sources.get(source, [])
+                ),
+            )
     if len(commands_map) == 0:
         return None
     return commands_map
 
 
+def sources_contexts(
+    sources: Sequence[Union[Path, str]], contexts: Optional[List[str]] = None
+) -> Dict[str, List[str]]:
+    """
+    Get contexts in which each source is evaluated.
+
+    :param sources: List of sources paths.
+    :param contexts: List of global contexts.
+    :return: Dictionary from source to the global contexts followed by the contexts
+     of the source in the configuration file.
+    """
+    sources_configuration = __read_sources_configuration()
+    return {
+        str(source): __combine_if_possible(
+            contexts,
+            __source_instructions(source, sources_configuration).get(CONTEXTS, None),
+        )
+        or []
+        for source in sources
+    }
+
+
+def find_overlapping_sources(
+    sources: Sequence[Union[Path, str]]
+) -> Dict[str, List[str]]:
+    """
+    Find sources which are nested inside other sources.
+
+    :param sources: List of sources.
+    :return: Dictionary from source to the sources nested directly inside it.
+    """
+    source_paths: List[str] = [str(Path(source)) for source in sources]
+    sources_set = set(source_paths)
+    overlapping_sources: Dict[str, List[str]] = dict()
+    for source in dict.fromkeys(source_paths):
+        for parent in Path(source).parents:
+            if str(parent) in sources_set:
+                overlapping_sources.setdefault(str(parent), []).append(source)
+                break
+    return overlapping_sources
+
+
+def commands_map_fingerprint(commands_map: Dict[str, List[Command]]) -> str:
+    """
+    Get fingerprint of commands map and of the files its commands check.
+
+    The fingerprint changes if any command or its arguments change, or if any file
+    checked by the commands is added, removed or modified. Files are compared by
+    their stat signatures rather than by their content, so computing the
+    fingerprint does not read them.
+
+    :param commands_map: Dictionary from source file to the commands to run on it.
+    :return: Hex digest string.
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps(
+            {
+                source: [command.as_json() for command in commands]
+                for source, commands in commands_map.items()
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+    )
+    for source, commands in commands_map.items():
+        for file_path in __checked_files(source, commands):
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                continue
+            digest.update(
+                f"\0{file_path}\0{stat_result.st_mtime_ns}\0{stat_result.st_size}"
+                f"\0{stat_result.st_ino}".encode("utf-8")
+            )
+    return digest.hexdigest()
+
+
+def __checked_files(source: str, commands: List[Command]) -> List[str]:
+    """Get sorted files of a source which any of its commands checks."""
+    files_filters = {
+        FilesFilter() if command.files_filter is None else command.files_filter
+        for command in commands
+    }
+    files: Set[str] = set()
+    for files_filter in files_filters:
+        files.update(files_filter.filter_source(source))
+    return sorted(files)
+
+
+def __read_sources_configuration() -> Dict[Path, MutableMapping[str, Any]]:
+    """
+    Read sources configuration once, for all sources to be resolved against it.
+
+    :meth:`Configuration.get_source_configuration` copies the whole configuration
+    and goes over all configured sources, which would make resolving every source
+    quadratic.
+    """
+    try:
+        sources_configuration = Configuration.sources_configuration()
+    except MissingConfiguration:
+        return dict()
+    return {
+        Path(source_path): setup for source_path, setup in sources_configuration.items()
+    }
+
+
+def __source_instructions(
+    source: Union[Path, str],
+    sources_configuration: Dict[Path, MutableMapping[str, Any]],
+) -> MutableMapping[str, Any]:
+    """Get configuration of the most specific configured source containing source."""
+    source = Path(source)
+    for source_path in [source, *source.parents]:
+        instructions = sources_configuration.get(source_path, None)
+        if instructions is not None:
+            return instructions
+    return dict()
+
+
+def __commands_signature(
+    contexts: Optional[List[str]],
+    allow_list: Optional[List[str]],
+    deny_list: Optional[List[str]],
+) -> CommandsSignature:
+    """
+    Normalize contexts, allow list and deny list into a hashable key.
+
+    Sources sharing the same key resolve to the same commands, so
+    :meth:`Configuration.read_commands` is called only once per key.
+    Contexts order is kept since arguments are combined context after context.
+    """
+    return (
+        tuple(contexts) if contexts else (),
+        frozenset(allow_list) if allow_list else None,
+        frozenset(deny_list) if deny_list else frozenset(),
+    )
+
+
+def __source_filter(
+    source: str, instructions: MutableMapping[str, Any], nested_sources: List[str]
+) -> Optional[FilesFilter]:
+    """
+    Build files filter of a source.
+
+    Nested sources are checked according to their own configuration, so they are
+    excluded from the source in order for each file to be checked only once.
+    """
+    source_filter = FilesFilter.from_setup(instructions)
+    if len(nested_sources) == 0:
+        return source_filter
+    exclude = []
+    for nested_source in nested_sources:
+        relative_path = escape(Path(nested_source).relative_to(source).as_posix())
+        exclude.extend([f"/{relative_path}", f"/{relative_path}/*"])
+    return FilesFilter(exclude=tuple(exclude)).combine(source_filter)
+
+
+def __filter_commands(
+    commands: List[Command], source_filter: Optional[FilesFilter]
+) -> List[Command]:
+    filtered_commands: List[Command] = []
+    for command in commands:
+        if source_filter is not None:
+            command = replace(
+                command, files_filter=source_filter.combine(command.files_filter)
+            )
+        if command not in filtered_commands:
+            filtered_commands.append(command)
+    return filtered_commands
+
+
 def __combine_if_possible(
     list1: Optional[List[str]], list2: Optional[List[str]]
 ) -> Optional[List[str]]:
@@ -14,6 +14,7 @@ from statue.constants import (
     CONTEXTS,
     DEFAULT_CONFIGURATION_FILE,
     HELP,
+    HISTORY,
     OVERRIDE,
     SOURCES,
     STANDARD,
@@ -28,6 +29,8 @@ from statue.exceptions import (
     UnknownCommand,
     UnknownContext,
 )
+from statue.files_filter import FilesFilter
+from statue.retention import RetentionPolicy
 
 
 class Configuration:
@@ -60,12 +63,7 @@ class Configuration:
     @classmethod
     def statue_configuration(cls) -> MutableMapping[str, Any]:
         """Getter of general statue configuration."""
-        if cls.__statue_configuration is not None:
-            return deepcopy(cls.__statue_configuration)
-        default_configuration = cls.default_configuration()
-        if default_configuration is not None:
-            return default_configuration
-        raise EmptyConfiguration()
+        return deepcopy(cls.__configuration())
 
     @classmethod
     def set_statue_configuration(
@@ -77,7 +75,7 @@ class Configuration:
     @classmethod
     def commands_configuration(cls) -> Optional[MutableMapping[str, Any]]:
         """Getter of the commands configuration."""
-        return cls.statue_configuration().get(COMMANDS, None)
+        return deepcopy(cls.__configuration().get(COMMANDS, None))
 
     @classmethod
     def commands_names_list(cls) -> List[str]:
@@ -100,10 +98,7 @@ class Configuration:
         :raises: raise :Class:`MissingConfiguration` if no contexts configuration was
         set.
         """
-        commands_configuration = cls.commands_configuration()
-        if commands_configuration is None:
-            raise MissingConfiguration(COMMANDS)
-        return commands_configuration.get(command_name, None)
+        return deepcopy(cls.__command_configuration(command_name))
 
     @classmethod
     def sources_configuration(
@@ -112,10 +107,10 @@ class Configuration:
         """Getter of the sources configuration."""
         sources_configuration: Optional[
             MutableMapping[Path, MutableMapping[str, Any]]
-        ] = cls.statue_configuration().get(SOURCES, None)
+        ] = cls.__configuration().get(SOURCES, None)
         if sources_configuration is None:
             raise MissingConfiguration(SOURCES)
-        return sources_configuration
+        return deepcopy(sources_configuration)
 
     @classmethod
     def sources_list(cls) -> List[Path]:
@@ -127,7 +122,10 @@ class Configuration:
         cls, source: Union[Path, str]
     ) -> Optional[MutableMapping[str, Any]]:
         """
-        Get configuration dictionary of a context.
+        Get configuration dictionary of a source.
+
+        If the source is nested inside several configured sources, the configuration
+        of the most specific one is returned.
 
         :param source: Name of the desired source.
         :type source: str
@@ -138,18 +136,21 @@ class Configuration:
         sources_configuration = cls.sources_configuration()
         if not isinstance(source, Path):
             source = Path(source)
+        matching_setup, matching_depth = None, -1
         for source_path, setup in sources_configuration.items():
             try:
                 source.relative_to(source_path)
-                return setup
             except ValueError:
                 continue
-        return None
+            depth = len(Path(source_path).parts)
+            if depth > matching_depth:
+                matching_setup, matching_depth = setup, depth
+        return matching_setup
 
     @classmethod
     def contexts_map(cls) -> Optional[Dict[str, Context]]:
         """Getter of the contexts configuration."""
-        return cls.statue_configuration().get(CONTEXTS, None)
+        return deepcopy(cls.__configuration().get(CONTEXTS, None))
 
     @classmethod
     def contexts_list(cls) -> List[Context]:
@@ -159,6 +160,11 @@ class Configuration:
             return []
         return list(contexts_map.values())
 
+    @classmethod
+    def history_retention(cls) -> RetentionPolicy:
+        """Getter of the history retention policy."""
+        return RetentionPolicy.from_setup(cls.__configuration().get(HISTORY, {}))
+
     @classmethod
     def get_context(cls, context_identifier: str) -> Context:
         """
@@ -170,16 +176,7 @@ class Configuration:
         :raises: raise :Class:`MissingConfiguration` if no contexts configuration was
         set.
         """
-        contexts_configuration = cls.contexts_map()
-        if contexts_configuration is None:
-            raise MissingConfiguration(CONTEXTS)
-        for context_name, context in contexts_configuration.items():
-            if (
-                context_identifier == context_name
-                or context_identifier in context.aliases  # noqa: disable=W503
-            ):
-                return context
-        raise UnknownContext(context_identifier)
+        return cls.__find_context(cls.contexts_map(), context_identifier)
 
     @classmethod
     def read_commands(
@@ -246,12 +243,17 @@ class Configuration:
                 f'Command "{command_name}" '
                 f"was explicitly denied in deny list: {', '.join(deny_list)}"
             )
-        command_configuration = cls.get_command_configuration(command_name)
+        # Setups are combined into new dictionaries, so they are not copied
+        command_configuration = cls.__command_configuration(command_name)
         if command_configuration is None:
             raise UnknownCommand(command_name)
         if contexts is None or len(contexts) == 0:
             contexts = [STANDARD]
-        context_objects = [cls.get_context(context_name) for context_name in contexts]
+        # Contexts are only searched, so they are not copied
+        contexts_map = cls.__configuration().get(CONTEXTS, None)
+        context_objects = [
+            cls.__find_context(contexts_map, context_name) for context_name in contexts
+        ]
         for context in context_objects:
             context_obj = context.search_context(command_configuration)
             if context_obj is False or context_obj is None:
@@ -265,8 +267,11 @@ class Configuration:
             )
         return Command(
             name=command_name,
-            args=command_configuration.get(ARGS, []),
+            args=list(command_configuration.get(ARGS, [])),
             help=command_configuration[HELP],
+            files_filter=FilesFilter.from_setup(
+                command_configuration, allow_include=False
+            ),
         )
 
     @classmethod
@@ -298,6 +303,44 @@ class Configuration:
         cls.set_default_configuration(None)
         cls.set_statue_configuration(None)
 
+    @classmethod
+    def __configuration(cls) -> MutableMapping[str, Any]:
+        """
+        Get general statue configuration without copying it.
+
+        Getters copy only the part of the configuration they return, so reading a
+        single command or source does not copy the whole configuration.
+        """
+        if cls.__statue_configuration is not None:
+            return cls.__statue_configuration
+        default_configuration = cls.default_configuration()
+        if default_configuration is not None:
+            return default_configuration
+        raise EmptyConfiguration()
+
+    @classmethod
+    def __command_configuration(
+        cls, command_name: str
+    ) -> Optional[MutableMapping[str, Any]]:
+        commands_configuration = cls.__configuration().get(COMMANDS, None)
+        if commands_configuration is None:
+            raise MissingConfiguration(COMMANDS)
+        return commands_configuration.get(command_name, None)
+
+    @classmethod
+    def __find_context(
+        cls, contexts_map: Optional[Dict[str, Context]], context_identifier: str
+    ) -> Context:
+        if contexts_map is None:
+            raise MissingConfiguration(CONTEXTS)
+        for context_name, context in contexts_map.items():
+            if (
+                context_identifier == context_name
+                or context_identifier in context.aliases  # noqa: disable=W503
+            ):
+                return context
+        raise UnknownContext(context_identifier)
+
     @classmethod
     def __load_default_configuration(cls) -> None:
         if not DEFAULT_CONFIGURATION_FILE.exists():
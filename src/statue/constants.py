@@ -4,6 +4,14 @@ from pathlib import Path
 STATUE = "STATUE"
 
 HISTORY_SIZE = 30
+HISTORY_TIMEOUT = 30
+WEEKLY_ROLLUP_AFTER_DAYS = 28
+# Suffix of the files filters check, and the commands failures are attributed to
+PYTHON_SUFFIX = ".py"
+# Commands which report the paths of the files they fail on
+FILES_REPORTING_COMMANDS = frozenset(
+    ["flake8", "pylint", "mypy", "isort", "black", "pydocstyle", "bandit"]
+)
 
 DEFAULT_CONFIGURATION_FILE = Path(__file__).parent / "resources" / "defaults.toml"
 
@@ -17,10 +25,26 @@ DENY_LIST = "deny_list"
 ALIASES = "aliases"
 PARENT = "parent"
 IS_DEFAULT = "is_default"
+INCLUDE = "include"
+EXCLUDE = "exclude"
+MAX_FILE_SIZE = "max_file_size"
+FILES = "files"
+FAILED_FILES = "failed_files"
+DURATION = "duration"
+FILES_FILTER = "files_filter"
+MAX_RUNS = "max_runs"
+MIN_RUNS = "min_runs"
+MAX_AGE_DAYS = "max_age_days"
+MAX_SIZE = "max_size"
+ROLLUP = "rollup"
+WEEKLY_ROLLUP_AFTER = "weekly_rollup_after_days"
 
 COMMANDS = "commands"
 CONTEXTS = "contexts"
 SOURCES = "sources"
+SOURCE = "source"
+HISTORY = "history"
+VERSION = "version"
 
 OVERRIDE = "OVERRIDE"
 
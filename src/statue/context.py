@@ -21,20 +21,36 @@ class Context:
     parent: Optional["Context"] = field(default=None)
     is_default: bool = field(default=False)
     _names: List[str] = field(init=False)
+    _search_names: List[str] = field(init=False, repr=False)
+    _falls_back_to_default: bool = field(init=False, repr=False)
 
     def __post_init__(self):
         """Extra initialization."""
         self._names = [self.name, *self.aliases]
+        if self.parent is None:
+            self._search_names = list(self._names)
+            self._falls_back_to_default = self.is_default
+        else:
+            self._search_names = [
+                *self._names,
+                *self.parent._search_names,  # pylint: disable=protected-access
+            ]
+            self._falls_back_to_default = (
+                self.parent._falls_back_to_default  # pylint: disable=protected-access
+            )
 
     def search_context(self, setups):
-        """Search for context in setup dictionary."""
-        for name in self._names:
+        """
+        Search for context in setup dictionary.
+
+        The names of the context, its aliases and all of its ancestors are flattened
+        once on initialization, so searching does not walk the parents chain.
+        """
+        for name in self._search_names:
             name_setups = setups.get(name, None)
             if name_setups is not None:
                 return name_setups
-        if self.parent is not None:
-            return self.parent.search_context(setups)
-        if self.is_default:
+        if self._falls_back_to_default:
             return setups
         return None
 
@@ -1,32 +1,104 @@
 """Evaluation of commands map."""
+import gzip
 import json
-from dataclasses import asdict, dataclass, field
+import time
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Callable, Dict, ItemsView, Iterator, KeysView, List, Union
-
-from statue.command import Command
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    ItemsView,
+    Iterable,
+    Iterator,
+    KeysView,
+    List,
+    Optional,
+    Union,
+)
+
+from statue.command import Command, ProcessesUsage
+from statue.constants import (
+    COMMANDS,
+    DURATION,
+    FAILED_FILES,
+    SOURCE,
+    SOURCES,
+    VERSION,
+)
+from statue.exceptions import EvaluationsConflict
+from statue.file_util import atomic_write
+from statue.files_filter import FilesFilter
+from statue.hooks import TASK_FINISHED, TASK_QUEUED, TASK_STARTED, Hooks
 from statue.print_util import print_title
 from statue.verbosity import DEFAULT_VERBOSITY, is_silent
 
+EVALUATION_FORMAT_VERSION = 2
+
 
 @dataclass
 class CommandEvaluation:
-    """Evaluation result of a command."""
+    """
+    Evaluation result of a command.
+
+    :param command: Evaluated command.
+    :param success: Did the command succeed.
+    :param failed_files: Files of the source which the command failed on, relative
+     to the source. None if unknown.
+    :param duration: Running time of the command in seconds. None if unknown.
+     Ignored when comparing evaluations.
+    :param output_bytes: Size of the output of the command, if it was captured.
+     Known only in the run which evaluated the command, so it is not saved.
+    :param peak_rss: Peak resident memory of the command processes in bytes, if
+     the platform reports it. Known only in the run which evaluated the command,
+     so it is not saved.
+    """
 
     command: Command
     success: bool
+    failed_files: Optional[List[str]] = None
+    duration: Optional[float] = field(default=None, compare=False)
+    output_bytes: Optional[int] = field(default=None, compare=False)
+    peak_rss: Optional[int] = field(default=None, compare=False)
+
+    @property
+    def failed_command(self) -> Command:
+        """Command to rerun, checking only the failed files if they are known."""
+        if self.failed_files is None:
+            return self.command
+        return replace(
+            self.command,
+            files_filter=FilesFilter(files=tuple(self.failed_files)).combine(
+                self.command.files_filter
+            ),
+        )
 
     def as_json(self) -> Dict[str, Any]:
         """Return command evaluation as json dictionary."""
-        return dict(command=asdict(self.command), success=self.success)
+        command_evaluation = dict(command=self.command.as_json(), success=self.success)
+        if self.failed_files is not None:
+            command_evaluation[FAILED_FILES] = self.failed_files
+        if self.duration is not None:
+            command_evaluation[DURATION] = self.duration
+        return command_evaluation
+
+    def as_json_line(self, source: str) -> str:
+        """
+        Return command evaluation as a single line of json, ending with a newline.
+
+        :param source: Source the command was evaluated on.
+        """
+        return json.dumps({SOURCE: source, **self.as_json()}) + "\n"
 
     @classmethod
     def from_json(cls, command_evaluation):
         # type: (Dict[str, Any]) -> CommandEvaluation
         """Read command evaluation from json dictionary."""
         return CommandEvaluation(
-            command=Command(**command_evaluation["command"]),
+            command=Command.from_json(command_evaluation["command"]),
             success=command_evaluation["success"],
+            failed_files=command_evaluation.get(FAILED_FILES, None),
+            duration=command_evaluation.get(DURATION, None),
         )
 
 
@@ -116,10 +188,60 @@ class Evaluation:
         """Return evaluation as json dictionary."""
         return {key: value.as_json() for key, value in self.items()}
 
-    def save_as_json(self, output: Union[Path, str]) -> None:
-        """Save evaluation as json."""
-        with open(output, mode="w") as output_file:
-            json.dump(self.as_json(), output_file, indent=2)
+    def as_compact_json(self) -> Dict[str, Any]:
+        """
+        Return evaluation as compact json dictionary.
+
+        Each distinct command is kept once in a commands table. Sources map to
+        pairs of command index and success, followed by the failed files and the
+        duration if they are known.
+        """
+        commands: List[Dict[str, Any]] = []
+        commands_indices: Dict[str, int] = {}
+        sources: Dict[str, List[List[Any]]] = {}
+        for source, source_evaluation in self.items():
+            sources[source] = []
+            for command_evaluation in source_evaluation.commands_evaluations:
+                command_json = command_evaluation.command.as_json()
+                command_key = json.dumps(command_json, sort_keys=True)
+                if command_key not in commands_indices:
+                    commands_indices[command_key] = len(commands)
+                    commands.append(command_json)
+                command_evaluation_entry = [
+                    commands_indices[command_key],
+                    command_evaluation.success,
+                    command_evaluation.failed_files,
+                    command_evaluation.duration,
+                ]
+                while command_evaluation_entry[-1] is None:
+                    command_evaluation_entry.pop()
+                sources[source].append(command_evaluation_entry)
+        return {
+            VERSION: EVALUATION_FORMAT_VERSION,
+            COMMANDS: commands,
+            SOURCES: sources,
+        }
+
+    def save_as_json(self, output: Union[Path, str], compact: bool = False) -> None:
+        """
+        Save evaluation as json. The file is replaced atomically.
+
+        :param output: Path of the output file. Output is compressed with gzip if
+         its suffix is ``.gz``.
+        :param compact: Save in the minified compact format of
+         :meth:`as_compact_json` instead of the indented per-source format.
+        """
+        content = (
+            json.dumps(self.as_compact_json(), separators=(",", ":"))
+            if compact
+            else json.dumps(self.as_json(), indent=2)
+        )
+        if Path(output).suffix == ".gz":
+            with atomic_write(output, mode="wb") as output_file:
+                output_file.write(gzip.compress(content.encode("utf-8")))
+            return
+        with atomic_write(output) as output_file:
+            output_file.write(content)
 
     @property
     def success(self) -> bool:
@@ -159,14 +281,26 @@ class Evaluation:
     @classmethod
     def load_from_file(cls, input_path):
         # type: (Path) -> Evaluation
-        """Load evaluation from json file."""
+        """
+        Load evaluation from json file, which may be compressed with gzip.
+
+        Files with ``.jsonl`` suffix are read as json lines.
+        """
+        if Path(input_path).suffix == ".jsonl":
+            with open(input_path, mode="r") as input_file:
+                return Evaluation.from_json_lines(input_file)
+        if Path(input_path).suffix == ".gz":
+            with gzip.open(input_path, mode="rt") as input_file:
+                return Evaluation.from_json(json.load(input_file))
         with open(input_path, mode="r") as input_file:
             return Evaluation.from_json(json.load(input_file))
 
     @classmethod
     def from_json(cls, evaluation):
-        # type: (Dict[str, List[Dict[str, Any]]]) -> Evaluation
-        """Read evaluation from json dictionary."""
+        # type: (Dict[str, Any]) -> Evaluation
+        """Read evaluation from json dictionary, either compact or not."""
+        if isinstance(evaluation.get(VERSION, None), int):
+            return Evaluation.from_compact_json(evaluation)
         return Evaluation(
             sources_evaluations={
                 input_path: SourceEvaluation.from_json(source_evaluation)
@@ -174,11 +308,67 @@ class Evaluation:
             }
         )
 
+    @classmethod
+    def from_json_lines(cls, lines: Iterable[str]) -> "Evaluation":
+        """
+        Read evaluation from json lines, one line per command evaluation.
+
+        A truncated last line, left by a run that was stopped while writing it,
+        is ignored.
+        """
+        evaluation = Evaluation()
+        lines = [line for line in lines if line.strip() != ""]
+        for index, line in enumerate(lines):
+            try:
+                command_evaluation_json = json.loads(line)
+            except json.JSONDecodeError:
+                if index == len(lines) - 1:
+                    break
+                raise
+            source = command_evaluation_json[SOURCE]
+            if source not in evaluation.keys():
+                evaluation[source] = SourceEvaluation()
+            evaluation[source].commands_evaluations.append(
+                CommandEvaluation.from_json(command_evaluation_json)
+            )
+        return evaluation
+
+    @classmethod
+    def from_compact_json(cls, evaluation: Dict[str, Any]) -> "Evaluation":
+        """
+        Read evaluation from compact json dictionary.
+
+        :raises: ValueError if the format version is not supported.
+        """
+        if evaluation[VERSION] != EVALUATION_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported evaluation format version: {evaluation[VERSION]}"
+            )
+        commands = [Command.from_json(command) for command in evaluation[COMMANDS]]
+        return Evaluation(
+            sources_evaluations={
+                source: SourceEvaluation(
+                    commands_evaluations=[
+                        CommandEvaluation(
+                            commands[command_index], success, *optional_fields
+                        )
+                        for command_index, success, *optional_fields in (
+                            source_evaluation
+                        )
+                    ]
+                )
+                for source, source_evaluation in evaluation[SOURCES].items()
+            }
+        )
+
 
 def evaluate_commands_map(
     commands_map: Dict[str, List[Command]],
     verbosity: str = DEFAULT_VERBOSITY,
     print_method: Callable[..., None] = print,
+    on_command_evaluation: Optional[Callable[[str, CommandEvaluation], None]] = None,
+    capture_output: bool = False,
+    attribute_failures: bool = False,
 ) -> Evaluation:
     """
     Run commands map and return evaluation report.
@@ -186,9 +376,20 @@ def evaluate_commands_map(
     :param commands_map: map from input file to list of commands to run on it,
     :param verbosity: verbosity level
     :param print_method: print method, can be either ``print`` or ``click.echo``
+    :param on_command_evaluation: Called with the source and the
+     :class:`CommandEvaluation` as soon as each command is evaluated
+    :param capture_output: Capture the output of every command, so it would be
+     passed to the task finished hook and its size would be known
+    :param attribute_failures: Capture the output of commands which report the files
+     they fail on, so failures would be attributed to files. Captured output is
+     echoed without the colors of the tools
     :return: :class:`Evaluation`
     """
     evaluation = Evaluation()
+    if Hooks.enabled(TASK_QUEUED):
+        for input_path, commands in commands_map.items():
+            for command in commands:
+                Hooks.emit(TASK_QUEUED, source=input_path, command=command)
     for input_path, commands in commands_map.items():
         source_evaluation = SourceEvaluation()
         if not is_silent(verbosity):
@@ -199,25 +400,98 @@ def evaluate_commands_map(
         for command in commands:
             if not is_silent(verbosity):
                 print_title(command.name, underline="-", print_method=print_method)
-            success = command.execute(input_path, verbosity) == 0
-            source_evaluation.commands_evaluations.append(
-                CommandEvaluation(command=command, success=success)
+            output: Optional[List[str]] = (
+                []
+                if capture_output or (attribute_failures and command.reports_files)
+                else None
             )
+            usage = ProcessesUsage()
+            Hooks.emit(TASK_STARTED, source=input_path, command=command)
+            start_time = time.monotonic()
+            success = (
+                command.execute(input_path, verbosity, output=output, usage=usage) == 0
+            )
+            duration = time.monotonic() - start_time
+            command_evaluation = CommandEvaluation(
+                command=command,
+                success=success,
+                failed_files=(
+                    None
+                    if success or output is None
+                    else command.failed_files(input_path, output)
+                ),
+                duration=duration,
+                output_bytes=(
+                    None
+                    if output is None
+                    else sum(len(line.encode(errors="replace")) for line in output)
+                ),
+                peak_rss=usage.peak_rss,
+            )
+            source_evaluation.commands_evaluations.append(command_evaluation)
+            Hooks.emit(
+                TASK_FINISHED,
+                source=input_path,
+                command_evaluation=command_evaluation,
+                output=output,
+            )
+            if on_command_evaluation is not None:
+                on_command_evaluation(input_path, command_evaluation)
         evaluation[input_path] = source_evaluation
     return evaluation
 
 
+def merge_evaluations(
+    evaluations: Iterable[Evaluation], strict: bool = False
+) -> Evaluation:
+    """
+    Merge evaluations, such as of shards or of partial reruns, into one evaluation.
+
+    A command is identified by its source and its name. When several evaluations
+    evaluated the same command, the last one wins. Sources and commands keep the
+    order in which they first appeared.
+
+    :param evaluations: Evaluations to merge, from the first to the last.
+    :param strict: Raise an error if evaluations disagree on the success of a
+     command instead of taking the last one.
+    :return: Merged :class:`Evaluation`
+    :raises: :class:`EvaluationsConflict` if strict and evaluations disagree.
+    """
+    merged_commands: Dict[str, Dict[str, CommandEvaluation]] = {}
+    for evaluation in evaluations:
+        for source, source_evaluation in evaluation.items():
+            source_commands = merged_commands.setdefault(source, {})
+            for command_evaluation in source_evaluation.commands_evaluations:
+                command_name = command_evaluation.command.name
+                previous_evaluation = source_commands.get(command_name, None)
+                if (
+                    strict
+                    and previous_evaluation is not None
+                    and previous_evaluation.success != command_evaluation.success
+                ):
+                    raise EvaluationsConflict(source, command_name)
+                source_commands[command_name] = command_evaluation
+    return Evaluation(
+        {
+            source: SourceEvaluation(list(source_commands.values()))
+            for source, source_commands in merged_commands.items()
+        }
+    )
+
+
 def get_failure_map(evaluation: Evaluation) -> Dict[str, List[Command]]:
     """
     Get a map from input paths to failed commands.
 
+    Failed commands check only the files they failed on, when these are known.
+
     :param evaluation: evaluation result
     :return: ``Dict[str, List[str]]``
     """
     failure_dict = dict()
     for input_path, source_valuation in evaluation.items():
         failed_commands = [
-            command_evaluation.command
+            command_evaluation.failed_command
             for command_evaluation in source_valuation.commands_evaluations
             if not command_evaluation.success
         ]
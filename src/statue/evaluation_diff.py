@@ -0,0 +1,128 @@
+"""Differences between two evaluations."""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from statue.evaluation import CommandEvaluation, Evaluation
+
+CommandKey = Tuple[str, str]
+
+
+@dataclass
+class DurationChange:
+    """Change of the running time of a command over a source."""
+
+    source: str
+    command: str
+    old_duration: float
+    new_duration: float
+
+    @property
+    def delta(self) -> float:
+        """Difference of durations in seconds. Positive if the command got slower."""
+        return self.new_duration - self.old_duration
+
+    def as_json(self) -> Dict[str, Any]:
+        """Return duration change as json dictionary."""
+        return dict(
+            source=self.source,
+            command=self.command,
+            old_duration=self.old_duration,
+            new_duration=self.new_duration,
+            delta=self.delta,
+        )
+
+
+@dataclass
+class EvaluationDiff:
+    """
+    Differences between an old evaluation and a new one.
+
+    Commands are identified by their source and their name.
+    """
+
+    newly_failing: List[CommandKey] = field(default_factory=list)
+    newly_passing: List[CommandKey] = field(default_factory=list)
+    added: List[CommandKey] = field(default_factory=list)
+    removed: List[CommandKey] = field(default_factory=list)
+    durations: List[DurationChange] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        """Did any command change its result, or was added or removed."""
+        return any(
+            len(commands) != 0
+            for commands in [
+                self.newly_failing,
+                self.newly_passing,
+                self.added,
+                self.removed,
+            ]
+        )
+
+    def as_json(self) -> Dict[str, Any]:
+        """Return evaluations diff as json dictionary."""
+        return dict(
+            newly_failing=self.__commands_json(self.newly_failing),
+            newly_passing=self.__commands_json(self.newly_passing),
+            added=self.__commands_json(self.added),
+            removed=self.__commands_json(self.removed),
+            durations=[duration.as_json() for duration in self.durations],
+        )
+
+    @classmethod
+    def from_evaluations(
+        cls, old_evaluation: Evaluation, new_evaluation: Evaluation
+    ) -> "EvaluationDiff":
+        """
+        Compare two evaluations.
+
+        Both evaluations are indexed by source and command name once, so the
+        comparison takes linear time. Duration changes are listed for commands
+        timed in both evaluations, from the largest change to the smallest.
+
+        :param old_evaluation: Evaluation to compare to.
+        :param new_evaluation: Evaluation to compare.
+        :return: :class:`EvaluationDiff`
+        """
+        old_commands = cls.__index(old_evaluation)
+        new_commands = cls.__index(new_evaluation)
+        evaluation_diff = EvaluationDiff(
+            removed=[key for key in old_commands if key not in new_commands]
+        )
+        for key, new_command_evaluation in new_commands.items():
+            old_command_evaluation = old_commands.get(key, None)
+            if old_command_evaluation is None:
+                evaluation_diff.added.append(key)
+                continue
+            if old_command_evaluation.success and not new_command_evaluation.success:
+                evaluation_diff.newly_failing.append(key)
+            if not old_command_evaluation.success and new_command_evaluation.success:
+                evaluation_diff.newly_passing.append(key)
+            if (
+                old_command_evaluation.duration is not None
+                and new_command_evaluation.duration is not None
+            ):
+                evaluation_diff.durations.append(
+                    DurationChange(
+                        source=key[0],
+                        command=key[1],
+                        old_duration=old_command_evaluation.duration,
+                        new_duration=new_command_evaluation.duration,
+                    )
+                )
+        evaluation_diff.durations.sort(
+            key=lambda duration_change: abs(duration_change.delta), reverse=True
+        )
+        return evaluation_diff
+
+    @classmethod
+    def __index(cls, evaluation: Evaluation) -> Dict[CommandKey, CommandEvaluation]:
+        return {
+            (source, command_evaluation.command.name): command_evaluation
+            for source, source_evaluation in evaluation.items()
+            for command_evaluation in source_evaluation.commands_evaluations
+        }
+
+    @classmethod
+    def __commands_json(cls, commands: List[CommandKey]) -> List[Dict[str, str]]:
+        return [dict(source=source, command=command) for source, command in commands]
@@ -0,0 +1,76 @@
+"""Stream of run events as json lines, for dashboards and editors."""
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO
+
+from statue.command import Command
+from statue.constants import SOURCE
+from statue.evaluation import CommandEvaluation, Evaluation
+
+TEXT_FORMAT = "text"
+JSONL_FORMAT = "jsonl"
+FORMATS = [TEXT_FORMAT, JSONL_FORMAT]
+TASK_STARTED_EVENT = "task_started"
+TASK_FINISHED_EVENT = "task_finished"
+TASK_CACHED_EVENT = "task_cached"
+RUN_FINISHED_EVENT = "run_finished"
+
+
+class EventStreamWriter:
+    """
+    Write events of a run as json lines, as a plugin of :class:`statue.hooks.Hooks`.
+
+    Each line is flushed as soon as it is written, so readers get events while the
+    run goes on. Every event has an ``event`` name and a ``time`` in seconds since
+    the epoch.
+
+    :param output: Text file to write events into.
+    """
+
+    def __init__(self, output: TextIO) -> None:
+        """Create writer, measuring the run duration from now on."""
+        self.__output = output
+        self.__start = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def on_task_started(self, source: str, command: Command) -> None:
+        """Write event of a command which started running."""
+        self.__write(TASK_STARTED_EVENT, {SOURCE: source, "command": command.as_json()})
+
+    def on_task_finished(
+        self,
+        source: str,
+        command_evaluation: CommandEvaluation,
+        output: Optional[List[str]] = None,
+    ) -> None:
+        """Write event of a finished command, with its output if it was captured."""
+        event = {SOURCE: source, **command_evaluation.as_json()}
+        if output is not None:
+            event["output"] = "".join(output)
+        self.__write(TASK_FINISHED_EVENT, event)
+
+    def on_cache_hit(self, source: str, command_evaluation: CommandEvaluation) -> None:
+        """Write event of a command taken from an interrupted run."""
+        self.__write(
+            TASK_CACHED_EVENT, {SOURCE: source, **command_evaluation.as_json()}
+        )
+
+    def on_run_finished(self, evaluation: Evaluation) -> None:
+        """Write summary of the run."""
+        self.__write(
+            RUN_FINISHED_EVENT,
+            dict(
+                success=evaluation.success,
+                commands_number=evaluation.commands_number,
+                successful_commands_number=evaluation.successful_commands_number,
+                failed_commands_number=evaluation.failed_commands_number,
+                duration=time.monotonic() - self.__start,
+            ),
+        )
+
+    def __write(self, event_name: str, event: Dict[str, Any]) -> None:
+        line = json.dumps(dict(event=event_name, time=time.time(), **event)) + "\n"
+        with self.__lock:
+            self.__output.write(line)
+            self.__output.flush()
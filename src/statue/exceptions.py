@@ -53,3 +53,13 @@ class CommandExecutionError(StatueException):
         super().__init__(
             f'Cannot execute "{command_name}" because it is not installed.'
         )
+
+
+class EvaluationsConflict(StatueException):
+    """Evaluations disagree on the result of a command."""
+
+    def __init__(self, source: str, command_name: str) -> None:
+        """Exception constructor."""
+        super().__init__(
+            f'Evaluations disagree on the result of "{command_name}" over "{source}".'
+        )
@@ -0,0 +1,52 @@
+"""File related methods."""
+import os
+import secrets
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Tuple, Union
+
+# Flags of a new file which is only written, as tempfile opens its files
+TEMPORARY_FILE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+@contextmanager
+def atomic_write(output: Union[Path, str], mode: str = "w") -> Iterator[IO]:
+    """
+    Open a temporary file which replaces the output file once written.
+
+    Readers of the output file never see it partially written: it keeps its
+    previous content until the temporary file is fully written and synced, and
+    is left untouched if writing fails.
+
+    :param output: Path of the file to write.
+    :param mode: Writing mode, either ``w`` or ``wb``
+    :return: Temporary file object.
+    """
+    output = Path(output)
+    file_descriptor, temporary_path = __create_temporary_file(output)
+    try:
+        with os.fdopen(file_descriptor, mode=mode) as output_file:
+            yield output_file
+            output_file.flush()
+            os.fsync(output_file.fileno())
+        os.replace(temporary_path, output)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def __create_temporary_file(output: Path) -> Tuple[int, str]:
+    """
+    Create temporary file next to the output file.
+
+    Unlike ``tempfile.mkstemp``, the file gets the permissions of any new file,
+    as the umask allows, since the umask cannot be read without changing it.
+    """
+    while True:
+        temporary_path = str(
+            output.parent / f".{output.name}.{secrets.token_hex(4)}.tmp"
+        )
+        try:
+            return os.open(temporary_path, TEMPORARY_FILE_FLAGS, 0o666), temporary_path
+        except FileExistsError:
+            continue
@@ -0,0 +1,190 @@
+"""Filter files of sources according to glob patterns and size limits."""
+import os
+import re
+from dataclasses import dataclass
+from fnmatch import translate
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Pattern, Tuple, Union
+
+from statue.constants import EXCLUDE, FILES, INCLUDE, MAX_FILE_SIZE, PYTHON_SUFFIX
+
+CompiledPatterns = Tuple[Optional[Pattern[str]], Optional[Pattern[str]]]
+
+
+@lru_cache(maxsize=None)
+def compile_patterns(patterns: Tuple[str, ...]) -> CompiledPatterns:
+    """
+    Compile glob patterns into two regular expressions.
+
+    Patterns without a slash are matched against files names, while patterns with a
+    slash are matched against paths relative to the source.
+
+    :param patterns: Glob patterns.
+    :return: Tuple of names regular expression and paths regular expression.
+    """
+    names_patterns = [translate(pattern) for pattern in patterns if "/" not in pattern]
+    paths_patterns = [
+        translate(pattern.strip("/")) for pattern in patterns if "/" in pattern
+    ]
+    return _join_patterns(names_patterns), _join_patterns(paths_patterns)
+
+
+def _join_patterns(patterns: List[str]) -> Optional[Pattern[str]]:
+    if len(patterns) == 0:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+def _matches(patterns: Tuple[str, ...], relative_path: str) -> bool:
+    names_regex, paths_regex = compile_patterns(patterns)
+    if names_regex is not None and names_regex.match(relative_path.split("/")[-1]):
+        return True
+    return paths_regex is not None and paths_regex.match(relative_path) is not None
+
+
+def _is_skipped_directory(name: str) -> bool:
+    return name.startswith(".") or name == "__pycache__"
+
+
+@dataclass(frozen=True)
+class FilesFilter:
+    """
+    Files filter of a source.
+
+    :param include: Glob patterns of files to check. If empty, check all files.
+    :param exclude: Glob patterns of files to skip.
+    :param max_file_size: Skip files larger than this size in bytes.
+    :param files: Posix paths relative to the source of the only files to check.
+     If None, check all files.
+    """
+
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+    max_file_size: Optional[int] = None
+    files: Optional[Tuple[str, ...]] = None
+
+    def matches(self, relative_path: str, file_path: Union[Path, str]) -> bool:
+        """
+        Check whether a file should be checked.
+
+        :param relative_path: Posix path of the file relative to its source.
+        :param file_path: Actual path of the file.
+        :return: Boolean.
+        """
+        if self.files is not None and relative_path not in self.files:
+            return False
+        if len(self.include) != 0 and not _matches(self.include, relative_path):
+            return False
+        if len(self.exclude) != 0 and _matches(self.exclude, relative_path):
+            return False
+        return self.max_file_size is None or (
+            os.path.getsize(file_path) <= self.max_file_size
+        )
+
+    def filter_source(self, source: Union[Path, str]) -> List[str]:
+        """
+        Get files of source which should be checked.
+
+        Directories are walked for python files, skipping hidden directories and
+        ``__pycache__``.
+
+        :param source: File or directory.
+        :return: Sorted list of files paths.
+        """
+        source = Path(source)
+        if not source.is_dir():
+            if self.matches(source.name, source):
+                return [str(source)]
+            return []
+        files = []
+        pending_directories = [""]
+        while len(pending_directories) != 0:
+            relative_directory = pending_directories.pop()
+            with os.scandir(source / relative_directory) as entries:
+                for entry in entries:
+                    relative_path = (
+                        entry.name
+                        if relative_directory == ""
+                        else f"{relative_directory}/{entry.name}"
+                    )
+                    if entry.is_dir():
+                        if not _is_skipped_directory(entry.name):
+                            pending_directories.append(relative_path)
+                    elif entry.name.endswith(PYTHON_SUFFIX) and self.matches(
+                        relative_path, entry.path
+                    ):
+                        files.append(str(source / relative_path))
+        return sorted(files)
+
+    def combine(self, other: Optional["FilesFilter"]) -> "FilesFilter":
+        """
+        Combine two filters.
+
+        Exclude patterns of both filters are applied, and the smaller size limit is
+        taken. Include patterns are joined, since only sources specify them. Only
+        files specified by both filters are checked.
+        """
+        if other is None:
+            return self
+        max_file_sizes = [
+            max_file_size
+            for max_file_size in [self.max_file_size, other.max_file_size]
+            if max_file_size is not None
+        ]
+        return FilesFilter(
+            include=self.include + other.include,
+            exclude=self.exclude + other.exclude,
+            max_file_size=min(max_file_sizes) if len(max_file_sizes) != 0 else None,
+            files=(
+                other.files
+                if self.files is None
+                else tuple(
+                    file
+                    for file in self.files
+                    if other.files is None or file in other.files
+                )
+            ),
+        )
+
+    def as_json(self) -> Dict[str, Any]:
+        """Return filter as json dictionary."""
+        files_filter: Dict[str, Any] = {
+            INCLUDE: list(self.include),
+            EXCLUDE: list(self.exclude),
+            MAX_FILE_SIZE: self.max_file_size,
+        }
+        if self.files is not None:
+            files_filter[FILES] = list(self.files)
+        return files_filter
+
+    @classmethod
+    def from_json(cls, files_filter: Dict[str, Any]) -> "FilesFilter":
+        """Read filter from json dictionary."""
+        files = files_filter.get(FILES, None)
+        return FilesFilter(
+            include=tuple(files_filter.get(INCLUDE, ())),
+            exclude=tuple(files_filter.get(EXCLUDE, ())),
+            max_file_size=files_filter.get(MAX_FILE_SIZE, None),
+            files=tuple(files) if files is not None else None,
+        )
+
+    @classmethod
+    def from_setup(
+        cls, setup: Mapping[str, Any], allow_include: bool = True
+    ) -> Optional["FilesFilter"]:
+        """
+        Read filter from a source or command setup.
+
+        :param setup: Configuration dictionary of a source or a command.
+        :param allow_include: Whether to read include patterns from the setup.
+        :return: :class:`FilesFilter` or None if no filter is specified.
+        """
+        files_filter = FilesFilter(
+            include=tuple(setup.get(INCLUDE, ())) if allow_include else (),
+            exclude=tuple(setup.get(EXCLUDE, ())),
+            max_file_size=setup.get(MAX_FILE_SIZE, None),
+        )
+        if files_filter == FilesFilter():
+            return None
+        return files_filter
@@ -0,0 +1,362 @@
+"""Statistics of commands evaluations over the history."""
+import json
+import math
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from statue.retention import SECONDS_IN_DAY
+
+DEFAULT_WINDOW = 10
+DEFAULT_BASELINE_WINDOW = 100
+DEFAULT_SIGNIFICANCE = 0.01
+DEFAULT_SMOOTHING = 0.3
+MIN_SAMPLES = 3
+DAILY = 1
+WEEKLY = 7
+# Durations are rolled up into buckets which are 5% apart, starting at 1ms
+DURATIONS_BUCKETS_GROWTH = 1.05
+MIN_BUCKETED_DURATION = 0.001
+# First Monday since the epoch, so weekly periods would start on Mondays
+PERIODS_ORIGIN = 4 * SECONDS_IN_DAY
+
+
+@dataclass
+class CommandStats:  # pylint: disable=too-many-instance-attributes
+    """
+    Statistics of a command over a source.
+
+    :param source: Source of the command.
+    :param command: Name of the command.
+    :param runs: Number of evaluations of the command.
+    :param failures: Number of failed evaluations of the command.
+    :param median_duration: Median duration in seconds. None if never timed.
+    :param p95_duration: 95th percentile of durations in seconds. None if never
+     timed.
+    :param trend: Exponentially weighted moving average of durations, giving
+     recent evaluations a higher weight. None if never timed.
+    :param slowdown: Relative growth of the median duration of the recent
+     evaluations over the older ones. None if not statistically significant.
+    :param p_value: Probability of seeing such a slowdown if durations did not
+     change. None if there are not enough timed evaluations.
+    """
+
+    source: str
+    command: str
+    runs: int
+    failures: int
+    median_duration: Optional[float] = None
+    p95_duration: Optional[float] = None
+    trend: Optional[float] = None
+    slowdown: Optional[float] = None
+    p_value: Optional[float] = None
+
+    @property
+    def failure_rate(self) -> float:
+        """Ratio of failed evaluations."""
+        return self.failures / self.runs
+
+    def as_json(self) -> Dict[str, Any]:
+        """Return command statistics as json dictionary."""
+        return dict(
+            source=self.source,
+            command=self.command,
+            runs=self.runs,
+            failures=self.failures,
+            failure_rate=self.failure_rate,
+            median_duration=self.median_duration,
+            p95_duration=self.p95_duration,
+            trend=self.trend,
+            slowdown=self.slowdown,
+            p_value=self.p_value,
+        )
+
+
+@dataclass
+class CommandHistory:
+    """
+    Evaluations of a command over a source.
+
+    :param source: Source of the command.
+    :param command: Name of the command.
+    :param runs: Number of evaluations of the command.
+    :param failures: Number of failed evaluations of the command.
+    :param durations: Durations in seconds of the timed evaluations, from the oldest
+     to the most recent, each with the number of consecutive evaluations which
+     took it. Rolled up evaluations are counted by their durations buckets.
+    """
+
+    source: str
+    command: str
+    runs: int = 0
+    failures: int = 0
+    durations: List[Tuple[float, int]] = field(default_factory=list)
+
+
+@dataclass
+class CommandRollup:
+    """
+    Aggregate of the evaluations of a command over a source in a period of time.
+
+    Durations are kept as a histogram with logarithmic buckets, so rollups can be
+    merged into longer periods while estimating quantiles within 2.5%.
+
+    :param runs: Number of evaluations of the command.
+    :param failures: Number of failed evaluations of the command.
+    :param durations: Number of timed evaluations in each durations bucket.
+    """
+
+    runs: int = 0
+    failures: int = 0
+    durations: Dict[int, int] = field(default_factory=dict)
+
+    def add(self, success: bool, duration: Optional[float] = None) -> None:
+        """
+        Add an evaluation of the command to the rollup.
+
+        :param success: Was the evaluation successful.
+        :param duration: Duration of the evaluation in seconds, if timed.
+        """
+        self.runs += 1
+        if not success:
+            self.failures += 1
+        if duration is not None:
+            bucket = duration_bucket(duration)
+            self.durations[bucket] = self.durations.get(bucket, 0) + 1
+
+    def merge(self, other: "CommandRollup") -> None:
+        """
+        Add the evaluations of another rollup to this one.
+
+        :param other: Rollup to merge.
+        """
+        self.runs += other.runs
+        self.failures += other.failures
+        for bucket, count in other.durations.items():
+            self.durations[bucket] = self.durations.get(bucket, 0) + count
+
+    def bucketed_durations(self) -> List[Tuple[float, int]]:
+        """
+        Get durations histogram as durations with the number of evaluations of each.
+
+        The order of the evaluations within the rollup is lost, so shorter
+        durations come first.
+
+        :return: Duration representing each bucket, with its number of evaluations.
+        """
+        return [
+            (bucket_duration(bucket), count)
+            for bucket, count in sorted(self.durations.items())
+        ]
+
+    def durations_as_json(self) -> str:
+        """Return durations histogram as json string."""
+        return json.dumps(sorted(self.durations.items()))
+
+    @classmethod
+    def from_row(cls, runs: int, failures: int, durations: str) -> "CommandRollup":
+        """Build rollup from its stored values."""
+        return CommandRollup(
+            runs=runs,
+            failures=failures,
+            durations={bucket: count for bucket, count in json.loads(durations)},
+        )
+
+
+def duration_bucket(duration: float) -> int:
+    """
+    Get index of the durations histogram bucket of a duration.
+
+    :param duration: Duration in seconds. Shorter durations than 1ms share the
+     first bucket.
+    :return: Bucket index.
+    """
+    return math.floor(
+        math.log(max(duration, MIN_BUCKETED_DURATION) / MIN_BUCKETED_DURATION)
+        / math.log(DURATIONS_BUCKETS_GROWTH)
+    )
+
+
+def bucket_duration(bucket: int) -> float:
+    """
+    Get duration representing a durations histogram bucket.
+
+    :param bucket: Bucket index.
+    :return: Geometric middle of the bucket, in seconds.
+    """
+    return MIN_BUCKETED_DURATION * DURATIONS_BUCKETS_GROWTH ** (bucket + 0.5)
+
+
+def period_start(timestamp: float, period_days: int) -> float:
+    """
+    Get start of the period containing a timestamp.
+
+    :param timestamp: Timestamp in seconds since the epoch.
+    :param period_days: Length of the period in days. Weekly periods start on
+     Mondays.
+    :return: Timestamp of the start of the period.
+    """
+    period = period_days * SECONDS_IN_DAY
+    return (timestamp - PERIODS_ORIGIN) // period * period + PERIODS_ORIGIN
+
+
+def commands_stats(  # pylint: disable=too-many-arguments
+    histories: Iterable[CommandHistory],
+    window: int = DEFAULT_WINDOW,
+    significance: float = DEFAULT_SIGNIFICANCE,
+    smoothing: float = DEFAULT_SMOOTHING,
+    baseline_window: int = DEFAULT_BASELINE_WINDOW,
+) -> List[CommandStats]:
+    """
+    Compute statistics of each command over each source.
+
+    The durations of the last ``window`` evaluations of each command are compared
+    to the durations of the ``baseline_window`` evaluations before them with a
+    one-sided Mann-Whitney U test, which is not sensitive to outliers.
+
+    Durations are counted by their values, so quantiles and the test take time by
+    the number of distinct durations rather than by the number of evaluations,
+    and rolled up evaluations are never expanded.
+
+    :param histories: Evaluations of each command over each source, as counted and
+     grouped by :meth:`statue.cache.Cache.commands_histories`.
+    :param window: Number of recent evaluations to compare to the older ones.
+    :param significance: Maximal p-value for a slowdown to be flagged.
+    :param smoothing: Weight of each new duration in the moving average.
+    :param baseline_window: Number of evaluations before the recent ones to
+     compare them to.
+    :return: Statistics ordered by source and then by command name.
+    """
+    stats = []
+    for history in sorted(
+        histories, key=lambda history: (history.source, history.command)
+    ):
+        command_stats = CommandStats(
+            source=history.source,
+            command=history.command,
+            runs=history.runs,
+            failures=history.failures,
+        )
+        if len(history.durations) != 0:
+            __fill_durations_stats(
+                command_stats,
+                history.durations,
+                (window, baseline_window),
+                significance,
+                smoothing,
+            )
+        stats.append(command_stats)
+    return stats
+
+
+def quantile(sorted_counts: Sequence[Tuple[float, int]], fraction: float) -> float:
+    """
+    Get quantile of counted values, interpolating linearly between closest values.
+
+    :param sorted_counts: Non-empty values sorted by value, each with the number
+     of times it was seen.
+    :param fraction: Quantile fraction between 0 and 1.
+    :return: Quantile value.
+    """
+    cumulative_counts = list(accumulate(count for _, count in sorted_counts))
+    position = (cumulative_counts[-1] - 1) * fraction
+    lower_index = math.floor(position)
+    lower_value = sorted_counts[bisect_right(cumulative_counts, lower_index)][0]
+    upper_value = sorted_counts[bisect_right(cumulative_counts, math.ceil(position))][0]
+    return lower_value + (upper_value - lower_value) * (position - lower_index)
+
+
+def mann_whitney_p_value(
+    baseline: Mapping[float, int], recent: Mapping[float, int]
+) -> float:
+    """
+    One-sided Mann-Whitney U test of recent values being greater than baseline.
+
+    Uses the normal approximation with tie and continuity corrections.
+
+    :param baseline: Older values, each with the number of times it was seen.
+    :param recent: Newer values, each with the number of times it was seen.
+    :return: p-value.
+    """
+    recent_ranks_sum = 0.0
+    ties_correction = 0
+    preceding = 0
+    for value in sorted({*baseline, *recent}):
+        ties = baseline.get(value, 0) + recent.get(value, 0)
+        # Tied values share the average of their ranks, which start from 1
+        recent_ranks_sum += recent.get(value, 0) * (preceding + (ties + 1) / 2)
+        ties_correction += ties**3 - ties
+        preceding += ties
+    baseline_size, recent_size = sum(baseline.values()), sum(recent.values())
+    size = baseline_size + recent_size
+    u_statistic = recent_ranks_sum - recent_size * (recent_size + 1) / 2
+    variance = (
+        baseline_size
+        * recent_size
+        / 12
+        * ((size + 1) - ties_correction / (size * (size - 1)))
+    )
+    if variance == 0:
+        return 1.0
+    z_score = (u_statistic - baseline_size * recent_size / 2 - 0.5) / math.sqrt(
+        variance
+    )
+    return 0.5 * math.erfc(z_score / math.sqrt(2))
+
+
+def recent_windows(
+    durations: Sequence[Tuple[float, int]], window: int, baseline_window: int
+) -> Tuple[Counter, Counter]:
+    """
+    Count durations of the most recent evaluations and of the evaluations before.
+
+    :param durations: Durations from the oldest to the most recent, each with the
+     number of consecutive evaluations which took it.
+    :param window: Number of most recent evaluations.
+    :param baseline_window: Number of evaluations before the most recent ones.
+    :return: Counts of the durations of the baseline and of the recent windows.
+    """
+    baseline: Counter = Counter()
+    recent: Counter = Counter()
+    recent_left, baseline_left = window, baseline_window
+    for duration, count in reversed(durations):
+        recent_count = min(count, recent_left)
+        baseline_count = min(count - recent_count, baseline_left)
+        recent[duration] += recent_count
+        baseline[duration] += baseline_count
+        recent_left -= recent_count
+        baseline_left -= baseline_count
+        if baseline_left == 0:
+            break
+    return +baseline, +recent
+
+
+def __fill_durations_stats(
+    command_stats: CommandStats,
+    durations: List[Tuple[float, int]],
+    windows: Tuple[int, int],
+    significance: float,
+    smoothing: float,
+) -> None:
+    counts: Counter = Counter()
+    for duration, count in durations:
+        counts[duration] += count
+    sorted_counts = sorted(counts.items())
+    command_stats.median_duration = quantile(sorted_counts, 0.5)
+    command_stats.p95_duration = quantile(sorted_counts, 0.95)
+    trend = durations[0][0]
+    for duration, count in durations:
+        # Moving average over consecutive evaluations of the same duration
+        trend = duration + (trend - duration) * (1 - smoothing) ** count
+    command_stats.trend = trend
+    baseline, recent = recent_windows(durations, *windows)
+    if sum(baseline.values()) < MIN_SAMPLES or sum(recent.values()) < MIN_SAMPLES:
+        return
+    command_stats.p_value = mann_whitney_p_value(baseline, recent)
+    baseline_median = quantile(sorted(baseline.items()), 0.5)
+    if command_stats.p_value <= significance and baseline_median > 0:
+        command_stats.slowdown = (
+            quantile(sorted(recent.items()), 0.5) / baseline_median - 1
+        )
@@ -0,0 +1,148 @@
+"""Lifecycle events of a run, for plugins and instrumentation."""
+import warnings
+from typing import Any, Callable, Dict, List, Tuple
+
+import pkg_resources
+
+PLUGINS_GROUP = "statue.plugins"
+
+CONFIGURATION_LOADED = "configuration_loaded"
+COMMANDS_MAP_BUILT = "commands_map_built"
+TASK_QUEUED = "task_queued"
+TASK_STARTED = "task_started"
+TASK_FINISHED = "task_finished"
+CACHE_HIT = "cache_hit"
+RUN_FINISHED = "run_finished"
+EVENTS = [
+    CONFIGURATION_LOADED,
+    COMMANDS_MAP_BUILT,
+    TASK_QUEUED,
+    TASK_STARTED,
+    TASK_FINISHED,
+    CACHE_HIT,
+    RUN_FINISHED,
+]
+
+
+class Hooks:
+    """
+    Hooks singleton.
+
+    A plugin is any object with ``on_<event>`` methods, such as a module or an
+    instance, called with the keyword arguments of the event. Plugins are registered
+    directly or through the ``statue.plugins`` entry points group, in which classes
+    are instantiated without arguments.
+
+    Emitting an event no plugin handles costs a single dictionary lookup. Events
+    may be emitted from several threads: handlers are never modified in place, and
+    plugins are responsible for their own locking. A handler which raises is
+    reported as a warning naming its plugin, and does not stop the run.
+    """
+
+    __plugins: List[Any] = []
+    __handlers: Dict[str, List[Tuple[Any, Callable[..., None]]]] = {}
+    __disabled_on_error: List[Any] = []
+    __plugins_loaded: bool = False
+
+    @classmethod
+    def load_plugins(cls) -> None:
+        """Register plugins of installed packages, once."""
+        if cls.__plugins_loaded:
+            return
+        cls.__plugins_loaded = True
+        for entry_point in pkg_resources.iter_entry_points(PLUGINS_GROUP):
+            try:
+                plugin = entry_point.load()
+                cls.register(
+                    plugin() if isinstance(plugin, type) else plugin,
+                    disable_on_error=True,
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                warnings.warn(
+                    f'Could not load statue plugin "{entry_point.name}": {error}'
+                )
+
+    @classmethod
+    def register(cls, plugin: Any, disable_on_error: bool = False) -> None:
+        """
+        Register plugin.
+
+        :param plugin: Object with ``on_<event>`` methods.
+        :param disable_on_error: Unregister the plugin once one of its handlers
+            raises.
+        """
+        if disable_on_error:
+            cls.__disabled_on_error = [*cls.__disabled_on_error, plugin]
+        cls.__set_plugins([*cls.__plugins, plugin])
+
+    @classmethod
+    def unregister(cls, plugin: Any) -> None:
+        """
+        Unregister plugin, if registered.
+
+        :param plugin: Registered plugin.
+        """
+        cls.__disabled_on_error = [
+            registered
+            for registered in cls.__disabled_on_error
+            if registered is not plugin
+        ]
+        cls.__set_plugins(
+            [registered for registered in cls.__plugins if registered is not plugin]
+        )
+
+    @classmethod
+    def plugins(cls) -> List[Any]:
+        """Get registered plugins, in registration order."""
+        return list(cls.__plugins)
+
+    @classmethod
+    def enabled(cls, event: str) -> bool:
+        """Check whether any plugin handles the event."""
+        return event in cls.__handlers
+
+    @classmethod
+    def emit(cls, event: str, **payload: Any) -> None:
+        """
+        Call the handlers of an event, in registration order.
+
+        :param event: Name of the event, one of :data:`EVENTS`.
+        :param payload: Keyword arguments passed to the handlers.
+        """
+        handlers = cls.__handlers.get(event, None)
+        if handlers is None:
+            return
+        for plugin, handler in handlers:
+            try:
+                handler(**payload)
+            except Exception as error:  # pylint: disable=broad-except
+                cls.__handler_failed(plugin, event, error)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Unregister all plugins, so they would be loaded again."""
+        cls.__set_plugins([])
+        cls.__disabled_on_error = []
+        cls.__plugins_loaded = False
+
+    @classmethod
+    def __handler_failed(cls, plugin: Any, event: str, error: Exception) -> None:
+        name = getattr(plugin, "__name__", type(plugin).__name__)
+        disabled = any(registered is plugin for registered in cls.__disabled_on_error)
+        warnings.warn(
+            f'Statue plugin "{name}" failed handling {event}: {error}'
+            + (", plugin is disabled" if disabled else "")
+        )
+        if disabled:
+            cls.unregister(plugin)
+
+    @classmethod
+    def __set_plugins(cls, plugins: List[Any]) -> None:
+        handlers: Dict[str, List[Tuple[Any, Callable[..., None]]]] = {}
+        for event in EVENTS:
+            for plugin in plugins:
+                handler = getattr(plugin, f"on_{event}", None)
+                if handler is not None:
+                    handlers.setdefault(event, []).append((plugin, handler))
+        # Replaced at once, so emitting threads see either old or new handlers
+        cls.__plugins, cls.__handlers = plugins, handlers
@@ -0,0 +1,146 @@
+"""Find which files of a source make each command slow."""
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from statue.command import Command
+from statue.files_filter import FilesFilter
+from statue.verbosity import SILENT
+
+
+@dataclass
+class FileTiming:
+    """
+    Time a command took on a single file.
+
+    :param file: Path of the file.
+    :param duration: Duration in seconds.
+    :param success: Did the command succeed on the file.
+    """
+
+    file: str
+    duration: float
+    success: bool
+
+
+@dataclass
+class Hotspot:
+    """
+    File of a source, ranked by the time a command spends on it.
+
+    :param source: Source the file belongs to.
+    :param file: Path of the file.
+    :param duration: Duration in seconds.
+    :param share: Part of the time of the command on the whole source.
+    """
+
+    source: str
+    file: str
+    duration: float
+    share: float
+
+
+@dataclass
+class CommandHotspots:
+    """
+    Slowest files of a command.
+
+    :param command: Name of the command.
+    :param total: Time of the command on all files, in seconds.
+    :param files_number: Number of timed files.
+    :param hotspots: Slowest files, slowest first.
+    """
+
+    command: str
+    total: float = 0.0
+    files_number: int = 0
+    hotspots: List[Hotspot] = field(default_factory=list)
+
+
+def file_digest(file: Union[Path, str]) -> bytes:
+    """Digest of a file content, used in order to reuse timings of unchanged files."""
+    return hashlib.sha256(Path(file).read_bytes()).digest()
+
+
+def command_files(source: Union[Path, str], command: Command) -> List[str]:
+    """
+    Get files of a source which the command checks.
+
+    :param source: File or directory.
+    :param command: Command, whose files filter is applied.
+    :return: Sorted list of files paths.
+    """
+    files_filter = (
+        command.files_filter if command.files_filter is not None else FilesFilter()
+    )
+    return files_filter.filter_source(source)
+
+
+def time_file(command: Command, file: str) -> FileTiming:
+    """
+    Run command on a single file and measure it.
+
+    :param command: Command to run. Its files filter was already applied.
+    :param file: Path of the file.
+    :return: Timing of the command on the file.
+    """
+    file_command = replace(command, files_filter=None)
+    start_time = time.monotonic()
+    success = file_command.execute(file, SILENT) == 0
+    return FileTiming(
+        file=file, duration=time.monotonic() - start_time, success=success
+    )
+
+
+def time_files(
+    command: Command, files: Sequence[str], jobs: int = 1
+) -> List[FileTiming]:
+    """
+    Run command on each file, in parallel.
+
+    :param command: Command to run.
+    :param files: Files to run the command on.
+    :param jobs: Number of commands running at the same time.
+    :return: Timing of each file, in the order of files.
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(lambda file: time_file(command, file), files))
+
+
+def rank_hotspots(
+    timings: Dict[str, Dict[str, List[FileTiming]]], top: Optional[int] = None
+) -> List[CommandHotspots]:
+    """
+    Rank files of each command by their duration.
+
+    :param timings: Timings of files by command name and source.
+    :param top: Number of slowest files to keep for each command. Keep all if None.
+    :return: Hotspots of each command, slowest command first.
+    """
+    commands_hotspots = []
+    for command_name, sources_timings in timings.items():
+        command_hotspots = CommandHotspots(command=command_name)
+        for source, files_timings in sources_timings.items():
+            source_total = sum(file_timing.duration for file_timing in files_timings)
+            command_hotspots.total += source_total
+            command_hotspots.files_number += len(files_timings)
+            command_hotspots.hotspots.extend(
+                Hotspot(
+                    source=source,
+                    file=file_timing.file,
+                    duration=file_timing.duration,
+                    share=(
+                        file_timing.duration / source_total if source_total > 0 else 0
+                    ),
+                )
+                for file_timing in files_timings
+            )
+        command_hotspots.hotspots.sort(key=lambda hotspot: -hotspot.duration)
+        if top is not None:
+            command_hotspots.hotspots = command_hotspots.hotspots[:top]
+        commands_hotspots.append(command_hotspots)
+    commands_hotspots.sort(key=lambda command_hotspots: -command_hotspots.total)
+    return commands_hotspots
@@ -0,0 +1,257 @@
+"""Metrics of a run in Prometheus text format, for textfile collectors."""
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+from statue.command import MAX_RSS_UNIT
+from statue.evaluation import CommandEvaluation, Evaluation
+from statue.file_util import atomic_write
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
+
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# Command name, contexts and source group
+MetricsLabels = Tuple[str, str, str]
+
+
+@dataclass
+class CommandMetrics:
+    """
+    Metrics of a command over sources sharing the same labels.
+
+    :param tasks: Number of evaluations of the command.
+    :param failures: Number of failed evaluations.
+    :param cache_hits: Number of evaluations taken from an interrupted run.
+    :param buckets: Number of timed evaluations in each duration bucket, not
+     including evaluations of shorter buckets.
+    :param duration_sum: Sum of durations in seconds.
+    :param duration_count: Number of timed evaluations.
+    :param output_bytes: Size of the captured output of evaluations.
+    :param peak_rss: Peak resident memory of the command processes in bytes, None
+     if unknown.
+    """
+
+    tasks: int = 0
+    failures: int = 0
+    cache_hits: int = 0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(DURATION_BUCKETS))
+    duration_sum: float = 0.0
+    duration_count: int = 0
+    output_bytes: int = 0
+    peak_rss: Optional[int] = None
+
+    def add_duration(self, duration: float) -> None:
+        """Count duration in the durations histogram."""
+        self.duration_sum += duration
+        self.duration_count += 1
+        for index, bucket in enumerate(DURATION_BUCKETS):
+            if duration <= bucket:
+                self.buckets[index] += 1
+                return
+
+    def add_evaluation(self, command_evaluation: CommandEvaluation) -> None:
+        """Count duration and resources of an evaluation run in this run."""
+        if command_evaluation.duration is not None:
+            self.add_duration(command_evaluation.duration)
+        if command_evaluation.output_bytes is not None:
+            self.output_bytes += command_evaluation.output_bytes
+        if command_evaluation.peak_rss is not None:
+            self.peak_rss = (
+                command_evaluation.peak_rss
+                if self.peak_rss is None
+                else max(self.peak_rss, command_evaluation.peak_rss)
+            )
+
+
+def source_group(source: Union[Path, str]) -> str:
+    """
+    Get group of a source, used as label instead of the source itself.
+
+    Sources are grouped by their top level directory, so the number of series
+    does not grow with the number of sources.
+
+    :param source: Source path.
+    :return: First part of the source path.
+    """
+    parts = Path(source).parts
+    return parts[0] if len(parts) != 0 else "."
+
+
+def commands_metrics(
+    evaluation: Evaluation,
+    sources_contexts: Mapping[str, List[str]],
+    cached_evaluation: Optional[Evaluation] = None,
+) -> Dict[MetricsLabels, CommandMetrics]:
+    """
+    Aggregate metrics of commands by their labels.
+
+    :param evaluation: Evaluation of the run, including cached evaluations.
+    :param sources_contexts: Contexts in which each source was evaluated.
+    :param cached_evaluation: Evaluations taken from an interrupted run.
+    :return: Metrics by command name, contexts and source group.
+    """
+    metrics: Dict[MetricsLabels, CommandMetrics] = {}
+    for source, source_evaluation in evaluation.items():
+        cached_commands = (
+            [
+                command_evaluation.command
+                for command_evaluation in cached_evaluation[source].commands_evaluations
+            ]
+            if cached_evaluation is not None and source in cached_evaluation
+            else []
+        )
+        for command_evaluation in source_evaluation.commands_evaluations:
+            command_metrics = metrics.setdefault(
+                (
+                    command_evaluation.command.name,
+                    ",".join(sources_contexts.get(source, [])),
+                    source_group(source),
+                ),
+                CommandMetrics(),
+            )
+            command_metrics.tasks += 1
+            if not command_evaluation.success:
+                command_metrics.failures += 1
+            if command_evaluation.command in cached_commands:
+                command_metrics.cache_hits += 1
+            else:
+                command_metrics.add_evaluation(command_evaluation)
+    return metrics
+
+
+def metrics_text(
+    metrics: Mapping[MetricsLabels, CommandMetrics], timestamp: float
+) -> str:
+    """
+    Format metrics in Prometheus text exposition format.
+
+    :param metrics: Metrics by labels.
+    :param timestamp: Time the run finished.
+    :return: Metrics text.
+    """
+    lines = []
+    for name, help_string, value_of in [
+        ("tasks_total", "Evaluations of the command.", lambda m: m.tasks),
+        ("failures_total", "Failed evaluations of the command.", lambda m: m.failures),
+        (
+            "cache_hits_total",
+            "Evaluations taken from an interrupted run.",
+            lambda m: m.cache_hits,
+        ),
+        (
+            "cache_misses_total",
+            "Evaluations run in this run.",
+            lambda m: m.tasks - m.cache_hits,
+        ),
+        (
+            "output_bytes_total",
+            "Bytes of captured output of the command.",
+            lambda m: m.output_bytes,
+        ),
+    ]:
+        lines.append(f"# HELP statue_command_{name} {help_string}")
+        lines.append(f"# TYPE statue_command_{name} counter")
+        for labels, command_metrics in metrics.items():
+            lines.append(
+                f"statue_command_{name}{{{__labels(labels)}}} "
+                f"{value_of(command_metrics)}"
+            )
+    lines.append(
+        "# HELP statue_command_duration_seconds Duration of evaluations of the command."
+    )
+    lines.append("# TYPE statue_command_duration_seconds histogram")
+    for labels, command_metrics in metrics.items():
+        cumulative_count = 0
+        for bucket, count in zip(DURATION_BUCKETS, command_metrics.buckets):
+            cumulative_count += count
+            lines.append(
+                "statue_command_duration_seconds_bucket"
+                f'{{{__labels(labels)},le="{bucket}"}} {cumulative_count}'
+            )
+        lines.append(
+            "statue_command_duration_seconds_bucket"
+            f'{{{__labels(labels)},le="+Inf"}} {command_metrics.duration_count}'
+        )
+        lines.append(
+            f"statue_command_duration_seconds_sum{{{__labels(labels)}}} "
+            f"{command_metrics.duration_sum}"
+        )
+        lines.append(
+            f"statue_command_duration_seconds_count{{{__labels(labels)}}} "
+            f"{command_metrics.duration_count}"
+        )
+    commands_peak_rss = {
+        labels: command_metrics.peak_rss
+        for labels, command_metrics in metrics.items()
+        if command_metrics.peak_rss is not None
+    }
+    if len(commands_peak_rss) != 0:
+        lines.append(
+            "# HELP statue_command_peak_rss_bytes "
+            "Peak resident memory of a process of the command."
+        )
+        lines.append("# TYPE statue_command_peak_rss_bytes gauge")
+        for labels, rss in commands_peak_rss.items():
+            lines.append(f"statue_command_peak_rss_bytes{{{__labels(labels)}}} {rss}")
+    peak_rss = __peak_rss()
+    if len(peak_rss) != 0:
+        lines.append("# HELP statue_peak_rss_bytes Peak resident memory of the run.")
+        lines.append("# TYPE statue_peak_rss_bytes gauge")
+        for process, rss in peak_rss.items():
+            lines.append(f'statue_peak_rss_bytes{{process="{process}"}} {rss}')
+    lines.append("# HELP statue_last_run_timestamp_seconds Time the last run finished.")
+    lines.append("# TYPE statue_last_run_timestamp_seconds gauge")
+    lines.append(f"statue_last_run_timestamp_seconds {timestamp}")
+    return "\n".join(lines) + "\n"
+
+
+def save_metrics(
+    output: Union[Path, str],
+    evaluation: Evaluation,
+    sources_contexts: Mapping[str, List[str]],
+    cached_evaluation: Optional[Evaluation] = None,
+) -> None:
+    """
+    Save metrics of a run. The file is replaced atomically.
+
+    :param output: Path of the metrics file.
+    :param evaluation: Evaluation of the run, including cached evaluations.
+    :param sources_contexts: Contexts in which each source was evaluated.
+    :param cached_evaluation: Evaluations taken from an interrupted run.
+    """
+    text = metrics_text(
+        commands_metrics(evaluation, sources_contexts, cached_evaluation),
+        timestamp=time.time(),
+    )
+    with atomic_write(output) as output_file:
+        output_file.write(text)
+
+
+def __labels(labels: MetricsLabels) -> str:
+    command, contexts, group = labels
+    return ",".join(
+        f'{name}="{__escape(value)}"'
+        for name, value in [
+            ("command", command),
+            ("context", contexts),
+            ("source_group", group),
+        ]
+    )
+
+
+def __escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def __peak_rss() -> Dict[str, int]:
+    """Peak resident memory of statue and of its largest tool process, in bytes."""
+    if resource is None:  # pragma: no cover
+        return {}
+    return {
+        "statue": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAX_RSS_UNIT,
+        "tools": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * MAX_RSS_UNIT,
+    }
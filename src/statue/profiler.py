@@ -0,0 +1,100 @@
+"""Measure the time statue spends in each phase of a run."""
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator
+
+START_UP = "start-up"
+CONFIGURATION_LOAD = "configuration load"
+COMMANDS_MAP_BUILD = "commands map build"
+SOURCES_FINGERPRINT = "sources fingerprint"
+INSTALL_CHECKS = "install checks"
+SPAWN = "spawn"
+OUTPUT_CAPTURE = "output capture"
+TOOLS_RUNTIME = "tools runtime"
+HISTORY_SAVE = "history save"
+# Phases in which the tools run, rather than statue itself. Tools run from their
+# spawn to their exit, apart from the time statue spends handling their output lines.
+TOOLS_PHASES = [TOOLS_RUNTIME]
+
+
+@dataclass
+class PhaseTime:
+    """
+    Time spent in a phase.
+
+    :param total: Total time in seconds.
+    :param count: Number of times the phase was entered.
+    """
+
+    total: float = 0.0
+    count: int = 0
+
+
+class Profiler:
+    """
+    Profiler singleton.
+
+    Phases are always measured, since measuring costs a couple of clock reads.
+    Time is measured from the import of statue's modules. Phases may be measured
+    from several threads, such as when files are timed in parallel.
+    """
+
+    __start: float = time.perf_counter()
+    __phases: Dict[str, PhaseTime] = {}
+    __lock = threading.Lock()
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name: str) -> Iterator[None]:
+        """
+        Measure the time spent in a phase.
+
+        :param name: Name of the phase. Time of phases with the same name is
+         summed.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.add(name, time.perf_counter() - start)
+
+    @classmethod
+    def add(cls, name: str, duration: float) -> None:
+        """
+        Add time spent in a phase.
+
+        :param name: Name of the phase.
+        :param duration: Time spent in seconds.
+        """
+        with cls.__lock:
+            phase_time = cls.__phases.setdefault(name, PhaseTime())
+            phase_time.total += duration
+            phase_time.count += 1
+
+    @classmethod
+    def finish_start_up(cls) -> None:
+        """Mark the end of the start-up phase, once command line is parsed."""
+        cls.add(START_UP, cls.elapsed())
+
+    @classmethod
+    def elapsed(cls) -> float:
+        """Time passed since the profiler started, in seconds."""
+        return time.perf_counter() - cls.__start
+
+    @classmethod
+    def phases(cls) -> Dict[str, PhaseTime]:
+        """Get times of the measured phases, in the order they were first entered."""
+        with cls.__lock:
+            return {
+                name: PhaseTime(total=phase_time.total, count=phase_time.count)
+                for name, phase_time in cls.__phases.items()
+            }
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget measured phases and start measuring from now."""
+        with cls.__lock:
+            cls.__start = time.perf_counter()
+            cls.__phases = {}
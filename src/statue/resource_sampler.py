@@ -0,0 +1,240 @@
+"""Sample resources used by the running tools, as reported by procfs."""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+PROC_DIR = Path("/proc")
+# Sampling more often would make the sampler itself a noticeable load
+MIN_SAMPLE_INTERVAL = 0.01
+
+
+@dataclass
+class ProcessStat:
+    """
+    Resources used by a process.
+
+    :param pid: Process id.
+    :param ppid: Parent process id.
+    :param cpu_ticks: User and system cpu time, in clock ticks.
+    :param rss_pages: Resident memory, in pages.
+    :param threads: Number of threads.
+    """
+
+    pid: int
+    ppid: int
+    cpu_ticks: int
+    rss_pages: int
+    threads: int
+
+
+@dataclass
+class ResourceSample:
+    """
+    Resources used by the processes spawned by statue at a point in time.
+
+    :param processes: Number of running processes.
+    :param cpu_percent: Cpu usage since the previous sample, 100 for each busy core.
+    :param rss_bytes: Resident memory of all processes.
+    :param threads: Number of threads of all processes.
+    """
+
+    processes: int
+    cpu_percent: float
+    rss_bytes: int
+    threads: int
+
+
+def is_supported(proc_dir: Path = PROC_DIR) -> bool:
+    """Can resources be sampled on this platform."""
+    return (proc_dir / "self" / "stat").exists()
+
+
+def read_process_stat(stat_line: str) -> ProcessStat:
+    """
+    Parse line of a /proc/<pid>/stat file.
+
+    :param stat_line: Content of the stat file.
+    :return: Process resources.
+    """
+    pid, rest = stat_line.split(" (", 1)
+    # Process name may contain spaces and parentheses, but is followed by the
+    # last closing parenthesis of the line
+    fields = rest[rest.rindex(")") + 2 :].split()
+    return ProcessStat(
+        pid=int(pid),
+        ppid=int(fields[1]),
+        cpu_ticks=int(fields[11]) + int(fields[12]),
+        threads=int(fields[17]),
+        rss_pages=int(fields[21]),
+    )
+
+
+def processes_stats(proc_dir: Path = PROC_DIR) -> List[ProcessStat]:
+    """
+    Read resources of all processes.
+
+    Processes which exit while being read are skipped.
+
+    :param proc_dir: Mount point of procfs.
+    :return: Resources of each process.
+    """
+    stats = []
+    for process_dir in proc_dir.iterdir():
+        if not process_dir.name.isdigit():
+            continue
+        try:
+            stats.append(read_process_stat((process_dir / "stat").read_text()))
+        except (OSError, ValueError, IndexError):
+            continue
+    return stats
+
+
+def children_listed(proc_dir: Path = PROC_DIR) -> bool:
+    """Check whether procfs lists the children of each thread."""
+    return (proc_dir / "self" / "task" / str(os.getpid()) / "children").exists()
+
+
+def children_pids(pid: int, proc_dir: Path = PROC_DIR) -> List[int]:
+    """
+    Read ids of the children spawned by any thread of a process.
+
+    :param pid: Id of the parent process.
+    :param proc_dir: Mount point of procfs.
+    :return: Ids of the children.
+    :raises OSError: The process has exited.
+    """
+    pids: List[int] = []
+    for task_dir in (proc_dir / str(pid) / "task").iterdir():
+        pids.extend(int(child) for child in (task_dir / "children").read_text().split())
+    return pids
+
+
+def running_descendants(pid: int, proc_dir: Path = PROC_DIR) -> List[ProcessStat]:
+    """
+    Read resources of the processes descending from a process.
+
+    Only the descendants are read, by following the children of each process,
+    instead of reading every process of the system. Processes which exit while
+    being read are skipped.
+
+    :param pid: Id of the ancestor process.
+    :param proc_dir: Mount point of procfs.
+    :return: Resources of the descendants, not including the ancestor.
+    """
+    found, parents = [], [pid]
+    while len(parents) != 0:
+        try:
+            children = children_pids(parents.pop(), proc_dir)
+        except OSError:
+            continue
+        for child in children:
+            try:
+                found.append(
+                    read_process_stat((proc_dir / str(child) / "stat").read_text())
+                )
+            except (OSError, ValueError, IndexError):
+                continue
+            parents.append(child)
+    return found
+
+
+def descendants(pid: int, stats: List[ProcessStat]) -> List[ProcessStat]:
+    """
+    Find processes descending from a process.
+
+    :param pid: Id of the ancestor process.
+    :param stats: Resources of all processes.
+    :return: Resources of the descendants, not including the ancestor.
+    """
+    children: Dict[int, List[ProcessStat]] = {}
+    for stat in stats:
+        children.setdefault(stat.ppid, []).append(stat)
+    found, parents = [], [pid]
+    while len(parents) != 0:
+        parent_children = children.get(parents.pop(), [])
+        found.extend(parent_children)
+        parents.extend(child.pid for child in parent_children)
+    return found
+
+
+class ResourceSampler:
+    """
+    Sample resources of the processes spawned by statue at a constant interval.
+
+    Sampling happens in a daemon thread, which reads procfs only, so the
+    evaluation itself is not slowed down. Cpu usage is measured over the time
+    which actually passed between consecutive samples. Where procfs does not list
+    the children of processes, all processes are read to find the descendants.
+
+    :param interval: Seconds between samples.
+    :param on_sample: Callback receiving each sample.
+    :param proc_dir: Mount point of procfs.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        on_sample: Callable[[ResourceSample], None],
+        proc_dir: Path = PROC_DIR,
+    ) -> None:
+        """Create sampler, which starts measuring cpu usage right away."""
+        self.interval = interval
+        self.on_sample = on_sample
+        self.proc_dir = proc_dir
+        self.__clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.__page_size = os.sysconf("SC_PAGE_SIZE")
+        self.__cpu_ticks: Dict[int, int] = {}
+        self.__children_listed = children_listed(proc_dir)
+        self.__sample_time = time.monotonic()
+        self.__stopped = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def sample(self) -> ResourceSample:
+        """Take a sample of the processes spawned by statue and report it."""
+        if self.__children_listed:
+            processes = running_descendants(os.getpid(), self.proc_dir)
+        else:
+            processes = descendants(os.getpid(), processes_stats(self.proc_dir))
+        sample_time = time.monotonic()
+        elapsed = sample_time - self.__sample_time
+        self.__sample_time = sample_time
+        cpu_ticks = {process.pid: process.cpu_ticks for process in processes}
+        # Processes started since the previous sample count their whole cpu time
+        used_ticks = sum(
+            ticks - self.__cpu_ticks.get(pid, 0) for pid, ticks in cpu_ticks.items()
+        )
+        self.__cpu_ticks = cpu_ticks
+        resource_sample = ResourceSample(
+            processes=len(processes),
+            cpu_percent=100 * used_ticks / self.__clock_ticks / elapsed
+            if elapsed > 0
+            else 0.0,
+            rss_bytes=sum(process.rss_pages for process in processes)
+            * self.__page_size,
+            threads=sum(process.threads for process in processes),
+        )
+        self.on_sample(resource_sample)
+        return resource_sample
+
+    def start(self) -> None:
+        """Start sampling in the background."""
+        self.__stopped.clear()
+        self.__sample_time = time.monotonic()
+        self.__thread = threading.Thread(
+            target=self.__run, name="statue-resource-sampler", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling, waiting for a sample in progress to be reported."""
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __run(self) -> None:
+        while not self.__stopped.wait(self.interval):
+            self.sample()
@@ -0,0 +1,103 @@
+"""Retention policy of the evaluations history."""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from statue.constants import (
+    HISTORY_SIZE,
+    MAX_AGE_DAYS,
+    MAX_RUNS,
+    MAX_SIZE,
+    MIN_RUNS,
+    ROLLUP,
+    WEEKLY_ROLLUP_AFTER,
+    WEEKLY_ROLLUP_AFTER_DAYS,
+)
+from statue.exceptions import InvalidStatueConfiguration
+
+SECONDS_IN_DAY = 24 * 60 * 60
+SECONDS_IN_WEEK = 7 * SECONDS_IN_DAY
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Which evaluations to keep in history.
+
+    Runs are pruned from the least recently used one, where a run is used when it
+    is saved or loaded. Pinned runs are never pruned.
+
+    :param max_runs: Maximal number of runs to keep. Unlimited if None.
+    :param min_runs: Number of most recently used runs to keep, regardless of
+     other limits.
+    :param max_age_days: Remove runs older than this number of days.
+    :param max_size: Maximal size of history in bytes.
+    :param rollup: Aggregate removed runs into daily summaries of each command,
+     instead of dropping them altogether.
+    :param weekly_rollup_after_days: Aggregate daily summaries older than this
+     number of days into weekly summaries.
+    """
+
+    max_runs: Optional[int] = HISTORY_SIZE
+    min_runs: int = 1
+    max_age_days: Optional[float] = None
+    max_size: Optional[int] = None
+    rollup: bool = False
+    weekly_rollup_after_days: float = WEEKLY_ROLLUP_AFTER_DAYS
+
+    def expired_runs(self, runs: Sequence[Tuple[int, float]], now: float) -> List[int]:
+        """
+        Get runs that exceed number or age limits.
+
+        :param runs: Ids and timestamps of unpinned runs, from the most recently
+         used to the least.
+        :param now: Current time.
+        :return: Ids of runs to remove.
+        """
+        expired_runs = []
+        for index, (run_id, timestamp) in enumerate(runs):
+            if index < self.min_runs:
+                continue
+            if (self.max_runs is not None and index >= self.max_runs) or (
+                self.max_age_days is not None
+                and now - timestamp > self.max_age_days * SECONDS_IN_DAY
+            ):
+                expired_runs.append(run_id)
+        return expired_runs
+
+    @classmethod
+    def from_setup(cls, setup: Dict[str, Any]) -> "RetentionPolicy":
+        """
+        Read retention policy from history configuration.
+
+        :param setup: History configuration dictionary.
+        :return: :class:`RetentionPolicy`.
+        :raises: :class:`InvalidStatueConfiguration` if a limit is not a
+         non-negative number.
+        """
+        rollup = setup.get(ROLLUP, False)
+        if not isinstance(rollup, bool):
+            raise InvalidStatueConfiguration(
+                f'History "{ROLLUP}" should be a boolean, got "{rollup}".'
+            )
+        for key in [MAX_RUNS, MIN_RUNS, MAX_AGE_DAYS, MAX_SIZE, WEEKLY_ROLLUP_AFTER]:
+            value = setup.get(key, None)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise InvalidStatueConfiguration(
+                    f'History "{key}" should be a number, got "{value}".'
+                )
+            if value < 0:
+                raise InvalidStatueConfiguration(
+                    f'History "{key}" should not be negative, got {value}.'
+                )
+        return RetentionPolicy(
+            max_runs=setup.get(MAX_RUNS, HISTORY_SIZE),
+            min_runs=setup.get(MIN_RUNS, 1),
+            max_age_days=setup.get(MAX_AGE_DAYS, None),
+            max_size=setup.get(MAX_SIZE, None),
+            rollup=rollup,
+            weekly_rollup_after_days=setup.get(
+                WEEKLY_ROLLUP_AFTER, WEEKLY_ROLLUP_AFTER_DAYS
+            ),
+        )
@@ -1,30 +1,52 @@
 """Find all python sources in a directory."""
+import os
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
 
 from git import Repo
 
+from statue.sources_index import SourcesIndex, repository_files
 
-def find_sources(path: Path, repo: Repo = None):
-    """Search for sources recursively."""
+FilesTree = Dict[str, Any]
+
+
+def find_sources(
+    path: Path, repo: Repo = None, sources_index: Optional[SourcesIndex] = None
+) -> List[Path]:
+    """
+    Search for sources recursively.
+
+    :param path: Python module, package or directory to search in.
+    :param repo: Git repository of the path. Files ignored by git are skipped.
+    :param sources_index: Refreshed index of a directory. If it is the index of
+     the path, its sources are taken from the index instead of listing the directory.
+    """
     if is_python(path):
         return [path]
     if not path.is_dir():
         return []
+    if sources_index is not None and sources_index.root.resolve() == path.resolve():
+        return [
+            path / source.relative_to(sources_index.root)
+            for source in sources_index.sources()
+        ]
     return expend(path, repo)
 
 
-def expend(path, repo=None):
-    """Find all sources inside a directory which are not ignored."""
-    inner_files = list(path.iterdir())
+def expend(path: Path, repo: Repo = None) -> List[Path]:
+    """
+    Find all sources inside a directory which are not ignored.
+
+    When a repository is given, tracked and untracked-but-not-ignored files are listed
+    with a single ``git ls-files`` call. Otherwise, the directory is walked once.
+    Python modules and packages are then derived from the listed files in memory.
+    """
+    relative_files = None
     if repo is not None:
-        ignored_files = [Path(ignored) for ignored in repo.ignored(inner_files)]
-        inner_files = [
-            inner_path for inner_path in inner_files if inner_path not in ignored_files
-        ]
-    sources = []
-    for inner_path in inner_files:
-        sources.extend(find_sources(inner_path, repo=repo))
-    return sorted(sources)
+        relative_files = repository_files(path, repo)
+    if relative_files is None:
+        relative_files = _walk_files(path)
+    return sorted(_tree_sources(path, _build_files_tree(relative_files)))
 
 
 def is_python(path: Path) -> bool:
@@ -40,3 +62,47 @@ def is_python_module(path: Path) -> bool:
 def is_python_package(path: Path) -> bool:
     """Is path a python package."""
     return path.is_dir() and (path / "__init__.py").exists()
+
+
+def _walk_files(path: Path) -> List[str]:
+    files = []
+    directories = [""]
+    while len(directories) != 0:
+        relative_directory = directories.pop()
+        with os.scandir(path / relative_directory) as entries:
+            for entry in entries:
+                relative_path = (
+                    entry.name
+                    if relative_directory == ""
+                    else f"{relative_directory}/{entry.name}"
+                )
+                if entry.is_dir():
+                    directories.append(relative_path)
+                else:
+                    files.append(relative_path)
+    return files
+
+
+def _build_files_tree(relative_files: Iterable[str]) -> FilesTree:
+    tree: FilesTree = {}
+    for relative_file in relative_files:
+        *directories, file_name = relative_file.split("/")
+        node = tree
+        for directory in directories:
+            node = node.setdefault(directory, {})
+        node[file_name] = None
+    return tree
+
+
+def _tree_sources(path: Path, tree: FilesTree) -> List[Path]:
+    sources = []
+    for name, node in tree.items():
+        inner_path = path / name
+        if node is None:
+            if inner_path.suffix == ".py" and inner_path.is_file():
+                sources.append(inner_path)
+        elif "__init__.py" in node and (inner_path / "__init__.py").exists():
+            sources.append(inner_path)
+        else:
+            sources.extend(_tree_sources(inner_path, node))
+    return sources
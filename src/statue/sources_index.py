@@ -0,0 +1,230 @@
+"""Persistent index of python sources, refreshed incrementally."""
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from git import Repo
+
+from statue.file_util import atomic_write
+
+SOURCES_INDEX_VERSION = 1
+
+
+def _join(directory: str, name: str) -> str:
+    return name if directory == "" else f"{directory}/{name}"
+
+
+def repository_files(path: Path, repo: Repo) -> Optional[List[str]]:
+    """
+    List tracked and untracked-but-not-ignored files with a single ``git ls-files``.
+
+    :param path: Directory inside the working tree of the repository.
+    :param repo: Git repository of the path.
+    :return: Files paths relative to the path, or None if the path is outside of
+     the working tree.
+    """
+    if repo.working_tree_dir is None:
+        return None
+    working_tree = Path(repo.working_tree_dir).resolve()
+    try:
+        prefix = path.resolve().relative_to(working_tree).as_posix()
+    except ValueError:
+        return None
+    output = repo.git.ls_files(
+        "--cached", "--others", "--exclude-standard", "-z", "--", prefix
+    )
+    files = [file_path for file_path in output.split("\0") if file_path != ""]
+    if prefix == ".":
+        return files
+    return [file_path[len(prefix) + 1 :] for file_path in files]
+
+
+@dataclass
+class DirectoryEntry:
+    """
+    Listing of python files and inner directories of a directory.
+
+    A listing made by walking the directory is valid as long as the directory mtime
+    is unchanged. Listings made by git have no mtime.
+    """
+
+    mtime: Optional[int] = None
+    files: List[str] = field(default_factory=list)
+    directories: List[str] = field(default_factory=list)
+
+    @property
+    def is_python_package(self) -> bool:
+        """Does directory contain an ``__init__.py`` file."""
+        return "__init__.py" in self.files
+
+    def as_json(self) -> Dict[str, Any]:
+        """Return directory entry as json dictionary."""
+        return dict(mtime=self.mtime, files=self.files, directories=self.directories)
+
+    @classmethod
+    def from_json(cls, directory_entry: Dict[str, Any]) -> "DirectoryEntry":
+        """Read directory entry from json dictionary."""
+        return DirectoryEntry(**directory_entry)
+
+
+@dataclass
+class SourcesIndex:
+    """
+    Index of python modules and packages under a root directory.
+
+    Without a git repository, directories listings are kept together with their
+    mtime, so refreshing the index rescans only directories whose entries were
+    added, removed or renamed.
+
+    With a git repository, the index is rebuilt from a single ``git ls-files`` call,
+    so files ignored by git are not indexed, exactly as in
+    :func:`statue.sources_finder.expend`.
+    """
+
+    root: Path
+    directories: Dict[str, DirectoryEntry] = field(default_factory=dict)
+    listed_by_git: bool = False
+
+    def refresh(self, repo: Optional[Repo] = None) -> None:
+        """
+        Refresh index according to the current state of the root directory.
+
+        :param repo: Git repository of the root directory. If given, files ignored
+         by git are not indexed.
+        """
+        relative_files = None if repo is None else repository_files(self.root, repo)
+        if relative_files is not None:
+            self.__list_files(relative_files)
+            return
+        if self.listed_by_git:
+            self.directories = {}
+            self.listed_by_git = False
+        visited_directories: Set[str] = set()
+        pending_directories = [""]
+        while len(pending_directories) != 0:
+            relative_directory = pending_directories.pop()
+            directory_entry = self.__refreshed_directory(relative_directory)
+            if directory_entry is None:
+                continue
+            visited_directories.add(relative_directory)
+            pending_directories.extend(
+                _join(relative_directory, name) for name in directory_entry.directories
+            )
+        for relative_directory in set(self.directories) - visited_directories:
+            del self.directories[relative_directory]
+
+    def sources(self) -> List[Path]:
+        """
+        Get indexed python modules and packages, as :func:`find_sources` would.
+
+        :return: Sorted list of paths.
+        """
+        sources: List[Path] = []
+        root_entry = self.directories.get("", None)
+        if root_entry is None:
+            return sources
+        pending_directories = [("", root_entry)]
+        while len(pending_directories) != 0:
+            relative_directory, directory_entry = pending_directories.pop()
+            sources.extend(
+                self.root / _join(relative_directory, name)
+                for name in directory_entry.files
+            )
+            for name in directory_entry.directories:
+                inner_directory = _join(relative_directory, name)
+                inner_entry = self.directories[inner_directory]
+                if inner_entry.is_python_package:
+                    sources.append(self.root / inner_directory)
+                else:
+                    pending_directories.append((inner_directory, inner_entry))
+        return sorted(sources)
+
+    def as_json(self) -> Dict[str, Any]:
+        """Return index as json dictionary."""
+        return dict(
+            version=SOURCES_INDEX_VERSION,
+            root=str(self.root),
+            directories={
+                relative_directory: directory_entry.as_json()
+                for relative_directory, directory_entry in self.directories.items()
+            },
+            listed_by_git=self.listed_by_git,
+        )
+
+    def save_as_json(self, output: Union[Path, str]) -> None:
+        """Save index as json. The file is replaced atomically."""
+        with atomic_write(output) as output_file:
+            json.dump(self.as_json(), output_file)
+
+    @classmethod
+    def load_from_file(cls, input_path: Union[Path, str]) -> Optional["SourcesIndex"]:
+        """Load index from json file. Returns None if index is unreadable."""
+        try:
+            with open(input_path, mode="r") as input_file:
+                return SourcesIndex.from_json(json.load(input_file))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def from_json(cls, sources_index: Dict[str, Any]) -> Optional["SourcesIndex"]:
+        """Read index from json dictionary. Returns None for other index versions."""
+        if sources_index.get("version", None) != SOURCES_INDEX_VERSION:
+            return None
+        return SourcesIndex(
+            root=Path(sources_index["root"]),
+            directories={
+                relative_directory: DirectoryEntry.from_json(directory_entry)
+                for relative_directory, directory_entry in sources_index[
+                    "directories"
+                ].items()
+            },
+            listed_by_git=sources_index["listed_by_git"],
+        )
+
+    def __refreshed_directory(
+        self, relative_directory: str
+    ) -> Optional[DirectoryEntry]:
+        directory_path = self.root / relative_directory
+        try:
+            mtime = directory_path.stat().st_mtime_ns
+        except OSError:
+            return None
+        directory_entry = self.directories.get(relative_directory, None)
+        if directory_entry is not None and directory_entry.mtime == mtime:
+            return directory_entry
+        directory_entry = DirectoryEntry(mtime=mtime)
+        with os.scandir(directory_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    directory_entry.directories.append(entry.name)
+                elif entry.name.endswith(".py") and entry.is_file():
+                    directory_entry.files.append(entry.name)
+        self.directories[relative_directory] = directory_entry
+        return directory_entry
+
+    def __list_files(self, relative_files: Iterable[str]) -> None:
+        directories = {"": DirectoryEntry()}
+        for relative_file in relative_files:
+            relative_directory, _, name = relative_file.rpartition("/")
+            # Files removed from the working tree are still listed until staged
+            if name.endswith(".py") and (self.root / relative_file).is_file():
+                self.__directory_entry(directories, relative_directory).files.append(
+                    name
+                )
+        self.directories = directories
+        self.listed_by_git = True
+
+    @classmethod
+    def __directory_entry(
+        cls, directories: Dict[str, DirectoryEntry], relative_directory: str
+    ) -> DirectoryEntry:
+        directory_entry = directories.get(relative_directory, None)
+        if directory_entry is None:
+            directory_entry = directories[relative_directory] = DirectoryEntry()
+            parent_directory, _, name = relative_directory.rpartition("/")
+            cls.__directory_entry(directories, parent_directory).directories.append(
+                name
+            )
+        return directory_entry
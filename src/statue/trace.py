@@ -0,0 +1,149 @@
+"""Timeline of a run in Chrome Trace Event Format, viewable in Perfetto."""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO
+
+from statue.evaluation import CommandEvaluation
+
+WORKER_THREAD_ID = 0
+COMMAND_CATEGORY = "command"
+RUN_CATEGORY = "run"
+RESOURCES_CATEGORY = "resources"
+
+
+class TraceWriter:
+    """
+    Stream trace events into a file, as a json array.
+
+    Events are written as soon as they are known, so memory does not grow with
+    the number of tasks. Trace viewers accept an array missing its closing
+    bracket, so the trace of a killed run is still readable. Events may be added
+    from several threads.
+
+    :param output: Text file to write the trace into.
+    """
+
+    def __init__(self, output: TextIO) -> None:
+        """Start trace, naming the statue process and its worker track."""
+        self.__output = output
+        self.__start = time.perf_counter()
+        self.__pid = os.getpid()
+        self.__events_number = 0
+        self.__lock = threading.Lock()
+        self.__output.write("[\n")
+        self.__write(
+            dict(name="process_name", ph="M", args=dict(name="statue")),
+        )
+        self.__write(
+            dict(
+                name="thread_name",
+                ph="M",
+                tid=WORKER_THREAD_ID,
+                args=dict(name=f"worker {WORKER_THREAD_ID}"),
+            ),
+        )
+
+    def command_evaluated(
+        self, source: str, command_evaluation: CommandEvaluation
+    ) -> None:
+        """
+        Add span of a command which was just evaluated.
+
+        :param source: Source the command was evaluated on.
+        :param command_evaluation: Evaluation of the command, with its duration.
+        """
+        end = self.__timestamp()
+        duration = (
+            0
+            if command_evaluation.duration is None
+            else command_evaluation.duration * 1e6
+        )
+        args: Dict[str, Any] = dict(
+            source=source,
+            args=command_evaluation.command.args,
+            success=command_evaluation.success,
+        )
+        if command_evaluation.failed_files is not None:
+            args["failed_files"] = len(command_evaluation.failed_files)
+        self.__write(
+            dict(
+                name=command_evaluation.command.name,
+                cat=COMMAND_CATEGORY,
+                ph="X",
+                ts=end - duration,
+                dur=duration,
+                tid=WORKER_THREAD_ID,
+                args=args,
+            )
+        )
+
+    def on_task_finished(
+        self,
+        source: str,
+        command_evaluation: CommandEvaluation,
+        output: Optional[List[str]] = None,  # pylint: disable=unused-argument
+    ) -> None:
+        """Add span of a finished task, as a plugin of :class:`statue.hooks.Hooks`."""
+        self.command_evaluated(source, command_evaluation)
+
+    def on_cache_hit(self, source: str, command_evaluation: CommandEvaluation) -> None:
+        """Mark command taken from an interrupted run, as a plugin."""
+        self.instant(
+            "resumed", dict(source=source, command=command_evaluation.command.name)
+        )
+
+    def instant(self, name: str, args: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Add instant event on the worker track.
+
+        :param name: Name of the event.
+        :param args: Arguments shown with the event.
+        """
+        self.__write(
+            dict(
+                name=name,
+                cat=RUN_CATEGORY,
+                ph="i",
+                s="t",
+                ts=self.__timestamp(),
+                tid=WORKER_THREAD_ID,
+                args={} if args is None else args,
+            )
+        )
+
+    def counter(self, name: str, values: Dict[str, float]) -> None:
+        """
+        Add values of a counter, shown as a track of its own.
+
+        :param name: Name of the counter.
+        :param values: Value of each series of the counter.
+        """
+        self.__write(
+            dict(
+                name=name,
+                cat=RESOURCES_CATEGORY,
+                ph="C",
+                ts=self.__timestamp(),
+                args=values,
+            )
+        )
+
+    def close(self) -> None:
+        """Close the events array and the file."""
+        self.__output.write("\n]\n")
+        self.__output.close()
+
+    def __timestamp(self) -> float:
+        """Microseconds since the trace started."""
+        return (time.perf_counter() - self.__start) * 1e6
+
+    def __write(self, event: Dict[str, Any]) -> None:
+        event["pid"] = self.__pid
+        line = json.dumps(event, separators=(",", ":"))
+        with self.__lock:
+            if self.__events_number != 0:
+                self.__output.write(",\n")
+            self.__output.write(line)
+            self.__events_number += 1
@@ -1,5 +1,6 @@
 from pytest_cases import fixture
 
+from statue.cache import Cache
 from statue.configuration import Configuration
 
 
@@ -8,6 +9,11 @@ def mock_find_sources(mocker):
     return mocker.patch("statue.cli.config.find_sources")
 
 
+@fixture(autouse=True)
+def mock_sources_index(mocker):
+    return mocker.patch.object(Cache, "sources_index")
+
+
 @fixture
 def mock_expend(mocker):
     return mocker.patch("statue.cli.config.expend")
@@ -50,6 +50,7 @@ def test_config_init(
     mock_configuration_path,
     mock_cwd,
     mock_find_sources,
+    mock_sources_index,
     mock_toml_dump,
     mock_git_repo,
     cli_runner,
@@ -62,7 +63,12 @@ def test_config_init(
             mock_configuration_path.return_value, mode="w"
         )
         mock_toml_dump.assert_called_once_with(expected_config, mock_open.return_value)
-    mock_find_sources.assert_called_once_with(mock_cwd, repo=mock_git_repo.return_value)
+    mock_find_sources.assert_called_once_with(
+        mock_cwd,
+        repo=mock_git_repo.return_value,
+        sources_index=mock_sources_index.return_value,
+    )
+    mock_sources_index.assert_called_once_with(repo=mock_git_repo.return_value)
     assert result.exit_code == 0
 
 
@@ -74,6 +80,7 @@ def test_config_init_without_repo(
     mock_configuration_path,
     mock_cwd,
     mock_find_sources,
+    mock_sources_index,
     mock_toml_dump,
     mock_git_repo,
     cli_runner,
@@ -87,7 +94,10 @@ def test_config_init_without_repo(
             mock_configuration_path.return_value, mode="w"
         )
         mock_toml_dump.assert_called_once_with(expected_config, mock_open.return_value)
-    mock_find_sources.assert_called_once_with(mock_cwd, repo=None)
+    mock_find_sources.assert_called_once_with(
+        mock_cwd, repo=None, sources_index=mock_sources_index.return_value
+    )
+    mock_sources_index.assert_called_once_with(repo=None)
     assert result.exit_code == 0
 
 
@@ -99,6 +109,7 @@ def test_config_init_with_directory(
     mock_configuration_path,
     tmp_path,
     mock_find_sources,
+    mock_sources_index,
     mock_toml_dump,
     mock_git_repo,
     cli_runner,
@@ -111,5 +122,8 @@ def test_config_init_with_directory(
             mock_configuration_path.return_value, mode="w"
         )
         mock_toml_dump.assert_called_once_with(expected_config, mock_open.return_value)
-    mock_find_sources.assert_called_once_with(tmp_path, repo=mock_git_repo.return_value)
+    mock_find_sources.assert_called_once_with(
+        tmp_path, repo=mock_git_repo.return_value, sources_index=None
+    )
+    mock_sources_index.assert_not_called()
     assert result.exit_code == 0
@@ -101,6 +101,7 @@ def test_interactive_config_init(
     mock_configuration_path,
     mock_cwd,
     mock_find_sources,
+    mock_sources_index,
     mock_toml_dump,
     mock_git_repo,
     cli_runner,
@@ -119,4 +120,9 @@ def test_interactive_config_init(
     assert result.exit_code == 0, f"Exit with code different than 0. {result.exception}"
     mock_open.assert_called_once_with(mock_configuration_path.return_value, mode="w")
     mock_toml_dump.assert_called_once_with(expected_config, mock_open.return_value)
-    mock_find_sources.assert_called_once_with(mock_cwd, repo=mock_git_repo.return_value)
+    mock_find_sources.assert_called_once_with(
+        mock_cwd,
+        repo=mock_git_repo.return_value,
+        sources_index=mock_sources_index.return_value,
+    )
+    mock_sources_index.assert_called_once_with(repo=mock_git_repo.return_value)
@@ -1,9 +1,13 @@
 import datetime
+import json
 
+import pytest
 import regex
 
+from statue.cache import Cache
 from statue.cli.cli import statue as statue_cli
 from statue.evaluation import CommandEvaluation, Evaluation, SourceEvaluation
+from statue.retention import RetentionPolicy
 from tests.constants import (
     COMMAND1,
     COMMAND2,
@@ -13,7 +17,7 @@ from tests.constants import (
     SOURCE1,
     SOURCE2,
 )
-from tests.util import command_mock, evaluation_mock
+from tests.util import command_mock
 
 EPOCH = datetime.datetime.utcfromtimestamp(0)
 TIME_REGEX = r"\d\d/\d\d/\d\d\d\d, \d\d:\d\d:\d\d"
@@ -44,6 +48,22 @@ EVALUATION_REPORT = f"""{SOURCE1}:
 """
 
 
+def evaluation_with_ratio(successful_commands, total_commands):
+    return Evaluation(
+        {
+            SOURCE1: SourceEvaluation(
+                [
+                    CommandEvaluation(
+                        command=command_mock(name=COMMAND1),
+                        success=i < successful_commands,
+                    )
+                    for i in range(total_commands)
+                ]
+            )
+        }
+    )
+
+
 def assert_evaluations(result, evaluations):
     assert (
         result.exit_code == 0
@@ -67,117 +87,472 @@ def test_history_empty_list(cli_runner, mock_cwd):
     assert result.output == "No previous evaluations.\n"
 
 
-def test_history_list_not_empty(cli_runner, mock_cwd, mock_evaluation_load_from_file):
+def save_evaluations(times, evaluations):
+    for time_stamp, evaluation in zip(times, evaluations):
+        Cache.save_evaluation(
+            evaluation, timestamp=(time_stamp - EPOCH).total_seconds()
+        )
+
+
+def test_history_list_not_empty(cli_runner, mock_cwd):
     times = (
         datetime.datetime(year=2021, month=10, day=28, hour=16, minute=38, second=15),
         datetime.datetime(year=2021, month=10, day=28, hour=12, minute=17, second=59),
         datetime.datetime(year=2021, month=10, day=27, hour=19, minute=20, second=0),
     )
-    times_seconds_since_epoch = [
-        int((time_stamp - EPOCH).total_seconds()) for time_stamp in times
-    ]
-    evaluations_dir = mock_cwd / ".statue" / "evaluations"
-    evaluations_dir.mkdir(parents=True)
-    for seconds in times_seconds_since_epoch:
-        (evaluations_dir / f"evaluation-{seconds}.json").touch()
     evaluations = [
-        evaluation_mock(successful_commands=10, total_commands=10),
-        evaluation_mock(successful_commands=2, total_commands=3),
-        evaluation_mock(successful_commands=7, total_commands=7),
+        evaluation_with_ratio(successful_commands=10, total_commands=10),
+        evaluation_with_ratio(successful_commands=2, total_commands=3),
+        evaluation_with_ratio(successful_commands=7, total_commands=7),
     ]
-    mock_evaluation_load_from_file.side_effect = evaluations
+    save_evaluations(reversed(times), reversed(evaluations))
 
     result = cli_runner.invoke(statue_cli, ["history", "list"])
 
     assert_evaluations(result, evaluations)
 
 
-def test_history_list_with_head(cli_runner, mock_cwd, mock_evaluation_load_from_file):
+def test_history_list_with_head(cli_runner, mock_cwd):
     times = (
         datetime.datetime(year=2021, month=10, day=28, hour=16, minute=38, second=15),
         datetime.datetime(year=2021, month=10, day=28, hour=12, minute=17, second=59),
         datetime.datetime(year=2021, month=10, day=27, hour=19, minute=20, second=0),
         datetime.datetime(year=2020, month=12, day=1, hour=10, minute=15, second=35),
     )
-    times_seconds_since_epoch = [
-        int((time_stamp - EPOCH).total_seconds()) for time_stamp in times
-    ]
-    evaluations_dir = mock_cwd / ".statue" / "evaluations"
-    evaluations_dir.mkdir(parents=True)
-    for seconds in times_seconds_since_epoch:
-        (evaluations_dir / f"evaluation-{seconds}.json").touch()
     evaluations = [
-        evaluation_mock(successful_commands=2, total_commands=3),
-        evaluation_mock(successful_commands=10, total_commands=12),
-        evaluation_mock(successful_commands=3, total_commands=3),
+        evaluation_with_ratio(successful_commands=2, total_commands=3),
+        evaluation_with_ratio(successful_commands=10, total_commands=12),
+        evaluation_with_ratio(successful_commands=3, total_commands=3),
+        evaluation_with_ratio(successful_commands=1, total_commands=3),
     ]
-    mock_evaluation_load_from_file.side_effect = evaluations
+    save_evaluations(times, evaluations)
 
     result = cli_runner.invoke(statue_cli, ["history", "list", "--head", "3"])
 
-    assert_evaluations(result, evaluations)
+    assert_evaluations(result, evaluations[:3])
+    assert "4)" not in result.output
 
 
-def test_show_recent_evaluation(
-    cli_runner, mock_cache_evaluation_path, mock_evaluation_load_from_file
-):
-    mock_evaluation_load_from_file.return_value = EVALUATION
+def test_show_recent_evaluation(cli_runner, mock_cwd):
+    Cache.save_evaluation(EVALUATION, timestamp=1)
 
     result = cli_runner.invoke(statue_cli, ["history", "show"])
 
     assert result.exit_code == 0
+    assert "Failure (3/5 successful)" in result.output
     assert EVALUATION_REPORT in result.output
-    mock_cache_evaluation_path.assert_called_once_with(0)
-    mock_evaluation_load_from_file.assert_called_once_with(
-        mock_cache_evaluation_path.return_value
-    )
 
 
-def test_show_recent_evaluation_explicitly(
-    cli_runner, mock_cache_evaluation_path, mock_evaluation_load_from_file
-):
-    mock_evaluation_load_from_file.return_value = EVALUATION
+def test_show_recent_evaluation_explicitly(cli_runner, mock_cwd):
+    Cache.save_evaluation(EVALUATION, timestamp=1)
 
     result = cli_runner.invoke(statue_cli, ["history", "show", "-n", "1"])
 
     assert result.exit_code == 0
     assert EVALUATION_REPORT in result.output
-    mock_cache_evaluation_path.assert_called_once_with(0)
-    mock_evaluation_load_from_file.assert_called_once_with(
-        mock_cache_evaluation_path.return_value
-    )
 
 
-def test_show_3rd_recent_evaluation_explicitly(
-    cli_runner, mock_cache_evaluation_path, mock_evaluation_load_from_file
-):
-    mock_evaluation_load_from_file.return_value = EVALUATION
+def test_show_3rd_recent_evaluation_explicitly(cli_runner, mock_cwd):
+    save_evaluations(
+        [EPOCH + datetime.timedelta(days=days) for days in [3, 2, 1]],
+        [
+            evaluation_with_ratio(successful_commands=1, total_commands=1),
+            evaluation_with_ratio(successful_commands=1, total_commands=2),
+            EVALUATION,
+        ],
+    )
 
     result = cli_runner.invoke(statue_cli, ["history", "show", "-n", "3"])
 
     assert result.exit_code == 0
     assert EVALUATION_REPORT in result.output
-    mock_cache_evaluation_path.assert_called_once_with(2)
-    mock_evaluation_load_from_file.assert_called_once_with(
-        mock_cache_evaluation_path.return_value
-    )
 
 
-def test_show_with_number_zero(
-    cli_runner, mock_cache_evaluation_path, mock_evaluation_load_from_file
-):
+def test_show_not_existing_evaluation(cli_runner, mock_cwd):
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+
+    result = cli_runner.invoke(statue_cli, ["history", "show", "-n", "2"])
+
+    assert result.exit_code == 1
+    assert result.output == "Could not find evaluation number 2.\n"
 
+
+def test_show_with_number_zero(cli_runner, mock_cwd):
     result = cli_runner.invoke(statue_cli, ["history", "show", "-n", "0"])
 
     assert result.exit_code == 2
     assert "Number should be 1 or greater. got 0" in result.output
 
 
-def test_show_with_negative_number(
-    cli_runner, mock_cache_evaluation_path, mock_evaluation_load_from_file
-):
-
+def test_show_with_negative_number(cli_runner, mock_cwd):
     result = cli_runner.invoke(statue_cli, ["history", "show", "-n", "-2"])
 
     assert result.exit_code == 2
     assert "Number should be 1 or greater. got -2" in result.output
+
+
+def test_export_and_import_evaluation(cli_runner, mock_cwd, tmp_path):
+    output_path = tmp_path / "evaluation.json"
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+
+    result = cli_runner.invoke(statue_cli, ["history", "export", str(output_path)])
+
+    assert result.exit_code == 0
+    assert json.loads(output_path.read_text()) == EVALUATION.as_json()
+    assert Evaluation.load_from_file(output_path) == EVALUATION
+
+    result = cli_runner.invoke(statue_cli, ["history", "import", str(output_path)])
+
+    assert result.exit_code == 0
+    assert len(Cache.runs_summaries()) == 2
+    assert Cache.recent_evaluation() == EVALUATION
+
+
+def test_export_not_existing_evaluation(cli_runner, mock_cwd, tmp_path):
+    output_path = tmp_path / "evaluation.json"
+
+    result = cli_runner.invoke(statue_cli, ["history", "export", str(output_path)])
+
+    assert result.exit_code == 1
+    assert result.output == "Could not find evaluation number 1.\n"
+    assert not output_path.exists()
+
+
+def test_import_invalid_evaluation(cli_runner, mock_cwd, tmp_path):
+    input_path = tmp_path / "evaluation.json"
+    input_path.write_text("[1, 2")
+
+    result = cli_runner.invoke(statue_cli, ["history", "import", str(input_path)])
+
+    assert result.exit_code == 1
+    assert result.output == f'Could not import "{input_path}" since it is not valid.\n'
+    assert Cache.runs_summaries() == []
+
+
+@pytest.mark.parametrize("flags", [[], ["--compact"]])
+def test_export_and_import_compressed_evaluation(cli_runner, mock_cwd, tmp_path, flags):
+    output_path = tmp_path / "evaluation.json.gz"
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+
+    result = cli_runner.invoke(
+        statue_cli, ["history", "export", str(output_path), *flags]
+    )
+
+    assert result.exit_code == 0
+    assert output_path.read_bytes().startswith(b"\x1f\x8b")
+
+    result = cli_runner.invoke(statue_cli, ["history", "import", str(output_path)])
+
+    assert result.exit_code == 0
+    assert Cache.recent_evaluation() == EVALUATION
+
+
+def test_import_invalid_compressed_evaluation(cli_runner, mock_cwd, tmp_path):
+    input_path = tmp_path / "evaluation.json.gz"
+    input_path.write_text("[1, 2]")
+
+    result = cli_runner.invoke(statue_cli, ["history", "import", str(input_path)])
+
+    assert result.exit_code == 1
+    assert result.output == f'Could not import "{input_path}" since it is not valid.\n'
+
+
+def test_pin_and_unpin_evaluation(cli_runner, mock_cwd):
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+    Cache.save_evaluation(EVALUATION, timestamp=2)
+
+    result = cli_runner.invoke(statue_cli, ["history", "pin", "-n", "2"])
+
+    assert result.exit_code == 0
+    assert [run_summary.pinned for run_summary in Cache.runs_summaries()] == [
+        False,
+        True,
+    ]
+    result = cli_runner.invoke(statue_cli, ["history", "list"])
+    assert result.output.splitlines()[1].endswith("successful) [pinned]")
+
+    result = cli_runner.invoke(statue_cli, ["history", "unpin", "-n", "2"])
+
+    assert result.exit_code == 0
+    assert not any(run_summary.pinned for run_summary in Cache.runs_summaries())
+
+
+def test_pin_not_existing_evaluation(cli_runner, mock_cwd):
+    result = cli_runner.invoke(statue_cli, ["history", "pin"])
+
+    assert result.exit_code == 1
+    assert result.output == "Could not find evaluation number 1.\n"
+
+    result = cli_runner.invoke(statue_cli, ["history", "unpin"])
+
+    assert result.exit_code == 1
+    assert result.output == "Could not find evaluation number 1.\n"
+
+
+def test_history_list_incomplete_evaluation(cli_runner, mock_cwd):
+    run_id = Cache.start_run(timestamp=1)
+    Cache.record_command_evaluation(
+        run_id, SOURCE1, EVALUATION[SOURCE1].commands_evaluations[0]
+    )
+
+    result = cli_runner.invoke(statue_cli, ["history", "list"])
+
+    assert result.exit_code == 0
+    assert regex.search(
+        rf"1\) {TIME_REGEX} - Incomplete \(1/1 successful\)", result.output
+    )
+
+
+def test_merge_evaluations(cli_runner, mock_cwd, tmp_path):
+    Cache.save_evaluation(evaluation_with_ratio(2, 2), timestamp=1)
+    input_path = tmp_path / "shard.json"
+    Evaluation(
+        {SOURCE2: SourceEvaluation([EVALUATION[SOURCE2].commands_evaluations[1]])}
+    ).save_as_json(input_path)
+    output_path = tmp_path / "merged.json"
+
+    result = cli_runner.invoke(
+        statue_cli,
+        [
+            "history",
+            "merge",
+            str(input_path),
+            "-n",
+            "1",
+            "-o",
+            str(output_path),
+            "--compact",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.output == "Merged 2 evaluations - Failure (1/2 successful)\n"
+    merged_evaluation = Cache.recent_evaluation()
+    assert list(merged_evaluation.keys()) == [SOURCE1, SOURCE2]
+    assert merged_evaluation.commands_number == 2
+    assert json.loads(output_path.read_text())["version"] == 2
+    assert Evaluation.load_from_file(output_path) == merged_evaluation
+
+
+def test_merge_conflicting_evaluations_strictly(cli_runner, mock_cwd):
+    Cache.save_evaluation(evaluation_with_ratio(1, 1), timestamp=1)
+    Cache.save_evaluation(evaluation_with_ratio(0, 1), timestamp=2)
+
+    result = cli_runner.invoke(
+        statue_cli, ["history", "merge", "-n", "1", "-n", "2", "--strict"]
+    )
+
+    assert result.exit_code == 1
+    assert result.output == (
+        f'Evaluations disagree on the result of "{COMMAND1}" over "{SOURCE1}".\n'
+    )
+    assert len(Cache.runs_summaries()) == 2
+
+
+def test_merge_no_evaluations(cli_runner, mock_cwd):
+    result = cli_runner.invoke(statue_cli, ["history", "merge"])
+
+    assert result.exit_code == 1
+    assert result.output == "No evaluations to merge.\n"
+
+
+def test_merge_not_existing_evaluation(cli_runner, mock_cwd):
+    result = cli_runner.invoke(statue_cli, ["history", "merge", "-n", "1"])
+
+    assert result.exit_code == 1
+    assert result.output == "Could not find evaluation number 1.\n"
+
+
+def test_merge_with_invalid_number(cli_runner, mock_cwd):
+    result = cli_runner.invoke(statue_cli, ["history", "merge", "-n", "0"])
+
+    assert result.exit_code == 2
+    assert "Number should be 1 or greater. got 0" in result.output
+
+
+def test_merge_invalid_evaluation(cli_runner, mock_cwd, tmp_path):
+    input_path = tmp_path / "shard.json"
+    input_path.write_text("[")
+
+    result = cli_runner.invoke(statue_cli, ["history", "merge", str(input_path)])
+
+    assert result.exit_code == 1
+    assert result.output == f'Could not merge "{input_path}" since it is not valid.\n'
+    assert Cache.runs_summaries() == []
+
+
+def save_diff_evaluations():
+    Cache.save_evaluation(
+        Evaluation(
+            {
+                SOURCE1: SourceEvaluation(
+                    [
+                        CommandEvaluation(
+                            command=command_mock(name=COMMAND1),
+                            success=True,
+                            duration=1,
+                        ),
+                        CommandEvaluation(
+                            command=command_mock(name=COMMAND2), success=True
+                        ),
+                    ]
+                )
+            }
+        ),
+        timestamp=1,
+    )
+    Cache.save_evaluation(
+        Evaluation(
+            {
+                SOURCE1: SourceEvaluation(
+                    [
+                        CommandEvaluation(
+                            command=command_mock(name=COMMAND1),
+                            success=False,
+                            duration=1.5,
+                        ),
+                        CommandEvaluation(
+                            command=command_mock(name=COMMAND3), success=True
+                        ),
+                    ]
+                )
+            }
+        ),
+        timestamp=2,
+    )
+
+
+def test_diff_evaluations(cli_runner, mock_cwd):
+    save_diff_evaluations()
+
+    result = cli_runner.invoke(statue_cli, ["history", "diff"])
+
+    assert result.exit_code == 0
+    assert result.output == (
+        "Newly failing:\n"
+        f"\t{SOURCE1}: {COMMAND1}\n"
+        "Added:\n"
+        f"\t{SOURCE1}: {COMMAND3}\n"
+        "Removed:\n"
+        f"\t{SOURCE1}: {COMMAND2}\n"
+        "Durations:\n"
+        f"\t{SOURCE1}: {COMMAND1} 1.00s -> 1.50s (+0.50s)\n"
+    )
+
+
+def test_diff_evaluations_as_json(cli_runner, mock_cwd):
+    save_diff_evaluations()
+
+    result = cli_runner.invoke(
+        statue_cli, ["history", "diff", "-n", "2", "-m", "1", "--json"]
+    )
+
+    assert result.exit_code == 0
+    diff_json = json.loads(result.output)
+    assert diff_json["newly_passing"] == [dict(source=SOURCE1, command=COMMAND1)]
+    assert diff_json["added"] == [dict(source=SOURCE1, command=COMMAND2)]
+    assert diff_json["durations"][0]["delta"] == -0.5
+
+
+def test_diff_same_evaluation(cli_runner, mock_cwd):
+    Cache.save_evaluation(EVALUATION)
+
+    result = cli_runner.invoke(statue_cli, ["history", "diff", "-m", "1"])
+
+    assert result.exit_code == 0
+    assert result.output == "No changes in commands results.\n"
+
+
+def test_diff_not_existing_evaluation(cli_runner, mock_cwd):
+    Cache.save_evaluation(EVALUATION)
+
+    result = cli_runner.invoke(statue_cli, ["history", "diff"])
+
+    assert result.exit_code == 1
+    assert result.output == "Could not find evaluation number 2.\n"
+
+
+def test_show_evaluation_with_durations(cli_runner, mock_cwd):
+    save_diff_evaluations()
+
+    result = cli_runner.invoke(statue_cli, ["history", "show"])
+
+    assert result.exit_code == 0
+    assert f"\t{COMMAND1} - Failure (1.50s)\n\t{COMMAND3} - Success\n" in result.output
+
+
+def save_timed_evaluations(durations):
+    for timestamp, duration in enumerate(durations):
+        Cache.save_evaluation(
+            Evaluation(
+                {
+                    SOURCE1: SourceEvaluation(
+                        [
+                            CommandEvaluation(
+                                command=command_mock(name=COMMAND1),
+                                success=timestamp != 0,
+                                duration=duration,
+                            ),
+                            CommandEvaluation(
+                                command=command_mock(name=COMMAND2), success=True
+                            ),
+                        ]
+                    )
+                }
+            ),
+            timestamp=timestamp,
+            retention_policy=RetentionPolicy(max_runs=None),
+        )
+
+
+def test_history_stats(cli_runner, mock_cwd):
+    save_timed_evaluations([1.0, 1.1, 0.9, 1.0] * 5 + [1.4, 1.5, 1.3, 1.4] * 3)
+
+    result = cli_runner.invoke(statue_cli, ["history", "stats", "--window", "12"])
+
+    assert result.exit_code == 0
+    assert regex.fullmatch(
+        (
+            f"{SOURCE1}:\n"
+            rf"\t{COMMAND1} - 32 runs, 3\.1% failed, median 1\.10s, p95 1\.50s, "
+            r"trend 1\.39s - 40% slower \(p-value \S+\)\n"
+            rf"\t{COMMAND2} - 32 runs, 0\.0% failed\n"
+        ),
+        result.output,
+    )
+
+
+def test_history_stats_with_short_baseline(cli_runner, mock_cwd):
+    save_timed_evaluations([1.0, 1.1, 0.9, 1.0] * 5 + [1.4, 1.5, 1.3, 1.4] * 3)
+
+    result = cli_runner.invoke(
+        statue_cli,
+        ["history", "stats", "--json", "--window", "12", "--baseline", "2"],
+    )
+
+    assert result.exit_code == 0
+    stats = json.loads(result.output)
+    assert stats[0]["p_value"] is None
+    assert stats[0]["slowdown"] is None
+
+
+def test_history_stats_as_json(cli_runner, mock_cwd):
+    save_timed_evaluations([1.0, 2.0, 3.0])
+
+    result = cli_runner.invoke(
+        statue_cli, ["history", "stats", "--json", "--head", "2"]
+    )
+
+    assert result.exit_code == 0
+    stats = json.loads(result.output)
+    assert [
+        (command_stats["command"], command_stats["runs"]) for command_stats in stats
+    ] == [(COMMAND1, 2), (COMMAND2, 2)]
+    assert stats[0]["median_duration"] == 2.5
+
+
+def test_history_stats_without_evaluations(cli_runner, mock_cwd):
+    result = cli_runner.invoke(statue_cli, ["history", "stats"])
+
+    assert result.exit_code == 0
+    assert result.output == "No previous evaluations.\n"
@@ -0,0 +1,150 @@
+import pytest
+
+from statue.cli.cli import statue as statue_cli
+from statue.command import Command
+from statue.constants import SOURCES
+from statue.exceptions import (
+    CommandExecutionError,
+    MissingConfiguration,
+    UnknownContext,
+)
+from tests.constants import (
+    COMMAND1,
+    COMMAND2,
+    COMMAND_HELP_STRING1,
+    COMMAND_HELP_STRING2,
+    CONTEXT1,
+    SOURCE1,
+)
+
+COMMAND_1 = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+COMMAND_2 = Command(name=COMMAND2, help=COMMAND_HELP_STRING2)
+
+
+@pytest.fixture
+def mock_read_commands_map(mocker):
+    return mocker.patch("statue.cli.profile.read_commands_map")
+
+
+@pytest.fixture
+def mock_run_subprocess(mocker):
+    return mocker.patch.object(Command, "_run_subprocess", return_value=0)
+
+
+@pytest.fixture
+def source_files(mock_cwd, monkeypatch):
+    monkeypatch.chdir(mock_cwd)
+    (mock_cwd / SOURCE1).mkdir()
+    for name in ["a.py", "b.py", "c.py"]:
+        (mock_cwd / SOURCE1 / name).write_text(f"# {name}")
+    return [f"{SOURCE1}/{name}" for name in ["a.py", "b.py", "c.py"]]
+
+
+@pytest.fixture
+def mock_monotonic(mocker):
+    # Each file takes as many seconds as the number of the letter in its name
+    clock = dict(now=0.0)
+
+    def run_subprocess(args, verbosity, output, usage):
+        clock["now"] += " abc".index(args[1][-4])
+        return 0 if args[1].endswith("a.py") else 1
+
+    mocker.patch.object(Command, "_run_subprocess", side_effect=run_subprocess)
+    mocker.patch("time.monotonic", side_effect=lambda: clock["now"])
+
+
+def test_profile_shows_slowest_files(
+    cli_runner, mock_read_commands_map, source_files, mock_monotonic
+):
+    mock_read_commands_map.return_value = {SOURCE1: [COMMAND_1, COMMAND_2]}
+
+    result = cli_runner.invoke(statue_cli, ["profile", "--top", "2", "-j", "1"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output == (
+        f"{COMMAND1} (6.000s on 3 files):\n"
+        f"\t   3.000s  50.0% {source_files[2]} ({SOURCE1})\n"
+        f"\t   2.000s  33.3% {source_files[1]} ({SOURCE1})\n"
+        f"{COMMAND2} (6.000s on 3 files):\n"
+        f"\t   3.000s  50.0% {source_files[2]} ({SOURCE1})\n"
+        f"\t   2.000s  33.3% {source_files[1]} ({SOURCE1})\n"
+    )
+
+
+def test_profile_reuses_timings_of_unchanged_files(
+    cli_runner, mock_read_commands_map, source_files, mock_run_subprocess
+):
+    mock_read_commands_map.return_value = {SOURCE1: [COMMAND_1]}
+
+    cli_runner.invoke(statue_cli, ["profile"])
+    assert mock_run_subprocess.call_count == 3
+    with open(source_files[0], mode="a") as source_file:
+        source_file.write("\nchanged = True\n")
+    result = cli_runner.invoke(statue_cli, ["profile"])
+
+    assert result.exit_code == 0
+    assert mock_run_subprocess.call_count == 4
+    assert mock_run_subprocess.call_args[0][0] == [COMMAND1, source_files[0]]
+
+
+def test_profile_without_cache(
+    cli_runner, mock_read_commands_map, source_files, mock_run_subprocess
+):
+    mock_read_commands_map.return_value = {SOURCE1: [COMMAND_1]}
+
+    cli_runner.invoke(statue_cli, ["profile", "--no-cache"])
+    cli_runner.invoke(statue_cli, ["profile"])
+
+    assert mock_run_subprocess.call_count == 6
+
+
+def test_profile_passes_options_to_commands_map(
+    cli_runner, mock_read_commands_map, source_files, mock_run_subprocess
+):
+    mock_read_commands_map.return_value = {SOURCE1: [COMMAND_1]}
+
+    cli_runner.invoke(
+        statue_cli, ["profile", SOURCE1, "-c", CONTEXT1, "-a", COMMAND1, "-d", COMMAND2]
+    )
+
+    mock_read_commands_map.assert_called_once_with(
+        (SOURCE1,), contexts=(CONTEXT1,), allow_list=(COMMAND1,), deny_list=(COMMAND2,)
+    )
+
+
+def test_profile_with_empty_commands_map(cli_runner, mock_read_commands_map, mock_cwd):
+    mock_read_commands_map.return_value = {}
+
+    result = cli_runner.invoke(statue_cli, ["profile"])
+
+    assert result.exit_code == 0
+    assert result.output.startswith("Usage:")
+
+
+@pytest.mark.parametrize(
+    "error", [UnknownContext(CONTEXT1), MissingConfiguration(SOURCES)]
+)
+def test_profile_with_invalid_commands_map(
+    cli_runner, mock_read_commands_map, mock_cwd, error
+):
+    mock_read_commands_map.side_effect = error
+
+    result = cli_runner.invoke(statue_cli, ["profile"])
+
+    assert result.exit_code == 1
+    assert result.output == f"{error}\n"
+
+
+def test_profile_with_missing_command(
+    cli_runner, mock_read_commands_map, source_files, mock_run_subprocess
+):
+    mock_read_commands_map.return_value = {SOURCE1: [COMMAND_1]}
+    mock_run_subprocess.side_effect = CommandExecutionError(COMMAND1)
+
+    result = cli_runner.invoke(statue_cli, ["profile"])
+
+    assert result.exit_code == 1
+    assert result.output == (
+        f'Cannot execute "{COMMAND1}" because it is not installed.\n'
+        'Try to install the missing command with "statue run -i"\n'
+    )
@@ -1,15 +1,25 @@
 import itertools
 import json
+import pstats
+import time
 
+import pytest
+import regex
+from click.testing import CliRunner
 from pytest_cases import fixture
 
+from statue.cache import Cache
 from statue.cli.cli import statue as statue_cli
+from statue.commands_map import commands_map_fingerprint
 from statue.constants import SOURCES
+from statue.evaluation import CommandEvaluation, Evaluation, SourceEvaluation
 from statue.exceptions import (
     CommandExecutionError,
     MissingConfiguration,
     UnknownContext,
 )
+from statue.hooks import Hooks
+from statue.profiler import Profiler
 from statue.verbosity import DEFAULT_VERBOSITY
 from tests.constants import (
     COMMAND1,
@@ -55,7 +65,7 @@ def assert_successful_run(result):
 
 
 def test_simple_run(
-    cli_runner, mock_read_commands_map, mock_cache_save_evaluation, mock_cwd
+    cli_runner, mock_read_commands_map, mock_cache_finish_run, mock_cwd
 ):
     mock_read_commands_map.return_value = COMMANDS_MAP
 
@@ -63,11 +73,11 @@ def test_simple_run(
 
     assert_successful_run(result)
     mock_read_commands_map.assert_called_once()
-    mock_cache_save_evaluation.assert_called_once()
+    mock_cache_finish_run.assert_called_once()
 
 
 def test_run_with_no_cache(
-    cli_runner, mock_read_commands_map, mock_cache_save_evaluation, mock_cwd
+    cli_runner, mock_read_commands_map, mock_cache_finish_run, mock_cwd
 ):
     mock_read_commands_map.return_value = COMMANDS_MAP
 
@@ -75,11 +85,11 @@ def test_run_with_no_cache(
 
     assert_successful_run(result)
     mock_read_commands_map.assert_called_once()
-    mock_cache_save_evaluation.assert_not_called()
+    mock_cache_finish_run.assert_not_called()
 
 
 def test_run_and_install(
-    cli_runner, mock_read_commands_map, mock_cache_save_evaluation, mock_cwd
+    cli_runner, mock_read_commands_map, mock_cache_finish_run, mock_cwd
 ):
     mock_read_commands_map.return_value = COMMANDS_MAP
 
@@ -87,7 +97,7 @@ def test_run_and_install(
 
     assert_successful_run(result)
     mock_read_commands_map.assert_called_once()
-    mock_cache_save_evaluation.assert_called_once()
+    mock_cache_finish_run.assert_called_once()
 
     for command in itertools.chain.from_iterable(COMMANDS_MAP.values()):
         command.install.assert_called_once_with(verbosity=DEFAULT_VERBOSITY)
@@ -96,7 +106,7 @@ def test_run_and_install(
 def test_run_and_save_to_file(
     cli_runner,
     mock_read_commands_map,
-    mock_cache_save_evaluation,
+    mock_cache_finish_run,
     tmpdir_factory,
     mock_cwd,
 ):
@@ -109,35 +119,160 @@ def test_run_and_save_to_file(
 
     assert_successful_run(result)
     mock_read_commands_map.assert_called_once()
-    mock_cache_save_evaluation.assert_called_once()
+    mock_cache_finish_run.assert_called_once()
 
     with open(output_path, mode="r") as fd:
         saved_evaluation = json.load(fd)
     assert set(saved_evaluation.keys()) == set(COMMANDS_MAP.keys())
 
 
+def test_run_and_save_to_compact_file(
+    cli_runner,
+    mock_read_commands_map,
+    mock_cache_finish_run,
+    tmp_path,
+    mock_cwd,
+):
+    mock_read_commands_map.return_value = COMMANDS_MAP
+    output_path = tmp_path / "output.json"
+
+    result = cli_runner.invoke(statue_cli, ["run", "-o", str(output_path), "--compact"])
+
+    assert_successful_run(result)
+    saved_evaluation = json.loads(output_path.read_text())
+    assert saved_evaluation["version"] == 2
+    assert set(saved_evaluation["sources"].keys()) == set(COMMANDS_MAP.keys())
+
+
+def test_run_and_stream_to_json_lines_file(
+    cli_runner,
+    mock_read_commands_map,
+    mock_cache_finish_run,
+    tmpdir_factory,
+    mock_cwd,
+):
+    mock_read_commands_map.return_value = COMMANDS_MAP
+    output_path = tmpdir_factory.mktemp("bla") / "output.jsonl"
+
+    result = cli_runner.invoke(statue_cli, ["run", "-o", str(output_path)])
+
+    assert_successful_run(result)
+    with open(output_path, mode="r") as fd:
+        lines = [json.loads(line) for line in fd]
+    assert [(line["source"], line["command"]["name"]) for line in lines] == [
+        (source, command.name)
+        for source, commands in COMMANDS_MAP.items()
+        for command in commands
+    ]
+
+
+def test_run_records_each_command_evaluation(
+    cli_runner,
+    mock_read_commands_map,
+    mock_cache_start_run,
+    mock_cache_record_command_evaluation,
+    mock_cache_finish_run,
+    mock_cwd,
+):
+    mock_read_commands_map.return_value = COMMANDS_MAP
+
+    result = cli_runner.invoke(statue_cli, ["run"])
+
+    assert_successful_run(result)
+    run_id = mock_cache_start_run.return_value
+    assert [
+        (call_args[0][0], call_args[0][1], call_args[0][2].command)
+        for call_args in mock_cache_record_command_evaluation.call_args_list
+    ] == [
+        (run_id, source, command)
+        for source, commands in COMMANDS_MAP.items()
+        for command in commands
+    ]
+    assert mock_cache_finish_run.call_args[0] == (run_id,)
+
+
+def test_run_warns_about_overlapping_sources(
+    cli_runner, mock_read_commands_map, mock_cache_finish_run, mock_cwd
+):
+    nested_source = f"{SOURCE1}/inner"
+    mock_read_commands_map.return_value = {
+        SOURCE1: [command_mock(name=COMMAND1, return_code=0)],
+        nested_source: [command_mock(name=COMMAND1, return_code=0)],
+    }
+
+    result = cli_runner.invoke(statue_cli, ["run"])
+
+    assert_successful_run(result)
+    assert (
+        "Warning: the following sources overlap. "
+        "Nested sources are excluded from the sources containing them:\n"
+        f"\t{SOURCE1}: {nested_source}\n"
+    ) in result.output
+
+
 def test_run_over_failed_commands(
     cli_runner,
-    mock_cache_recent_evaluation_path,
-    mock_evaluation_load_from_file,
-    mock_get_failure_map,
-    tmp_path_factory,
+    mock_cache_failure_map,
+    mock_read_commands_map,
+    mock_cache_finish_run,
+    mock_cwd,
+):
+    mock_cache_failure_map.return_value = FAILURE_MAP
+
+    result = cli_runner.invoke(statue_cli, ["run", "-f"])
+
+    assert_successful_run(result)
+    mock_cache_failure_map.assert_called_once_with()
+    mock_read_commands_map.assert_not_called()
+    for commands in FAILURE_MAP.values():
+        for command in commands:
+            command.execute.assert_called()
+
+
+@pytest.mark.parametrize(
+    ("args", "captured"),
+    [
+        ([], False),
+        (["-f"], True),
+        (["-o", "evaluation.json"], True),
+        (["--metrics-output", "statue.prom"], True),
+    ],
+)
+def test_run_captures_output_only_when_needed(
+    cli_runner, mock_read_commands_map, mock_cache_failure_map, mock_cwd, args, captured
+):
+    command = command_mock(name="flake8", return_code=0)
+    mock_read_commands_map.return_value = {SOURCE1: [command]}
+    mock_cache_failure_map.return_value = {SOURCE1: [command]}
+
+    with cli_runner.isolated_filesystem():
+        result = cli_runner.invoke(statue_cli, ["run", *args])
+
+    assert_successful_run(result)
+    output = command.execute.call_args[1]["output"]
+    assert (output is not None) == captured
+
+
+def test_run_over_failed_commands_with_no_failures(
+    cli_runner,
+    mock_cache_failure_map,
+    mock_read_commands_map,
+    mock_cache_finish_run,
     mock_cwd,
 ):
-    recent_cache = tmp_path_factory.mktemp("cache.json")
-    mock_cache_recent_evaluation_path.return_value = recent_cache
-    mock_get_failure_map.side_effect = [COMMANDS_MAP, {}]
+    mock_cache_failure_map.return_value = {}
+    mock_read_commands_map.return_value = COMMANDS_MAP
 
     result = cli_runner.invoke(statue_cli, ["run", "-f"])
 
     assert_successful_run(result)
-    mock_evaluation_load_from_file.assert_called_once_with(recent_cache)
+    mock_read_commands_map.assert_called_once()
 
 
 def test_run_has_failed(
     cli_runner,
     mock_read_commands_map,
-    mock_cache_save_evaluation,
+    mock_cache_finish_run,
     mock_get_failure_map,
     mock_cwd,
 ):
@@ -148,7 +283,7 @@ def test_run_has_failed(
 
     assert result.exit_code == 1
     mock_read_commands_map.assert_called_once()
-    mock_cache_save_evaluation.assert_called_once()
+    mock_cache_finish_run.assert_called_once()
     for source, commands in FAILURE_MAP.items():
         failure_string = (
             f"{source}:\n" f"\t{', '.join([command.name for command in commands])}"
@@ -159,7 +294,7 @@ def test_run_has_failed(
 def test_run_with_unknown_context(
     cli_runner,
     mock_read_commands_map,
-    mock_cache_save_evaluation,
+    mock_cache_finish_run,
     mock_cwd,
 ):
     mock_read_commands_map.side_effect = UnknownContext(
@@ -170,13 +305,13 @@ def test_run_with_unknown_context(
 
     assert result.exit_code == 1
     assert f'Could not find context named "{NOT_EXISTING_CONTEXT}".' in result.output
-    mock_cache_save_evaluation.assert_not_called()
+    mock_cache_finish_run.assert_not_called()
 
 
 def test_run_with_missing_configuration(
     cli_runner,
     mock_read_commands_map,
-    mock_cache_save_evaluation,
+    mock_cache_finish_run,
     mock_cwd,
 ):
     mock_read_commands_map.side_effect = MissingConfiguration(part_name=SOURCES)
@@ -190,13 +325,13 @@ def test_run_with_missing_configuration(
         'Please consider running "statue config init" in order to initialize '
         "default configuration."
     ) in result.output
-    mock_cache_save_evaluation.assert_not_called()
+    mock_cache_finish_run.assert_not_called()
 
 
 def test_run_with_none_commands_map(
     cli_runner,
     mock_read_commands_map,
-    mock_cache_save_evaluation,
+    mock_cache_finish_run,
     mock_cwd,
 ):
     mock_read_commands_map.return_value = None
@@ -204,11 +339,11 @@ def test_run_with_none_commands_map(
     result = cli_runner.invoke(statue_cli, ["run"])
     assert result.exit_code == 0
     assert result.output.startswith("Usage: statue run [OPTIONS] [SOURCES]...")
-    mock_cache_save_evaluation.assert_not_called()
+    mock_cache_finish_run.assert_not_called()
 
 
 def test_run_with_command_raises_exception(
-    cli_runner, mock_read_commands_map, mock_cache_save_evaluation, mock_cwd
+    cli_runner, mock_read_commands_map, mock_cache_finish_run, mock_cwd
 ):
     mock_read_commands_map.return_value = COMMANDS_MAP
     some_command = COMMANDS_MAP[SOURCE2][0]
@@ -221,4 +356,518 @@ def test_run_with_command_raises_exception(
     assert result.exit_code == 1
     assert 'Try to rerun with the "-i" flag' in result.output
     mock_read_commands_map.assert_called_once()
-    mock_cache_save_evaluation.assert_not_called()
+    mock_cache_finish_run.assert_not_called()
+
+
+def new_commands_map():
+    return {
+        SOURCE1: [
+            command_mock(name=COMMAND1, return_code=0),
+            command_mock(name=COMMAND2, return_code=1),
+        ],
+        SOURCE2: [command_mock(name=COMMAND3, return_code=0)],
+    }
+
+
+def interrupted_run(commands_map, fingerprint=None):
+    run_id = Cache.start_run(
+        fingerprint=(
+            commands_map_fingerprint(commands_map)
+            if fingerprint is None
+            else fingerprint
+        )
+    )
+    Cache.record_command_evaluation(
+        run_id,
+        SOURCE1,
+        CommandEvaluation(command=commands_map[SOURCE1][0], success=True),
+    )
+    return run_id
+
+
+def test_run_resumes_interrupted_run(cli_runner, mock_read_commands_map, mock_cwd):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    run_id = interrupted_run(commands_map)
+
+    result = cli_runner.invoke(statue_cli, ["run", "--resume"])
+
+    assert result.exit_code == 1
+    assert "Resuming interrupted run. Skipping 1 evaluated commands." in result.output
+    assert f"{SOURCE1}:\n\t{COMMAND2}\n" in result.output
+    commands_map[SOURCE1][0].execute.assert_not_called()
+    commands_map[SOURCE1][1].execute.assert_called_once()
+    commands_map[SOURCE2][0].execute.assert_called_once()
+    run_summaries = Cache.runs_summaries()
+    assert [
+        (run_summary.run_id, run_summary.complete) for run_summary in run_summaries
+    ] == [(run_id, True)]
+    assert Cache.recent_evaluation() == Evaluation(
+        {
+            SOURCE1: SourceEvaluation(
+                [
+                    CommandEvaluation(command=commands_map[SOURCE1][0], success=True),
+                    CommandEvaluation(command=commands_map[SOURCE1][1], success=False),
+                ]
+            ),
+            SOURCE2: SourceEvaluation(
+                [CommandEvaluation(command=commands_map[SOURCE2][0], success=True)]
+            ),
+        }
+    )
+
+
+def test_run_resumes_interrupted_run_into_json_lines_file(
+    cli_runner, mock_read_commands_map, tmp_path, mock_cwd
+):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    interrupted_run(commands_map)
+    output_path = tmp_path / "output.jsonl"
+
+    result = cli_runner.invoke(statue_cli, ["run", "--resume", "-o", str(output_path)])
+
+    assert result.exit_code == 1
+    assert Evaluation.load_from_file(output_path) == Cache.recent_evaluation()
+
+
+def test_run_does_not_resume_changed_run(cli_runner, mock_read_commands_map, mock_cwd):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    interrupted_run(commands_map, fingerprint="changed")
+
+    result = cli_runner.invoke(statue_cli, ["run", "--resume"])
+
+    assert result.exit_code == 1
+    assert (
+        "Commands or sources were changed since the interrupted run. "
+        "Running all commands."
+    ) in result.output
+    commands_map[SOURCE1][0].execute.assert_called_once()
+    assert [run_summary.complete for run_summary in Cache.runs_summaries()] == [
+        True,
+        False,
+    ]
+
+
+def test_run_resume_without_interrupted_run(
+    cli_runner, mock_read_commands_map, mock_cwd
+):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+
+    result = cli_runner.invoke(statue_cli, ["run", "--resume"])
+
+    assert result.exit_code == 1
+    assert "No interrupted run to resume. Running all commands." in result.output
+    commands_map[SOURCE1][0].execute.assert_called_once()
+
+
+def test_run_resume_silently(cli_runner, mock_read_commands_map, mock_cwd):
+    for fingerprint in [None, "changed"]:
+        commands_map = new_commands_map()
+        mock_read_commands_map.return_value = commands_map
+        result = cli_runner.invoke(statue_cli, ["run", "--resume", "--silent"])
+        assert result.exit_code == 1
+        interrupted_run(commands_map, fingerprint=fingerprint)
+        result = cli_runner.invoke(statue_cli, ["run", "--resume", "--silent"])
+        assert result.exit_code == 1
+        assert "resume" not in result.output
+        assert "Running all commands" not in result.output
+
+
+def test_run_resume_with_no_cache(cli_runner, mock_read_commands_map, mock_cwd):
+    result = cli_runner.invoke(statue_cli, ["run", "--resume", "--no-cache"])
+
+    assert result.exit_code == 1
+    assert result.output == 'Cannot resume evaluation with "--no-cache".\n'
+    mock_read_commands_map.assert_not_called()
+
+
+def test_run_interrupted(cli_runner, mock_read_commands_map, mock_cwd):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    commands_map[SOURCE1][1].execute.side_effect = KeyboardInterrupt()
+
+    result = cli_runner.invoke(statue_cli, ["run"])
+
+    assert result.exit_code == 130
+    assert result.output.endswith(
+        "Evaluation was interrupted.\n"
+        'Run "statue run --resume" in order to resume it.\n'
+    )
+    commands_map[SOURCE2][0].execute.assert_not_called()
+    run_summary = Cache.run_summary(0)
+    assert not run_summary.complete
+    assert run_summary.commands_number == 1
+
+
+def test_run_interrupted_with_no_cache(cli_runner, mock_read_commands_map, mock_cwd):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    commands_map[SOURCE1][0].execute.side_effect = KeyboardInterrupt()
+
+    result = cli_runner.invoke(statue_cli, ["run", "--no-cache"])
+
+    assert result.exit_code == 130
+    assert result.output.endswith("Evaluation was interrupted.\n")
+
+
+def test_run_with_profile(cli_runner, mock_read_commands_map, mock_cwd):
+    mock_read_commands_map.return_value = {
+        SOURCE1: [
+            command_mock(name=COMMAND1, return_code=0),
+            command_mock(name=COMMAND2, return_code=0),
+        ]
+    }
+    Profiler.reset()
+
+    result = cli_runner.invoke(statue_cli, ["run", "--profile"])
+
+    assert_successful_run(result)
+    profile = result.output[result.output.index("Profile:") :]
+    assert regex.fullmatch(
+        (
+            r"Profile:\n"
+            r"\tstart-up: \d+\.\d{3}s\n"
+            r"\tconfiguration load: \d+\.\d{3}s\n"
+            r"\tcommands map build: \d+\.\d{3}s\n"
+            r"\tsources fingerprint: \d+\.\d{3}s\n"
+            r"\thistory save: \d+\.\d{3}s \(4 times, \d+\.\dms each\)\n"
+            r"\tother: -?\d+\.\d{3}s\n"
+            r"Tools took 0\.000s of \d+\.\d{3}s wall time\. "
+            r"Statue overhead is \d+\.\d{3}s \(100\.0%\)\.\n"
+        ),
+        profile,
+    )
+
+
+def test_run_with_profile_output(cli_runner, mock_read_commands_map, mock_cwd):
+    mock_read_commands_map.return_value = {
+        SOURCE1: [command_mock(name=COMMAND1, return_code=0)]
+    }
+    profile_output = mock_cwd / "statue.prof"
+
+    result = cli_runner.invoke(
+        statue_cli, ["run", "--profile-output", str(profile_output)]
+    )
+
+    assert_successful_run(result)
+    assert "Profile:" not in result.output
+    assert pstats.Stats(str(profile_output)).total_calls > 0
+
+
+def test_run_with_trace(cli_runner, mock_read_commands_map, tmp_path, mock_cwd):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    trace_path = tmp_path / "trace.json"
+
+    result = cli_runner.invoke(statue_cli, ["run", "--trace", str(trace_path)])
+
+    assert result.exit_code == 1
+    with open(trace_path) as trace_file:
+        events = json.load(trace_file)
+    assert [
+        (event["ph"], event["name"], event["args"].get("source", None))
+        for event in events
+    ] == [
+        ("M", "process_name", None),
+        ("M", "thread_name", None),
+        ("X", COMMAND1, SOURCE1),
+        ("X", COMMAND2, SOURCE1),
+        ("X", COMMAND3, SOURCE2),
+    ]
+
+
+def test_run_with_trace_of_resumed_run(
+    cli_runner, mock_read_commands_map, tmp_path, mock_cwd
+):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    interrupted_run(commands_map)
+    trace_path = tmp_path / "trace.json"
+
+    cli_runner.invoke(statue_cli, ["run", "--resume", "--trace", str(trace_path)])
+
+    with open(trace_path) as trace_file:
+        events = json.load(trace_file)
+    assert [(event["ph"], event["name"]) for event in events[2:]] == [
+        ("i", "resumed"),
+        ("X", COMMAND2),
+        ("X", COMMAND3),
+    ]
+    assert events[2]["args"] == dict(source=SOURCE1, command=COMMAND1)
+
+
+def test_run_with_trace_interrupted(
+    cli_runner, mock_read_commands_map, tmp_path, mock_cwd
+):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    commands_map[SOURCE1][1].execute.side_effect = KeyboardInterrupt()
+    trace_path = tmp_path / "trace.json"
+
+    result = cli_runner.invoke(statue_cli, ["run", "--trace", str(trace_path)])
+
+    assert result.exit_code == 130
+    with open(trace_path) as trace_file:
+        events = json.load(trace_file)
+    assert [(event["ph"], event["name"]) for event in events[2:]] == [
+        ("X", COMMAND1),
+        ("i", "interrupted"),
+    ]
+
+
+def test_run_with_metrics_output(
+    cli_runner, mock_read_commands_map, tmp_path, mock_cwd
+):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    interrupted_run(commands_map)
+    metrics_path = tmp_path / "statue.prom"
+
+    result = cli_runner.invoke(
+        statue_cli, ["run", "--resume", "--metrics-output", str(metrics_path)]
+    )
+
+    assert result.exit_code == 1
+    lines = metrics_path.read_text().splitlines()
+    for command, source, metric, value in [
+        (COMMAND1, SOURCE1, "tasks_total", 1),
+        (COMMAND1, SOURCE1, "cache_hits_total", 1),
+        (COMMAND1, SOURCE1, "cache_misses_total", 0),
+        (COMMAND2, SOURCE1, "failures_total", 1),
+        (COMMAND2, SOURCE1, "cache_misses_total", 1),
+        (COMMAND3, SOURCE2, "failures_total", 0),
+    ]:
+        assert (
+            f'statue_command_{metric}{{command="{command}",context="",'
+            f'source_group="{source}"}} {value}'
+        ) in lines
+
+
+def test_run_with_sample_interval(
+    cli_runner, mock_read_commands_map, tmp_path, mock_cwd
+):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    commands_map[SOURCE1][0].execute.side_effect = lambda *args, **kwargs: (
+        time.sleep(0.1) or 0
+    )
+    trace_path = tmp_path / "trace.json"
+
+    result = cli_runner.invoke(
+        statue_cli,
+        ["run", "--trace", str(trace_path), "--sample-interval", "0.01"],
+    )
+
+    assert result.exit_code == 1
+    with open(trace_path) as trace_file:
+        events = json.load(trace_file)
+    counters = [event for event in events if event["ph"] == "C"]
+    assert {event["name"] for event in counters} == {
+        "tools cpu",
+        "tools memory",
+        "tools threads",
+    }
+    assert set(counters[2]["args"].keys()) == {"threads", "processes"}
+
+
+def test_run_with_sample_interval_without_trace(
+    cli_runner, mock_read_commands_map, mock_cwd
+):
+    mock_read_commands_map.return_value = new_commands_map()
+
+    result = cli_runner.invoke(statue_cli, ["run", "--sample-interval", "1"])
+
+    assert result.exit_code == 1
+    assert result.output == 'Cannot sample resources without "--trace".\n'
+
+
+def test_run_with_sample_interval_unsupported(
+    cli_runner, mocker, mock_read_commands_map, tmp_path, mock_cwd
+):
+    mocker.patch("statue.cli.run.is_supported", return_value=False)
+    mock_read_commands_map.return_value = new_commands_map()
+    trace_path = tmp_path / "trace.json"
+
+    result = cli_runner.invoke(
+        statue_cli, ["run", "--trace", str(trace_path), "--sample-interval", "1"]
+    )
+
+    assert result.exit_code == 1
+    assert "Resources sampling is supported only on platforms with procfs." in (
+        result.output
+    )
+
+
+def test_run_emits_hooks(cli_runner, mock_read_commands_map, mock_cwd, hooks_plugin):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    interrupted_run(commands_map)
+
+    cli_runner.invoke(statue_cli, ["run", "--resume"])
+
+    hooks_plugin.on_configuration_loaded.assert_called_once_with(config=None)
+    hooks_plugin.on_commands_map_built.assert_called_once_with(
+        commands_map=commands_map
+    )
+    hooks_plugin.on_cache_hit.assert_called_once()
+    assert hooks_plugin.on_cache_hit.call_args[1]["source"] == SOURCE1
+    assert hooks_plugin.on_task_finished.call_count == 2
+    evaluation = hooks_plugin.on_run_finished.call_args[1]["evaluation"]
+    assert evaluation.commands_number == 3
+
+
+def test_run_with_jsonl_format(cli_runner, mock_read_commands_map, mock_cwd):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    interrupted_run(commands_map)
+
+    result = cli_runner.invoke(statue_cli, ["run", "--resume", "--format", "jsonl"])
+
+    assert result.exit_code == 1
+    events = [json.loads(line) for line in result.output.splitlines()]
+    assert [
+        (event["event"], event.get("source", None), event.get("success", None))
+        for event in events
+    ] == [
+        ("task_cached", SOURCE1, True),
+        ("task_started", SOURCE1, None),
+        ("task_finished", SOURCE1, False),
+        ("task_started", SOURCE2, None),
+        ("task_finished", SOURCE2, True),
+        ("run_finished", None, False),
+    ]
+    assert events[2]["command"]["name"] == COMMAND2
+    assert events[2]["output"] == ""
+    assert events[-1]["commands_number"] == 3
+    assert Hooks.plugins() == []
+
+
+def test_run_with_jsonl_format_successfully(
+    cli_runner, mock_read_commands_map, mock_cwd
+):
+    mock_read_commands_map.return_value = {
+        SOURCE1: [command_mock(name=COMMAND1, return_code=0)]
+    }
+
+    result = cli_runner.invoke(statue_cli, ["run", "--format", "jsonl"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.output.splitlines()[-1])["success"]
+
+
+def test_run_with_jsonl_format_writes_errors_to_stderr(
+    mock_read_commands_map, mock_cwd
+):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    commands_map[SOURCE1][1].execute.side_effect = CommandExecutionError(COMMAND2)
+
+    result = CliRunner(mix_stderr=False).invoke(
+        statue_cli, ["run", "--format", "jsonl"]
+    )
+
+    assert result.exit_code == 1
+    assert [json.loads(line)["event"] for line in result.stdout.splitlines()] == [
+        "task_started",
+        "task_finished",
+        "task_started",
+    ]
+    assert result.stderr == (
+        f'Cannot execute "{COMMAND2}" because it is not installed.\n'
+        'Try to rerun with the "-i" flag\n'
+    )
+    assert Hooks.plugins() == []
+
+
+def test_run_with_jsonl_format_interrupted(mock_read_commands_map, mock_cwd):
+    commands_map = new_commands_map()
+    mock_read_commands_map.return_value = commands_map
+    commands_map[SOURCE1][1].execute.side_effect = KeyboardInterrupt()
+
+    result = CliRunner(mix_stderr=False).invoke(
+        statue_cli, ["run", "--format", "jsonl"]
+    )
+
+    assert result.exit_code == 130
+    assert "Evaluation was interrupted." in result.stderr
+    assert "Evaluation was interrupted." not in result.stdout
+
+
+def assert_jsonl_stdout(result):
+    for line in result.stdout.splitlines():
+        assert isinstance(json.loads(line), dict), line
+
+
+@pytest.mark.parametrize(
+    ("args", "commands_map", "message"),
+    [
+        (
+            ["--resume", "--no-cache"],
+            new_commands_map(),
+            'Cannot resume evaluation with "--no-cache".',
+        ),
+        (
+            ["--sample-interval", "1"],
+            new_commands_map(),
+            'Cannot sample resources without "--trace".',
+        ),
+        (
+            [],
+            UnknownContext(context_name=NOT_EXISTING_CONTEXT),
+            f'Could not find context named "{NOT_EXISTING_CONTEXT}".',
+        ),
+        (
+            [],
+            MissingConfiguration(part_name=SOURCES),
+            'Please consider running "statue config init"',
+        ),
+        ([], {}, "Usage: statue run [OPTIONS] [SOURCES]..."),
+        (["--profile"], new_commands_map(), "Tools took"),
+    ],
+)
+def test_run_with_jsonl_format_writes_messages_to_stderr(
+    mock_read_commands_map, mock_cwd, args, commands_map, message
+):
+    if isinstance(commands_map, Exception):
+        mock_read_commands_map.side_effect = commands_map
+    else:
+        mock_read_commands_map.return_value = commands_map
+
+    result = CliRunner(mix_stderr=False).invoke(
+        statue_cli, ["run", "--format", "jsonl", *args]
+    )
+
+    assert_jsonl_stdout(result)
+    assert message in result.stderr
+    assert Hooks.plugins() == []
+
+
+def test_run_with_jsonl_format_and_sample_interval_unsupported(
+    mocker, mock_read_commands_map, tmp_path, mock_cwd
+):
+    mocker.patch("statue.cli.run.is_supported", return_value=False)
+    mock_read_commands_map.return_value = new_commands_map()
+    trace_path = tmp_path / "trace.json"
+
+    result = CliRunner(mix_stderr=False).invoke(
+        statue_cli,
+        [
+            "run",
+            "--format",
+            "jsonl",
+            "--trace",
+            str(trace_path),
+            "--sample-interval",
+            "1",
+        ],
+    )
+
+    assert result.exit_code == 1
+    assert_jsonl_stdout(result)
+    assert json.loads(result.stdout.splitlines()[-1])["event"] == "run_finished"
+    assert result.stderr == (
+        "Resources sampling is supported only on platforms with procfs.\n"
+    )
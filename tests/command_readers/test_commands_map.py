@@ -1,19 +1,38 @@
+import os
 from pathlib import Path
 from unittest.mock import Mock, call
 
 import pytest
 
-from statue.commands_map import read_commands_map
-from statue.constants import ALLOW_LIST, CONTEXTS, DENY_LIST, SOURCES
+from statue.command import Command
+from statue.commands_map import (
+    commands_map_fingerprint,
+    find_overlapping_sources,
+    read_commands_map,
+    sources_contexts,
+)
+from statue.constants import (
+    ALLOW_LIST,
+    CONTEXTS,
+    DENY_LIST,
+    EXCLUDE,
+    INCLUDE,
+    SOURCES,
+)
 from statue.exceptions import MissingConfiguration
+from statue.files_filter import FilesFilter
 from tests.constants import (
+    ARG1,
     COMMAND1,
     COMMAND2,
     COMMAND3,
+    COMMAND_HELP_STRING1,
+    COMMAND_HELP_STRING2,
     CONTEXT1,
     CONTEXT2,
     SOURCE1,
     SOURCE2,
+    SOURCE3,
 )
 from tests.util import assert_calls
 
@@ -98,40 +117,61 @@ def test_get_commands_map_with_no_commands(
     mock_read_commands.return_value = None
     commands_map = read_commands_map([], **kwargs)
     assert commands_map is None
-    assert_calls(mock_read_commands, [call(**kwargs), call(**kwargs)])
+    assert_calls(mock_read_commands, [call(**kwargs)])
 
 
 def test_get_commands_map_with_commands_without_directives(
     mock_sources_configuration, mock_read_commands
 ):
-    command1, command2, command3 = Mock(), Mock(), Mock()
+    command1, command2 = Mock(), Mock()
     mock_sources_configuration.return_value = {SOURCE1: {}, SOURCE2: {}}
-    mock_read_commands.side_effect = [[command1], [command2, command3]]
+    mock_read_commands.side_effect = [[command1, command2]]
     commands_map = read_commands_map([])
     assert_sources(commands_map, [SOURCE1, SOURCE2])
-    assert_commands(commands_map, SOURCE1, [command1])
-    assert_commands(commands_map, SOURCE2, [command2, command3])
+    assert_commands(commands_map, SOURCE1, [command1, command2])
+    assert_commands(commands_map, SOURCE2, [command1, command2])
     assert_calls(
         mock_read_commands,
-        [
-            call(allow_list=None, contexts=None, deny_list=None),
-            call(allow_list=None, contexts=None, deny_list=None),
-        ],
+        [call(allow_list=None, contexts=None, deny_list=None)],
     )
 
 
 def test_get_commands_map_with_commands_and_directives(
     mock_sources_configuration, mock_read_commands
 ):
-    command1, command2, command3 = Mock(), Mock(), Mock()
+    command1, command2 = Mock(), Mock()
     kwargs = dict(allow_list=[COMMAND1], deny_list=[COMMAND3], contexts=[CONTEXT2])
     mock_sources_configuration.return_value = {SOURCE1: {}, SOURCE2: {}}
-    mock_read_commands.side_effect = [[command1], [command2, command3]]
+    mock_read_commands.side_effect = [[command1, command2]]
     commands_map = read_commands_map([], **kwargs)
     assert_sources(commands_map, [SOURCE1, SOURCE2])
-    assert_commands(commands_map, SOURCE1, [command1])
-    assert_commands(commands_map, SOURCE2, [command2, command3])
-    assert_calls(mock_read_commands, [call(**kwargs), call(**kwargs)])
+    assert_commands(commands_map, SOURCE1, [command1, command2])
+    assert_commands(commands_map, SOURCE2, [command1, command2])
+    assert_calls(mock_read_commands, [call(**kwargs)])
+
+
+def test_get_commands_map_memoize_equivalent_directives(
+    mock_sources_configuration, mock_read_commands
+):
+    command1, command2 = Mock(), Mock()
+    mock_sources_configuration.return_value = {
+        SOURCE1: {ALLOW_LIST: [COMMAND1, COMMAND2], DENY_LIST: [COMMAND3]},
+        SOURCE2: {ALLOW_LIST: [COMMAND2, COMMAND1], DENY_LIST: [COMMAND3]},
+        SOURCE3: {CONTEXTS: [CONTEXT1]},
+    }
+    mock_read_commands.side_effect = [[command1, command2], [command2]]
+    commands_map = read_commands_map([])
+    assert_sources(commands_map, [SOURCE1, SOURCE2, SOURCE3])
+    assert_commands(commands_map, SOURCE1, [command1, command2])
+    assert_commands(commands_map, SOURCE2, [command1, command2])
+    assert_commands(commands_map, SOURCE3, [command2])
+    assert_calls(
+        mock_read_commands,
+        [
+            call(allow_list=[COMMAND1, COMMAND2], deny_list=[COMMAND3], contexts=None),
+            call(allow_list=None, deny_list=None, contexts=[CONTEXT1]),
+        ],
+    )
 
 
 def test_get_commands_map_with_source_context(
@@ -237,3 +277,196 @@ def test_get_commands_map_from_relative_path(
     assert_calls(
         mock_read_commands, [call(contexts=[CONTEXT2], allow_list=None, deny_list=None)]
     )
+
+
+def test_get_commands_map_with_source_files_filter(
+    mock_sources_configuration, mock_read_commands
+):
+    command1 = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    command2 = Command(
+        name=COMMAND2,
+        help=COMMAND_HELP_STRING2,
+        files_filter=FilesFilter(exclude=("*_pb2.py",), max_file_size=100),
+    )
+    mock_sources_configuration.return_value = {
+        SOURCE1: {INCLUDE: ["*.py"], EXCLUDE: ["migrations/*"]},
+        SOURCE2: {},
+    }
+    mock_read_commands.return_value = [command1, command2]
+    commands_map = read_commands_map([])
+    assert_sources(commands_map, [SOURCE1, SOURCE2])
+    assert_commands(
+        commands_map,
+        SOURCE1,
+        [
+            Command(
+                name=COMMAND1,
+                help=COMMAND_HELP_STRING1,
+                files_filter=FilesFilter(include=("*.py",), exclude=("migrations/*",)),
+            ),
+            Command(
+                name=COMMAND2,
+                help=COMMAND_HELP_STRING2,
+                files_filter=FilesFilter(
+                    include=("*.py",),
+                    exclude=("migrations/*", "*_pb2.py"),
+                    max_file_size=100,
+                ),
+            ),
+        ],
+    )
+    assert_commands(commands_map, SOURCE2, [command1, command2])
+
+
+def test_get_commands_map_with_overlapping_sources(
+    mock_sources_configuration, mock_read_commands
+):
+    command1 = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    nested_source = f"{SOURCE1}/inner"
+    mock_sources_configuration.return_value = {SOURCE1: {}}
+    mock_read_commands.return_value = [command1]
+    commands_map = read_commands_map(
+        [SOURCE1, f"./{SOURCE1}/", nested_source, f"{nested_source}/module.py"]
+    )
+    assert_sources(commands_map, [SOURCE1, nested_source, f"{nested_source}/module.py"])
+    assert_commands(
+        commands_map,
+        SOURCE1,
+        [
+            Command(
+                name=COMMAND1,
+                help=COMMAND_HELP_STRING1,
+                files_filter=FilesFilter(exclude=("/inner", "/inner/*")),
+            )
+        ],
+    )
+    assert_commands(
+        commands_map,
+        nested_source,
+        [
+            Command(
+                name=COMMAND1,
+                help=COMMAND_HELP_STRING1,
+                files_filter=FilesFilter(exclude=("/module.py", "/module.py/*")),
+            )
+        ],
+    )
+    assert_commands(commands_map, f"{nested_source}/module.py", [command1])
+
+
+def test_find_overlapping_sources():
+    assert find_overlapping_sources(
+        [
+            SOURCE1,
+            f"{SOURCE1}/a",
+            f"{SOURCE1}/a/b/c.py",
+            f"{SOURCE1}/d.py",
+            SOURCE2,
+            Path(SOURCE3) / "e.py",
+        ]
+    ) == {
+        SOURCE1: [f"{SOURCE1}/a", f"{SOURCE1}/d.py"],
+        f"{SOURCE1}/a": [f"{SOURCE1}/a/b/c.py"],
+    }
+    assert find_overlapping_sources([SOURCE1, SOURCE2]) == {}
+
+
+def test_sources_contexts(mock_sources_configuration):
+    mock_sources_configuration.return_value = {
+        Path(SOURCE1): {CONTEXTS: [CONTEXT2]},
+        Path(SOURCE2): {},
+    }
+
+    assert sources_contexts([SOURCE1, f"{SOURCE1}/a.py", SOURCE2, SOURCE3]) == {
+        SOURCE1: [CONTEXT2],
+        f"{SOURCE1}/a.py": [CONTEXT2],
+        SOURCE2: [],
+        SOURCE3: [],
+    }
+    assert sources_contexts([SOURCE1, Path(SOURCE2)], contexts=[CONTEXT1]) == {
+        SOURCE1: [CONTEXT1, CONTEXT2],
+        SOURCE2: [CONTEXT1],
+    }
+    mock_sources_configuration.assert_called_with()
+    assert mock_sources_configuration.call_count == 2
+
+
+def test_sources_contexts_without_sources_configuration(mock_sources_configuration):
+    mock_sources_configuration.side_effect = MissingConfiguration(SOURCES)
+
+    assert sources_contexts([SOURCE1], contexts=[CONTEXT1]) == {SOURCE1: [CONTEXT1]}
+
+
+@pytest.mark.parametrize("sources_number", [10, 1000])
+def test_read_commands_map_reads_configuration_once(
+    mock_read_commands, mock_sources_configuration, sources_number
+):
+    sources = [f"{SOURCE1}/module{index}.py" for index in range(sources_number)]
+    mock_sources_configuration.return_value = {
+        Path(SOURCE1): {CONTEXTS: [CONTEXT1]},
+        **{Path(source): {CONTEXTS: [CONTEXT1]} for source in sources[::2]},
+    }
+    mock_read_commands.return_value = [
+        Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    ]
+
+    commands_map = read_commands_map(sources)
+
+    # Resolving is linear in the number of sources: configuration is read once,
+    # and commands are read once for all sources with the same instructions
+    assert len(commands_map) == sources_number
+    assert mock_sources_configuration.call_count == 1
+    assert mock_read_commands.call_count == 1
+
+
+def test_commands_map_fingerprint(tmp_path):
+    source = tmp_path / SOURCE1
+    (source / "package").mkdir(parents=True)
+    (source / "package" / "module.py").write_text("a = 1")
+    single_file = tmp_path / "single.py"
+    single_file.write_text("b = 2")
+    commands_map = {
+        str(source): [Command(name=COMMAND1, help=COMMAND_HELP_STRING1)],
+        str(single_file): [Command(name=COMMAND2, help=COMMAND_HELP_STRING2)],
+    }
+    fingerprint = commands_map_fingerprint(commands_map)
+
+    for ignored_directory in ["__pycache__", ".mypy_cache"]:
+        (source / ignored_directory).mkdir()
+        (source / ignored_directory / "module.py").write_text("cache")
+    (source / "package" / "data.txt").write_text("data")
+    assert commands_map_fingerprint(commands_map) == fingerprint
+
+    (source / "package" / "module.py").write_text("a = 22")
+    changed_source_fingerprint = commands_map_fingerprint(commands_map)
+    assert changed_source_fingerprint != fingerprint
+
+    os.utime(single_file, ns=(0, 0))
+    changed_file_fingerprint = commands_map_fingerprint(commands_map)
+    assert changed_file_fingerprint != changed_source_fingerprint
+
+    commands_map[str(source)][0].args.append(ARG1)
+    assert commands_map_fingerprint(commands_map) != changed_file_fingerprint
+
+
+def test_commands_map_fingerprint_ignores_filtered_files(tmp_path):
+    source = tmp_path / SOURCE1
+    source.mkdir()
+    (source / "checked.py").write_text("a = 1")
+    (source / "excluded.py").write_text("b = 1")
+    commands_map = {
+        str(source): [
+            Command(
+                name=COMMAND1,
+                help=COMMAND_HELP_STRING1,
+                files_filter=FilesFilter(exclude=("excluded.py",)),
+            )
+        ]
+    }
+    fingerprint = commands_map_fingerprint(commands_map)
+
+    (source / "excluded.py").write_text("b = 22")
+    assert commands_map_fingerprint(commands_map) == fingerprint
+
+    (source / "checked.py").write_text("a = 22")
+    assert commands_map_fingerprint(commands_map) != fingerprint
@@ -9,7 +9,10 @@ from statue.constants import (
     CLEAR_ARGS,
     COMMANDS,
     CONTEXTS,
+    EXCLUDE,
     HELP,
+    INCLUDE,
+    MAX_FILE_SIZE,
     STANDARD,
 )
 from statue.context import Context
@@ -19,6 +22,7 @@ from statue.exceptions import (
     UnknownCommand,
     UnknownContext,
 )
+from statue.files_filter import FilesFilter
 from tests.constants import (
     ARG1,
     ARG2,
@@ -306,6 +310,32 @@ def case_on_standard_child_context_inheritance():
     return configuration, kwargs, command
 
 
+@case(tags=[SUCCESSFUL_TAG])
+def case_with_files_filter_override_by_context():
+    configuration = {
+        CONTEXTS: CONTEXTS_MAP,
+        COMMANDS: {
+            COMMAND1: {
+                HELP: COMMAND_HELP_STRING1,
+                ARGS: [ARG1],
+                EXCLUDE: ["*_pb2.py"],
+                INCLUDE: ["*.py"],
+                CONTEXT1: {EXCLUDE: ["*_pb2.py", "migrations/*"], MAX_FILE_SIZE: 100},
+            }
+        },
+    }
+    kwargs = dict(command_name=COMMAND1, contexts=[CONTEXT1])
+    command = Command(
+        name=COMMAND1,
+        args=[ARG1],
+        help=COMMAND_HELP_STRING1,
+        files_filter=FilesFilter(
+            exclude=("*_pb2.py", "migrations/*"), max_file_size=100
+        ),
+    )
+    return configuration, kwargs, command
+
+
 @parametrize_with_cases(
     argnames="configuration, kwargs, command",
     cases=THIS_MODULE,
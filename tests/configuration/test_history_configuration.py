@@ -0,0 +1,17 @@
+from statue.configuration import Configuration
+from statue.constants import HISTORY, MAX_AGE_DAYS, MAX_RUNS
+from statue.retention import RetentionPolicy
+
+
+def test_history_retention(clear_configuration):
+    Configuration.set_statue_configuration({HISTORY: {MAX_RUNS: 200, MAX_AGE_DAYS: 90}})
+
+    assert Configuration.history_retention() == RetentionPolicy(
+        max_runs=200, max_age_days=90
+    )
+
+
+def test_default_history_retention(clear_configuration):
+    Configuration.set_statue_configuration({})
+
+    assert Configuration.history_retention() == RetentionPolicy()
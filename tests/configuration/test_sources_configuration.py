@@ -67,3 +67,14 @@ def test_get_non_existing_source(clear_configuration):
     assert (
         source_configuration is None
     ), "Source configuration is different than expected"
+
+
+def test_get_most_specific_source(clear_configuration):
+    nested_source = Path(SOURCE1) / "inner"
+    Configuration.set_statue_configuration(
+        {SOURCES: {Path(SOURCE1): {CONTEXTS: [CONTEXT1]}, nested_source: {}}}
+    )
+    assert Configuration.get_source_configuration(nested_source / "module.py") == {}
+    assert Configuration.get_source_configuration(Path(SOURCE1) / "module.py") == {
+        CONTEXTS: [CONTEXT1]
+    }
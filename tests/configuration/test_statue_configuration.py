@@ -1,7 +1,18 @@
 import pytest
 
 from statue.configuration import Configuration
+from statue.constants import ARGS, COMMANDS, CONTEXTS, HELP
+from statue.context import Context
 from statue.exceptions import EmptyConfiguration
+from tests.constants import (
+    ARG1,
+    ARG2,
+    COMMAND1,
+    COMMAND_HELP_STRING1,
+    CONTEXT1,
+    CONTEXT2,
+    CONTEXT_HELP_STRING1,
+)
 
 DUMMY_CONFIGURATION = {"a": "b"}
 
@@ -29,3 +40,23 @@ def test_get_statue_configuration_raise_exception(
     mock_default_configuration.return_value = None
     with pytest.raises(EmptyConfiguration, match="^Statue configuration is empty!$"):
         Configuration.statue_configuration()
+
+
+def test_getters_return_copies(clear_configuration, mock_default_configuration):
+    context = Context(name=CONTEXT1, help=CONTEXT_HELP_STRING1, is_default=True)
+    Configuration.set_statue_configuration(
+        {
+            COMMANDS: {COMMAND1: {HELP: COMMAND_HELP_STRING1, ARGS: [ARG1]}},
+            CONTEXTS: {CONTEXT1: context},
+        }
+    )
+
+    Configuration.contexts_map()[CONTEXT1].aliases.append(CONTEXT2)
+    Configuration.get_command_configuration(COMMAND1)[ARGS].append(ARG2)
+    Configuration.read_command(COMMAND1, contexts=[CONTEXT1]).args.append(ARG2)
+
+    assert Configuration.contexts_map() == {CONTEXT1: context}
+    assert Configuration.get_command_configuration(COMMAND1) == {
+        HELP: COMMAND_HELP_STRING1,
+        ARGS: [ARG1],
+    }
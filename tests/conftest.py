@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
 import toml
@@ -8,7 +9,7 @@ from statue.cache import Cache
 from statue.command import Command
 from statue.configuration import Configuration
 from statue.constants import OVERRIDE, STATUE
-from statue.evaluation import Evaluation
+from statue.hooks import Hooks
 
 ENVIRON = dict(s=2, d=5, g=8)
 
@@ -92,29 +93,38 @@ def mock_subprocess(mocker):
     return mocker.patch("subprocess.run")
 
 
+@pytest.fixture
+def mock_popen(mocker):
+    mock = mocker.patch("subprocess.Popen")
+    mock.return_value.wait.return_value = 0
+    return mock
+
+
 @pytest.fixture
 def mock_available_packages(mocker):
     return mocker.patch.object(Command, "available_packages")
 
 
 @pytest.fixture
-def mock_cache_save_evaluation(mocker):
-    return mocker.patch.object(Cache, "save_evaluation")
+def mock_cache_start_run(mocker):
+    return mocker.patch.object(Cache, "start_run")
 
 
 @pytest.fixture
-def mock_evaluation_load_from_file(mocker):
-    return mocker.patch.object(Evaluation, "load_from_file")
+def mock_cache_record_command_evaluation(mocker):
+    return mocker.patch.object(Cache, "record_command_evaluation")
 
 
 @pytest.fixture
-def mock_cache_evaluation_path(mocker):
-    return mocker.patch.object(Cache, "evaluation_path")
+def mock_cache_finish_run(
+    mocker, mock_cache_start_run, mock_cache_record_command_evaluation
+):
+    return mocker.patch.object(Cache, "finish_run")
 
 
 @pytest.fixture
-def mock_cache_recent_evaluation_path(mocker):
-    return mocker.patch.object(Cache, "recent_evaluation_path")
+def mock_cache_failure_map(mocker):
+    return mocker.patch.object(Cache, "failure_map")
 
 
 @pytest.fixture
@@ -126,3 +136,11 @@ def environ(monkeypatch):
 @pytest.fixture
 def print_mock(mocker):
     return mocker.patch("builtins.print")
+
+
+@pytest.fixture
+def hooks_plugin():
+    plugin = Mock()
+    Hooks.register(plugin)
+    yield plugin
+    Hooks.unregister(plugin)
@@ -2,13 +2,14 @@ from unittest.mock import Mock, call
 
 from pytest_cases import THIS_MODULE, parametrize_with_cases
 
+from statue.command import ProcessesUsage
 from statue.evaluation import (
     CommandEvaluation,
     Evaluation,
     SourceEvaluation,
     evaluate_commands_map,
 )
-from statue.verbosity import SILENT
+from statue.verbosity import DEFAULT_VERBOSITY, SILENT
 from tests.constants import COMMAND1, COMMAND2, COMMAND3, SOURCE1, SOURCE2
 from tests.util import assert_calls, command_mock
 
@@ -150,3 +151,129 @@ def test_evaluate_commands_silently(commands_map, evaluation, prints):
     print_mock = Mock()
     evaluate_commands_map(commands_map, print_method=print_mock, verbosity=SILENT)
     print_mock.assert_not_called()
+
+
+@parametrize_with_cases(argnames=["commands_map", "evaluation"], cases=THIS_MODULE)
+def test_evaluate_commands_map_reports_each_command_evaluation(
+    commands_map, evaluation
+):
+    on_command_evaluation = Mock()
+
+    evaluate_commands_map(
+        commands_map, print_method=Mock(), on_command_evaluation=on_command_evaluation
+    )
+
+    assert_calls(
+        on_command_evaluation,
+        [
+            call(source, command_evaluation)
+            for source, source_evaluation in evaluation.items()
+            for command_evaluation in source_evaluation.commands_evaluations
+        ],
+    )
+
+
+@parametrize_with_cases(argnames=["commands_map", "evaluation"], cases=THIS_MODULE)
+def test_evaluate_commands_map_emits_hooks(commands_map, evaluation, hooks_plugin):
+    evaluate_commands_map(commands_map, print_method=Mock())
+
+    assert_calls(
+        hooks_plugin.on_task_queued,
+        [
+            call(source=source, command=command)
+            for source, commands in commands_map.items()
+            for command in commands
+        ],
+    )
+    assert_calls(
+        hooks_plugin.on_task_started,
+        [
+            call(source=source, command=command)
+            for source, commands in commands_map.items()
+            for command in commands
+        ],
+    )
+    assert_calls(
+        hooks_plugin.on_task_finished,
+        [
+            call(source=source, command_evaluation=command_evaluation, output=None)
+            for source, source_evaluation in evaluation.items()
+            for command_evaluation in source_evaluation.commands_evaluations
+        ],
+    )
+
+
+def test_evaluate_commands_map_captures_output(hooks_plugin):
+    def execute(input_path, verbosity, output, usage):
+        output.append(f"checked {input_path}\n")
+        usage.add_peak_rss(1024)
+        return 0
+
+    command = command_mock(COMMAND1)
+    command.execute = Mock(side_effect=execute)
+
+    evaluation = evaluate_commands_map(
+        {SOURCE1: [command]}, print_method=Mock(), capture_output=True
+    )
+
+    hooks_plugin.on_task_finished.assert_called_once_with(
+        source=SOURCE1,
+        command_evaluation=evaluation[SOURCE1].commands_evaluations[0],
+        output=[f"checked {SOURCE1}\n"],
+    )
+    command_evaluation = evaluation[SOURCE1].commands_evaluations[0]
+    assert command_evaluation.output_bytes == len(f"checked {SOURCE1}\n")
+    assert command_evaluation.peak_rss == 1024
+
+
+def test_evaluate_commands_map_with_failed_files(tmp_path):
+    source = str(tmp_path)
+    failed_file = tmp_path / "a.py"
+
+    def execute(input_path, verbosity, output, usage):
+        output.append(f"{failed_file}:1:1: F401 'os' imported but unused\n")
+        return 1
+
+    command = command_mock("flake8")
+    command.execute = Mock(side_effect=execute)
+    passing_command = command_mock("pylint", return_code=0)
+
+    evaluation = evaluate_commands_map(
+        {source: [command, passing_command]},
+        print_method=Mock(),
+        attribute_failures=True,
+    )
+
+    assert evaluation == Evaluation(
+        {
+            source: SourceEvaluation(
+                [
+                    CommandEvaluation(
+                        command=command, success=False, failed_files=["a.py"]
+                    ),
+                    CommandEvaluation(command=passing_command, success=True),
+                ]
+            )
+        }
+    )
+
+
+def test_evaluate_commands_map_without_failures_attribution():
+    command = command_mock("flake8", return_code=1)
+
+    evaluation = evaluate_commands_map({SOURCE1: [command]}, print_method=Mock())
+
+    command.execute.assert_called_once_with(
+        SOURCE1, DEFAULT_VERBOSITY, output=None, usage=ProcessesUsage()
+    )
+    assert evaluation[SOURCE1].commands_evaluations[0].failed_files is None
+    assert evaluation[SOURCE1].commands_evaluations[0].output_bytes is None
+
+
+def test_evaluate_commands_map_records_duration(mocker):
+    mocker.patch("statue.evaluation.time.monotonic", side_effect=[10, 12.5])
+    command = command_mock(COMMAND1, return_code=0)
+
+    evaluation = evaluate_commands_map({SOURCE1: [command]}, print_method=Mock())
+
+    assert evaluation[SOURCE1].commands_evaluations[0].duration == 2.5
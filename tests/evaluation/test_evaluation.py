@@ -1,11 +1,13 @@
 from pytest_cases import THIS_MODULE, case, parametrize_with_cases
 
+from statue.command import Command
 from statue.evaluation import (
     CommandEvaluation,
     Evaluation,
     SourceEvaluation,
     get_failure_map,
 )
+from statue.files_filter import FilesFilter
 from tests.constants import (
     COMMAND1,
     COMMAND2,
@@ -184,3 +186,44 @@ def test_source_successful_and_failed_commands_count(
         assert source_evaluation.failed_commands_number == source_failed_commands_number
         successful_commands = source_all_commands_number - source_failed_commands_number
         assert source_evaluation.successful_commands_number == successful_commands
+
+
+def test_failed_command_checks_failed_files():
+    command = Command(
+        name=COMMAND1, help="This is help", files_filter=FilesFilter(exclude=("c.py",))
+    )
+    command_evaluation = CommandEvaluation(
+        command=command, success=False, failed_files=["a.py", "b/c.py"]
+    )
+
+    assert command_evaluation.failed_command == Command(
+        name=COMMAND1,
+        help="This is help",
+        files_filter=FilesFilter(exclude=("c.py",), files=("a.py", "b/c.py")),
+    )
+    assert CommandEvaluation(command=command, success=False).failed_command == command
+
+
+def test_get_failure_map_with_failed_files():
+    command = Command(name=COMMAND1, help="This is help")
+    evaluation = Evaluation(
+        {
+            SOURCE1: SourceEvaluation(
+                [
+                    CommandEvaluation(
+                        command=command, success=False, failed_files=["a.py"]
+                    )
+                ]
+            )
+        }
+    )
+
+    assert get_failure_map(evaluation) == {
+        SOURCE1: [
+            Command(
+                name=COMMAND1,
+                help="This is help",
+                files_filter=FilesFilter(files=("a.py",)),
+            )
+        ]
+    }
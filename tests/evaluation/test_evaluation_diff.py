@@ -0,0 +1,90 @@
+from statue.evaluation import CommandEvaluation, Evaluation, SourceEvaluation
+from statue.evaluation_diff import DurationChange, EvaluationDiff
+from tests.constants import COMMAND1, COMMAND2, COMMAND3, COMMAND4, SOURCE1, SOURCE2
+from tests.util import command_mock
+
+
+def command_evaluation(name, success, duration=None):
+    return CommandEvaluation(
+        command=command_mock(name), success=success, duration=duration
+    )
+
+
+OLD_EVALUATION = Evaluation(
+    {
+        SOURCE1: SourceEvaluation(
+            [
+                command_evaluation(COMMAND1, True, duration=1.0),
+                command_evaluation(COMMAND2, False, duration=2.0),
+                command_evaluation(COMMAND3, True),
+            ]
+        ),
+        SOURCE2: SourceEvaluation([command_evaluation(COMMAND1, True, duration=3.0)]),
+    }
+)
+NEW_EVALUATION = Evaluation(
+    {
+        SOURCE1: SourceEvaluation(
+            [
+                command_evaluation(COMMAND1, False, duration=1.5),
+                command_evaluation(COMMAND2, True, duration=1.0),
+                command_evaluation(COMMAND4, True, duration=1.0),
+            ]
+        ),
+        SOURCE2: SourceEvaluation([command_evaluation(COMMAND1, True)]),
+    }
+)
+
+
+def test_diff_evaluations():
+    evaluation_diff = EvaluationDiff.from_evaluations(OLD_EVALUATION, NEW_EVALUATION)
+
+    assert evaluation_diff == EvaluationDiff(
+        newly_failing=[(SOURCE1, COMMAND1)],
+        newly_passing=[(SOURCE1, COMMAND2)],
+        added=[(SOURCE1, COMMAND4)],
+        removed=[(SOURCE1, COMMAND3)],
+        durations=[
+            DurationChange(SOURCE1, COMMAND2, old_duration=2.0, new_duration=1.0),
+            DurationChange(SOURCE1, COMMAND1, old_duration=1.0, new_duration=1.5),
+        ],
+    )
+    assert evaluation_diff.changed
+
+
+def test_diff_same_evaluation():
+    evaluation_diff = EvaluationDiff.from_evaluations(OLD_EVALUATION, OLD_EVALUATION)
+
+    assert not evaluation_diff.changed
+    assert [duration_change.delta for duration_change in evaluation_diff.durations] == [
+        0,
+        0,
+        0,
+    ]
+
+
+def test_diff_as_json():
+    evaluation_diff = EvaluationDiff.from_evaluations(OLD_EVALUATION, NEW_EVALUATION)
+
+    assert evaluation_diff.as_json() == dict(
+        newly_failing=[dict(source=SOURCE1, command=COMMAND1)],
+        newly_passing=[dict(source=SOURCE1, command=COMMAND2)],
+        added=[dict(source=SOURCE1, command=COMMAND4)],
+        removed=[dict(source=SOURCE1, command=COMMAND3)],
+        durations=[
+            dict(
+                source=SOURCE1,
+                command=COMMAND2,
+                old_duration=2.0,
+                new_duration=1.0,
+                delta=-1.0,
+            ),
+            dict(
+                source=SOURCE1,
+                command=COMMAND1,
+                old_duration=1.0,
+                new_duration=1.5,
+                delta=0.5,
+            ),
+        ],
+    )
@@ -0,0 +1,116 @@
+import pytest
+from pytest_cases import THIS_MODULE, parametrize_with_cases
+
+from statue.evaluation import (
+    CommandEvaluation,
+    Evaluation,
+    SourceEvaluation,
+    merge_evaluations,
+)
+from statue.exceptions import EvaluationsConflict
+from tests.constants import COMMAND1, COMMAND2, COMMAND3, SOURCE1, SOURCE2
+from tests.util import command_mock
+
+COMMAND_EVALUATION1 = CommandEvaluation(command=command_mock(COMMAND1), success=True)
+COMMAND_EVALUATION2 = CommandEvaluation(command=command_mock(COMMAND2), success=False)
+COMMAND_EVALUATION3 = CommandEvaluation(command=command_mock(COMMAND3), success=True)
+FIXED_COMMAND_EVALUATION2 = CommandEvaluation(
+    command=command_mock(COMMAND2), success=True
+)
+
+
+def case_no_evaluations():
+    return [], Evaluation()
+
+
+def case_one_evaluation():
+    evaluation = Evaluation(
+        {SOURCE1: SourceEvaluation([COMMAND_EVALUATION1, COMMAND_EVALUATION2])}
+    )
+    return [evaluation], evaluation
+
+
+def case_shards():
+    evaluations = [
+        Evaluation({SOURCE1: SourceEvaluation([COMMAND_EVALUATION1])}),
+        Evaluation(
+            {
+                SOURCE2: SourceEvaluation([COMMAND_EVALUATION3]),
+                SOURCE1: SourceEvaluation([COMMAND_EVALUATION2]),
+            }
+        ),
+    ]
+    merged_evaluation = Evaluation(
+        {
+            SOURCE1: SourceEvaluation([COMMAND_EVALUATION1, COMMAND_EVALUATION2]),
+            SOURCE2: SourceEvaluation([COMMAND_EVALUATION3]),
+        }
+    )
+    return evaluations, merged_evaluation
+
+
+def case_rerun():
+    evaluations = [
+        Evaluation(
+            {
+                SOURCE1: SourceEvaluation(
+                    [COMMAND_EVALUATION1, COMMAND_EVALUATION2, COMMAND_EVALUATION3]
+                )
+            }
+        ),
+        Evaluation({SOURCE1: SourceEvaluation([FIXED_COMMAND_EVALUATION2])}),
+    ]
+    merged_evaluation = Evaluation(
+        {
+            SOURCE1: SourceEvaluation(
+                [COMMAND_EVALUATION1, FIXED_COMMAND_EVALUATION2, COMMAND_EVALUATION3]
+            )
+        }
+    )
+    return evaluations, merged_evaluation
+
+
+@parametrize_with_cases(
+    argnames=["evaluations", "merged_evaluation"], cases=THIS_MODULE
+)
+def test_merge_evaluations(evaluations, merged_evaluation):
+    assert merge_evaluations(evaluations) == merged_evaluation
+
+
+@parametrize_with_cases(
+    argnames=["evaluations", "merged_evaluation"], cases=THIS_MODULE
+)
+def test_merge_evaluations_from_iterator(evaluations, merged_evaluation):
+    assert merge_evaluations(iter(evaluations)) == merged_evaluation
+
+
+def test_merge_evaluations_strictly():
+    evaluation = Evaluation(
+        {SOURCE1: SourceEvaluation([COMMAND_EVALUATION1, COMMAND_EVALUATION2])}
+    )
+    assert (
+        merge_evaluations(
+            [
+                evaluation,
+                Evaluation({SOURCE1: SourceEvaluation([COMMAND_EVALUATION1])}),
+            ],
+            strict=True,
+        )
+        == evaluation
+    )
+
+
+def test_merge_conflicting_evaluations_strictly():
+    with pytest.raises(
+        EvaluationsConflict,
+        match=(
+            f'^Evaluations disagree on the result of "{COMMAND2}" over "{SOURCE1}".$'
+        ),
+    ):
+        merge_evaluations(
+            [
+                Evaluation({SOURCE1: SourceEvaluation([COMMAND_EVALUATION2])}),
+                Evaluation({SOURCE1: SourceEvaluation([FIXED_COMMAND_EVALUATION2])}),
+            ],
+            strict=True,
+        )
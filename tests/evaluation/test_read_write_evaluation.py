@@ -1,6 +1,9 @@
+import gzip
+import json
 from pathlib import Path
 from unittest import mock
 
+import pytest
 from pytest_cases import THIS_MODULE, parametrize_with_cases
 
 from statue.command import Command
@@ -138,18 +141,187 @@ def test_evaluation_as_json(evaluation_json, evaluation):
 
 
 @parametrize_with_cases(argnames=["evaluation_json", "evaluation"], cases=THIS_MODULE)
-def test_evaluation_save_as_json(evaluation_json, evaluation):
-    file_path = Path("/path/to/data.json")
-    with mock.patch("statue.evaluation.json") as mock_json:
-        with mock.patch("builtins.open", mock.mock_open()) as mock_open:
-            evaluation.save_as_json(file_path)
-            mock_open.assert_called_once_with(file_path, mode="w")
-            mock_json.dump.assert_called_once_with(
-                evaluation_json, mock_open.return_value, indent=2
-            )
+def test_evaluation_save_as_json(evaluation_json, evaluation, tmp_path):
+    file_path = tmp_path / "data.json"
+    file_path.write_text("previous content")
+
+    evaluation.save_as_json(file_path)
+
+    assert file_path.read_text() == json.dumps(evaluation_json, indent=2)
+    assert Evaluation.load_from_file(file_path) == evaluation
+    assert list(tmp_path.iterdir()) == [file_path]
+
+
+@parametrize_with_cases(argnames=["evaluation_json", "evaluation"], cases=THIS_MODULE)
+def test_evaluation_save_as_compact_json(evaluation_json, evaluation, tmp_path):
+    file_path = tmp_path / "data.json"
+
+    evaluation.save_as_json(file_path, compact=True)
+
+    assert file_path.read_text() == json.dumps(
+        evaluation.as_compact_json(), separators=(",", ":")
+    )
+    assert Evaluation.load_from_file(file_path) == evaluation
+
+
+@parametrize_with_cases(argnames=["evaluation_json", "evaluation"], cases=THIS_MODULE)
+def test_evaluation_from_compact_json(evaluation_json, evaluation):
+    assert Evaluation.from_json(evaluation.as_compact_json()) == evaluation
+
+
+def test_evaluation_as_compact_json():
+    command1 = Command(COMMAND1, help=COMMAND_HELP_STRING1)
+    command2 = Command(COMMAND2, help=COMMAND_HELP_STRING2, args=[ARG1])
+    evaluation = Evaluation()
+    evaluation[SOURCE1] = SourceEvaluation(
+        [
+            CommandEvaluation(command=command1, success=True),
+            CommandEvaluation(command=command2, success=False),
+        ]
+    )
+    evaluation[SOURCE2] = SourceEvaluation(
+        [
+            CommandEvaluation(command=command2, success=True),
+            CommandEvaluation(command=command1, success=True),
+        ]
+    )
+
+    assert evaluation.as_compact_json() == {
+        "version": 2,
+        "commands": [
+            dict(name=COMMAND1, help=COMMAND_HELP_STRING1, args=[]),
+            dict(name=COMMAND2, help=COMMAND_HELP_STRING2, args=[ARG1]),
+        ],
+        "sources": {SOURCE1: [[0, True], [1, False]], SOURCE2: [[1, True], [0, True]]},
+    }
+
+
+def test_evaluation_from_unsupported_compact_json():
+    with pytest.raises(ValueError, match="^Unsupported evaluation format version: 3$"):
+        Evaluation.from_json({"version": 3, "commands": [], "sources": {}})
 
 
 @parametrize_with_cases(argnames=["evaluation_json", "evaluation"], cases=THIS_MODULE)
 def test_iterate_evaluation(evaluation_json, evaluation):
     for source in evaluation:
         assert evaluation[source] == SourceEvaluation.from_json(evaluation_json[source])
+
+
+@parametrize_with_cases(argnames=["evaluation_json", "evaluation"], cases=THIS_MODULE)
+@pytest.mark.parametrize("compact", [False, True])
+def test_evaluation_save_and_load_compressed(
+    evaluation_json, evaluation, compact, tmp_path
+):
+    file_path = tmp_path / "data.json.gz"
+
+    evaluation.save_as_json(file_path, compact=compact)
+
+    assert json.loads(gzip.decompress(file_path.read_bytes())) == (
+        evaluation.as_compact_json() if compact else evaluation_json
+    )
+    assert Evaluation.load_from_file(file_path) == evaluation
+
+
+def json_lines_evaluation():
+    evaluation = Evaluation()
+    evaluation[SOURCE1] = SourceEvaluation(
+        [
+            CommandEvaluation(
+                command=Command(COMMAND1, help=COMMAND_HELP_STRING1), success=True
+            ),
+            CommandEvaluation(
+                command=Command(COMMAND2, help=COMMAND_HELP_STRING2, args=[ARG2]),
+                success=False,
+            ),
+        ]
+    )
+    evaluation[SOURCE2] = SourceEvaluation(
+        [
+            CommandEvaluation(
+                command=Command(COMMAND1, help=COMMAND_HELP_STRING1), success=True
+            )
+        ]
+    )
+    return evaluation
+
+
+def json_lines(evaluation):
+    return [
+        command_evaluation.as_json_line(source)
+        for source, source_evaluation in evaluation.items()
+        for command_evaluation in source_evaluation.commands_evaluations
+    ]
+
+
+def test_command_evaluation_as_json_line():
+    command_evaluation = CommandEvaluation(
+        command=Command(COMMAND1, help=COMMAND_HELP_STRING1), success=True
+    )
+
+    json_line = command_evaluation.as_json_line(SOURCE1)
+
+    assert json_line.endswith("\n")
+    assert json.loads(json_line) == dict(
+        source=SOURCE1,
+        command=dict(name=COMMAND1, help=COMMAND_HELP_STRING1, args=[]),
+        success=True,
+    )
+
+
+def test_evaluation_load_from_json_lines_file(tmp_path):
+    file_path = tmp_path / "data.jsonl"
+    evaluation = json_lines_evaluation()
+    file_path.write_text("".join(json_lines(evaluation)))
+
+    assert Evaluation.load_from_file(file_path) == evaluation
+
+
+def test_evaluation_from_json_lines_ignores_truncated_last_line():
+    evaluation = json_lines_evaluation()
+    lines = json_lines(evaluation)
+
+    assert Evaluation.from_json_lines(lines + [lines[0][:10]]) == evaluation
+
+
+def test_evaluation_from_json_lines_with_invalid_line():
+    lines = json_lines(json_lines_evaluation())
+
+    with pytest.raises(json.JSONDecodeError):
+        Evaluation.from_json_lines([lines[0][:10]] + lines)
+
+
+def test_evaluation_with_failed_files_json():
+    command_evaluation = CommandEvaluation(
+        command=Command(COMMAND1, help=COMMAND_HELP_STRING1),
+        success=False,
+        failed_files=["a.py"],
+    )
+    evaluation = Evaluation({SOURCE1: SourceEvaluation([command_evaluation])})
+
+    assert command_evaluation.as_json() == dict(
+        command=dict(name=COMMAND1, help=COMMAND_HELP_STRING1, args=[]),
+        success=False,
+        failed_files=["a.py"],
+    )
+    assert evaluation.as_compact_json()["sources"] == {SOURCE1: [[0, False, ["a.py"]]]}
+    assert Evaluation.from_json(evaluation.as_json()) == evaluation
+    assert Evaluation.from_json(evaluation.as_compact_json()) == evaluation
+    assert Evaluation.from_json_lines(json_lines(evaluation)) == evaluation
+
+
+def test_evaluation_with_duration_json():
+    command_evaluation = CommandEvaluation(
+        command=Command(COMMAND1, help=COMMAND_HELP_STRING1),
+        success=True,
+        duration=1.5,
+    )
+    evaluation = Evaluation({SOURCE1: SourceEvaluation([command_evaluation])})
+
+    assert command_evaluation.as_json()["duration"] == 1.5
+    assert evaluation.as_compact_json()["sources"] == {SOURCE1: [[0, True, None, 1.5]]}
+    for loaded_evaluation in [
+        Evaluation.from_json(evaluation.as_json()),
+        Evaluation.from_json(evaluation.as_compact_json()),
+        Evaluation.from_json_lines(json_lines(evaluation)),
+    ]:
+        assert loaded_evaluation[SOURCE1].commands_evaluations[0].duration == 1.5
@@ -0,0 +1,136 @@
+import statistics
+import sys
+
+import pytest
+from pytest_cases import parametrize
+
+from benchmarks.execution import (
+    DISTRIBUTIONS,
+    IN_PROCESS,
+    PROCESS,
+    Workload,
+    run_workload,
+)
+from benchmarks.fixtures import configuration_setup, contexts_names
+from benchmarks.suite import (
+    RESULTS_FORMAT_VERSION,
+    Benchmark,
+    compare_results,
+    measure,
+    run_benchmarks,
+)
+
+
+def test_contexts_names_are_split_into_chains():
+    assert contexts_names(5, 2) == [
+        ["context0", "context1"],
+        ["context2", "context3"],
+        ["context4"],
+    ]
+
+
+def test_configuration_setup_inherits_contexts():
+    setup = configuration_setup(sources_number=3, contexts_number=4, chain_length=2)
+
+    assert setup["contexts"]["context1"]["parent"] == "context0"
+    assert "parent" not in setup["contexts"]["context2"]
+    assert [source_setup["contexts"] for source_setup in setup["sources"].values()] == [
+        ["context1"],
+        ["context3"],
+        ["context1"],
+    ]
+
+
+def test_measure(mocker):
+    mocker.patch("time.perf_counter", side_effect=[0, 1, 10, 13, 20, 22])
+    function = mocker.Mock()
+
+    assert measure(function, 3) == dict(min=1, median=2, times=[1, 3, 2])
+    assert function.call_count == 3
+
+
+def test_run_benchmarks(mocker, tmp_path):
+    unsupported_setup = mocker.Mock(side_effect=AttributeError("missing"))
+    mocker.patch(
+        "benchmarks.suite.BENCHMARKS",
+        [
+            Benchmark(name="evaluation.dummy", setup=lambda directory, scale: list),
+            Benchmark(name="evaluation.unsupported", setup=unsupported_setup),
+            Benchmark(name="other", setup=mocker.Mock()),
+        ],
+    )
+
+    results = run_benchmarks(tmp_path, repeat=2, names=["evaluation"])
+
+    assert results["version"] == RESULTS_FORMAT_VERSION
+    assert list(results["benchmarks"]) == ["evaluation.dummy", "evaluation.unsupported"]
+    assert len(results["benchmarks"]["evaluation.dummy"]["times"]) == 2
+    assert results["benchmarks"]["evaluation.unsupported"] == dict(skipped="missing")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_compare_results():
+    baseline = dict(benchmarks=dict(a=dict(median=2), b=dict(median=1), c={}))
+    results = dict(benchmarks=dict(a=dict(median=3), c=dict(median=1), d={}))
+
+    assert compare_results(baseline, results) == dict(a=1.5)
+
+
+@parametrize("distribution", DISTRIBUTIONS)
+def test_workload_durations(distribution):
+    workload = Workload(tasks=5000, mean_duration=2, distribution=distribution)
+
+    durations = workload.durations()
+
+    assert len(durations) == 5000
+    assert statistics.mean(durations) == pytest.approx(2, rel=0.1)
+    assert durations == workload.durations()
+
+
+def test_workload_commands_map():
+    commands_map = Workload(
+        tasks=7, commands_per_source=3, failure_rate=0.5
+    ).commands_map()
+
+    assert [len(commands) for commands in commands_map.values()] == [3, 3, 1]
+    assert {
+        command.task.success
+        for commands in commands_map.values()
+        for command in commands
+    } == {True, False}
+
+
+@parametrize(
+    "mode",
+    [
+        IN_PROCESS,
+        pytest.param(
+            PROCESS,
+            marks=pytest.mark.skipif(
+                sys.platform == "win32", reason="Fake tool uses a shebang"
+            ),
+        ),
+    ],
+)
+def test_run_workload(mode, tmp_path):
+    workload = Workload(
+        tasks=4,
+        commands_per_source=2,
+        mean_duration=0.001,
+        failure_rate=0.5,
+        output_lines=2,
+        reports_files=True,
+    )
+    failures = sum(
+        not command.task.success
+        for commands in workload.commands_map().values()
+        for command in commands
+    )
+
+    metrics = run_workload(workload, tmp_path, mode=mode)
+
+    assert metrics["tasks"] == 4
+    assert metrics["mode"] == mode
+    assert metrics["failures"] == failures
+    assert metrics["work"] == pytest.approx(0.004)
+    assert metrics["makespan"] >= 0.004
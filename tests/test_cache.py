@@ -1,8 +1,69 @@
 import random
-from unittest import mock
+import sqlite3
+import threading
 
-from statue.cache import Cache
+import pytest
+from git import Repo
+
+from statue.cache import HISTORY_SCHEMA_VERSION, Cache, RunSummary
+from statue.command import Command
 from statue.constants import HISTORY_SIZE
+from statue.evaluation import CommandEvaluation, Evaluation, SourceEvaluation
+from statue.files_filter import FilesFilter
+from statue.history_stats import CommandHistory
+from statue.hotspots import FileTiming
+from statue.retention import SECONDS_IN_DAY, RetentionPolicy
+from statue.sources_index import SourcesIndex
+from tests.constants import (
+    ARG1,
+    COMMAND1,
+    COMMAND2,
+    COMMAND3,
+    COMMAND4,
+    COMMAND5,
+    COMMAND_HELP_STRING1,
+    COMMAND_HELP_STRING2,
+    COMMAND_HELP_STRING3,
+    COMMAND_HELP_STRING4,
+    COMMAND_HELP_STRING5,
+    SOURCE1,
+    SOURCE2,
+)
+
+EVALUATION = Evaluation(
+    {
+        SOURCE1: SourceEvaluation(
+            [
+                CommandEvaluation(
+                    command=Command(name=COMMAND1, help=COMMAND_HELP_STRING1),
+                    success=True,
+                ),
+                CommandEvaluation(
+                    command=Command(
+                        name=COMMAND2, help=COMMAND_HELP_STRING2, args=[ARG1]
+                    ),
+                    success=False,
+                ),
+                CommandEvaluation(
+                    command=Command(name=COMMAND3, help=COMMAND_HELP_STRING3),
+                    success=True,
+                ),
+            ]
+        ),
+        SOURCE2: SourceEvaluation(
+            [
+                CommandEvaluation(
+                    command=Command(name=COMMAND4, help=COMMAND_HELP_STRING4),
+                    success=True,
+                ),
+                CommandEvaluation(
+                    command=Command(name=COMMAND5, help=COMMAND_HELP_STRING5),
+                    success=False,
+                ),
+            ]
+        ),
+    }
+)
 
 
 def test_create_cache_dir(mock_cwd):
@@ -19,110 +80,681 @@ def test_cache_dir_already_exist(mock_cwd):
     assert expected_cache_dir.exists()
 
 
-def test_create_evaluations_dir(mock_cwd):
-    expected_evaluations_dir = mock_cwd / ".statue" / "evaluations"
-    assert not expected_evaluations_dir.exists()
-    assert Cache.evaluations_dir() == expected_evaluations_dir
-    assert expected_evaluations_dir.exists()
+def test_history_path(mock_cwd):
+    assert Cache.history_path() == mock_cwd / ".statue" / "history.sqlite"
 
 
-def test_evaluations_dir_already_exist(mock_cwd):
-    expected_evaluations_dir = mock_cwd / ".statue" / "evaluations"
-    expected_evaluations_dir.mkdir(parents=True)
-    assert Cache.evaluations_dir() == expected_evaluations_dir
-    assert expected_evaluations_dir.exists()
+def test_empty_history(mock_cwd):
+    assert Cache.runs_summaries() == []
+    assert Cache.run_summary(0) is None
+    assert Cache.load_evaluation(0) is None
+    assert Cache.recent_evaluation() is None
+    assert Cache.failure_map() == {}
+    assert Cache.history_path().exists()
 
 
-def test_all_evaluations_paths(mock_cwd):
-    evaluations_dir = mock_cwd / ".statue" / "evaluations"
-    evaluations_dir.mkdir(parents=True)
-    evaluation_paths = [
-        evaluations_dir / "evaluation-1000.json",
-        evaluations_dir / "evaluation-999.json",
-        evaluations_dir / "evaluation-900.json",
-        evaluations_dir / "evaluation-889.json",
-        evaluations_dir / "evaluation-700.json",
-        evaluations_dir / "evaluation-88.json",
-        evaluations_dir / "evaluation-70.json",
+def test_save_and_load_evaluation(mock_cwd, mock_time):
+    mock_time.return_value = 12300566.5
+
+    run_id = Cache.save_evaluation(EVALUATION)
+
+    assert Cache.runs_summaries() == [
+        RunSummary(
+            run_id=run_id,
+            timestamp=12300566.5,
+            commands_number=5,
+            successful_commands_number=3,
+        )
     ]
-    for evaluation_file in evaluation_paths:
-        evaluation_file.touch()
-    assert Cache.all_evaluation_paths() == evaluation_paths
+    assert Cache.recent_evaluation() == EVALUATION
 
 
-def test_numbered_evaluation_path(mock_cwd):
-    evaluations_dir = mock_cwd / ".statue" / "evaluations"
-    evaluations_dir.mkdir(parents=True)
-    evaluation_paths = [
-        evaluations_dir / "evaluation-3.json",
-        evaluations_dir / "evaluation-2.json",
-        evaluations_dir / "evaluation-1.json",
+def test_runs_summaries_are_ordered_from_recent(mock_cwd):
+    timestamps = [1000, 70, 999, 88, 700]
+    for timestamp in timestamps:
+        Cache.save_evaluation(EVALUATION, timestamp=timestamp)
+
+    assert [run_summary.timestamp for run_summary in Cache.runs_summaries()] == [
+        1000,
+        999,
+        700,
+        88,
+        70,
+    ]
+    assert [run_summary.timestamp for run_summary in Cache.runs_summaries(head=2)] == [
+        1000,
+        999,
     ]
-    for evaluation_file in evaluation_paths:
-        evaluation_file.touch()
-    for i, evaluation_file in enumerate(evaluation_paths):
-        assert Cache.evaluation_path(i) == evaluation_file
-    assert Cache.evaluation_path(len(evaluation_paths)) is None
+    assert Cache.run_summary(2).timestamp == 700
+    assert Cache.run_summary(len(timestamps)) is None
+
+
+def test_load_nth_evaluation(mock_cwd):
+    other_evaluation = Evaluation({SOURCE1: SourceEvaluation()})
+    Cache.save_evaluation(EVALUATION, timestamp=2)
+    Cache.save_evaluation(other_evaluation, timestamp=1)
+
+    assert Cache.load_evaluation(0) == EVALUATION
+    assert Cache.load_evaluation(1) == other_evaluation
+    assert Cache.load_evaluation(2) is None
+
+
+def test_failure_map(mock_cwd):
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+
+    assert Cache.failure_map() == {
+        SOURCE1: [Command(name=COMMAND2, help=COMMAND_HELP_STRING2, args=[ARG1])],
+        SOURCE2: [Command(name=COMMAND5, help=COMMAND_HELP_STRING5)],
+    }
+    assert Cache.failure_map(1) == {}
+
+
+def test_save_evaluation_deletes_old_evaluations(mock_cwd):
+    time_stamps = list(random.sample(range(1_000_000), k=HISTORY_SIZE + 1))
+    for time_stamp in time_stamps:
+        Cache.save_evaluation(EVALUATION, timestamp=time_stamp)
+
+    runs_summaries = Cache.runs_summaries()
+    assert len(runs_summaries) == HISTORY_SIZE
+    assert [run_summary.timestamp for run_summary in runs_summaries] == sorted(
+        time_stamps, reverse=True
+    )[:HISTORY_SIZE]
 
 
-def test_recent_evaluation_path(mock_cwd):
+def test_import_evaluation(mock_cwd, tmp_path):
+    evaluation_path = tmp_path / "evaluation.json"
+    EVALUATION.save_as_json(evaluation_path)
+
+    Cache.import_evaluation(evaluation_path, timestamp=5)
+    Cache.import_evaluation(evaluation_path)
+
+    assert Cache.run_summary(0).timestamp == evaluation_path.stat().st_mtime
+    assert Cache.run_summary(1).timestamp == 5
+    assert Cache.load_evaluation(1) == EVALUATION
+
+
+def test_legacy_evaluations_are_imported(mock_cwd):
     evaluations_dir = mock_cwd / ".statue" / "evaluations"
     evaluations_dir.mkdir(parents=True)
-    evaluation_paths = [
-        evaluations_dir / "evaluation-3.json",
-        evaluations_dir / "evaluation-2.json",
-        evaluations_dir / "evaluation-1.json",
+    EVALUATION.save_as_json(evaluations_dir / "evaluation-100.json")
+    (evaluations_dir / "evaluation-200.json").write_text('{"source": [')
+
+    assert [run_summary.timestamp for run_summary in Cache.runs_summaries()] == [100]
+    assert Cache.recent_evaluation() == EVALUATION
+
+
+def test_sources_index_is_created_and_saved(mock_cwd):
+    (mock_cwd / "setup.py").touch()
+    sources_index_path = mock_cwd / ".statue" / "sources_index.json"
+
+    sources_index = Cache.sources_index()
+
+    assert sources_index.root == mock_cwd
+    assert sources_index.sources() == [mock_cwd / "setup.py"]
+    assert Cache.sources_index_path() == sources_index_path
+    assert sources_index_path.exists()
+
+
+def test_sources_index_is_loaded_from_cache(mock_cwd, mocker):
+    (mock_cwd / "setup.py").touch()
+    Cache.sources_index()
+    load_from_file = mocker.spy(SourcesIndex, "load_from_file")
+
+    sources_index = Cache.sources_index()
+
+    assert load_from_file.spy_return is not None
+    assert sources_index.sources() == [mock_cwd / "setup.py"]
+
+
+def test_sources_index_skips_ignored_files(mock_cwd):
+    (mock_cwd / "setup.py").touch()
+    (mock_cwd / "ignored.py").touch()
+    (mock_cwd / ".gitignore").write_text("ignored.py\n")
+
+    sources_index = Cache.sources_index(repo=Repo.init(mock_cwd))
+
+    assert sources_index.sources() == [mock_cwd / "setup.py"]
+
+
+def test_sources_index_is_rebuilt_when_corrupted(mock_cwd):
+    (mock_cwd / "setup.py").touch()
+    Cache.sources_index_path().write_text("not a json")
+
+    sources_index = Cache.sources_index()
+
+    assert sources_index.sources() == [mock_cwd / "setup.py"]
+
+
+def test_concurrent_saves_keep_all_evaluations(mock_cwd):
+    runs_per_thread, threads_number = 4, 5
+    threads = [
+        threading.Thread(
+            target=lambda: [
+                Cache.save_evaluation(EVALUATION) for _ in range(runs_per_thread)
+            ]
+        )
+        for _ in range(threads_number)
     ]
-    for evaluation_file in evaluation_paths:
-        evaluation_file.touch()
-    assert Cache.recent_evaluation_path() == evaluation_paths[0]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
 
+    runs_summaries = Cache.runs_summaries()
+    assert len(runs_summaries) == runs_per_thread * threads_number
+    assert len({run_summary.run_id for run_summary in runs_summaries}) == len(
+        runs_summaries
+    )
+    assert all(
+        Cache.load_evaluation(n) == EVALUATION for n in range(len(runs_summaries))
+    )
 
-def test_recent_evaluation_path_when_dir_is_empty(mock_cwd):
-    evaluations_dir = mock_cwd / ".statue" / "evaluations"
-    evaluations_dir.mkdir(parents=True)
-    assert Cache.recent_evaluation_path() is None
 
+def test_corrupted_history_is_replaced(mock_cwd):
+    Cache.cache_dir()
+    Cache.history_path().write_bytes(b"not a database" * 100)
 
-def test_save_evaluation(mock_cwd, mock_time):
-    time = 12300566
-    evaluations_dir = mock_cwd / ".statue" / "evaluations"
-    evaluation_file = evaluations_dir / f"evaluation-{time}.json"
-    mock_time.return_value = time
+    Cache.save_evaluation(EVALUATION, timestamp=1)
 
-    evaluation = mock.Mock()
-    evaluation.save_as_json.side_effect = lambda path: path.touch()
+    assert Cache.recent_evaluation() == EVALUATION
+    assert (mock_cwd / ".statue" / "history.sqlite.corrupted").exists()
 
-    Cache.save_evaluation(evaluation)
-    evaluation.save_as_json.assert_called_with(evaluation_file)
-    assert evaluation_file.exists()
 
+def test_corrupted_commands_are_skipped(mock_cwd):
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+    with Cache.connect() as connection:
+        connection.execute(
+            "UPDATE commands SET command = X'00' WHERE name = ?",
+            (COMMAND2,),
+        )
 
-def test_save_evaluation_deletes_old_evaluations(mock_cwd, mock_time):
-    evaluations_dir = mock_cwd / ".statue" / "evaluations"
-    evaluations_dir.mkdir(parents=True)
+    assert Cache.failure_map() == {
+        SOURCE2: [Command(name=COMMAND5, help=COMMAND_HELP_STRING5)],
+    }
+    assert [
+        command_evaluation.command.name
+        for command_evaluation in Cache.recent_evaluation()[
+            SOURCE1
+        ].commands_evaluations
+    ] == [COMMAND1, COMMAND3]
+
+
+def test_failed_save_is_rolled_back(mock_cwd, mocker):
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+    mocker.patch.object(
+        Cache, "_Cache__remove_old_evaluations", side_effect=KeyboardInterrupt()
+    )
+
+    with pytest.raises(KeyboardInterrupt):
+        Cache.save_evaluation(EVALUATION, timestamp=2)
+
+    assert [run_summary.timestamp for run_summary in Cache.runs_summaries()] == [1]
+
+
+def locked_history():
+    Cache.cache_dir()
+    lock_connection = sqlite3.connect(
+        str(Cache.history_path()), isolation_level=None, check_same_thread=False
+    )
+    lock_connection.execute("CREATE TABLE lock (id INTEGER)")
+    lock_connection.execute("BEGIN")
+    lock_connection.execute("SELECT * FROM lock").fetchall()
+    return lock_connection
+
+
+def test_locked_history_is_not_replaced(mock_cwd, mocker):
+    mocker.patch("statue.cache.HISTORY_TIMEOUT", 0)
+    mock_time_module = mocker.patch("statue.cache.time")
+    mock_time_module.monotonic.side_effect = [0, 0, 1, 0]
+    lock_connection = locked_history()
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            Cache.runs_summaries()
+    finally:
+        lock_connection.close()
+
+    mock_time_module.sleep.assert_called_once_with(0.01)
+
+    assert not (mock_cwd / ".statue" / "history.sqlite.corrupted").exists()
+    assert Cache.runs_summaries() == []
+
+
+def test_history_waits_for_lock(mock_cwd):
+    lock_connection = locked_history()
+    timer = threading.Timer(0.05, lock_connection.close)
+    timer.start()
+
+    assert Cache.runs_summaries() == []
+    timer.join()
+
+
+def test_history_created_by_another_process(mock_cwd, mocker):
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+    mocker.patch.object(
+        Cache, "_Cache__schema_version", side_effect=[0, HISTORY_SCHEMA_VERSION]
+    )
+
+    assert len(Cache.runs_summaries()) == 1
+
+
+def test_commands_are_stored_once(mock_cwd):
+    for timestamp in range(3):
+        Cache.save_evaluation(EVALUATION, timestamp=timestamp)
+
+    with Cache.connect() as connection:
+        assert connection.execute("SELECT COUNT(*) FROM commands").fetchone() == (5,)
+
+
+def test_pinned_evaluations_are_kept(mock_cwd):
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+    assert Cache.pin_evaluation(0)
+    assert not Cache.pin_evaluation(1)
+
+    for timestamp in range(2, 5):
+        Cache.save_evaluation(
+            EVALUATION, timestamp=timestamp, retention_policy=RetentionPolicy(2)
+        )
+
+    runs_summaries = Cache.runs_summaries()
+    assert [run_summary.timestamp for run_summary in runs_summaries] == [4, 3, 1]
+    assert [run_summary.pinned for run_summary in runs_summaries] == [
+        False,
+        False,
+        True,
+    ]
+
+    assert Cache.pin_evaluation(2, pinned=False)
+    Cache.save_evaluation(EVALUATION, timestamp=5, retention_policy=RetentionPolicy(2))
+    assert [run_summary.timestamp for run_summary in Cache.runs_summaries()] == [5, 4]
+
+
+def test_least_recently_used_evaluations_are_removed(mock_cwd, mock_time):
+    mock_time.return_value = 1000
+    for timestamp in range(1, 4):
+        Cache.save_evaluation(EVALUATION, timestamp=timestamp)
+    Cache.load_evaluation(2)
 
-    time_stamps = list(random.choices(range(1_000_000), k=HISTORY_SIZE + 1))
-    time_stamps.sort(reverse=True)
-    old_time_stamps, recent_time_stamp = time_stamps[1:], time_stamps[0]
-    old_evaluations = [
-        evaluations_dir / f"evaluation-{time_stamp}.json"
-        for time_stamp in old_time_stamps
+    Cache.save_evaluation(
+        EVALUATION, timestamp=4, retention_policy=RetentionPolicy(max_runs=2)
+    )
+
+    assert [run_summary.timestamp for run_summary in Cache.runs_summaries()] == [4, 1]
+
+
+def test_old_evaluations_are_removed(mock_cwd, mock_time):
+    mock_time.return_value = 10 * SECONDS_IN_DAY
+    for days in [1, 5, 8, 9]:
+        Cache.save_evaluation(
+            EVALUATION,
+            timestamp=days * SECONDS_IN_DAY,
+            retention_policy=RetentionPolicy(max_age_days=3),
+        )
+
+    assert [run_summary.timestamp for run_summary in Cache.runs_summaries()] == [
+        9 * SECONDS_IN_DAY,
+        8 * SECONDS_IN_DAY,
+    ]
+
+
+def test_history_size_is_limited(mock_cwd):
+    large_evaluation = Evaluation(
+        {
+            f"source{i}.py": SourceEvaluation(EVALUATION[SOURCE1].commands_evaluations)
+            for i in range(60)
+        }
+    )
+    retention_policy = RetentionPolicy(max_runs=None, max_size=100_000)
+    for timestamp in range(20):
+        Cache.save_evaluation(
+            large_evaluation, timestamp=timestamp, retention_policy=retention_policy
+        )
+
+    runs_summaries = Cache.runs_summaries()
+    assert 1 < len(runs_summaries) < 20
+    assert runs_summaries[0].timestamp == 19
+    # Few free pages may be left in the file
+    assert Cache.history_path().stat().st_size <= 100_000 + 4 * 4096
+
+
+def test_history_of_unknown_version_is_replaced(mock_cwd):
+    Cache.cache_dir()
+    connection = sqlite3.connect(str(Cache.history_path()))
+    connection.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY)")
+    connection.execute(f"PRAGMA user_version = {HISTORY_SCHEMA_VERSION + 1}")
+    connection.close()
+
+    Cache.save_evaluation(EVALUATION, timestamp=1)
+
+    assert Cache.recent_evaluation() == EVALUATION
+    assert (mock_cwd / ".statue" / "history.sqlite.corrupted").exists()
+
+
+def record_evaluation(evaluation, timestamp=None):
+    run_id = Cache.start_run(timestamp=timestamp)
+    for source, source_evaluation in evaluation.items():
+        for command_evaluation in source_evaluation.commands_evaluations:
+            Cache.record_command_evaluation(run_id, source, command_evaluation)
+    return run_id
+
+
+def test_record_evaluation(mock_cwd, mock_time):
+    mock_time.return_value = 12300566.5
+
+    run_id = record_evaluation(EVALUATION)
+    Cache.finish_run(run_id)
+
+    assert Cache.runs_summaries() == [
+        RunSummary(
+            run_id=run_id,
+            timestamp=12300566.5,
+            commands_number=5,
+            successful_commands_number=3,
+            complete=True,
+        )
+    ]
+    assert Cache.recent_evaluation() == EVALUATION
+
+
+def test_unfinished_run_is_incomplete(mock_cwd):
+    run_id = Cache.start_run(timestamp=10)
+    Cache.record_command_evaluation(
+        run_id, SOURCE1, EVALUATION[SOURCE1].commands_evaluations[1]
+    )
+
+    assert Cache.runs_summaries() == [
+        RunSummary(
+            run_id=run_id,
+            timestamp=10,
+            commands_number=1,
+            successful_commands_number=0,
+            complete=False,
+        )
     ]
-    for evaluation_file in old_evaluations:
-        evaluation_file.touch()
-    recent_evaluation_file = evaluations_dir / f"evaluation-{recent_time_stamp}.json"
+    assert Cache.recent_evaluation() == Evaluation(
+        {SOURCE1: SourceEvaluation([EVALUATION[SOURCE1].commands_evaluations[1]])}
+    )
+    assert not Cache.runs_summaries()[0].success
+
+
+def test_finish_run_deletes_old_evaluations(mock_cwd):
+    for timestamp in range(3):
+        Cache.save_evaluation(EVALUATION, timestamp=timestamp)
+    run_id = record_evaluation(EVALUATION, timestamp=3)
+
+    Cache.finish_run(run_id, retention_policy=RetentionPolicy(max_runs=2))
+
+    assert [run_summary.timestamp for run_summary in Cache.runs_summaries()] == [3, 2]
+
+
+def test_finish_run_keeps_runs_recorded_by_other_processes(mock_cwd):
+    first_run_id = Cache.start_run()
+    second_run_id = Cache.start_run()
+    first_evaluation, second_evaluation = EVALUATION[SOURCE1].commands_evaluations[:2]
+    Cache.record_command_evaluation(first_run_id, SOURCE1, first_evaluation)
+    Cache.record_command_evaluation(second_run_id, SOURCE1, first_evaluation)
+
+    Cache.finish_run(second_run_id, retention_policy=RetentionPolicy(max_runs=0))
+    Cache.record_command_evaluation(first_run_id, SOURCE1, second_evaluation)
+    Cache.finish_run(first_run_id, retention_policy=RetentionPolicy(max_runs=0))
+
+    assert Cache.runs_summaries() == [
+        RunSummary(
+            run_id=second_run_id,
+            timestamp=Cache.runs_summaries()[0].timestamp,
+            commands_number=1,
+            successful_commands_number=1,
+            complete=True,
+        )
+    ]
+
+
+def test_stale_unfinished_runs_are_removed(mock_cwd):
+    record_evaluation(EVALUATION, timestamp=1)
+
+    Cache.save_evaluation(
+        EVALUATION, retention_policy=RetentionPolicy(max_runs=1, min_runs=0)
+    )
+
+    assert [run_summary.complete for run_summary in Cache.runs_summaries()] == [True]
+
+
+def test_last_incomplete_run(mock_cwd):
+    assert Cache.last_incomplete_run() is None
+
+    run_id = record_evaluation(EVALUATION, timestamp=1)
+    Cache.save_evaluation(EVALUATION, timestamp=2)
+    Cache.start_run(timestamp=0, fingerprint="fingerprint")
 
-    mock_time.return_value = time_stamps[0]
-    evaluation = mock.Mock()
-    evaluation.save_as_json.side_effect = lambda path: path.touch()
+    assert Cache.last_incomplete_run() == RunSummary(
+        run_id=run_id,
+        timestamp=1,
+        commands_number=5,
+        successful_commands_number=3,
+        complete=False,
+    )
+    assert Cache.run_evaluation(run_id) == EVALUATION
 
-    assert not recent_evaluation_file.exists()
+    Cache.finish_run(run_id)
+
+    assert Cache.last_incomplete_run().fingerprint == "fingerprint"
+
+
+def test_failure_map_checks_failed_files(mock_cwd):
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    evaluation = Evaluation(
+        {
+            SOURCE1: SourceEvaluation(
+                [
+                    CommandEvaluation(
+                        command=command, success=False, failed_files=["a.py"]
+                    )
+                ]
+            )
+        }
+    )
 
     Cache.save_evaluation(evaluation)
-    evaluation.save_as_json.assert_called_with(recent_evaluation_file)
 
-    assert recent_evaluation_file.exists()
-    for i, evaluation_file in enumerate(old_evaluations[:-1]):
-        assert evaluation_file.exists(), f"The {i}th old file does not exist."
-    assert not old_evaluations[-1].exists()
+    assert Cache.recent_evaluation() == evaluation
+    assert Cache.failure_map() == {
+        SOURCE1: [
+            Command(
+                name=COMMAND1,
+                help=COMMAND_HELP_STRING1,
+                files_filter=FilesFilter(files=("a.py",)),
+            )
+        ]
+    }
+
+
+def test_duration_is_saved(mock_cwd):
+    command_evaluation = CommandEvaluation(
+        command=Command(name=COMMAND1, help=COMMAND_HELP_STRING1),
+        success=True,
+        duration=0.25,
+    )
+    Cache.save_evaluation(Evaluation({SOURCE1: SourceEvaluation([command_evaluation])}))
+
+    assert Cache.recent_evaluation()[SOURCE1].commands_evaluations[0].duration == 0.25
+
+
+def test_commands_histories(mock_cwd):
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    for timestamp, success, duration in [
+        (2, False, 1.5),
+        (1, True, None),
+        (4, True, 0.5),
+        (3, True, 2),
+    ]:
+        Cache.save_evaluation(
+            Evaluation(
+                {
+                    SOURCE1: SourceEvaluation(
+                        [
+                            CommandEvaluation(
+                                command=command, success=success, duration=duration
+                            ),
+                            CommandEvaluation(
+                                command=Command(
+                                    name=COMMAND1,
+                                    help=COMMAND_HELP_STRING1,
+                                    args=[ARG1],
+                                ),
+                                success=True,
+                            ),
+                        ]
+                    ),
+                    SOURCE2: SourceEvaluation(
+                        [CommandEvaluation(command=command, success=True)]
+                    ),
+                }
+            ),
+            timestamp=timestamp,
+        )
+
+    assert sorted(Cache.commands_histories(), key=lambda history: history.source) == [
+        CommandHistory(
+            source=SOURCE1,
+            command=COMMAND1,
+            runs=8,
+            failures=1,
+            durations=[(1.5, 1), (2, 1), (0.5, 1)],
+        ),
+        CommandHistory(source=SOURCE2, command=COMMAND1, runs=4),
+    ]
+    assert sorted(
+        Cache.commands_histories(head=2), key=lambda history: history.source
+    ) == [
+        CommandHistory(
+            source=SOURCE1, command=COMMAND1, runs=4, durations=[(2, 1), (0.5, 1)]
+        ),
+        CommandHistory(source=SOURCE2, command=COMMAND1, runs=2),
+    ]
+
+
+def save_timed_evaluation(timestamp, success, duration, retention_policy):
+    Cache.save_evaluation(
+        Evaluation(
+            {
+                SOURCE1: SourceEvaluation(
+                    [
+                        CommandEvaluation(
+                            command=Command(name=COMMAND1, help=COMMAND_HELP_STRING1),
+                            success=success,
+                            duration=duration,
+                        )
+                    ]
+                )
+            }
+        ),
+        timestamp=timestamp,
+        retention_policy=retention_policy,
+    )
+
+
+def test_removed_runs_are_rolled_up(mock_cwd, mock_time):
+    mock_time.return_value = 10 * SECONDS_IN_DAY
+    retention_policy = RetentionPolicy(max_runs=1, rollup=True)
+    for days, success, duration in [(1.2, False, 1), (1.7, True, 2), (3.5, True, 3)]:
+        save_timed_evaluation(
+            days * SECONDS_IN_DAY, success, duration, retention_policy
+        )
+
+    assert [run_summary.timestamp for run_summary in Cache.runs_summaries()] == [
+        3.5 * SECONDS_IN_DAY
+    ]
+    assert Cache.commands_histories() == [
+        CommandHistory(
+            source=SOURCE1,
+            command=COMMAND1,
+            runs=3,
+            failures=1,
+            durations=[
+                (pytest.approx(1, rel=0.025), 1),
+                (pytest.approx(2, rel=0.025), 1),
+                (3, 1),
+            ],
+        )
+    ]
+    assert Cache.commands_histories(head=5) == [
+        CommandHistory(source=SOURCE1, command=COMMAND1, runs=1, durations=[(3, 1)])
+    ]
+
+
+def test_pinned_runs_are_ordered_with_rollups(mock_cwd, mock_time):
+    mock_time.return_value = 10 * SECONDS_IN_DAY
+    retention_policy = RetentionPolicy(max_runs=1, rollup=True)
+    save_timed_evaluation(SECONDS_IN_DAY, True, 1, retention_policy)
+    Cache.pin_evaluation(0)
+    for days, duration in [(2.5, 2), (3.5, 3)]:
+        save_timed_evaluation(days * SECONDS_IN_DAY, True, duration, retention_policy)
+
+    assert Cache.commands_histories() == [
+        CommandHistory(
+            source=SOURCE1,
+            command=COMMAND1,
+            runs=3,
+            durations=[(1, 1), (pytest.approx(2, rel=0.025), 1), (3, 1)],
+        )
+    ]
+
+
+def test_old_rollups_are_rolled_up_into_weeks(mock_cwd, mock_time):
+    mock_time.return_value = 30 * SECONDS_IN_DAY
+    retention_policy = RetentionPolicy(
+        max_runs=1, rollup=True, weekly_rollup_after_days=20
+    )
+    # Days 5 and 6 are in the week starting on day 4, and day 12 in the next one
+    for days in [5, 6, 12, 25]:
+        save_timed_evaluation(days * SECONDS_IN_DAY, True, None, retention_policy)
+
+    with Cache.connect() as connection:
+        rollups = connection.execute(
+            "SELECT period_days, period_start, runs FROM rollups ORDER BY period_start"
+        ).fetchall()
+    assert rollups == [(7, 4 * SECONDS_IN_DAY, 2), (1, 12 * SECONDS_IN_DAY, 1)]
+    assert Cache.commands_histories() == [
+        CommandHistory(source=SOURCE1, command=COMMAND1, runs=4)
+    ]
+
+
+def test_removed_runs_are_not_rolled_up_by_default(mock_cwd):
+    for timestamp in range(3):
+        save_timed_evaluation(timestamp, True, 1, RetentionPolicy(max_runs=1))
+
+    assert Cache.commands_histories() == [
+        CommandHistory(source=SOURCE1, command=COMMAND1, runs=1, durations=[(1, 1)])
+    ]
+
+
+def test_file_timings(mock_cwd):
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    Cache.save_file_timings(
+        command,
+        [FileTiming("a.py", 1.5, True), FileTiming("b.py", 2, False)],
+        {"a.py": b"a", "b.py": b"b"},
+    )
+
+    assert Cache.file_timings(command, {"a.py": b"a", "b.py": b"b"}) == {
+        "a.py": FileTiming("a.py", 1.5, True),
+        "b.py": FileTiming("b.py", 2, False),
+    }
+    assert Cache.file_timings(command, {"a.py": b"changed", "c.py": b"c"}) == {}
+    assert (
+        Cache.file_timings(
+            Command(name=COMMAND1, help=COMMAND_HELP_STRING1, args=[ARG1]),
+            {"a.py": b"a"},
+        )
+        == {}
+    )
+
+
+def test_file_timings_are_replaced(mock_cwd):
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    Cache.save_file_timings(command, [FileTiming("a.py", 1, True)], {"a.py": b"a"})
+    Cache.save_file_timings(command, [FileTiming("a.py", 3, False)], {"a.py": b"b"})
+
+    assert Cache.file_timings(command, {"a.py": b"a"}) == {}
+    assert Cache.file_timings(command, {"a.py": b"b"}) == {
+        "a.py": FileTiming("a.py", 3, False)
+    }
@@ -1,11 +1,26 @@
+import errno
+import signal
+import subprocess
 import sys
+import time
 from argparse import Namespace
+from pathlib import Path
 
 import pytest
 from pytest_cases import THIS_MODULE, parametrize_with_cases
 
-from statue.command import Command
+from statue.command import (
+    ARGS_HEADROOM,
+    MAX_RSS_UNIT,
+    WINDOWS_COMMAND_LINE_LIMIT,
+    Command,
+    ProcessesUsage,
+    args_length,
+    max_args_length,
+)
 from statue.exceptions import CommandExecutionError
+from statue.files_filter import FilesFilter
+from statue.profiler import OUTPUT_CAPTURE, SPAWN, TOOLS_RUNTIME, Profiler
 from statue.verbosity import SILENT, VERBOSE
 from tests.constants import (
     ARG1,
@@ -34,7 +49,10 @@ def case_no_args():
         args=[],
         command_input=[COMMAND1, SOURCE1],
         print=f'Running the following command: "{COMMAND1} {SOURCE1}"',
-        repr=f"Command(name='{COMMAND1}', help='{COMMAND_HELP_STRING1}', args=[])",
+        repr=(
+            f"Command(name='{COMMAND1}', help='{COMMAND_HELP_STRING1}', args=[], "
+            "files_filter=None)"
+        ),
     )
     return inp, output
 
@@ -49,7 +67,7 @@ def case_one_arg():
         print=f'Running the following command: "{COMMAND2} {SOURCE1} {ARG1}"',
         repr=(
             f"Command(name='{COMMAND2}', help='{COMMAND_HELP_STRING2}', "
-            f"args=['{ARG1}'])"
+            f"args=['{ARG1}'], files_filter=None)"
         ),
     )
     return inp, output
@@ -67,7 +85,7 @@ def case_two_args():
         ),
         repr=(
             f"Command(name='{COMMAND3}', help='{COMMAND_HELP_STRING3}',"
-            f" args=['{ARG1}', '{ARG2}'])"
+            f" args=['{ARG1}', '{ARG2}'], files_filter=None)"
         ),
     )
     return inp, output
@@ -89,16 +107,22 @@ def test_args_are_set(command, out):
 
 
 @parametrize_with_cases(argnames="command, out", cases=THIS_MODULE)
-def test_execute(command, out, mock_subprocess, environ):
+def test_execute(command, out, mock_popen, environ):
     command.execute(SOURCE1)
-    mock_subprocess.assert_called_with(
-        out["command_input"], env=environ, check=False, capture_output=False
+    mock_popen.assert_called_with(
+        out["command_input"],
+        env=environ,
+        stdout=None,
+        stderr=None,
+        start_new_session=True,
+        text=False,
+        errors=None,
     )
 
 
 @parametrize_with_cases(argnames="command, out", cases=THIS_MODULE)
-def test_execute_raises_error(command, out, mock_subprocess, environ):
-    mock_subprocess.side_effect = FileNotFoundError()
+def test_execute_raises_error(command, out, mock_popen, environ):
+    mock_popen.side_effect = FileNotFoundError()
     with pytest.raises(
         CommandExecutionError,
         match=f'^Cannot execute "{command.name}" because it is not installed.$',
@@ -107,18 +131,30 @@ def test_execute_raises_error(command, out, mock_subprocess, environ):
 
 
 @parametrize_with_cases(argnames="command, out", cases=THIS_MODULE)
-def test_execute_silently(command, out, mock_subprocess, environ):
+def test_execute_silently(command, out, mock_popen, environ):
     command.execute(SOURCE1, verbosity=SILENT)
-    mock_subprocess.assert_called_with(
-        out["command_input"], env=environ, check=False, capture_output=True
+    mock_popen.assert_called_with(
+        out["command_input"],
+        env=environ,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        text=False,
+        errors=None,
     )
 
 
 @parametrize_with_cases(argnames="command, out", cases=THIS_MODULE)
-def test_execute_verbosely(command, out, mock_subprocess, environ, print_mock):
+def test_execute_verbosely(command, out, mock_popen, environ, print_mock):
     command.execute(SOURCE1, verbosity=VERBOSE)
-    mock_subprocess.assert_called_with(
-        out["command_input"], env=environ, check=False, capture_output=False
+    mock_popen.assert_called_with(
+        out["command_input"],
+        env=environ,
+        stdout=None,
+        stderr=None,
+        start_new_session=True,
+        text=False,
+        errors=None,
     )
     print_mock.assert_called_with(out["print"])
 
@@ -220,3 +256,316 @@ def test_command_not_equals_because_of_different_args():
     command2 = Command(name=name, help=help_string, args=args2)
     assert not command1 == command2  # pylint: disable=C0113
     assert command1 != command2
+
+
+def test_execute_with_files_filter(mock_popen, environ, tmpdir):
+    source = Path(tmpdir)
+    for file_name in ["a.py", "b_pb2.py", "c.py"]:
+        (source / file_name).touch()
+    command = Command(
+        name=COMMAND1,
+        help=COMMAND_HELP_STRING1,
+        args=[ARG1],
+        files_filter=FilesFilter(exclude=("*_pb2.py",)),
+    )
+    command.execute(str(source))
+    mock_popen.assert_called_with(
+        [COMMAND1, str(source / "a.py"), str(source / "c.py"), ARG1],
+        env=environ,
+        stdout=None,
+        stderr=None,
+        start_new_session=True,
+        text=False,
+        errors=None,
+    )
+
+
+def test_execute_with_files_filter_and_no_files_left(mock_popen, tmpdir, print_mock):
+    source = Path(tmpdir)
+    (source / "a_pb2.py").touch()
+    command = Command(
+        name=COMMAND1,
+        help=COMMAND_HELP_STRING1,
+        files_filter=FilesFilter(exclude=("*_pb2.py",)),
+    )
+    assert command.execute(str(source), verbosity=VERBOSE) == 0
+    mock_popen.assert_not_called()
+    print_mock.assert_called_with(f'No files of "{source}" were left to check.')
+
+
+def test_execute_with_failed_files_left(mock_popen, environ, tmpdir):
+    source = Path(tmpdir)
+    for file_name in ["a.py", "b.py"]:
+        (source / file_name).touch()
+    command = Command(
+        name=COMMAND1,
+        help=COMMAND_HELP_STRING1,
+        files_filter=FilesFilter(files=("b.py",)),
+    )
+
+    command.execute(str(source))
+
+    assert mock_popen.call_args[0][0] == [COMMAND1, str(source / "b.py")]
+
+
+@pytest.mark.parametrize(
+    ("files_filter", "checked_files"),
+    [
+        (FilesFilter(files=("gone.py",)), ["."]),
+        (
+            FilesFilter(exclude=("*_pb2.py",), files=("gone.py",)),
+            ["a.py", "c.py"],
+        ),
+    ],
+)
+def test_execute_with_no_failed_files_left(
+    mock_popen, environ, tmpdir, files_filter, checked_files
+):
+    source = Path(tmpdir)
+    for file_name in ["a.py", "b_pb2.py", "c.py"]:
+        (source / file_name).touch()
+    command = Command(
+        name=COMMAND1, help=COMMAND_HELP_STRING1, files_filter=files_filter
+    )
+
+    command.execute(str(source))
+
+    assert mock_popen.call_args[0][0] == [
+        COMMAND1,
+        *[str(source / file_name) for file_name in checked_files],
+    ]
+
+
+@pytest.fixture
+def many_files_command(tmpdir):
+    source = Path(tmpdir)
+    for file_name in ["a.py", "b.py", "c.py"]:
+        (source / file_name).touch()
+    return (
+        Command(
+            name=COMMAND1,
+            help=COMMAND_HELP_STRING1,
+            args=[ARG1],
+            files_filter=FilesFilter(),
+        ),
+        [str(source / file_name) for file_name in ["a.py", "b.py", "c.py"]],
+    )
+
+
+def test_execute_splits_files_beyond_arguments_limit(
+    many_files_command, mock_popen, mocker
+):
+    command, files = many_files_command
+    mocker.patch(
+        "statue.command.max_args_length",
+        return_value=args_length([COMMAND1, ARG1, *files[:2]]),
+    )
+    mock_popen.return_value.wait.side_effect = [0, 2]
+
+    assert command.execute(str(Path(files[0]).parent), verbosity=SILENT) == 2
+    assert [call_args.args[0] for call_args in mock_popen.call_args_list] == [
+        [COMMAND1, *files[:2], ARG1],
+        [COMMAND1, files[2], ARG1],
+    ]
+
+
+def test_execute_splits_files_on_too_long_arguments(many_files_command, mock_popen):
+    command, files = many_files_command
+    process = mock_popen.return_value
+    process.wait.side_effect = [3, 0, 0]
+    mock_popen.side_effect = [
+        OSError(errno.E2BIG, "Argument list too long"),
+        process,
+        OSError(errno.E2BIG, "Argument list too long"),
+        process,
+        process,
+    ]
+
+    assert command.execute(str(Path(files[0]).parent), verbosity=SILENT) == 3
+    assert [call_args.args[0] for call_args in mock_popen.call_args_list] == [
+        [COMMAND1, *files, ARG1],
+        [COMMAND1, files[0], ARG1],
+        [COMMAND1, *files[1:], ARG1],
+        [COMMAND1, files[1], ARG1],
+        [COMMAND1, files[2], ARG1],
+    ]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [OSError(errno.E2BIG, "Argument list too long"), OSError(errno.EACCES, "Denied")],
+)
+def test_execute_raises_error_of_single_file(mock_popen, error):
+    mock_popen.side_effect = error
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+
+    with pytest.raises(OSError) as exc_info:
+        command.execute(SOURCE1)
+    assert exc_info.value is error
+
+
+def test_max_args_length_excludes_environment(mocker):
+    mocker.patch("os.sysconf", return_value=10000)
+    mocker.patch.dict("os.environ", {"KEY": "value"}, clear=True)
+
+    assert max_args_length() == 10000 - args_length(["KEY=value"]) - ARGS_HEADROOM
+
+
+def test_max_args_length_without_sysconf(mocker):
+    mocker.patch("os.sysconf", side_effect=ValueError())
+
+    assert max_args_length() == WINDOWS_COMMAND_LINE_LIMIT
+
+
+def test_command_json_with_files_filter():
+    command = Command(
+        name=COMMAND1,
+        help=COMMAND_HELP_STRING1,
+        args=[ARG1],
+        files_filter=FilesFilter(exclude=("*_pb2.py",), max_file_size=100),
+    )
+    assert command.as_json() == dict(
+        name=COMMAND1,
+        help=COMMAND_HELP_STRING1,
+        args=[ARG1],
+        files_filter=dict(include=[], exclude=["*_pb2.py"], max_file_size=100),
+    )
+    assert Command.from_json(command.as_json()) == command
+
+
+def test_execute_returns_return_code(mock_popen):
+    mock_popen.return_value.wait.return_value = 3
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+
+    assert command.execute(SOURCE1) == 3
+
+
+def test_interrupted_execution_kills_process_group(mock_popen, mocker):
+    mock_killpg = mocker.patch("os.killpg")
+    process = mock_popen.return_value
+    process.wait.side_effect = [KeyboardInterrupt(), 0]
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+
+    with pytest.raises(KeyboardInterrupt):
+        command.execute(SOURCE1)
+
+    mock_killpg.assert_called_once_with(process.pid, signal.SIGKILL)
+    assert process.wait.call_count == 2
+
+
+def test_interrupted_execution_of_finished_process(mock_popen, mocker):
+    mocker.patch("os.killpg", side_effect=ProcessLookupError())
+    process = mock_popen.return_value
+    process.wait.side_effect = [KeyboardInterrupt(), 0]
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+
+    with pytest.raises(KeyboardInterrupt):
+        command.execute(SOURCE1)
+
+    assert process.wait.call_count == 2
+
+
+def test_interrupted_execution_without_process_groups(mock_popen, mocker):
+    mocker.patch("statue.command.os", spec=["environ"], environ={})
+    process = mock_popen.return_value
+    process.wait.side_effect = [KeyboardInterrupt(), 0]
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+
+    with pytest.raises(KeyboardInterrupt):
+        command.execute(SOURCE1)
+
+    process.kill.assert_called_once_with()
+
+
+def test_execute_with_output(mock_popen, environ, capsys):
+    process = mock_popen.return_value
+    process.stdout = ["line1\n", "line2\n"]
+    process.wait.return_value = 1
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    output = []
+
+    assert command.execute(SOURCE1, output=output) == 1
+
+    assert output == ["line1\n", "line2\n"]
+    assert capsys.readouterr().out == "line1\nline2\n"
+    mock_popen.assert_called_with(
+        [COMMAND1, SOURCE1],
+        env=environ,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        start_new_session=True,
+        text=True,
+        errors="replace",
+    )
+
+
+def test_execute_measures_tool_runtime_apart_from_output_handling(mock_popen):
+    def slow_output():
+        for line in ["line1\n", "line2\n"]:
+            time.sleep(0.05)
+            yield line
+
+    mock_popen.return_value.stdout = slow_output()
+    mock_popen.return_value.wait.return_value = 0
+    Profiler.reset()
+
+    Command(name=COMMAND1, help=COMMAND_HELP_STRING1).execute(
+        SOURCE1, verbosity=SILENT, output=[]
+    )
+
+    phases = Profiler.phases()
+    Profiler.reset()
+    assert list(phases.keys()) == [SPAWN, OUTPUT_CAPTURE, TOOLS_RUNTIME]
+    assert all(phase_time.count == 1 for phase_time in phases.values())
+    assert phases[TOOLS_RUNTIME].total >= 0.1
+    assert phases[OUTPUT_CAPTURE].total < 0.05
+
+
+def test_execute_silently_with_output(mock_popen, capsys):
+    mock_popen.return_value.stdout = ["line1\n"]
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    output = []
+
+    command.execute(SOURCE1, verbosity=SILENT, output=output)
+
+    assert output == ["line1\n"]
+    assert capsys.readouterr().out == ""
+
+
+def test_command_reports_files():
+    assert Command(name="flake8", help=COMMAND_HELP_STRING1).reports_files
+    assert not Command(name=COMMAND1, help=COMMAND_HELP_STRING1).reports_files
+
+
+@pytest.mark.parametrize(
+    "status, return_code", [(0, 0), (3 << 8, 3), (signal.SIGKILL, -signal.SIGKILL)]
+)
+def test_execute_counts_peak_rss(mock_popen, mocker, status, return_code):
+    process = mock_popen.return_value
+    mock_wait4 = mocker.patch(
+        "os.wait4", return_value=(process.pid, status, Namespace(ru_maxrss=100))
+    )
+    usage = ProcessesUsage()
+    larger_usage = ProcessesUsage(peak_rss=MAX_RSS_UNIT * 200)
+    command = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+
+    assert command.execute(SOURCE1, usage=usage) == return_code
+    assert command.execute(SOURCE1, usage=larger_usage) == return_code
+
+    mock_wait4.assert_called_with(process.pid, 0)
+    process.wait.assert_not_called()
+    assert process.returncode == return_code
+    assert usage == ProcessesUsage(peak_rss=MAX_RSS_UNIT * 100)
+    assert larger_usage == ProcessesUsage(peak_rss=MAX_RSS_UNIT * 200)
+
+
+def test_execute_counts_peak_rss_of_process():
+    usage = ProcessesUsage()
+    command = Command(
+        name=sys.executable,
+        help=COMMAND_HELP_STRING1,
+        args=["import sys; memory = bytearray(50_000_000); sys.exit(2)"],
+    )
+
+    assert command.execute("-c", verbosity=SILENT, usage=usage) == 2
+    assert usage.peak_rss > 50_000_000
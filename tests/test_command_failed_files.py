@@ -0,0 +1,112 @@
+from pathlib import Path
+
+from pytest_cases import THIS_MODULE, fixture, parametrize_with_cases
+
+from statue.command import Command
+
+SOURCE = "src"
+
+
+@fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for relative_path in ["pkg/__init__.py", "pkg/a.py", "pkg/b.py"]:
+        file_path = tmp_path / SOURCE / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.touch()
+    return tmp_path / SOURCE
+
+
+def case_flake8():
+    output = [
+        "src/pkg/a.py:1:1: F401 'os' imported but unused\n",
+        "src/pkg/b.py:7:80: E501 line too long (81 > 79 characters)\n",
+    ]
+    return "flake8", output, ["pkg/a.py", "pkg/b.py"]
+
+
+def case_pylint():
+    output = [
+        "************* Module pkg.a\n",
+        "src/pkg/a.py:1:0: C0114: Missing module docstring\n",
+        "Your code has been rated at 5.00/10\n",
+    ]
+    return "pylint", output, ["pkg/a.py"]
+
+
+def case_mypy():
+    output = [
+        'src/pkg/b.py:2: error: Name "x" is not defined\n',
+        "Found 1 error in 1 file (checked 3 source files)\n",
+    ]
+    return "mypy", output, ["pkg/b.py"]
+
+
+def case_isort():
+    output = [
+        "ERROR: {source}/pkg/a.py Imports are incorrectly sorted and/or formatted.\n"
+    ]
+    return "isort", output, ["pkg/a.py"]
+
+
+def case_black():
+    output = [
+        "would reformat src/pkg/b.py\n",
+        "Oh no! 1 file would be reformatted, 2 files would be left unchanged.\n",
+    ]
+    return "black", output, ["pkg/b.py"]
+
+
+def case_pydocstyle():
+    output = [
+        "src/pkg/a.py:1 at module level:\n",
+        "        D100: Missing docstring in public module\n",
+    ]
+    return "pydocstyle", output, ["pkg/a.py"]
+
+
+def case_bandit():
+    output = [
+        ">> Issue: [B101:assert_used] Use of assert detected.\n",
+        "   Location: ./src/pkg/b.py:3:4\n",
+    ]
+    return "bandit", output, ["pkg/b.py"]
+
+
+def case_files_outside_of_source():
+    output = ["other/c.py:1:1: F401 'os' imported but unused\n"]
+    return "flake8", output, None
+
+
+def case_stub_files_are_not_checked():
+    output = ['src/pkg/b.pyi:2: error: Name "x" is not defined\n']
+    return "mypy", output, None
+
+
+def case_no_files_reported():
+    output = ["mypy.ini: No [mypy] section in config file\n"]
+    return "mypy", output, None
+
+
+def case_command_which_does_not_report_files():
+    output = ["src/pkg/a.py failed\n"]
+    return "pytest", output, None
+
+
+@parametrize_with_cases(argnames=["name", "output", "failed_files"], cases=THIS_MODULE)
+def test_failed_files(name, output, failed_files, source):
+    command = Command(name=name, help="This is help")
+    output = [line.format(source=source) for line in output]
+
+    assert command.failed_files(SOURCE, output) == failed_files
+
+
+def test_failed_files_of_file_source(source):
+    command = Command(name="flake8", help="This is help")
+
+    assert (
+        command.failed_files(
+            str(Path(SOURCE) / "pkg" / "a.py"), ["src/pkg/a.py:1:1: F401\n"]
+        )
+        is None
+    )
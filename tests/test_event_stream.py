@@ -0,0 +1,109 @@
+import io
+import json
+
+import pytest
+
+from statue.command import Command
+from statue.evaluation import CommandEvaluation, Evaluation, SourceEvaluation
+from statue.event_stream import EventStreamWriter
+from tests.constants import ARG1, COMMAND1, COMMAND_HELP_STRING1, SOURCE1
+
+COMMAND = Command(name=COMMAND1, help=COMMAND_HELP_STRING1, args=[ARG1])
+
+
+@pytest.fixture
+def mock_event_time(mocker):
+    mocker.patch("time.time", return_value=100)
+    return mocker.patch("time.monotonic", return_value=10)
+
+
+def events_of(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_task_started(mock_event_time):
+    output = io.StringIO()
+
+    EventStreamWriter(output).on_task_started(SOURCE1, COMMAND)
+
+    assert events_of(output) == [
+        dict(
+            event="task_started",
+            time=100,
+            source=SOURCE1,
+            command=dict(name=COMMAND1, help=COMMAND_HELP_STRING1, args=[ARG1]),
+        )
+    ]
+
+
+def test_task_finished(mock_event_time):
+    output = io.StringIO()
+    event_stream_writer = EventStreamWriter(output)
+    command_evaluation = CommandEvaluation(
+        command=COMMAND, success=False, failed_files=["a.py"], duration=1.5
+    )
+
+    event_stream_writer.on_task_finished(
+        SOURCE1, command_evaluation, output=["a.py:1: error\n", "1 error\n"]
+    )
+    event_stream_writer.on_task_finished(SOURCE1, command_evaluation)
+
+    assert events_of(output) == [
+        dict(
+            event="task_finished",
+            time=100,
+            **json.loads(command_evaluation.as_json_line(SOURCE1)),
+            output="a.py:1: error\n1 error\n",
+        ),
+        dict(
+            event="task_finished",
+            time=100,
+            **json.loads(command_evaluation.as_json_line(SOURCE1)),
+        ),
+    ]
+
+
+def test_cache_hit(mock_event_time):
+    output = io.StringIO()
+    command_evaluation = CommandEvaluation(command=COMMAND, success=True)
+
+    EventStreamWriter(output).on_cache_hit(SOURCE1, command_evaluation)
+
+    assert events_of(output) == [
+        dict(
+            event="task_cached",
+            time=100,
+            **json.loads(command_evaluation.as_json_line(SOURCE1)),
+        )
+    ]
+
+
+def test_run_finished(mock_event_time):
+    output = io.StringIO()
+    event_stream_writer = EventStreamWriter(output)
+    mock_event_time.return_value = 12.5
+
+    event_stream_writer.on_run_finished(
+        Evaluation(
+            {
+                SOURCE1: SourceEvaluation(
+                    [
+                        CommandEvaluation(command=COMMAND, success=True),
+                        CommandEvaluation(command=COMMAND, success=False),
+                    ]
+                )
+            }
+        )
+    )
+
+    assert events_of(output) == [
+        dict(
+            event="run_finished",
+            time=100,
+            success=False,
+            commands_number=2,
+            successful_commands_number=1,
+            failed_commands_number=1,
+            duration=2.5,
+        )
+    ]
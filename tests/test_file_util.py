@@ -0,0 +1,66 @@
+import os
+import stat
+
+import pytest
+
+from statue.file_util import atomic_write
+
+
+def test_atomic_write_creates_file(tmp_path):
+    output = tmp_path / "output.txt"
+
+    with atomic_write(output) as output_file:
+        output_file.write("content")
+
+    assert output.read_text() == "content"
+    assert list(tmp_path.iterdir()) == [output]
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    output = tmp_path / "output.bin"
+    output.write_bytes(b"previous")
+
+    with atomic_write(output, mode="wb") as output_file:
+        output_file.write(b"new")
+
+    assert output.read_bytes() == b"new"
+    assert list(tmp_path.iterdir()) == [output]
+
+
+def test_atomic_write_keeps_file_on_failure(tmp_path):
+    output = tmp_path / "output.txt"
+    output.write_text("previous")
+
+    with pytest.raises(ValueError):
+        with atomic_write(output) as output_file:
+            output_file.write("partial")
+            raise ValueError()
+
+    assert output.read_text() == "previous"
+    assert list(tmp_path.iterdir()) == [output]
+
+
+def test_atomic_write_creates_file_as_umask_allows(tmp_path):
+    output = tmp_path / "output.txt"
+    umask = os.umask(0o027)
+    try:
+        with atomic_write(output) as output_file:
+            output_file.write("content")
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(output.stat().st_mode) == 0o640
+
+
+def test_atomic_write_skips_taken_temporary_path(tmp_path, mocker):
+    output = tmp_path / "output.txt"
+    taken_path = tmp_path / ".output.txt.taken.tmp"
+    taken_path.write_text("other writer")
+    mocker.patch("secrets.token_hex", side_effect=["taken", "free"])
+
+    with atomic_write(output) as output_file:
+        output_file.write("content")
+
+    assert output.read_text() == "content"
+    assert taken_path.read_text() == "other writer"
+    assert sorted(tmp_path.iterdir()) == [taken_path, output]
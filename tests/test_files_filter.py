@@ -0,0 +1,144 @@
+from pathlib import Path
+
+from pytest_cases import THIS_MODULE, fixture, parametrize_with_cases
+
+from statue.files_filter import FilesFilter
+
+
+@fixture
+def source(tmpdir):
+    source_path = Path(tmpdir) / "src"
+    for relative_path, content in [
+        ("__init__.py", ""),
+        ("module.py", "a = 1\n"),
+        ("big_module.py", "a = 1\n" * 100),
+        ("service_pb2.py", ""),
+        ("README.md", ""),
+        ("migrations/__init__.py", ""),
+        ("migrations/0001_initial.py", ""),
+        ("inner/other.py", ""),
+        ("inner/__pycache__/other.py", ""),
+        (".hidden/hidden.py", ""),
+    ]:
+        file_path = source_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+    return source_path
+
+
+def case_no_filters():
+    return FilesFilter(), [
+        "__init__.py",
+        "big_module.py",
+        "inner/other.py",
+        "migrations/0001_initial.py",
+        "migrations/__init__.py",
+        "module.py",
+        "service_pb2.py",
+    ]
+
+
+def case_exclude_by_name():
+    return FilesFilter(exclude=("*_pb2.py", "__init__.py")), [
+        "big_module.py",
+        "inner/other.py",
+        "migrations/0001_initial.py",
+        "module.py",
+    ]
+
+
+def case_exclude_by_path():
+    return FilesFilter(exclude=("migrations/*",)), [
+        "__init__.py",
+        "big_module.py",
+        "inner/other.py",
+        "module.py",
+        "service_pb2.py",
+    ]
+
+
+def case_include_and_exclude():
+    return FilesFilter(include=("inner/*", "*module.py"), exclude=("big_*",)), [
+        "inner/other.py",
+        "module.py",
+    ]
+
+
+def case_max_file_size():
+    return FilesFilter(exclude=("*_pb2.py",), max_file_size=10), [
+        "__init__.py",
+        "inner/other.py",
+        "migrations/0001_initial.py",
+        "migrations/__init__.py",
+        "module.py",
+    ]
+
+
+def case_files():
+    return FilesFilter(exclude=("big_*",), files=("big_module.py", "inner/other.py")), [
+        "inner/other.py"
+    ]
+
+
+@parametrize_with_cases(argnames=["files_filter", "expected_files"], cases=THIS_MODULE)
+def test_filter_directory_source(files_filter, expected_files, source):
+    assert files_filter.filter_source(source) == [
+        str(source / expected_file) for expected_file in expected_files
+    ]
+
+
+def test_filter_file_source(source):
+    files_filter = FilesFilter(exclude=("*_pb2.py",))
+    assert files_filter.filter_source(source / "module.py") == [
+        str(source / "module.py")
+    ]
+    assert files_filter.filter_source(source / "service_pb2.py") == []
+
+
+def test_combine_filters():
+    source_filter = FilesFilter(include=("*.py",), exclude=("a.py",))
+    command_filter = FilesFilter(exclude=("b.py",), max_file_size=100)
+    assert source_filter.combine(command_filter) == FilesFilter(
+        include=("*.py",), exclude=("a.py", "b.py"), max_file_size=100
+    )
+    assert source_filter.combine(None) == source_filter
+
+
+def test_combine_filters_with_files():
+    files_filter = FilesFilter(files=("a.py", "b.py"))
+    assert files_filter.combine(FilesFilter(exclude=("c.py",))) == FilesFilter(
+        exclude=("c.py",), files=("a.py", "b.py")
+    )
+    assert FilesFilter(exclude=("c.py",)).combine(files_filter) == FilesFilter(
+        exclude=("c.py",), files=("a.py", "b.py")
+    )
+    assert files_filter.combine(FilesFilter(files=("b.py", "c.py"))) == FilesFilter(
+        files=("b.py",)
+    )
+
+
+def test_filter_from_setup():
+    setup = dict(include=["*.py"], exclude=["a.py"], max_file_size=7, contexts=[])
+    assert FilesFilter.from_setup(setup) == FilesFilter(
+        include=("*.py",), exclude=("a.py",), max_file_size=7
+    )
+    assert FilesFilter.from_setup(setup, allow_include=False) == FilesFilter(
+        exclude=("a.py",), max_file_size=7
+    )
+    assert FilesFilter.from_setup(dict(contexts=[])) is None
+
+
+def test_filter_json():
+    files_filter = FilesFilter(include=("*.py",), exclude=("a.py",), max_file_size=7)
+    assert files_filter.as_json() == dict(
+        include=["*.py"], exclude=["a.py"], max_file_size=7
+    )
+    assert FilesFilter.from_json(files_filter.as_json()) == files_filter
+
+
+def test_filter_with_files_json():
+    files_filter = FilesFilter(files=("a.py",))
+    assert files_filter.as_json() == dict(
+        include=[], exclude=[], max_file_size=None, files=["a.py"]
+    )
+    assert FilesFilter.from_json(files_filter.as_json()) == files_filter
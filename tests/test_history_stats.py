@@ -0,0 +1,248 @@
+from collections import Counter
+
+import pytest
+from pytest_cases import parametrize
+
+from statue.history_stats import (
+    DAILY,
+    WEEKLY,
+    CommandHistory,
+    CommandRollup,
+    CommandStats,
+    bucket_duration,
+    commands_stats,
+    duration_bucket,
+    mann_whitney_p_value,
+    period_start,
+    quantile,
+    recent_windows,
+)
+from statue.retention import SECONDS_IN_DAY
+from tests.constants import COMMAND1, COMMAND2, SOURCE1, SOURCE2
+
+
+def history(source, command, durations, failures=0, runs=None):
+    return CommandHistory(
+        source=source,
+        command=command,
+        runs=len(durations) if runs is None else runs,
+        failures=failures,
+        durations=[(duration, 1) for duration in durations],
+    )
+
+
+@parametrize(
+    "fraction, expected",
+    [(0, 1), (0.5, 2.5), (0.95, 3.85), (1, 4)],
+)
+def test_quantile(fraction, expected):
+    assert quantile([(1, 1), (2, 1), (3, 1), (4, 1)], fraction) == pytest.approx(
+        expected
+    )
+
+
+@parametrize(
+    "fraction, expected",
+    [(0, 1), (0.25, 1), (0.5, 2), (0.9, 7), (1, 10)],
+)
+def test_quantile_of_counted_values(fraction, expected):
+    assert quantile([(1, 3), (2, 2), (5, 1), (10, 1)], fraction) == pytest.approx(
+        expected
+    )
+
+
+def test_mann_whitney_p_value_of_slower_values():
+    assert mann_whitney_p_value(Counter(range(1, 11)), Counter(range(11, 21))) < 0.001
+
+
+def test_mann_whitney_p_value_of_faster_values():
+    assert mann_whitney_p_value(Counter(range(11, 21)), Counter(range(1, 11))) > 0.999
+
+
+def test_mann_whitney_p_value_of_same_values():
+    assert mann_whitney_p_value(Counter([1, 2, 3]), Counter([1, 2, 3])) > 0.5
+    assert mann_whitney_p_value({1: 5}, {1: 5}) == 1.0
+
+
+def test_mann_whitney_p_value_of_counted_values():
+    assert mann_whitney_p_value({1: 4, 2: 1}, {1: 1, 3: 2}) == pytest.approx(
+        mann_whitney_p_value(Counter([1, 1, 1, 1, 2]), Counter([1, 3, 3]))
+    )
+
+
+def test_recent_windows():
+    assert recent_windows([(1, 1), (2, 5), (3, 1), (4, 2)], 4, 3) == (
+        Counter({2: 3}),
+        Counter({2: 1, 3: 1, 4: 2}),
+    )
+    assert recent_windows([(1, 2), (2, 1)], 4, 3) == (Counter(), {1: 2, 2: 1})
+
+
+def test_commands_stats():
+    stats = commands_stats(
+        [
+            history(SOURCE2, COMMAND1, [1.0] * 4, failures=1),
+            history(SOURCE1, COMMAND2, [], failures=2, runs=2),
+            history(SOURCE1, COMMAND1, [1.0, 2.0, 3.0, 4.0, 5.0]),
+        ],
+        window=2,
+    )
+
+    assert stats == [
+        CommandStats(
+            source=SOURCE1,
+            command=COMMAND1,
+            runs=5,
+            failures=0,
+            median_duration=3.0,
+            p95_duration=pytest.approx(4.8),
+            trend=pytest.approx(3.2269),
+        ),
+        CommandStats(source=SOURCE1, command=COMMAND2, runs=2, failures=2),
+        CommandStats(
+            source=SOURCE2,
+            command=COMMAND1,
+            runs=4,
+            failures=1,
+            median_duration=1.0,
+            p95_duration=1.0,
+            trend=1.0,
+        ),
+    ]
+    assert [command_stats.failure_rate for command_stats in stats] == [0, 1, 0.25]
+
+
+def test_commands_stats_detects_slowdown():
+    (command_stats,) = commands_stats(
+        [
+            history(
+                SOURCE1, COMMAND1, [1.0, 1.1, 0.9, 1.0] * 5 + [1.4, 1.5, 1.3, 1.4] * 3
+            )
+        ],
+        window=12,
+    )
+
+    assert command_stats.p_value < 0.01
+    assert command_stats.slowdown == pytest.approx(0.4)
+
+
+def test_commands_stats_ignores_insignificant_changes():
+    (command_stats,) = commands_stats(
+        [history(SOURCE1, COMMAND1, [1.0, 1.4, 0.9, 1.3] * 6)], window=12
+    )
+
+    assert command_stats.p_value > 0.01
+    assert command_stats.slowdown is None
+
+
+def test_commands_stats_compares_to_bounded_baseline():
+    durations = [2.0] * 50 + [1.0, 1.1, 0.9, 1.0] * 5 + [1.4, 1.5, 1.3, 1.4] * 3
+
+    (command_stats,) = commands_stats(
+        [history(SOURCE1, COMMAND1, durations)], window=12, baseline_window=20
+    )
+    (unbounded_stats,) = commands_stats(
+        [history(SOURCE1, COMMAND1, durations)], window=12, baseline_window=1000
+    )
+
+    assert command_stats.slowdown == pytest.approx(0.4)
+    assert unbounded_stats.slowdown is None
+
+
+def test_commands_stats_of_counted_durations():
+    expanded_durations = [1.0] * 3 + [2.0] * 4 + [1.0] + [3.0] * 5
+    counted_history = CommandHistory(
+        source=SOURCE1,
+        command=COMMAND1,
+        runs=13,
+        durations=[(1.0, 3), (2.0, 4), (1.0, 1), (3.0, 5)],
+    )
+
+    assert commands_stats([counted_history], window=5) == commands_stats(
+        [history(SOURCE1, COMMAND1, expanded_durations)], window=5
+    )
+
+
+def test_commands_stats_with_zero_durations():
+    (command_stats,) = commands_stats(
+        [history(SOURCE1, COMMAND1, [0.0] * 5 + [1.0] * 5)], window=5, significance=1
+    )
+
+    assert command_stats.p_value < 0.01
+    assert command_stats.slowdown is None
+
+
+def test_command_stats_as_json():
+    command_stats = CommandStats(
+        source=SOURCE1,
+        command=COMMAND1,
+        runs=4,
+        failures=1,
+        median_duration=1.0,
+        p95_duration=2.0,
+        trend=1.5,
+        slowdown=0.4,
+        p_value=0.001,
+    )
+
+    assert command_stats.as_json() == dict(
+        source=SOURCE1,
+        command=COMMAND1,
+        runs=4,
+        failures=1,
+        failure_rate=0.25,
+        median_duration=1.0,
+        p95_duration=2.0,
+        trend=1.5,
+        slowdown=0.4,
+        p_value=0.001,
+    )
+
+
+@parametrize("duration", [0.0015, 0.3, 1, 42.5, 3600])
+def test_bucket_duration_is_close_to_duration(duration):
+    assert bucket_duration(duration_bucket(duration)) == pytest.approx(
+        duration, rel=0.025
+    )
+
+
+def test_short_durations_share_first_bucket():
+    assert duration_bucket(0) == duration_bucket(0.0001) == 0
+
+
+def test_rollup_bucketed_durations():
+    rollup = CommandRollup()
+    for success, duration in [(True, 2), (False, 1), (True, None), (True, 2)]:
+        rollup.add(success, duration)
+
+    assert rollup.runs == 4
+    assert rollup.failures == 1
+    assert rollup.bucketed_durations() == [
+        (pytest.approx(1, rel=0.025), 1),
+        (pytest.approx(2, rel=0.025), 2),
+    ]
+
+
+def test_merge_rollups():
+    rollup = CommandRollup(runs=2, failures=1, durations={3: 1, 5: 1})
+    rollup.merge(CommandRollup(runs=3, failures=0, durations={5: 2, 8: 1}))
+
+    assert rollup == CommandRollup(runs=5, failures=1, durations={3: 1, 5: 3, 8: 1})
+
+
+def test_rollup_from_row():
+    rollup = CommandRollup(runs=2, failures=1, durations={3: 1, 5: 1})
+
+    assert CommandRollup.from_row(2, 1, rollup.durations_as_json()) == rollup
+
+
+@parametrize(
+    "days, period_days, expected_days",
+    [(10.5, DAILY, 10), (10, DAILY, 10), (10.5, WEEKLY, 4), (11, WEEKLY, 11)],
+)
+def test_period_start(days, period_days, expected_days):
+    # 1970-01-05, 4 days after the epoch, was a Monday
+    assert (
+        period_start(days * SECONDS_IN_DAY, period_days)
+        == expected_days * SECONDS_IN_DAY
+    )
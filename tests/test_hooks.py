@@ -0,0 +1,197 @@
+import types
+from unittest.mock import Mock, call
+
+import pytest
+
+from statue.hooks import (
+    CACHE_HIT,
+    RUN_FINISHED,
+    TASK_FINISHED,
+    TASK_STARTED,
+    Hooks,
+)
+from tests.constants import SOURCE1
+
+
+class Plugin:
+    instances = []
+
+    def __init__(self):
+        self.events = []
+        Plugin.instances.append(self)
+
+    def on_task_started(self, source, command):
+        self.events.append((TASK_STARTED, source, command))
+
+
+@pytest.fixture(autouse=True)
+def reset_hooks():
+    Hooks.reset()
+    Plugin.instances = []
+    yield
+    Hooks.reset()
+
+
+@pytest.fixture
+def mock_iter_entry_points(mocker):
+    return mocker.patch("pkg_resources.iter_entry_points")
+
+
+def entry_point(name, plugin=None, error=None):
+    mock_entry_point = Mock(load=Mock(return_value=plugin, side_effect=error))
+    # "name" is an argument of the Mock constructor, so it is set afterwards
+    mock_entry_point.name = name
+    return mock_entry_point
+
+
+def test_emit_without_plugins():
+    Hooks.emit(TASK_STARTED, source=SOURCE1, command=None)
+
+    assert Hooks.plugins() == []
+    assert not Hooks.enabled(TASK_STARTED)
+
+
+def test_emit_calls_handlers_in_registration_order():
+    calls = []
+    first = types.SimpleNamespace(
+        on_task_started=lambda **payload: calls.append(("first", payload)),
+        on_run_finished=lambda **payload: calls.append(("first", payload)),
+    )
+    second = types.SimpleNamespace(
+        on_task_started=lambda **payload: calls.append(("second", payload))
+    )
+
+    Hooks.register(first)
+    Hooks.register(second)
+    Hooks.emit(TASK_STARTED, source=SOURCE1, command=None)
+    Hooks.emit(CACHE_HIT, source=SOURCE1, command_evaluation=None)
+
+    assert calls == [
+        ("first", dict(source=SOURCE1, command=None)),
+        ("second", dict(source=SOURCE1, command=None)),
+    ]
+    assert Hooks.enabled(TASK_STARTED)
+    assert Hooks.enabled(RUN_FINISHED)
+    assert not Hooks.enabled(TASK_FINISHED)
+
+
+def test_unregister():
+    plugin = Mock()
+    other_plugin = Mock()
+    Hooks.register(plugin)
+    Hooks.register(other_plugin)
+
+    Hooks.unregister(plugin)
+    Hooks.unregister(plugin)
+    Hooks.emit(RUN_FINISHED, evaluation=None)
+
+    assert Hooks.plugins() == [other_plugin]
+    plugin.on_run_finished.assert_not_called()
+    other_plugin.on_run_finished.assert_called_once_with(evaluation=None)
+
+
+def test_load_plugins(mock_iter_entry_points):
+    module_plugin = Mock()
+    mock_iter_entry_points.return_value = [
+        entry_point("module", plugin=module_plugin),
+        entry_point("class", plugin=Plugin),
+    ]
+
+    Hooks.load_plugins()
+    Hooks.load_plugins()
+    Hooks.emit(TASK_STARTED, source=SOURCE1, command=None)
+
+    mock_iter_entry_points.assert_called_once_with("statue.plugins")
+    assert Hooks.plugins() == [module_plugin, Plugin.instances[0]]
+    module_plugin.on_task_started.assert_called_once_with(source=SOURCE1, command=None)
+    assert Plugin.instances[0].events == [(TASK_STARTED, SOURCE1, None)]
+
+
+def test_emit_reports_failing_handlers():
+    calls = []
+    failing = types.SimpleNamespace(
+        __name__="failing",
+        on_task_started=Mock(side_effect=ValueError("bad command")),
+    )
+    other = types.SimpleNamespace(
+        on_task_started=lambda **payload: calls.append(payload)
+    )
+    Hooks.register(failing)
+    Hooks.register(other)
+
+    for _ in range(2):
+        with pytest.warns(
+            UserWarning,
+            match='Statue plugin "failing" failed handling task_started: bad command$',
+        ):
+            Hooks.emit(TASK_STARTED, source=SOURCE1, command=None)
+
+    assert Hooks.plugins() == [failing, other]
+    assert failing.on_task_started.call_count == 2
+    assert calls == [dict(source=SOURCE1, command=None)] * 2
+
+
+def test_emit_disables_failing_plugins():
+    failing = Plugin()
+    failing.on_task_started = Mock(side_effect=ValueError("bad command"))
+    Hooks.register(failing, disable_on_error=True)
+
+    with pytest.warns(
+        UserWarning,
+        match=(
+            'Statue plugin "Plugin" failed handling task_started: bad command, '
+            "plugin is disabled"
+        ),
+    ):
+        Hooks.emit(TASK_STARTED, source=SOURCE1, command=None)
+    Hooks.emit(TASK_STARTED, source=SOURCE1, command=None)
+
+    assert Hooks.plugins() == []
+    failing.on_task_started.assert_called_once_with(source=SOURCE1, command=None)
+    Hooks.register(failing)
+    with pytest.warns(UserWarning, match="bad command$"):
+        Hooks.emit(TASK_STARTED, source=SOURCE1, command=None)
+    assert Hooks.plugins() == [failing]
+
+
+def test_load_plugins_skips_broken_plugins(mock_iter_entry_points):
+    plugin = Mock()
+    mock_iter_entry_points.return_value = [
+        entry_point("broken", error=ImportError("No module named broken")),
+        entry_point("plugin", plugin=plugin),
+    ]
+
+    with pytest.warns(
+        UserWarning,
+        match='Could not load statue plugin "broken": No module named broken',
+    ):
+        Hooks.load_plugins()
+
+    assert Hooks.plugins() == [plugin]
+
+
+def test_load_plugins_disables_failing_plugins(mock_iter_entry_points):
+    plugin = Mock(on_run_finished=Mock(side_effect=ValueError("bad evaluation")))
+    mock_iter_entry_points.return_value = [entry_point("plugin", plugin=plugin)]
+    Hooks.load_plugins()
+
+    with pytest.warns(UserWarning, match="bad evaluation, plugin is disabled"):
+        Hooks.emit(RUN_FINISHED, evaluation=None)
+
+    assert Hooks.plugins() == []
+
+
+def test_reset_loads_plugins_again(mock_iter_entry_points):
+    plugin = Mock()
+    mock_iter_entry_points.return_value = [entry_point("plugin", plugin=plugin)]
+    Hooks.load_plugins()
+
+    Hooks.reset()
+    assert Hooks.plugins() == []
+    Hooks.load_plugins()
+
+    assert Hooks.plugins() == [plugin]
+    assert mock_iter_entry_points.call_args_list == [
+        call("statue.plugins"),
+        call("statue.plugins"),
+    ]
@@ -0,0 +1,134 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from statue.command import Command
+from statue.files_filter import FilesFilter
+from statue.hotspots import (
+    CommandHotspots,
+    FileTiming,
+    Hotspot,
+    command_files,
+    file_digest,
+    rank_hotspots,
+    time_file,
+    time_files,
+)
+from statue.verbosity import SILENT
+from tests.constants import (
+    ARG1,
+    COMMAND1,
+    COMMAND2,
+    COMMAND_HELP_STRING1,
+    SOURCE1,
+    SOURCE2,
+)
+
+
+@pytest.fixture
+def mock_run_subprocess(mocker):
+    return mocker.patch.object(Command, "_run_subprocess", return_value=0)
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source = tmp_path / SOURCE1
+    (source / "pkg").mkdir(parents=True)
+    for file in ["a.py", "pkg/b.py", "pkg/c.txt"]:
+        (source / file).write_text(f"# {file}")
+    return source
+
+
+def test_file_digest(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1")
+    (tmp_path / "b.py").write_text("a = 1")
+    (tmp_path / "c.py").write_text("a = 2")
+
+    assert file_digest(tmp_path / "a.py") == file_digest(tmp_path / "b.py")
+    assert file_digest(tmp_path / "a.py") != file_digest(tmp_path / "c.py")
+
+
+def test_command_files(source_dir):
+    assert command_files(
+        source_dir, Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+    ) == [str(source_dir / "a.py"), str(source_dir / "pkg" / "b.py")]
+    assert command_files(
+        source_dir,
+        Command(
+            name=COMMAND1,
+            help=COMMAND_HELP_STRING1,
+            files_filter=FilesFilter(exclude=("pkg/*",)),
+        ),
+    ) == [str(source_dir / "a.py")]
+
+
+def test_time_file(mock_run_subprocess):
+    mock_run_subprocess.return_value = 1
+    command = Command(
+        name=COMMAND1,
+        help=COMMAND_HELP_STRING1,
+        args=[ARG1],
+        files_filter=FilesFilter(include=("pkg/*",)),
+    )
+
+    file_timing = time_file(command, "a.py")
+
+    assert file_timing.file == "a.py"
+    assert not file_timing.success
+    assert file_timing.duration >= 0
+    mock_run_subprocess.assert_called_once_with(
+        [COMMAND1, "a.py", ARG1], SILENT, None, None
+    )
+
+
+def test_time_files_in_parallel(mock_run_subprocess):
+    barrier = threading.Barrier(3, timeout=5)
+    mock_run_subprocess.side_effect = lambda *args: barrier.wait() and 0
+
+    files_timings = time_files(
+        Command(name=COMMAND1, help=COMMAND_HELP_STRING1),
+        ["a.py", "b.py", "c.py"],
+        jobs=3,
+    )
+
+    assert [file_timing.file for file_timing in files_timings] == [
+        "a.py",
+        "b.py",
+        "c.py",
+    ]
+
+
+def test_rank_hotspots():
+    timings = {
+        COMMAND1: {
+            SOURCE1: [FileTiming("a.py", 1, True), FileTiming("b.py", 3, True)],
+            SOURCE2: [FileTiming("c.py", 2, False)],
+        },
+        COMMAND2: {SOURCE1: [FileTiming("a.py", 0, True)]},
+    }
+
+    assert rank_hotspots(timings, top=2) == [
+        CommandHotspots(
+            command=COMMAND1,
+            total=6,
+            files_number=3,
+            hotspots=[
+                Hotspot(source=SOURCE1, file="b.py", duration=3, share=0.75),
+                Hotspot(source=SOURCE2, file="c.py", duration=2, share=1),
+            ],
+        ),
+        CommandHotspots(
+            command=COMMAND2,
+            total=0,
+            files_number=1,
+            hotspots=[Hotspot(source=SOURCE1, file="a.py", duration=0, share=0)],
+        ),
+    ]
+    assert len(rank_hotspots(timings)[0].hotspots) == 3
+
+
+def test_rank_hotspots_of_empty_source():
+    assert rank_hotspots({COMMAND1: {str(Path(SOURCE1)): []}}) == [
+        CommandHotspots(command=COMMAND1)
+    ]
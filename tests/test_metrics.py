@@ -0,0 +1,200 @@
+import pytest
+
+from statue.command import Command
+from statue.evaluation import CommandEvaluation, Evaluation, SourceEvaluation
+from statue.metrics import (
+    DURATION_BUCKETS,
+    CommandMetrics,
+    commands_metrics,
+    metrics_text,
+    save_metrics,
+    source_group,
+)
+from tests.constants import (
+    COMMAND1,
+    COMMAND2,
+    COMMAND_HELP_STRING1,
+    COMMAND_HELP_STRING2,
+    CONTEXT1,
+    CONTEXT2,
+    SOURCE1,
+    SOURCE2,
+)
+
+COMMAND_1 = Command(name=COMMAND1, help=COMMAND_HELP_STRING1)
+COMMAND_2 = Command(name=COMMAND2, help=COMMAND_HELP_STRING2)
+
+
+@pytest.fixture
+def mock_getrusage(mocker):
+    return mocker.patch("resource.getrusage")
+
+
+def evaluation_of(sources_evaluations):
+    return Evaluation(
+        sources_evaluations={
+            source: SourceEvaluation(commands_evaluations=commands_evaluations)
+            for source, commands_evaluations in sources_evaluations.items()
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "source, group",
+    [
+        (SOURCE1, SOURCE1),
+        (f"{SOURCE1}/a/b.py", SOURCE1),
+        ("", "."),
+    ],
+)
+def test_source_group(source, group):
+    assert source_group(source) == group
+
+
+def test_command_metrics_add_duration():
+    command_metrics = CommandMetrics()
+
+    command_metrics.add_duration(0.1)
+    command_metrics.add_duration(0.2)
+    command_metrics.add_duration(3)
+    command_metrics.add_duration(1000)
+
+    assert command_metrics.buckets == [1, 1, 0, 0, 0, 1] + [0] * (
+        len(DURATION_BUCKETS) - 6
+    )
+    assert command_metrics.duration_sum == pytest.approx(1003.3)
+    assert command_metrics.duration_count == 4
+
+
+def test_commands_metrics():
+    evaluation = evaluation_of(
+        {
+            SOURCE1: [
+                CommandEvaluation(command=COMMAND_1, success=True, duration=0.5),
+                CommandEvaluation(
+                    command=COMMAND_2,
+                    success=False,
+                    duration=2,
+                    output_bytes=10,
+                    peak_rss=300,
+                ),
+            ],
+            f"{SOURCE1}/a.py": [
+                CommandEvaluation(command=COMMAND_1, success=False, duration=0.2),
+                CommandEvaluation(
+                    command=COMMAND_2, success=True, output_bytes=5, peak_rss=200
+                ),
+            ],
+            SOURCE2: [CommandEvaluation(command=COMMAND_1, success=True, duration=1)],
+        }
+    )
+    cached_evaluation = evaluation_of(
+        {SOURCE1: [CommandEvaluation(command=COMMAND_1, success=True, duration=0.5)]}
+    )
+
+    metrics = commands_metrics(
+        evaluation,
+        sources_contexts={SOURCE1: [CONTEXT1], f"{SOURCE1}/a.py": [CONTEXT1]},
+        cached_evaluation=cached_evaluation,
+    )
+
+    assert list(metrics.keys()) == [
+        (COMMAND1, CONTEXT1, SOURCE1),
+        (COMMAND2, CONTEXT1, SOURCE1),
+        (COMMAND1, "", SOURCE2),
+    ]
+    command1_metrics = metrics[(COMMAND1, CONTEXT1, SOURCE1)]
+    assert command1_metrics.tasks == 2
+    assert command1_metrics.failures == 1
+    assert command1_metrics.cache_hits == 1
+    assert command1_metrics.duration_count == 1
+    assert command1_metrics.duration_sum == pytest.approx(0.2)
+    command2_metrics = metrics[(COMMAND2, CONTEXT1, SOURCE1)]
+    assert command2_metrics.tasks == 2
+    assert command2_metrics.failures == 1
+    assert command2_metrics.cache_hits == 0
+    assert command2_metrics.duration_count == 1
+    assert command2_metrics.output_bytes == 15
+    assert command2_metrics.peak_rss == 300
+    assert metrics[(COMMAND1, "", SOURCE2)].tasks == 1
+    assert metrics[(COMMAND1, "", SOURCE2)].peak_rss is None
+
+
+def test_metrics_text(mock_getrusage):
+    mock_getrusage.return_value.ru_maxrss = 2
+    command_metrics = CommandMetrics(
+        tasks=3, failures=1, cache_hits=1, output_bytes=20, peak_rss=4096
+    )
+    command_metrics.add_duration(0.3)
+    command_metrics.add_duration(400)
+
+    text = metrics_text(
+        {
+            (COMMAND1, f'{CONTEXT1},{CONTEXT2}\\"', SOURCE1): command_metrics,
+            (COMMAND2, "", SOURCE2): CommandMetrics(tasks=1),
+        },
+        timestamp=1000.5,
+    )
+
+    labels = (
+        f'command="{COMMAND1}",context="{CONTEXT1},{CONTEXT2}\\\\\\"",'
+        f'source_group="{SOURCE1}"'
+    )
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert lines[:5] == [
+        "# HELP statue_command_tasks_total Evaluations of the command.",
+        "# TYPE statue_command_tasks_total counter",
+        f"statue_command_tasks_total{{{labels}}} 3",
+        f'statue_command_tasks_total{{command="{COMMAND2}",context="",'
+        f'source_group="{SOURCE2}"}} 1',
+        "# HELP statue_command_failures_total Failed evaluations of the command.",
+    ]
+    assert f"statue_command_failures_total{{{labels}}} 1" in lines
+    assert f"statue_command_cache_hits_total{{{labels}}} 1" in lines
+    assert f"statue_command_cache_misses_total{{{labels}}} 2" in lines
+    assert f"statue_command_output_bytes_total{{{labels}}} 20" in lines
+    assert "# TYPE statue_command_duration_seconds histogram" in lines
+    assert f'statue_command_duration_seconds_bucket{{{labels},le="0.25"}} 0' in lines
+    assert f'statue_command_duration_seconds_bucket{{{labels},le="0.5"}} 1' in lines
+    assert f'statue_command_duration_seconds_bucket{{{labels},le="300.0"}} 1' in lines
+    assert f'statue_command_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"statue_command_duration_seconds_sum{{{labels}}} 400.3" in lines
+    assert f"statue_command_duration_seconds_count{{{labels}}} 2" in lines
+    assert "# TYPE statue_command_peak_rss_bytes gauge" in lines
+    assert [line for line in lines if line.startswith("statue_command_peak_rss")] == [
+        f"statue_command_peak_rss_bytes{{{labels}}} 4096"
+    ]
+    assert 'statue_peak_rss_bytes{process="statue"} 2048' in lines
+    assert 'statue_peak_rss_bytes{process="tools"} 2048' in lines
+    assert lines[-1] == "statue_last_run_timestamp_seconds 1000.5"
+
+
+def test_metrics_text_of_peak_rss_in_bytes(mocker, mock_getrusage):
+    mocker.patch("statue.metrics.MAX_RSS_UNIT", 1)
+    mock_getrusage.return_value.ru_maxrss = 2
+
+    lines = metrics_text({}, timestamp=0).splitlines()
+
+    assert 'statue_peak_rss_bytes{process="statue"} 2' in lines
+
+
+def test_save_metrics(tmp_path, mock_time):
+    mock_time.return_value = 1234
+    output = tmp_path / "statue.prom"
+    output.write_text("old metrics")
+
+    save_metrics(
+        output,
+        evaluation_of(
+            {SOURCE1: [CommandEvaluation(command=COMMAND_1, success=True, duration=1)]}
+        ),
+        sources_contexts={},
+    )
+
+    lines = output.read_text().splitlines()
+    assert (
+        f'statue_command_tasks_total{{command="{COMMAND1}",context="",'
+        f'source_group="{SOURCE1}"}} 1'
+    ) in lines
+    assert lines[-1] == "statue_last_run_timestamp_seconds 1234"
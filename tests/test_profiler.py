@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from statue.profiler import START_UP, PhaseTime, Profiler
+
+PHASE1 = "phase1"
+PHASE2 = "phase2"
+
+
+@pytest.fixture
+def mock_perf_counter(mocker):
+    mock = mocker.patch("time.perf_counter")
+    mock.return_value = 0
+    Profiler.reset()
+    yield mock
+    mock.side_effect = None
+    Profiler.reset()
+
+
+def test_phase_time_is_summed(mock_perf_counter):
+    mock_perf_counter.side_effect = [1, 3, 10, 11]
+    with Profiler.phase(PHASE1):
+        pass
+    with Profiler.phase(PHASE1):
+        pass
+    Profiler.add(PHASE2, 0.5)
+
+    assert Profiler.phases() == {
+        PHASE1: PhaseTime(total=3, count=2),
+        PHASE2: PhaseTime(total=0.5, count=1),
+    }
+
+
+def test_phase_is_measured_on_error(mock_perf_counter):
+    mock_perf_counter.side_effect = [1, 4]
+    with pytest.raises(ValueError):
+        with Profiler.phase(PHASE1):
+            raise ValueError()
+
+    assert Profiler.phases() == {PHASE1: PhaseTime(total=3, count=1)}
+
+
+def test_start_up_is_measured_from_start(mock_perf_counter):
+    mock_perf_counter.return_value = 2.5
+    Profiler.finish_start_up()
+
+    assert Profiler.phases() == {START_UP: PhaseTime(total=2.5, count=1)}
+    assert Profiler.elapsed() == 2.5
+
+
+def test_phases_are_copied(mock_perf_counter):
+    Profiler.add(PHASE1, 1)
+    Profiler.phases()[PHASE1].total = 5
+
+    assert Profiler.phases()[PHASE1].total == 1
+
+
+def test_phases_are_added_from_threads(mock_perf_counter):
+    def add_phases(_):
+        for _ in range(1000):
+            Profiler.add(PHASE1, 1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(add_phases, range(8)))
+
+    assert Profiler.phases() == {PHASE1: PhaseTime(total=8000, count=8000)}
@@ -0,0 +1,210 @@
+import os
+import subprocess  # nosec
+import sys
+
+import pytest
+
+from statue.resource_sampler import (
+    ProcessStat,
+    ResourceSample,
+    ResourceSampler,
+    children_listed,
+    children_pids,
+    descendants,
+    is_supported,
+    processes_stats,
+    read_process_stat,
+    running_descendants,
+)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def stat_line(pid, ppid, cpu_ticks=0, threads=1, rss_pages=0, name="tool"):
+    fields = ["S", str(ppid)] + ["0"] * 9
+    fields += [str(cpu_ticks), "0"] + ["0"] * 4 + [str(threads)] + ["0"] * 3
+    fields += [str(rss_pages)] + ["0"] * 5
+    return f"{pid} ({name}) {' '.join(fields)}\n"
+
+
+def write_proc_dir(proc_dir, stat_lines, tasks_children=None):
+    (proc_dir / "self").mkdir(parents=True)
+    (proc_dir / "self" / "stat").write_text(stat_line(1, 0))
+    for pid, line in stat_lines.items():
+        (proc_dir / str(pid)).mkdir(exist_ok=True)
+        if line is not None:
+            (proc_dir / str(pid) / "stat").write_text(line)
+    if tasks_children is None:
+        return
+    tasks_children = {("self", 1): [], **tasks_children}
+    for (pid, tid), children in tasks_children.items():
+        task_dir = proc_dir / str(pid) / "task" / str(tid)
+        task_dir.mkdir(parents=True)
+        (task_dir / "children").write_text("".join(f"{child} " for child in children))
+
+
+@pytest.fixture
+def mock_monotonic(mocker):
+    return mocker.patch("time.monotonic")
+
+
+@pytest.fixture
+def mock_getpid(mocker):
+    return mocker.patch("os.getpid", return_value=1)
+
+
+def test_read_process_stat():
+    assert read_process_stat(
+        stat_line(12, 3, cpu_ticks=7, threads=4, rss_pages=100, name="a) (b")
+    ) == ProcessStat(pid=12, ppid=3, cpu_ticks=7, rss_pages=100, threads=4)
+
+
+def test_read_process_stat_of_this_process():
+    with open("/proc/self/stat") as stat_file:
+        process_stat = read_process_stat(stat_file.read())
+
+    assert process_stat.pid == os.getpid()
+    assert process_stat.ppid == os.getppid()
+    assert process_stat.threads >= 1
+    assert process_stat.rss_pages > 0
+
+
+def test_is_supported(tmp_path):
+    assert not is_supported(tmp_path)
+    write_proc_dir(tmp_path, {})
+    assert is_supported(tmp_path)
+
+
+def test_processes_stats(tmp_path):
+    write_proc_dir(
+        tmp_path, {2: stat_line(2, 1), 3: None, 4: "4 (broken", 5: stat_line(5, 2)}
+    )
+
+    assert sorted(
+        processes_stats(tmp_path), key=lambda process_stat: process_stat.pid
+    ) == [
+        ProcessStat(pid=2, ppid=1, cpu_ticks=0, rss_pages=0, threads=1),
+        ProcessStat(pid=5, ppid=2, cpu_ticks=0, rss_pages=0, threads=1),
+    ]
+
+
+def test_descendants():
+    stats = [
+        read_process_stat(stat_line(pid, ppid))
+        for pid, ppid in [(1, 0), (2, 1), (3, 2), (4, 3), (5, 0), (6, 5), (7, 1)]
+    ]
+
+    assert sorted(process.pid for process in descendants(1, stats)) == [2, 3, 4, 7]
+    assert descendants(4, stats) == []
+
+
+def test_children_listed(tmp_path, mock_getpid):
+    write_proc_dir(tmp_path, {})
+    assert not children_listed(tmp_path)
+
+    write_proc_dir(tmp_path / "listed", {}, tasks_children={})
+    assert children_listed(tmp_path / "listed")
+
+
+def test_children_pids(tmp_path):
+    write_proc_dir(tmp_path, {}, tasks_children={(1, 1): [2, 3], (1, 10): [4]})
+
+    assert sorted(children_pids(1, tmp_path)) == [2, 3, 4]
+    with pytest.raises(OSError):
+        children_pids(2, tmp_path)
+
+
+def test_running_descendants(tmp_path):
+    write_proc_dir(
+        tmp_path,
+        {
+            2: stat_line(2, 1),
+            3: stat_line(3, 2),
+            4: "4 (broken",
+            5: None,
+            7: stat_line(7, 1),
+            9: stat_line(9, 0),
+        },
+        tasks_children={
+            (1, 1): [2, 4],
+            (1, 10): [7],
+            (2, 2): [3, 5],
+            (7, 7): [8],
+            (9, 9): [],
+        },
+    )
+
+    assert sorted(process.pid for process in running_descendants(1, tmp_path)) == [
+        2,
+        3,
+        7,
+    ]
+    assert running_descendants(9, tmp_path) == []
+
+
+@pytest.mark.parametrize(
+    "tasks_children", [None, {(1, 1): [2], (2, 2): [3], (3, 3): [], (4, 4): []}]
+)
+def test_resource_sampler_sample(tmp_path, mock_getpid, mock_monotonic, tasks_children):
+    write_proc_dir(
+        tmp_path,
+        {
+            2: stat_line(2, 1, cpu_ticks=10, threads=2, rss_pages=100),
+            3: stat_line(3, 2, cpu_ticks=5, threads=1, rss_pages=50),
+            4: stat_line(4, 0, cpu_ticks=1000, threads=8, rss_pages=1000),
+        },
+        tasks_children=tasks_children,
+    )
+    mock_monotonic.side_effect = [10, 10.25, 11.25, 11.25]
+    samples = []
+    resource_sampler = ResourceSampler(
+        interval=0.5, on_sample=samples.append, proc_dir=tmp_path
+    )
+
+    first_sample = resource_sampler.sample()
+    (tmp_path / "2" / "stat").write_text(
+        stat_line(2, 1, cpu_ticks=10 + CLOCK_TICKS // 2, threads=2, rss_pages=200)
+    )
+    second_sample = resource_sampler.sample()
+    third_sample = resource_sampler.sample()
+
+    assert samples == [first_sample, second_sample, third_sample]
+    assert first_sample == ResourceSample(
+        processes=2,
+        cpu_percent=pytest.approx(100 * 15 / CLOCK_TICKS / 0.25),
+        rss_bytes=150 * PAGE_SIZE,
+        threads=3,
+    )
+    assert second_sample == ResourceSample(
+        processes=2,
+        cpu_percent=pytest.approx(100 * (CLOCK_TICKS // 2) / CLOCK_TICKS),
+        rss_bytes=250 * PAGE_SIZE,
+        threads=3,
+    )
+    assert third_sample == ResourceSample(
+        processes=2, cpu_percent=0, rss_bytes=250 * PAGE_SIZE, threads=3
+    )
+
+
+def test_resource_sampler_samples_running_tools():
+    samples = []
+    resource_sampler = ResourceSampler(interval=0.01, on_sample=samples.append)
+    with subprocess.Popen(  # nosec
+        [sys.executable, "-c", "import time; time.sleep(0.2)"]
+    ) as process:
+        resource_sampler.start()
+        process.wait()
+    resource_sampler.stop()
+    samples_number = len(samples)
+
+    assert any(
+        resource_sample.processes == 1 and resource_sample.rss_bytes > 0
+        for resource_sample in samples
+    )
+    resource_sampler.stop()
+    assert len(samples) == samples_number
+
+
+def test_resource_sampler_stop_without_start():
+    ResourceSampler(interval=1, on_sample=print).stop()
@@ -0,0 +1,79 @@
+import pytest
+from pytest_cases import parametrize
+
+from statue.constants import (
+    HISTORY_SIZE,
+    MAX_AGE_DAYS,
+    MAX_RUNS,
+    MAX_SIZE,
+    MIN_RUNS,
+    ROLLUP,
+    WEEKLY_ROLLUP_AFTER,
+)
+from statue.exceptions import InvalidStatueConfiguration
+from statue.retention import SECONDS_IN_DAY, RetentionPolicy
+
+NOW = 100 * SECONDS_IN_DAY
+RUNS = [(run_id, NOW - run_id * SECONDS_IN_DAY) for run_id in range(1, 7)]
+
+
+def test_default_retention_policy():
+    assert RetentionPolicy.from_setup({}) == RetentionPolicy(
+        max_runs=HISTORY_SIZE, min_runs=1, max_age_days=None, max_size=None
+    )
+    assert RetentionPolicy().expired_runs(RUNS, NOW) == []
+
+
+def test_retention_policy_from_setup():
+    assert RetentionPolicy.from_setup(
+        {MAX_RUNS: 100, MIN_RUNS: 5, MAX_AGE_DAYS: 7.5, MAX_SIZE: 1_000_000}
+    ) == RetentionPolicy(max_runs=100, min_runs=5, max_age_days=7.5, max_size=1_000_000)
+
+
+def test_rollup_retention_policy_from_setup():
+    assert RetentionPolicy.from_setup(
+        {ROLLUP: True, WEEKLY_ROLLUP_AFTER: 14}
+    ) == RetentionPolicy(rollup=True, weekly_rollup_after_days=14)
+
+
+def test_expired_runs_by_number():
+    assert RetentionPolicy(max_runs=4).expired_runs(RUNS, NOW) == [5, 6]
+
+
+def test_expired_runs_by_age():
+    assert RetentionPolicy(max_age_days=3.5).expired_runs(RUNS, NOW) == [4, 5, 6]
+
+
+def test_expired_runs_keeps_minimal_number_of_runs():
+    assert RetentionPolicy(max_runs=0, min_runs=2).expired_runs(RUNS, NOW) == [
+        3,
+        4,
+        5,
+        6,
+    ]
+    assert RetentionPolicy(max_age_days=0, min_runs=5).expired_runs(RUNS, NOW) == [6]
+
+
+@parametrize("value", ["7", True, [1]])
+def test_retention_policy_with_invalid_type(value):
+    with pytest.raises(
+        InvalidStatueConfiguration,
+        match=f'^History "{MAX_RUNS}" should be a number',
+    ):
+        RetentionPolicy.from_setup({MAX_RUNS: value})
+
+
+def test_retention_policy_with_negative_limit():
+    with pytest.raises(
+        InvalidStatueConfiguration,
+        match=f'^History "{MAX_SIZE}" should not be negative, got -1.$',
+    ):
+        RetentionPolicy.from_setup({MAX_SIZE: -1})
+
+
+def test_retention_policy_with_invalid_rollup():
+    with pytest.raises(
+        InvalidStatueConfiguration,
+        match=f'^History "{ROLLUP}" should be a boolean, got "yes".$',
+    ):
+        RetentionPolicy.from_setup({ROLLUP: "yes"})
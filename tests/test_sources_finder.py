@@ -85,6 +85,53 @@ def case_ignore_inner_directory(path_tmpdir):
     return repo, path_tmpdir, []
 
 
+def case_python_package_in_directory(path_tmpdir):
+    package = path_tmpdir / "package"
+    existing_files(package, file_names=["__init__.py", "one.py"])
+    existing_files(package, "inner", file_names=["two.py"])
+    three = existing_file(path_tmpdir, "three.py")
+    return None, path_tmpdir, [package, three]
+
+
+def case_tracked_and_untracked_files(path_tmpdir):
+    one, two = existing_files(path_tmpdir, "inner", file_names=["one.py", "two.py"])
+    three = existing_file(path_tmpdir, "three.py")
+    repo = Repo.init(path_tmpdir)
+    repo.index.add([str(one), str(three)])
+    return repo, path_tmpdir, [one, two, three]
+
+
+def case_deleted_tracked_file(path_tmpdir):
+    one, two = existing_files(path_tmpdir, file_names=["one.py", "two.py"])
+    repo = Repo.init(path_tmpdir)
+    repo.index.add([str(one), str(two)])
+    two.unlink()
+    return repo, path_tmpdir, [one]
+
+
+def case_ignore_inside_inner_directory_of_repository(path_tmpdir):
+    inner = path_tmpdir / "inner"
+    one, two = existing_files(inner, file_names=["one.py", "two.py"])
+    existing_file(path_tmpdir, "three.py")
+    package = inner / "package"
+    existing_files(package, file_names=["__init__.py"])
+    repo = Repo.init(path_tmpdir)
+    ignore_paths(repo, files=[two])
+    return repo, inner, [one, package]
+
+
+def case_directory_outside_of_repository(path_tmpdir):
+    one = existing_file(path_tmpdir, "outside", "one.py")
+    repo = Repo.init(path_tmpdir / "repository")
+    return repo, path_tmpdir / "outside", [one]
+
+
+def case_bare_repository(path_tmpdir):
+    one = existing_file(path_tmpdir, "one.py")
+    repo = Repo.init(path_tmpdir / "bare", bare=True)
+    return repo, path_tmpdir, [one]
+
+
 @parametrize_with_cases(argnames=["repo", "directory", "sources"], cases=THIS_MODULE)
 def test_sources_finder(repo, directory, sources):
     assert find_sources(directory, repo=repo) == sources
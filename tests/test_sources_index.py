@@ -0,0 +1,211 @@
+import os
+from pathlib import Path
+
+from git import Repo
+from pytest_cases import fixture
+
+from statue import sources_index as sources_index_module
+from statue.sources_finder import find_sources
+from statue.sources_index import SourcesIndex
+
+
+def existing_file(*args):
+    file_path = Path(*args)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.touch()
+    return file_path
+
+
+def bump_mtime(path: Path):
+    stat_result = path.stat()
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+
+
+@fixture
+def root(tmpdir):
+    root_path = Path(tmpdir)
+    existing_file(root_path, "setup.py")
+    existing_file(root_path, "src", "package", "__init__.py")
+    existing_file(root_path, "src", "package", "module.py")
+    existing_file(root_path, "tests", "test_one.py")
+    existing_file(root_path, "tests", "inner", "test_two.py")
+    existing_file(root_path, "tests", "README.txt")
+    existing_file(root_path, ".scripts", "tool.py")
+    return root_path
+
+
+@fixture
+def mock_scandir(mocker):
+    return mocker.spy(os, "scandir")
+
+
+def test_sources_index_first_refresh(root):
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh()
+
+    assert sources_index.sources() == [
+        root / ".scripts" / "tool.py",
+        root / "setup.py",
+        root / "src" / "package",
+        root / "tests" / "inner" / "test_two.py",
+        root / "tests" / "test_one.py",
+    ]
+    assert sources_index.sources() == find_sources(root)
+
+
+def test_sources_index_refresh_without_changes(root, mock_scandir):
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh()
+    mock_scandir.reset_mock()
+
+    sources_index.refresh()
+
+    mock_scandir.assert_not_called()
+
+
+def test_sources_index_refresh_rescans_changed_directories(root, mock_scandir):
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh()
+    mock_scandir.reset_mock()
+
+    (root / "tests" / "test_one.py").unlink()
+    existing_file(root, "tests", "test_three.py")
+    bump_mtime(root / "tests")
+    sources_index.refresh()
+
+    mock_scandir.assert_called_once_with(root / "tests")
+    assert sources_index.sources() == find_sources(root)
+    assert root / "tests" / "test_three.py" in sources_index.sources()
+
+
+def test_sources_index_removed_directory(root):
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh()
+
+    inner = root / "tests" / "inner"
+    (inner / "test_two.py").unlink()
+    inner.rmdir()
+    bump_mtime(root / "tests")
+    sources_index.refresh()
+
+    assert "tests/inner" not in sources_index.directories
+    assert sources_index.sources() == find_sources(root)
+
+
+def test_sources_index_save_and_load(root, tmpdir):
+    index_path = Path(tmpdir) / "index.json"
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh()
+    sources_index.save_as_json(index_path)
+
+    loaded_index = SourcesIndex.load_from_file(index_path)
+    assert loaded_index == sources_index
+
+
+def test_sources_index_load_corrupted_file(tmpdir):
+    index_path = Path(tmpdir) / "index.json"
+    index_path.write_text('{"version": 1, "root"')
+    assert SourcesIndex.load_from_file(index_path) is None
+
+
+def test_sources_index_load_other_version(tmpdir):
+    index_path = Path(tmpdir) / "index.json"
+    index_path.write_text('{"version": 0}')
+    assert SourcesIndex.load_from_file(index_path) is None
+
+
+def test_sources_index_of_missing_root(tmpdir):
+    sources_index = SourcesIndex(root=Path(tmpdir) / "missing")
+
+    assert sources_index.sources() == []
+    sources_index.refresh()
+    assert sources_index.sources() == []
+
+
+def test_sources_index_skips_broken_links(root):
+    (root / "broken.py").symlink_to(root / "missing.py")
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh()
+
+    assert root / "broken.py" not in sources_index.sources()
+
+
+def test_sources_index_lists_repository_files_once(root, mocker):
+    (root / ".gitignore").write_text("tests/inner\nsetup.py\n")
+    repo = Repo.init(root)
+    repository_files = mocker.spy(sources_index_module, "repository_files")
+    sources_index = SourcesIndex(root=root)
+
+    sources_index.refresh(repo=repo)
+
+    repository_files.assert_called_once_with(root, repo)
+    assert sources_index.sources() == [
+        root / ".scripts" / "tool.py",
+        root / "src" / "package",
+        root / "tests" / "test_one.py",
+    ]
+    assert sources_index.sources() == find_sources(root, repo=repo)
+
+
+def test_sources_index_follows_gitignore_changes(root):
+    repo = Repo.init(root)
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh(repo=repo)
+
+    (root / "tests" / ".gitignore").write_text("inner\n")
+    sources_index.refresh(repo=repo)
+    assert root / "tests" / "inner" / "test_two.py" not in sources_index.sources()
+
+    (root / "tests" / ".gitignore").unlink()
+    sources_index.refresh(repo=repo)
+    assert root / "tests" / "inner" / "test_two.py" in sources_index.sources()
+
+
+def test_sources_index_skips_removed_tracked_files(root):
+    repo = Repo.init(root)
+    repo.git.add(".")
+    (root / "setup.py").unlink()
+    sources_index = SourcesIndex(root=root)
+
+    sources_index.refresh(repo=repo)
+
+    assert sources_index.sources() == find_sources(root, repo=repo)
+    assert root / "setup.py" not in sources_index.sources()
+
+
+def test_sources_index_with_and_without_repository(root):
+    (root / ".gitignore").write_text("setup.py\n")
+    repo = Repo.init(root)
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh()
+
+    sources_index.refresh(repo=repo)
+    assert root / "setup.py" not in sources_index.sources()
+    sources_index.refresh()
+    assert root / "setup.py" in sources_index.sources()
+
+
+def test_sources_index_outside_of_repository(root, tmpdir):
+    repo = Repo.init(Path(tmpdir) / "repository")
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh(repo=repo)
+
+    assert sources_index.sources() == find_sources(root)
+
+
+def test_find_sources_from_index(root):
+    sources_index = SourcesIndex(root=root)
+    sources_index.refresh()
+    existing_file(root, "new.py")
+
+    assert find_sources(root, sources_index=sources_index) == [
+        root / ".scripts" / "tool.py",
+        root / "setup.py",
+        root / "src" / "package",
+        root / "tests" / "inner" / "test_two.py",
+        root / "tests" / "test_one.py",
+    ]
+    assert find_sources(root / "tests", sources_index=sources_index) == [
+        root / "tests" / "inner" / "test_two.py",
+        root / "tests" / "test_one.py",
+    ]
@@ -0,0 +1,116 @@
+import io
+import json
+import os
+
+import pytest
+
+from statue.command import Command
+from statue.evaluation import CommandEvaluation
+from statue.trace import TraceWriter
+from tests.constants import ARG1, COMMAND1, COMMAND_HELP_STRING1, SOURCE1
+
+
+class UnclosedStringIO(io.StringIO):
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def mock_perf_counter(mocker):
+    return mocker.patch("time.perf_counter", return_value=10)
+
+
+def test_trace_metadata(mock_perf_counter):
+    output = UnclosedStringIO()
+
+    TraceWriter(output).close()
+
+    assert json.loads(output.getvalue()) == [
+        dict(name="process_name", ph="M", args=dict(name="statue"), pid=os.getpid()),
+        dict(
+            name="thread_name",
+            ph="M",
+            tid=0,
+            args=dict(name="worker 0"),
+            pid=os.getpid(),
+        ),
+    ]
+
+
+def test_trace_command_evaluated(mock_perf_counter):
+    output = UnclosedStringIO()
+    trace_writer = TraceWriter(output)
+    mock_perf_counter.return_value = 13
+    trace_writer.command_evaluated(
+        SOURCE1,
+        CommandEvaluation(
+            command=Command(name=COMMAND1, help=COMMAND_HELP_STRING1, args=[ARG1]),
+            success=False,
+            failed_files=["a.py", "b.py"],
+            duration=2,
+        ),
+    )
+    trace_writer.command_evaluated(
+        SOURCE1,
+        CommandEvaluation(
+            command=Command(name=COMMAND1, help=COMMAND_HELP_STRING1), success=True
+        ),
+    )
+    trace_writer.close()
+
+    events = json.loads(output.getvalue())[2:]
+    assert events == [
+        dict(
+            name=COMMAND1,
+            cat="command",
+            ph="X",
+            ts=1e6,
+            dur=2e6,
+            tid=0,
+            args=dict(source=SOURCE1, args=[ARG1], success=False, failed_files=2),
+            pid=os.getpid(),
+        ),
+        dict(
+            name=COMMAND1,
+            cat="command",
+            ph="X",
+            ts=3e6,
+            dur=0,
+            tid=0,
+            args=dict(source=SOURCE1, args=[], success=True),
+            pid=os.getpid(),
+        ),
+    ]
+
+
+def test_trace_instant(mock_perf_counter):
+    output = UnclosedStringIO()
+    trace_writer = TraceWriter(output)
+    mock_perf_counter.return_value = 10.5
+    trace_writer.instant("interrupted")
+    trace_writer.instant("resumed", dict(source=SOURCE1))
+
+    # Events are streamed, so an unclosed trace is valid once its array is closed
+    events = json.loads(output.getvalue() + "]")[2:]
+    assert [(event["name"], event["ph"], event["ts"]) for event in events] == [
+        ("interrupted", "i", 5e5),
+        ("resumed", "i", 5e5),
+    ]
+    assert [event["args"] for event in events] == [{}, dict(source=SOURCE1)]
+
+
+def test_trace_counter(mock_perf_counter):
+    output = UnclosedStringIO()
+    trace_writer = TraceWriter(output)
+    mock_perf_counter.return_value = 11
+    trace_writer.counter("tools memory", dict(rss=1024))
+    trace_writer.close()
+
+    assert json.loads(output.getvalue())[2] == dict(
+        name="tools memory",
+        cat="resources",
+        ph="C",
+        ts=1e6,
+        args=dict(rss=1024),
+        pid=os.getpid(),
+    )